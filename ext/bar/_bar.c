@@ -28,11 +28,67 @@ extern double _bar_df(double *db_IJ, int L1, double *db_JI, int L2, double *scra
     {
         scratch[i] = db_IJ[i]>0 ? 0 : db_IJ[i];
     }
-    ln_avg1 = _logsumexp_sort_kahan_inplace(scratch, L1);
-    for (i=0; i<L1; i++)
+    ln_avg1 = _logsumexp_inplace(scratch, L1);
+    for (i=0; i<L2; i++)
     {
         scratch[i] = db_JI[i]>0 ? 0 : db_JI[i];
     }
-    ln_avg2 = _logsumexp_sort_kahan_inplace(scratch, L2);
+    ln_avg2 = _logsumexp_inplace(scratch, L2);
     return ln_avg2 - ln_avg1;
-}
\ No newline at end of file
+}
+
+/* logsumexp of min(b_t(x) - b_s(x), 0) over the rows [first, last) without scratch memory */
+static double _bar_log_acceptance(
+    double *bias, int n_therm_states, int first, int last, int s, int t)
+{
+    int x;
+    double value, max_value = -INFINITY, sum = 0.0, err = 0.0, loc, tmp;
+    for(x=first; x<last; ++x)
+    {
+        value = bias[x * n_therm_states + t] - bias[x * n_therm_states + s];
+        if(value > 0) value = 0;
+        if(value > max_value) max_value = value;
+    }
+    if(max_value == -INFINITY) return -INFINITY;
+    for(x=first; x<last; ++x)
+    {
+        value = bias[x * n_therm_states + t] - bias[x * n_therm_states + s];
+        if(value > 0) value = 0;
+        _kahan_summation_step(exp(value - max_value), &sum, &err, &loc, &tmp);
+    }
+    return max_value + log(sum);
+}
+
+extern void _bar_variance_overlap(
+    double *bias, int n_therm_states, int *offsets, double factor, int *overlap)
+{
+    int k, l, x, N_k, N_l, result;
+    double df, shift, B, err, loc, tmp;
+    for(k=0; k<n_therm_states * n_therm_states; ++k)
+        overlap[k] = 0;
+    for(k=0; k<n_therm_states; ++k)
+    {
+        N_k = offsets[k + 1] - offsets[k];
+        if(N_k == 0) continue;
+        for(l=k+1; l<n_therm_states; ++l)
+        {
+            N_l = offsets[l + 1] - offsets[l];
+            if(N_l == 0) continue;
+            df = _bar_log_acceptance(bias, n_therm_states, offsets[l], offsets[l + 1], l, k)
+                - _bar_log_acceptance(bias, n_therm_states, offsets[k], offsets[k + 1], k, l);
+            shift = df - log((double) N_k / (double) N_l);
+            B = 0.0; err = 0.0;
+            for(x=offsets[k]; x<offsets[k + 1]; ++x)
+                _kahan_summation_step(1.0 / (2.0 + 2.0 * cosh(shift - bias[x * n_therm_states + l]
+                    + bias[x * n_therm_states + k])), &B, &err, &loc, &tmp);
+            for(x=offsets[l]; x<offsets[l + 1]; ++x)
+                _kahan_summation_step(1.0 / (2.0 + 2.0 * cosh(shift - bias[x * n_therm_states + l]
+                    + bias[x * n_therm_states + k])), &B, &err, &loc, &tmp);
+            /* swapping k and l flips the sign of the cosh argument, hence (l, k) gives the
+               same variance as (k, l) */
+            result = (1.0 / B - (double) (N_k + N_l) / ((double) N_k * (double) N_l)) < factor;
+            overlap[k * n_therm_states + l] = result;
+            overlap[l * n_therm_states + k] = result;
+        }
+    }
+}
@@ -21,6 +21,8 @@
 #define THERMOTOOLS_BAR
 
 extern double _bar_df(double *db_IJ, int L1, double *db_JI, int L2, double *scratch);
+extern void _bar_variance_overlap(
+    double *bias, int n_therm_states, int *offsets, double factor, int *overlap);
 
 #endif
 
@@ -22,10 +22,12 @@ Python interface to the BAR ratio initialisation.
 import numpy as _np
 cimport numpy as _np
 
-__all__ = ['df']
+__all__ = ['df', 'variance_overlap']
 
 cdef extern from "_bar.h":
-    double _bar_df(double *db_IJ, int L1, double *db_JI, int L2, double *scratch)
+    double _bar_df(double *db_IJ, int L1, double *db_JI, int L2, double *scratch) nogil
+    void _bar_variance_overlap(
+        double *bias, int n_therm_states, int *offsets, double factor, int *overlap) nogil
 
 def df(_np.ndarray[double, ndim=1, mode="c"] db_IJ not None,
        _np.ndarray[double, ndim=1, mode="c"] db_JI not None,
@@ -60,9 +62,57 @@ def df(_np.ndarray[double, ndim=1, mode="c"] db_IJ not None,
     .. [1] Bennett, C. H.: Efficient Estimation of Free Energy Differences from
         Monte Carlo Data. J. Comput. Phys. 22, 245-268 (1976)
     """
-    return _bar_df(
-        <double*> _np.PyArray_DATA(db_IJ),
-        db_IJ.shape[0],
-        <double*> _np.PyArray_DATA(db_JI), 
-        db_JI.shape[0],
-        <double*> _np.PyArray_DATA(scratch))
+    cdef:
+        double *p_IJ = <double*> _np.PyArray_DATA(db_IJ)
+        double *p_JI = <double*> _np.PyArray_DATA(db_JI)
+        double *p_scratch = <double*> _np.PyArray_DATA(scratch)
+        int L1 = db_IJ.shape[0]
+        int L2 = db_JI.shape[0]
+        double result
+    with nogil:
+        result = _bar_df(p_IJ, L1, p_JI, L2, p_scratch)
+    return result
+
+def variance_overlap(
+    _np.ndarray[double, ndim=2, mode="c"] bias not None,
+    _np.ndarray[int, ndim=1, mode="c"] offsets not None,
+    factor=1.0):
+    r"""
+    Check the BAR variance between all pairs of thermodynamic states at once.
+
+    Parameters
+    ----------
+    bias : numpy.ndarray(shape=(X, T), dtype=numpy.float64)
+        reduced bias energies of X samples grouped by their generating thermodynamic state
+    offsets : numpy.ndarray(shape=(T+1,), dtype=numpy.intc)
+        the samples generated in thermodynamic state k are bias[offsets[k]:offsets[k+1], :]
+    factor : float, optional, default=1.0
+        threshold for the variance of the free energy differences
+
+    Returns
+    -------
+    overlap : numpy.ndarray(shape=(T, T), dtype=numpy.intc)
+        overlap[k, l] is one if both states have samples and the asymptotic variance of
+        the BAR free energy difference between k and l is smaller than factor
+
+    Notes
+    -----
+    The work values of every pair are evaluated in place and shared between (k, l) and
+    (l, k), which have the same variance.
+    """
+    cdef:
+        int n_therm_states = bias.shape[1]
+        double c_factor = factor
+        double *p_bias = <double*> _np.PyArray_DATA(bias)
+        int *p_offsets = <int*> _np.PyArray_DATA(offsets)
+        int *p_overlap
+        _np.ndarray[int, ndim=2, mode="c"] overlap
+    if offsets.shape[0] != n_therm_states + 1:
+        raise ValueError("offsets must have one element more than bias has columns")
+    if offsets[0] < 0 or offsets[n_therm_states] > bias.shape[0] or _np.any(_np.diff(offsets) < 0):
+        raise ValueError("offsets must be nondecreasing row indices of bias")
+    overlap = _np.zeros(shape=(n_therm_states, n_therm_states), dtype=_np.intc)
+    p_overlap = <int*> _np.PyArray_DATA(overlap)
+    with nogil:
+        _bar_variance_overlap(p_bias, n_therm_states, p_offsets, c_factor, p_overlap)
+    return overlap
@@ -39,6 +39,21 @@ extern void _dtram_init_log_lagrangian_mult(
     }
 }
 
+extern void _dtram_init_log_lagrangian_mult_sparse(
+    int *indptr, int *counts_ij, int *counts_ji,
+    int n_therm_states, int n_conf_states, double *log_lagrangian_mult)
+{
+    int Ki, e, TM = n_therm_states * n_conf_states;
+    double sum;
+    for(Ki=0; Ki<TM; ++Ki)
+    {
+        sum = 0;
+        for(e=indptr[Ki]; e<indptr[Ki + 1]; ++e)
+            sum += 0.5 * (counts_ij[e] + counts_ji[e]);
+        log_lagrangian_mult[Ki] = log(THERMOTOOLS_DTRAM_PRIOR + sum);
+    }
+}
+
 extern void _dtram_update_log_lagrangian_mult(
     double *log_lagrangian_mult, double *bias_energies, double *conf_energies, int *count_matrices,
     int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult)
@@ -74,7 +89,83 @@ extern void _dtram_update_log_lagrangian_mult(
                         log_lagrangian_mult[Ki] - conf_energies[j] - bias_energies[Kj]);
                 scratch_M[o++] = log((double) CK) - bias_energies[Kj] - conf_energies[j] + log_lagrangian_mult[Ki] - divisor;
             }
-            new_log_lagrangian_mult[Ki] = _logsumexp_sort_kahan_inplace(scratch_M, o);
+            new_log_lagrangian_mult[Ki] = _logsumexp_inplace(scratch_M, o);
+        }
+    }
+}
+
+extern void _dtram_update_log_lagrangian_mult_sparse(
+    double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult)
+{
+    int i, j, K, e, o;
+    int Ki, Kj;
+    int CK, CKij;
+    double divisor;
+    for(K=0; K<n_therm_states; ++K)
+    {
+        for(i=0; i<n_conf_states; ++i)
+        {
+            Ki = K*n_conf_states+i;
+            o = 0;
+            for(e=indptr[Ki]; e<indptr[Ki + 1]; ++e)
+            {
+                j = indices[e];
+                CKij = counts_ij[e];
+                /* special case: most variables cancel out, here */
+                if(i == j)
+                {
+                    scratch_M[o++] = (0 == CKij) ?
+                        THERMOTOOLS_DTRAM_LOG_PRIOR : log(THERMOTOOLS_DTRAM_PRIOR + (double) CKij);
+                    continue;
+                }
+                CK = CKij + counts_ji[e];
+                Kj = K*n_conf_states+j;
+                /* special case */
+                if(0 == CK) continue;
+                /* regular case */
+                divisor = _logsumexp_pair(
+                        log_lagrangian_mult[Kj] - conf_energies[i] - bias_energies[Ki],
+                        log_lagrangian_mult[Ki] - conf_energies[j] - bias_energies[Kj]);
+                scratch_M[o++] = log((double) CK) - bias_energies[Kj] - conf_energies[j] + log_lagrangian_mult[Ki] - divisor;
+            }
+            new_log_lagrangian_mult[Ki] = _logsumexp_inplace(scratch_M, o);
+        }
+    }
+}
+
+extern void _dtram_update_log_lagrangian_mult_logc(
+    double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+    int *indptr, int *indices, double *log_counts,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult)
+{
+    int i, j, K, e, o;
+    int Ki, Kj;
+    double divisor;
+    for(K=0; K<n_therm_states; ++K)
+    {
+        for(i=0; i<n_conf_states; ++i)
+        {
+            Ki = K*n_conf_states+i;
+            o = 0;
+            for(e=indptr[Ki]; e<indptr[Ki + 1]; ++e)
+            {
+                j = indices[e];
+                /* special case: most variables cancel out, here */
+                if(i == j)
+                {
+                    scratch_M[o++] = log_counts[e];
+                    continue;
+                }
+                /* regular case */
+                Kj = K*n_conf_states+j;
+                divisor = _logsumexp_pair(
+                        log_lagrangian_mult[Kj] - conf_energies[i] - bias_energies[Ki],
+                        log_lagrangian_mult[Ki] - conf_energies[j] - bias_energies[Kj]);
+                scratch_M[o++] = log_counts[e] - bias_energies[Kj] - conf_energies[j] + log_lagrangian_mult[Ki] - divisor;
+            }
+            new_log_lagrangian_mult[Ki] = _logsumexp_inplace(scratch_M, o);
         }
     }
 }
@@ -120,11 +211,95 @@ extern void _dtram_update_conf_energies(
             }
         }
         /* patch Ci and the total divisor together */
-        new_conf_energies[i] = _logsumexp_sort_kahan_inplace(scratch_TM, o) - log(
+        new_conf_energies[i] = _logsumexp_inplace(scratch_TM, o) - log(
+            n_therm_states*THERMOTOOLS_DTRAM_PRIOR + (double) Ci);
+    }
+}
+
+extern void _dtram_update_conf_energies_sparse(
+    double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji, int n_therm_states,
+    int n_conf_states, double *scratch_TM, double *new_conf_energies)
+{
+    int i, j, K, e, o;
+    int Ki, Kj;
+    int CK, CKij, CKji, Ci;
+    double divisor;
+    for(i=0; i<n_conf_states; ++i)
+    {
+        Ci = 0;
+        o = 0;
+        for(K=0; K<n_therm_states; ++K)
+        {
+            Ki = K*n_conf_states + i;
+            for(e=indptr[Ki]; e<indptr[Ki + 1]; ++e)
+            {
+                j = indices[e];
+                Kj = K*n_conf_states + j;
+                CKij = counts_ij[e];
+                CKji = counts_ji[e];
+                /* add counts to Ci */
+                Ci += CKji;
+                /* special case: most variables cancel out, here */
+                if(i == j)
+                {
+                    scratch_TM[o] = (0 == CKij) ?
+                        THERMOTOOLS_DTRAM_LOG_PRIOR : log(THERMOTOOLS_DTRAM_PRIOR + (double) CKij);
+                    scratch_TM[o++] += conf_energies[i];
+                    continue;
+                }
+                CK = CKij + CKji;
+                /* special case */
+                if(0 == CK) continue;
+                /* regular case */
+                divisor = _logsumexp_pair(
+                        log_lagrangian_mult[Kj] - conf_energies[i] - bias_energies[Ki],
+                        log_lagrangian_mult[Ki] - conf_energies[j] - bias_energies[Kj]);
+                scratch_TM[o++] = log((double) CK) - bias_energies[Ki] + log_lagrangian_mult[Kj] - divisor;
+            }
+        }
+        /* patch Ci and the total divisor together */
+        new_conf_energies[i] = _logsumexp_inplace(scratch_TM, o) - log(
             n_therm_states*THERMOTOOLS_DTRAM_PRIOR + (double) Ci);
     }
 }
 
+extern void _dtram_update_conf_energies_logc(
+    double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+    int *indptr, int *indices, double *log_counts, double *log_conf_counts, int n_therm_states,
+    int n_conf_states, double *scratch_TM, double *new_conf_energies)
+{
+    int i, j, K, e, o;
+    int Ki, Kj;
+    double divisor;
+    for(i=0; i<n_conf_states; ++i)
+    {
+        o = 0;
+        for(K=0; K<n_therm_states; ++K)
+        {
+            Ki = K*n_conf_states + i;
+            for(e=indptr[Ki]; e<indptr[Ki + 1]; ++e)
+            {
+                j = indices[e];
+                /* special case: most variables cancel out, here */
+                if(i == j)
+                {
+                    scratch_TM[o++] = log_counts[e] + conf_energies[i];
+                    continue;
+                }
+                /* regular case */
+                Kj = K*n_conf_states + j;
+                divisor = _logsumexp_pair(
+                        log_lagrangian_mult[Kj] - conf_energies[i] - bias_energies[Ki],
+                        log_lagrangian_mult[Ki] - conf_energies[j] - bias_energies[Kj]);
+                scratch_TM[o++] = log_counts[e] - bias_energies[Ki] + log_lagrangian_mult[Kj] - divisor;
+            }
+        }
+        /* log_conf_counts holds the logarithm of the prior-patched total divisor */
+        new_conf_energies[i] = _logsumexp_inplace(scratch_TM, o) - log_conf_counts[i];
+    }
+}
+
 extern void _dtram_estimate_transition_matrix(
     double *log_lagrangian_mult, double *bias_energies, double *conf_energies, int *count_matrix,
     int n_conf_states, double *scratch_M, double *transition_matrix)
@@ -161,7 +336,7 @@ extern void _dtram_estimate_transition_matrix(
             transition_matrix[ij] = exp(scratch_M[o++]);
         }
         /* compute the diagonal elements from the other elements in this line */
-        sum = exp(_logsumexp_sort_kahan_inplace(scratch_M, o));
+        sum = exp(_logsumexp_inplace(scratch_M, o));
         if(0.0 == sum)
         {
             for(j=0; j<n_conf_states; ++j)
@@ -176,6 +351,56 @@ extern void _dtram_estimate_transition_matrix(
     }
 }
 
+extern void _dtram_estimate_transition_matrix_sparse(
+    double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji,
+    int n_conf_states, double *scratch_M, double *transition_values)
+{
+    int i, j, e, o;
+    int C;
+    double divisor, sum;
+    /* indptr points to the M+1 row offsets of one thermodynamic state */
+    for(i=0; i<n_conf_states; ++i)
+    {
+        o = 0;
+        for(e=indptr[i]; e<indptr[i + 1]; ++e)
+        {
+            j = indices[e];
+            transition_values[e] = 0.0;
+            /* special case: diagonal element */
+            if(i == j)
+            {
+                scratch_M[o] = (0 == counts_ij[e]) ?
+                    THERMOTOOLS_DTRAM_LOG_PRIOR : log(THERMOTOOLS_DTRAM_PRIOR + (double) counts_ij[e]);
+                scratch_M[o] -= log_lagrangian_mult[i];
+                transition_values[e] = exp(scratch_M[o++]);
+                continue;
+            }
+            C = counts_ij[e] + counts_ji[e];
+            /* special case: this element is zero */
+            if(0 == C) continue;
+            /* regular case */
+            divisor = _logsumexp_pair(
+                    log_lagrangian_mult[j] - conf_energies[i] - bias_energies[i],
+                    log_lagrangian_mult[i] - conf_energies[j] - bias_energies[j]);
+            scratch_M[o] =  log((double) C) - conf_energies[j] - bias_energies[j] - divisor;
+            transition_values[e] = exp(scratch_M[o++]);
+        }
+        /* compute the diagonal elements from the other elements in this line */
+        sum = exp(_logsumexp_inplace(scratch_M, o));
+        if(0.0 == sum)
+        {
+            for(e=indptr[i]; e<indptr[i + 1]; ++e)
+                transition_values[e] = (i == indices[e]) ? 1.0 : 0.0;
+        }
+        else if(1.0 != sum)
+        {
+            for(e=indptr[i]; e<indptr[i + 1]; ++e)
+                transition_values[e] /= sum;
+        }
+    }
+}
+
 extern void _dtram_get_therm_energies(
     double *bias_energies, double *conf_energies, int n_therm_states, int n_conf_states,
     double *scratch_M, double *therm_energies)
@@ -185,7 +410,7 @@ extern void _dtram_get_therm_energies(
     {
         for(i=0; i<n_conf_states; ++i)
             scratch_M[i] = -(bias_energies[K*n_conf_states + i] + conf_energies[i]);
-        therm_energies[K] = -_logsumexp_sort_kahan_inplace(scratch_M, n_conf_states);
+        therm_energies[K] = -_logsumexp_inplace(scratch_M, n_conf_states);
     }
 }
 
@@ -196,7 +421,7 @@ extern void _dtram_normalize(
     double f0;
     for(i=0; i<n_conf_states; ++i)
         scratch_M[i] = -conf_energies[i];
-    f0 = -_logsumexp_sort_kahan_inplace(scratch_M, n_conf_states);
+    f0 = -_logsumexp_inplace(scratch_M, n_conf_states);
     for(K=0; K<n_therm_states; ++K)
         therm_energies[K] -= f0;
     for(i=0; i<n_conf_states; ++i)
@@ -217,6 +442,19 @@ extern double _dtram_get_loglikelihood(
     return sum;
 }
 
+extern double _dtram_get_loglikelihood_sparse(
+    int *counts_ij, double *transition_values, int nnz)
+{
+    int e;
+    double sum = 0.0;
+    for(e=0; e<nnz; ++e)
+    {
+        if(counts_ij[e] > 0)
+            sum += counts_ij[e] * log(transition_values[e]);
+    }
+    return sum;
+}
+
 extern double _dtram_get_prior()
 {
     return THERMOTOOLS_DTRAM_PRIOR;
@@ -26,18 +26,47 @@
 extern void _dtram_init_log_lagrangian_mult(
     int *count_matrices, int n_therm_states, int n_conf_states, double *log_lagrangian_mult);
 
+extern void _dtram_init_log_lagrangian_mult_sparse(
+    int *indptr, int *counts_ij, int *counts_ji,
+    int n_therm_states, int n_conf_states, double *log_lagrangian_mult);
+
 extern void _dtram_update_log_lagrangian_mult(
     double *log_lagrangian_mult, double *bias_energies, double *conf_energies, int *count_matrices,
     int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult);
 
+extern void _dtram_update_log_lagrangian_mult_sparse(
+    double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult);
+
 extern void _dtram_update_conf_energies(
     double *log_lagrangian_mult, double *bias_energies, double *conf_energies, int *count_matrices, int n_therm_states,
     int n_conf_states, double *scratch_TM, double *new_conf_energies);
 
+extern void _dtram_update_conf_energies_sparse(
+    double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji, int n_therm_states,
+    int n_conf_states, double *scratch_TM, double *new_conf_energies);
+
+extern void _dtram_update_log_lagrangian_mult_logc(
+    double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+    int *indptr, int *indices, double *log_counts,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult);
+
+extern void _dtram_update_conf_energies_logc(
+    double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+    int *indptr, int *indices, double *log_counts, double *log_conf_counts, int n_therm_states,
+    int n_conf_states, double *scratch_TM, double *new_conf_energies);
+
 extern void _dtram_estimate_transition_matrix(
     double *log_lagrangian_mult, double *bias_energies, double *conf_energies, int *count_matrix,
     int n_conf_states, double *scratch_M, double *transition_matrix);
 
+extern void _dtram_estimate_transition_matrix_sparse(
+    double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji,
+    int n_conf_states, double *scratch_M, double *transition_values);
+
 extern void _dtram_get_therm_energies(
     double *bias_energies, double *conf_energies, int n_therm_states, int n_conf_states,
     double *scratch_M, double *therm_energies);
@@ -49,6 +78,9 @@ extern double _dtram_get_loglikelihood(
     int *count_matrices, double *transition_matrices,
     int n_therm_states, int n_conf_states);
 
+extern double _dtram_get_loglikelihood_sparse(
+    int *counts_ij, double *transition_values, int nnz);
+
 extern double _dtram_get_prior();
 extern double _dtram_get_log_prior();
 
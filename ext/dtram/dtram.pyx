@@ -27,6 +27,12 @@ from msmtools.util.exceptions import NotConvergedWarning as _NotConvergedWarning
 
 from . import util
 from .callback import CallbackInterrupt
+from .util import logsumexp_mode_context as _logsumexp_mode_context
+from .util import SparseCountMatrices as _SparseCountMatrices
+from .util import sparse_count_matrices as _sparse_count_matrices
+from .util import LogCountTables as _LogCountTables
+from .util import log_count_tables as _log_count_tables
+from .solvers import get_solver as _get_solver
 
 __all__ = [
     'init_log_lagrangian_mult',
@@ -44,17 +50,40 @@ __all__ = [
 cdef extern from "_dtram.h":
     void _dtram_init_log_lagrangian_mult(
         int *count_matrices, int n_therm_states, int n_conf_states, double *log_lagrangian_mult)
+    void _dtram_init_log_lagrangian_mult_sparse(
+        int *indptr, int *counts_ij, int *counts_ji,
+        int n_therm_states, int n_conf_states, double *log_lagrangian_mult)
     void _dtram_update_log_lagrangian_mult(
         double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
         int *count_matrices, int n_therm_states, int n_conf_states,
         double *scratch_M, double *new_log_lagrangian_mult)
+    void _dtram_update_log_lagrangian_mult_sparse(
+        double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+        int *indptr, int *indices, int *counts_ij, int *counts_ji,
+        int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult)
+    void _dtram_update_log_lagrangian_mult_logc(
+        double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+        int *indptr, int *indices, double *log_counts,
+        int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult)
     void _dtram_update_conf_energies(
         double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
         int *count_matrices, int n_therm_states, int n_conf_states,
         double *scratch_TM, double *new_conf_energies)
+    void _dtram_update_conf_energies_sparse(
+        double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+        int *indptr, int *indices, int *counts_ij, int *counts_ji, int n_therm_states,
+        int n_conf_states, double *scratch_TM, double *new_conf_energies)
+    void _dtram_update_conf_energies_logc(
+        double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+        int *indptr, int *indices, double *log_counts, double *log_conf_counts, int n_therm_states,
+        int n_conf_states, double *scratch_TM, double *new_conf_energies)
     void _dtram_estimate_transition_matrix(
         double *log_lagrangian_mult, double *b_i, double *conf_energies, int *count_matrix,
         int n_conf_states, double *scratch_M, double *transition_matrix)
+    void _dtram_estimate_transition_matrix_sparse(
+        double *log_lagrangian_mult, double *bias_energies, double *conf_energies,
+        int *indptr, int *indices, int *counts_ij, int *counts_ji,
+        int n_conf_states, double *scratch_M, double *transition_values)
     void _dtram_get_therm_energies(
         double *bias_energies, double *conf_energies, int n_therm_states, int n_conf_states,
         double *scratch_M, double *therm_energies)
@@ -64,18 +93,30 @@ cdef extern from "_dtram.h":
     double _dtram_get_loglikelihood(
         int *count_matrices, double *transition_matrices,
         int n_therm_states, int n_conf_states)
+    double _dtram_get_loglikelihood_sparse(
+        int *counts_ij, double *transition_values, int nnz)
     double _dtram_get_prior()
     double _dtram_get_log_prior()
 
+cdef extern from "../util/_util.h":
+    int _get_logsumexp_mode()
+    void _set_logsumexp_mode(int mode)
+
+def _select_logsumexp_mode(int mode):
+    r"""Select the logsumexp scheme index of the kernels in this module; return the previous one."""
+    cdef int old_mode = _get_logsumexp_mode()
+    _set_logsumexp_mode(mode)
+    return old_mode
+
 def init_log_lagrangian_mult(
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None):
+    count_matrices):
     r"""
     Set the logarithm of the Lagrangian multipliers with an initial guess based
     on the transition counts.
 
     Parameters
     ----------
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or SparseCountMatrices
         multistate count matrix
 
     Returns
@@ -83,10 +124,21 @@ def init_log_lagrangian_mult(
     log_lagrangian_mult : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         logarithm of the Lagrangian multipliers
     """
+    cdef _np.ndarray[int, ndim=3, mode="c"] dense
     log_lagrangian_mult = _np.zeros(
         shape=(count_matrices.shape[0], count_matrices.shape[1]), dtype=_np.float64)
+    if isinstance(count_matrices, _SparseCountMatrices):
+        _dtram_init_log_lagrangian_mult_sparse(
+            <int*> _np.PyArray_DATA(count_matrices.indptr),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ij),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ji),
+            log_lagrangian_mult.shape[0],
+            log_lagrangian_mult.shape[1],
+            <double*> _np.PyArray_DATA(log_lagrangian_mult))
+        return log_lagrangian_mult
+    dense = _np.asarray(count_matrices)
     _dtram_init_log_lagrangian_mult(
-        <int*> _np.PyArray_DATA(count_matrices),
+        <int*> _np.PyArray_DATA(dense),
         log_lagrangian_mult.shape[0],
         log_lagrangian_mult.shape[1],
         <double*> _np.PyArray_DATA(log_lagrangian_mult))
@@ -96,7 +148,7 @@ def update_log_lagrangian_mult(
     _np.ndarray[double, ndim=2, mode="c"] log_lagrangian_mult not None,
     _np.ndarray[double, ndim=2, mode="c"] bias_energies not None,
     _np.ndarray[double, ndim=1, mode="c"] conf_energies not None,
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
+    count_matrices,
     _np.ndarray[double, ndim=1, mode="c"] scratch_M not None,
     _np.ndarray[double, ndim=2, mode="c"] new_log_lagrangian_mult not None):
     r"""
@@ -110,18 +162,48 @@ def update_log_lagrangian_mult(
         reduced bias energies of the T thermodynamic and M configurational states
     conf_energies : numpy.ndarray(shape=(M,), dtype=numpy.float64)
         reduced unbiased configurational energies
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
-        multistate count matrix
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc), SparseCountMatrices or LogCountTables
+        multistate count matrix (LogCountTables built with prior=get_prior() skip the
+        logarithms of the counts)
     scratch_M : numpy.ndarray(shape=(M,), dtype=numpy.float64)
         scratch array for logsumexp operations
     new_log_lagrangian_mult : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         target array for the logarithm of the Lagrangian multipliers
     """
+    cdef _np.ndarray[int, ndim=3, mode="c"] dense
+    if isinstance(count_matrices, _LogCountTables):
+        _dtram_update_log_lagrangian_mult_logc(
+            <double*> _np.PyArray_DATA(log_lagrangian_mult),
+            <double*> _np.PyArray_DATA(bias_energies),
+            <double*> _np.PyArray_DATA(conf_energies),
+            <int*> _np.PyArray_DATA(count_matrices.indptr),
+            <int*> _np.PyArray_DATA(count_matrices.indices),
+            <double*> _np.PyArray_DATA(count_matrices.log_counts),
+            log_lagrangian_mult.shape[0],
+            log_lagrangian_mult.shape[1],
+            <double*> _np.PyArray_DATA(scratch_M),
+            <double*> _np.PyArray_DATA(new_log_lagrangian_mult))
+        return
+    if isinstance(count_matrices, _SparseCountMatrices):
+        _dtram_update_log_lagrangian_mult_sparse(
+            <double*> _np.PyArray_DATA(log_lagrangian_mult),
+            <double*> _np.PyArray_DATA(bias_energies),
+            <double*> _np.PyArray_DATA(conf_energies),
+            <int*> _np.PyArray_DATA(count_matrices.indptr),
+            <int*> _np.PyArray_DATA(count_matrices.indices),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ij),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ji),
+            log_lagrangian_mult.shape[0],
+            log_lagrangian_mult.shape[1],
+            <double*> _np.PyArray_DATA(scratch_M),
+            <double*> _np.PyArray_DATA(new_log_lagrangian_mult))
+        return
+    dense = _np.asarray(count_matrices)
     _dtram_update_log_lagrangian_mult(
         <double*> _np.PyArray_DATA(log_lagrangian_mult),
         <double*> _np.PyArray_DATA(bias_energies),
         <double*> _np.PyArray_DATA(conf_energies),
-        <int*> _np.PyArray_DATA(count_matrices),
+        <int*> _np.PyArray_DATA(dense),
         log_lagrangian_mult.shape[0],
         log_lagrangian_mult.shape[1],
         <double*> _np.PyArray_DATA(scratch_M),
@@ -131,7 +213,7 @@ def update_conf_energies(
     _np.ndarray[double, ndim=2, mode="c"] log_lagrangian_mult not None,
     _np.ndarray[double, ndim=2, mode="c"] bias_energies not None,
     _np.ndarray[double, ndim=1, mode="c"] conf_energies not None,
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
+    count_matrices,
     _np.ndarray[double, ndim=2, mode="c"] scratch_TM not None,
     _np.ndarray[double, ndim=1, mode="c"] new_conf_energies not None):
     r"""
@@ -145,18 +227,49 @@ def update_conf_energies(
         reduced bias energies of the T thermodynamic and M configurational states
     conf_energies : numpy.ndarray(shape=(M,), dtype=numpy.float64)
         reduced unbiased configurational energies
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
-        multistate count matrix
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc), SparseCountMatrices or LogCountTables
+        multistate count matrix (LogCountTables built with prior=get_prior() skip the
+        logarithms of the counts)
     scratch_TM : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         scratch array for logsumexp operations
     new_conf_energies : numpy.ndarray(shape=(M,), dtype=numpy.float64)
         target array for the reduced unbiased configurational energies
     """
+    cdef _np.ndarray[int, ndim=3, mode="c"] dense
+    if isinstance(count_matrices, _LogCountTables):
+        _dtram_update_conf_energies_logc(
+            <double*> _np.PyArray_DATA(log_lagrangian_mult),
+            <double*> _np.PyArray_DATA(bias_energies),
+            <double*> _np.PyArray_DATA(conf_energies),
+            <int*> _np.PyArray_DATA(count_matrices.indptr),
+            <int*> _np.PyArray_DATA(count_matrices.indices),
+            <double*> _np.PyArray_DATA(count_matrices.log_counts),
+            <double*> _np.PyArray_DATA(count_matrices.log_conf_counts),
+            log_lagrangian_mult.shape[0],
+            log_lagrangian_mult.shape[1],
+            <double*> _np.PyArray_DATA(scratch_TM),
+            <double*> _np.PyArray_DATA(new_conf_energies))
+        return
+    if isinstance(count_matrices, _SparseCountMatrices):
+        _dtram_update_conf_energies_sparse(
+            <double*> _np.PyArray_DATA(log_lagrangian_mult),
+            <double*> _np.PyArray_DATA(bias_energies),
+            <double*> _np.PyArray_DATA(conf_energies),
+            <int*> _np.PyArray_DATA(count_matrices.indptr),
+            <int*> _np.PyArray_DATA(count_matrices.indices),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ij),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ji),
+            log_lagrangian_mult.shape[0],
+            log_lagrangian_mult.shape[1],
+            <double*> _np.PyArray_DATA(scratch_TM),
+            <double*> _np.PyArray_DATA(new_conf_energies))
+        return
+    dense = _np.asarray(count_matrices)
     _dtram_update_conf_energies(
         <double*> _np.PyArray_DATA(log_lagrangian_mult),
         <double*> _np.PyArray_DATA(bias_energies),
         <double*> _np.PyArray_DATA(conf_energies),
-        <int*> _np.PyArray_DATA(count_matrices),
+        <int*> _np.PyArray_DATA(dense),
         log_lagrangian_mult.shape[0],
         log_lagrangian_mult.shape[1],
         <double*> _np.PyArray_DATA(scratch_TM),
@@ -166,7 +279,7 @@ def estimate_transition_matrices(
     _np.ndarray[double, ndim=2, mode="c"] log_lagrangian_mult not None,
     _np.ndarray[double, ndim=2, mode="c"] bias_energies not None,
     _np.ndarray[double, ndim=1, mode="c"] conf_energies not None,
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
+    count_matrices,
     _np.ndarray[double, ndim=1, mode="c"] scratch_M not None):
     r"""
     Compute the transition matrices for all thermodynamic states.
@@ -179,16 +292,20 @@ def estimate_transition_matrices(
         reduced bias energies of the T thermodynamic and M configurational states
     conf_energies : numpy.ndarray(shape=(M,), dtype=numpy.float64)
         reduced unbiased configurational energies
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or SparseCountMatrices
         multistate count matrix
     scratch_M : numpy.ndarray(shape=(M,), dtype=numpy.float64)
         scratch array for logsumexp operations
 
     Returns
     -------
-    transition_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.float64)
-        multistate transition matrix
+    transition_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.float64) or list of scipy.sparse.csr_matrix
+        multistate transition matrix (sparse if count_matrices are sparse)
     """
+    if isinstance(count_matrices, _SparseCountMatrices):
+        return [estimate_transition_matrix(
+            log_lagrangian_mult, bias_energies, conf_energies, count_matrices, scratch_M, K)
+            for K in range(log_lagrangian_mult.shape[0])]
     transition_matrices = _np.zeros(
         shape=(count_matrices.shape[0], count_matrices.shape[1], count_matrices.shape[2]),
         dtype=_np.float64)
@@ -201,7 +318,7 @@ def estimate_transition_matrix(
     _np.ndarray[double, ndim=2, mode="c"] log_lagrangian_mult not None,
     _np.ndarray[double, ndim=2, mode="c"] bias_energies not None,
     _np.ndarray[double, ndim=1, mode="c"] conf_energies not None,
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
+    count_matrices,
     _np.ndarray[double, ndim=1, mode="c"] scratch_M not None,
     therm_state):
     r"""
@@ -215,7 +332,7 @@ def estimate_transition_matrix(
         reduced bias energies of the T thermodynamic and M configurational states
     conf_energies : numpy.ndarray(shape=(M,), dtype=numpy.float64)
         reduced unbiased configurational energies
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or SparseCountMatrices
         multistate count matrix
     scratch_M : numpy.ndarray(shape=(M,), dtype=numpy.float64)
         scratch array for logsumexp operations
@@ -224,9 +341,24 @@ def estimate_transition_matrix(
 
     Returns
     -------
-    transition_matrix : numpy.ndarray(shape=(M, M), dtype=numpy.float64)
-        transition matrix for the target thermodynamic state
+    transition_matrix : numpy.ndarray(shape=(M, M), dtype=numpy.float64) or scipy.sparse.csr_matrix
+        transition matrix for the target thermodynamic state (sparse if count_matrices are sparse)
     """
+    cdef _np.ndarray[double, ndim=1, mode="c"] transition_values
+    if isinstance(count_matrices, _SparseCountMatrices):
+        transition_values = _np.zeros(shape=(count_matrices.nnz,), dtype=_np.float64)
+        _dtram_estimate_transition_matrix_sparse(
+            <double*> _np.PyArray_DATA(_np.ascontiguousarray(log_lagrangian_mult[therm_state, :])),
+            <double*> _np.PyArray_DATA(_np.ascontiguousarray(bias_energies[therm_state, :])),
+            <double*> _np.PyArray_DATA(conf_energies),
+            <int*> _np.PyArray_DATA(count_matrices.indptr) + (<int> therm_state) * conf_energies.shape[0],
+            <int*> _np.PyArray_DATA(count_matrices.indices),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ij),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ji),
+            conf_energies.shape[0],
+            <double*> _np.PyArray_DATA(scratch_M),
+            <double*> _np.PyArray_DATA(transition_values))
+        return count_matrices.tocsr(therm_state, values=transition_values)
     transition_matrix = _np.zeros(
         shape=(conf_energies.shape[0], conf_energies.shape[0]), dtype=_np.float64)
     _dtram_estimate_transition_matrix(
@@ -299,26 +431,39 @@ def normalize(
         <double*> _np.PyArray_DATA(conf_energies))
 
 def get_loglikelihood(
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
-    _np.ndarray[double, ndim=3, mode="c"] transition_matrices not None):
+    count_matrices,
+    transition_matrices not None):
     r"""
     Compute the loglikelihood of the estimated transition matrices.
 
     Parameters
     ----------
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or SparseCountMatrices
         multistate count matrix
-    transition_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.float64)
-        multistate transition matrix
+    transition_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.float64) or list of scipy.sparse.csr_matrix
+        multistate transition matrix (as returned by `estimate_transition_matrices`)
 
     Returns
     -------
     loglikelihood : float
         loglikelihood of the multistate transition matrix given the observed multistate count matrix
     """
+    cdef _np.ndarray[int, ndim=3, mode="c"] dense
+    cdef _np.ndarray[double, ndim=3, mode="c"] dense_transition_matrices
+    cdef _np.ndarray[double, ndim=1, mode="c"] transition_values
+    if isinstance(count_matrices, _SparseCountMatrices):
+        transition_values = _np.ascontiguousarray(
+            _np.concatenate([P.data for P in transition_matrices]), dtype=_np.float64)
+        assert transition_values.shape[0] == count_matrices.nnz
+        return _dtram_get_loglikelihood_sparse(
+            <int*> _np.PyArray_DATA(count_matrices.counts_ij),
+            <double*> _np.PyArray_DATA(transition_values),
+            count_matrices.nnz)
+    dense = _np.asarray(count_matrices)
+    dense_transition_matrices = _np.asarray(transition_matrices)
     return _dtram_get_loglikelihood(
-        <int*> _np.PyArray_DATA(count_matrices),
-        <double*> _np.PyArray_DATA(transition_matrices),
+        <int*> _np.PyArray_DATA(dense),
+        <double*> _np.PyArray_DATA(dense_transition_matrices),
         count_matrices.shape[0],
         count_matrices.shape[1])
 
@@ -344,14 +489,17 @@ def estimate(
     count_matrices, bias_energies,
     maxiter=1000, maxerr=1.0E-8,
     log_lagrangian_mult=None, conf_energies=None,
-    save_convergence_info=0, callback=None):
+    save_convergence_info=0, callback=None, logsumexp_mode='sort_kahan', solver='plain'):
     r"""
     Estimate the reduced unbiased and thermodynamic free energies.
         
     Parameters
     ----------
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
-        multistate count matrix
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or SparseCountMatrices
+        multistate count matrix (a list of T scipy.sparse matrices is converted with
+        `thermotools.util.sparse_count_matrices`; the sparse kernels scale with the number
+        of nonzero counts instead of M^2); the logarithms of the counts are tabulated
+        once per call (see `thermotools.util.log_count_tables`)
     bias_energies : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         reduced bias energies in the T thermodynamic and M configurational states
     maxiter : int
@@ -365,6 +513,17 @@ def estimate(
     save_convergence_info : int, optional
         every save_convergence_info iteration steps, store the actual increment
         and the actual loglikelihood
+    logsumexp_mode : str, optional, default='sort_kahan'
+        logspace summation scheme of the C kernels: 'sort_kahan' sorts every
+        summand buffer before the compensated sum, 'max_kahan' skips the sort
+        and runs in linear time, 'simd_kahan' also uses a vectorized exponential
+        (see `thermotools.util.logsumexp_mode_index`); the scheme is selected for
+        the calling thread only, such that estimators running in other threads are
+        not affected
+    solver : str or FixedPointSolver, optional, default='plain'
+        fixed point scheme: 'plain' self-consistent iteration or the safeguarded
+        'squarem' and 'anderson' (alias 'diis') extrapolations
+        (see `thermotools.solvers.get_solver`)
 
     Returns
     -------
@@ -386,67 +545,80 @@ def estimate(
     energies, and the logarithms of the Lagarangian multipliers by means of a fixed point
     iteration.
     """
-    if log_lagrangian_mult is None:
-        log_lagrangian_mult = init_log_lagrangian_mult(count_matrices)
-    if conf_energies is None:
-        conf_energies = _np.zeros(shape=bias_energies.shape[1], dtype=_np.float64)
-    increments = []
-    loglikelihoods = []
-    sci_count = 0
-    scratch_TM = _np.zeros(shape=bias_energies.shape, dtype=_np.float64)
-    scratch_M = _np.zeros(shape=conf_energies.shape, dtype=_np.float64)
-    therm_energies = _np.zeros(shape=(bias_energies.shape[0],), dtype=_np.float64)
-    old_log_lagrangian_mult = log_lagrangian_mult.copy()
-    old_conf_energies = conf_energies.copy()
-    old_therm_energies = therm_energies.copy()
-    for m in range(maxiter):
-        sci_count += 1
-        update_log_lagrangian_mult(
-            old_log_lagrangian_mult, bias_energies, conf_energies, count_matrices,
-            scratch_M, log_lagrangian_mult)
-        update_conf_energies(
-            log_lagrangian_mult, bias_energies, old_conf_energies, count_matrices,
-            scratch_TM, conf_energies)
-        therm_energies = get_therm_energies(
-            bias_energies, conf_energies, scratch_M, therm_energies=therm_energies)
-        delta_conf_energies = _np.abs((conf_energies - old_conf_energies))
-        delta_therm_energies = _np.abs((therm_energies - old_therm_energies))
-        normalize(scratch_M, therm_energies, conf_energies)
-        err = _np.max([_np.max(delta_conf_energies), _np.max(delta_therm_energies)])
-        if sci_count == save_convergence_info:
-            sci_count = 0
-            increments.append(err)
-            loglikelihoods.append(get_loglikelihood(count_matrices, estimate_transition_matrices(
-                log_lagrangian_mult, bias_energies, conf_energies, count_matrices, scratch_M)))
-        if callback is not None:
-            try:
-                callback(
-                    log_lagrangian_mult=log_lagrangian_mult,
-                    conf_energies=conf_energies,
-                    old_therm_energies=old_therm_energies,
-                    old_log_lagrangian_mult=old_log_lagrangian_mult,
-                    old_conf_energies=old_conf_energies,
-                    therm_energies=therm_energies,
-                    delta_conf_energies=delta_conf_energies,
-                    delta_therm_energies=delta_therm_energies,
-                    err=err,
-                    iteration_step=m,
-                    maxiter=maxiter,
-                    maxerr=maxerr)
-            except CallbackInterrupt:
+    solver = _get_solver(solver)
+    with _logsumexp_mode_context(_select_logsumexp_mode, logsumexp_mode):
+        if not isinstance(count_matrices, _np.ndarray):
+            count_matrices = _sparse_count_matrices(count_matrices)
+        if log_lagrangian_mult is None:
+            log_lagrangian_mult = init_log_lagrangian_mult(count_matrices)
+        # the logarithms of the counts are computed once for all iterations
+        count_matrices = _log_count_tables(count_matrices, prior=get_prior())
+        if conf_energies is None:
+            conf_energies = _np.zeros(shape=bias_energies.shape[1], dtype=_np.float64)
+        increments = []
+        loglikelihoods = []
+        sci_count = 0
+        scratch_TM = _np.zeros(shape=bias_energies.shape, dtype=_np.float64)
+        scratch_M = _np.zeros(shape=conf_energies.shape, dtype=_np.float64)
+        therm_energies = _np.zeros(shape=(bias_energies.shape[0],), dtype=_np.float64)
+        old_log_lagrangian_mult = log_lagrangian_mult.copy()
+        old_conf_energies = conf_energies.copy()
+        old_therm_energies = therm_energies.copy()
+        for m in range(maxiter):
+            sci_count += 1
+            update_log_lagrangian_mult(
+                old_log_lagrangian_mult, bias_energies, conf_energies, count_matrices,
+                scratch_M, log_lagrangian_mult)
+            update_conf_energies(
+                log_lagrangian_mult, bias_energies, old_conf_energies, count_matrices,
+                scratch_TM, conf_energies)
+            therm_energies = get_therm_energies(
+                bias_energies, conf_energies, scratch_M, therm_energies=therm_energies)
+            delta_conf_energies = _np.abs((conf_energies - old_conf_energies))
+            delta_therm_energies = _np.abs((therm_energies - old_therm_energies))
+            normalize(scratch_M, therm_energies, conf_energies)
+            err = _np.max([_np.max(delta_conf_energies), _np.max(delta_therm_energies)])
+            if sci_count == save_convergence_info:
+                sci_count = 0
+                increments.append(err)
+                loglikelihoods.append(get_loglikelihood(count_matrices, estimate_transition_matrices(
+                    log_lagrangian_mult, bias_energies, conf_energies, count_matrices, scratch_M)))
+            if callback is not None:
+                try:
+                    callback(
+                        log_lagrangian_mult=log_lagrangian_mult,
+                        conf_energies=conf_energies,
+                        old_therm_energies=old_therm_energies,
+                        old_log_lagrangian_mult=old_log_lagrangian_mult,
+                        old_conf_energies=old_conf_energies,
+                        therm_energies=therm_energies,
+                        delta_conf_energies=delta_conf_energies,
+                        delta_therm_energies=delta_therm_energies,
+                        err=err,
+                        iteration_step=m,
+                        maxiter=maxiter,
+                        maxerr=maxerr)
+                except CallbackInterrupt:
+                    break
+            if err < maxerr:
                 break
-        if err < maxerr:
-            break
+            else:
+                update = (log_lagrangian_mult, conf_energies)
+                proposal = solver.step((old_log_lagrangian_mult, old_conf_energies), update)
+                if proposal is not update:
+                    log_lagrangian_mult[:], conf_energies[:] = proposal
+                    therm_energies = get_therm_energies(
+                        bias_energies, conf_energies, scratch_M, therm_energies=therm_energies)
+                    normalize(scratch_M, therm_energies, conf_energies)
+                old_log_lagrangian_mult[:] = log_lagrangian_mult[:]
+                old_conf_energies[:] = conf_energies[:]
+                old_therm_energies[:] = therm_energies[:]
+        if err >= maxerr:
+            _warn("dTRAM did not converge: last increment = %.5e" % err, _NotConvergedWarning)
+        if save_convergence_info == 0:
+            increments = None
+            loglikelihoods = None
         else:
-            old_log_lagrangian_mult[:] = log_lagrangian_mult[:]
-            old_conf_energies[:] = conf_energies[:]
-            old_therm_energies[:] = therm_energies[:]
-    if err >= maxerr:
-        _warn("dTRAM did not converge: last increment = %.5e" % err, _NotConvergedWarning)
-    if save_convergence_info == 0:
-        increments = None
-        loglikelihoods = None
-    else:
-        increments = _np.array(increments, dtype=_np.float64)
-        loglikelihoods = _np.array(loglikelihoods, dtype=_np.float64)
+            increments = _np.array(increments, dtype=_np.float64)
+            loglikelihoods = _np.array(loglikelihoods, dtype=_np.float64)
     return therm_energies, conf_energies, log_lagrangian_mult, increments, loglikelihoods
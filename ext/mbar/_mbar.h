@@ -40,5 +40,62 @@ void _mbar_get_pointwise_unbiased_free_energies(
     int n_therm_states,  int seq_length,
     double *scratch_T, double *pointwise_unbiased_free_energies);
 
+extern double _mbar_get_gradient_and_hessian(
+    double *log_therm_state_counts, double *therm_energies, double *bias_energy_sequence,
+    int n_therm_states, int seq_length, double *scratch_T, double *gradient, double *hessian);
+
+/* all trajectories in one buffer, trajectory s spans the samples offsets[s]:offsets[s+1] */
+extern void _mbar_update_therm_energies_packed(
+    double *log_therm_state_counts, double *therm_energies, double *bias_energy_sequence,
+    long long *offsets, int n_sequences, int n_therm_states, double *scratch_T,
+    double *new_therm_energies);
+
+extern void _mbar_get_conf_energies_packed(
+    double *log_therm_state_counts, double *therm_energies,
+    double *bias_energy_sequence, int *conf_state_sequence, long long *offsets, int n_sequences,
+    int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies,
+    double *biased_conf_energies);
+
+extern double _mbar_get_gradient_and_hessian_packed(
+    double *log_therm_state_counts, double *therm_energies, double *bias_energy_sequence,
+    long long *offsets, int n_sequences, int n_therm_states, double *scratch_T,
+    double *gradient, double *hessian);
+
+/* single precision storage of the bias energies, double precision accumulation */
+extern void _mbar_update_therm_energies_f32(
+    double *log_therm_state_counts, double *therm_energies, float *bias_energy_sequence,
+    int n_therm_states, int seq_length, double *scratch_T, double *new_therm_energies);
+
+extern void _mbar_get_conf_energies_f32(
+    double *log_therm_state_counts, double *therm_energies,
+    float *bias_energy_sequence, int * conf_state_sequence,
+    int n_therm_states, int n_conf_states, int seq_length,
+    double *scratch_T, double *conf_energies, double *biased_conf_energies);
+
+void _mbar_get_pointwise_unbiased_free_energies_f32(
+    int k, double *log_therm_state_counts, double *therm_energies,
+    float *bias_energy_sequence,
+    int n_therm_states,  int seq_length,
+    double *scratch_T, double *pointwise_unbiased_free_energies);
+
+extern double _mbar_get_gradient_and_hessian_f32(
+    double *log_therm_state_counts, double *therm_energies, float *bias_energy_sequence,
+    int n_therm_states, int seq_length, double *scratch_T, double *gradient, double *hessian);
+
+extern void _mbar_update_therm_energies_packed_f32(
+    double *log_therm_state_counts, double *therm_energies, float *bias_energy_sequence,
+    long long *offsets, int n_sequences, int n_therm_states, double *scratch_T,
+    double *new_therm_energies);
+
+extern void _mbar_get_conf_energies_packed_f32(
+    double *log_therm_state_counts, double *therm_energies,
+    float *bias_energy_sequence, int *conf_state_sequence, long long *offsets, int n_sequences,
+    int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies,
+    double *biased_conf_energies);
+
+extern double _mbar_get_gradient_and_hessian_packed_f32(
+    double *log_therm_state_counts, double *therm_energies, float *bias_energy_sequence,
+    long long *offsets, int n_sequences, int n_therm_states, double *scratch_T,
+    double *gradient, double *hessian);
 
 #endif
@@ -0,0 +1,161 @@
+/*
+* This file is part of thermotools.
+*
+* Copyright 2016 Computational Molecular Biology Group, Freie Universitaet Berlin (GER)
+*
+* thermotools is free software: you can redistribute it and/or modify
+* it under the terms of the GNU Lesser General Public License as published by
+* the Free Software Foundation, either version 3 of the License, or
+* (at your option) any later version.
+*
+* This program is distributed in the hope that it will be useful,
+* but WITHOUT ANY WARRANTY; without even the implied warranty of
+* MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+* GNU General Public License for more details.
+*
+* You should have received a copy of the GNU Lesser General Public License
+* along with this program.  If not, see <http://www.gnu.org/licenses/>.
+*/
+
+/*
+* Per-frame MBAR kernels, included by _mbar.c once for every storage type of the
+* bias energies: BIAS_T is the element type and FRAME_KERNEL(name) the function
+* name. The bias energies are only read; all sums are accumulated in double.
+*/
+
+void FRAME_KERNEL(_mbar_update_therm_energies)(
+    double *log_therm_state_counts, double *therm_energies, BIAS_T *bias_energy_sequence,
+    int n_therm_states, int seq_length, double *scratch_T, double *new_therm_energies)
+{
+    int K, x, L;
+    double divisor;
+    /* assume that new_therm_energies were set to INF by the caller on the first call */
+    for(x=0; x<seq_length; ++x)
+    {
+        for(L=0; L<n_therm_states; ++L)
+            scratch_T[L] = log_therm_state_counts[L] + therm_energies[L] - bias_energy_sequence[(long long) x * n_therm_states + L];
+        divisor = _logsumexp_inplace(scratch_T, n_therm_states);
+        for(K=0; K<n_therm_states; ++K)
+            new_therm_energies[K] = -_logsumexp_pair(-new_therm_energies[K], -(bias_energy_sequence[(long long) x * n_therm_states + K] + divisor));
+    }
+}
+
+void FRAME_KERNEL(_mbar_get_conf_energies)(
+    double *log_therm_state_counts, double *therm_energies,
+    BIAS_T *bias_energy_sequence, int *conf_state_sequence,
+    int n_therm_states, int n_conf_states, int seq_length,
+    double *scratch_T, double *conf_energies, double *biased_conf_energies)
+{
+    int i, x, L, K;
+    double divisor;
+    /* assume that conf_energies and biased_conf_energies were set to INF by the caller on the first call */
+    for(x=0; x<seq_length; ++x)
+    {
+        for(L=0; L<n_therm_states; ++L)
+            scratch_T[L] = log_therm_state_counts[L] + therm_energies[L] - bias_energy_sequence[(long long) x * n_therm_states + L];
+        i = conf_state_sequence[x];
+        if(i < 0) continue;
+        divisor = _logsumexp_inplace(scratch_T, n_therm_states);
+        conf_energies[i] = -_logsumexp_pair(-conf_energies[i], -divisor);
+        for(K=0; K<n_therm_states; ++K)
+            biased_conf_energies[K * n_conf_states + i] = -_logsumexp_pair(
+                -biased_conf_energies[K * n_conf_states + i],
+                -(bias_energy_sequence[(long long) x * n_therm_states + K] + divisor));
+    }
+}
+
+void FRAME_KERNEL(_mbar_get_pointwise_unbiased_free_energies)(
+    int k, double *log_therm_state_counts, double *therm_energies,
+    BIAS_T *bias_energy_sequence,
+    int n_therm_states,  int seq_length,
+    double *scratch_T, double *pointwise_unbiased_free_energies)
+{
+    int L, x;
+    double log_divisor;
+
+    for(x=0; x<seq_length; ++x)
+    {
+        for(L=0; L<n_therm_states; ++L)
+            scratch_T[L] = log_therm_state_counts[L] + therm_energies[L] - bias_energy_sequence[(long long) x * n_therm_states + L];
+        log_divisor = _logsumexp_inplace(scratch_T, n_therm_states);
+        if(k==-1)
+            pointwise_unbiased_free_energies[x] = log_divisor;
+        else
+            pointwise_unbiased_free_energies[x] = bias_energy_sequence[(long long) x * n_therm_states + k] + log_divisor - therm_energies[k];
+    }
+}
+
+double FRAME_KERNEL(_mbar_get_gradient_and_hessian)(
+    double *log_therm_state_counts, double *therm_energies, BIAS_T *bias_energy_sequence,
+    int n_therm_states, int seq_length, double *scratch_T, double *gradient, double *hessian)
+{
+    int K, L, x;
+    double divisor, weight, objective = 0.0;
+    /* accumulates into gradient and the upper triangle of hessian; the caller initializes both */
+    for(x=0; x<seq_length; ++x)
+    {
+        for(L=0; L<n_therm_states; ++L)
+            scratch_T[L] = log_therm_state_counts[L] + therm_energies[L] - bias_energy_sequence[(long long) x * n_therm_states + L];
+        divisor = _logsumexp_inplace(scratch_T, n_therm_states);
+        objective += divisor;
+        /* _logsumexp_inplace may have reordered scratch_T */
+        for(L=0; L<n_therm_states; ++L)
+            scratch_T[L] = exp(log_therm_state_counts[L] + therm_energies[L] - bias_energy_sequence[(long long) x * n_therm_states + L] - divisor);
+        for(K=0; K<n_therm_states; ++K)
+        {
+            weight = scratch_T[K];
+            if(weight == 0.0) continue;
+            gradient[K] += weight;
+            hessian[K * n_therm_states + K] += weight;
+            for(L=K; L<n_therm_states; ++L)
+                hessian[K * n_therm_states + L] -= weight * scratch_T[L];
+        }
+    }
+    return objective;
+}
+
+/*
+* Multi-trajectory entry points: all trajectories are stored back to back in one
+* C-contiguous buffer and trajectory s spans the samples offsets[s]:offsets[s+1].
+* One call sweeps every trajectory; frame indices stay within int per trajectory.
+*/
+
+void FRAME_KERNEL(_mbar_update_therm_energies_packed)(
+    double *log_therm_state_counts, double *therm_energies, BIAS_T *bias_energy_sequence,
+    long long *offsets, int n_sequences, int n_therm_states, double *scratch_T,
+    double *new_therm_energies)
+{
+    int s;
+    for(s=0; s<n_sequences; ++s)
+        FRAME_KERNEL(_mbar_update_therm_energies)(
+            log_therm_state_counts, therm_energies, bias_energy_sequence + offsets[s] * n_therm_states,
+            n_therm_states, (int) (offsets[s + 1] - offsets[s]), scratch_T, new_therm_energies);
+}
+
+void FRAME_KERNEL(_mbar_get_conf_energies_packed)(
+    double *log_therm_state_counts, double *therm_energies,
+    BIAS_T *bias_energy_sequence, int *conf_state_sequence, long long *offsets, int n_sequences,
+    int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies,
+    double *biased_conf_energies)
+{
+    int s;
+    for(s=0; s<n_sequences; ++s)
+        FRAME_KERNEL(_mbar_get_conf_energies)(
+            log_therm_state_counts, therm_energies, bias_energy_sequence + offsets[s] * n_therm_states,
+            conf_state_sequence + offsets[s], n_therm_states, n_conf_states,
+            (int) (offsets[s + 1] - offsets[s]), scratch_T, conf_energies, biased_conf_energies);
+}
+
+double FRAME_KERNEL(_mbar_get_gradient_and_hessian_packed)(
+    double *log_therm_state_counts, double *therm_energies, BIAS_T *bias_energy_sequence,
+    long long *offsets, int n_sequences, int n_therm_states, double *scratch_T,
+    double *gradient, double *hessian)
+{
+    int s;
+    double objective = 0.0;
+    for(s=0; s<n_sequences; ++s)
+        objective += FRAME_KERNEL(_mbar_get_gradient_and_hessian)(
+            log_therm_state_counts, therm_energies, bias_energy_sequence + offsets[s] * n_therm_states,
+            n_therm_states, (int) (offsets[s + 1] - offsets[s]), scratch_T, gradient, hessian);
+    return objective;
+}
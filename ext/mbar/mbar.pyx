@@ -26,13 +26,19 @@ from warnings import warn as _warn
 from msmtools.util.exceptions import NotConvergedWarning as _NotConvergedWarning
 
 from .callback import CallbackInterrupt
+from .util import logsumexp_mode_context as _logsumexp_mode_context
+from .util import pack_sequences as _pack_sequences
+from .util import PackedSequences as _PackedSequences
+from .solvers import get_solver as _get_solver
 
 __all__ = [
     'update_therm_energies',
     'get_conf_energies',
     'normalize',
     'get_pointwise_unbiased_free_energies',
+    'get_gradient_and_hessian',
     'estimate_therm_energies',
+    'estimate_therm_energies_newton',
     'estimate']
 
 cdef extern from "_mbar.h":
@@ -52,7 +58,61 @@ cdef extern from "_mbar.h":
         double *bias_energy_sequence,
         int n_therm_states,  int seq_length,
         double *scratch_T, double *pointwise_unbiased_free_energies)
+    double _mbar_get_gradient_and_hessian(
+        double *log_therm_state_counts, double *therm_energies, double *bias_energy_sequence,
+        int n_therm_states, int seq_length, double *scratch_T, double *gradient, double *hessian)
+    void _mbar_update_therm_energies_packed(
+        double *log_therm_state_counts, double *therm_energies, double *bias_energy_sequence,
+        long long *offsets, int n_sequences, int n_therm_states, double *scratch_T,
+        double *new_therm_energies)
+    void _mbar_get_conf_energies_packed(
+        double *log_therm_state_counts, double *therm_energies,
+        double *bias_energy_sequence, int *conf_state_sequence, long long *offsets, int n_sequences,
+        int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies,
+        double *biased_conf_energies)
+    double _mbar_get_gradient_and_hessian_packed(
+        double *log_therm_state_counts, double *therm_energies, double *bias_energy_sequence,
+        long long *offsets, int n_sequences, int n_therm_states, double *scratch_T,
+        double *gradient, double *hessian)
+    void _mbar_update_therm_energies_f32(
+        double *log_therm_state_counts, double *therm_energies, float *bias_energy_sequence,
+        int n_therm_states, int seq_length, double *scratch_T, double *new_therm_energies)
+    void _mbar_get_conf_energies_f32(
+        double *log_therm_state_counts, double *therm_energies,
+        float *bias_energy_sequence, int * conf_state_sequence,
+        int n_therm_states, int n_conf_states, int seq_length,
+        double *scratch_T, double *conf_energies, double *biased_conf_energies)
+    void _mbar_get_pointwise_unbiased_free_energies_f32(
+        int k, double *log_therm_state_counts, double *therm_energies,
+        float *bias_energy_sequence,
+        int n_therm_states,  int seq_length,
+        double *scratch_T, double *pointwise_unbiased_free_energies)
+    double _mbar_get_gradient_and_hessian_f32(
+        double *log_therm_state_counts, double *therm_energies, float *bias_energy_sequence,
+        int n_therm_states, int seq_length, double *scratch_T, double *gradient, double *hessian)
+    void _mbar_update_therm_energies_packed_f32(
+        double *log_therm_state_counts, double *therm_energies, float *bias_energy_sequence,
+        long long *offsets, int n_sequences, int n_therm_states, double *scratch_T,
+        double *new_therm_energies)
+    void _mbar_get_conf_energies_packed_f32(
+        double *log_therm_state_counts, double *therm_energies,
+        float *bias_energy_sequence, int *conf_state_sequence, long long *offsets, int n_sequences,
+        int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies,
+        double *biased_conf_energies)
+    double _mbar_get_gradient_and_hessian_packed_f32(
+        double *log_therm_state_counts, double *therm_energies, float *bias_energy_sequence,
+        long long *offsets, int n_sequences, int n_therm_states, double *scratch_T,
+        double *gradient, double *hessian)
+
+cdef extern from "../util/_util.h":
+    int _get_logsumexp_mode()
+    void _set_logsumexp_mode(int mode)
 
+def _select_logsumexp_mode(int mode):
+    r"""Select the logsumexp scheme index of the kernels in this module; return the previous one."""
+    cdef int old_mode = _get_logsumexp_mode()
+    _set_logsumexp_mode(mode)
+    return old_mode
 
 def update_therm_energies(
     _np.ndarray[double, ndim=1, mode="c"] log_therm_state_counts not None,
@@ -69,23 +129,62 @@ def update_therm_energies(
         log of the state counts in each of the T thermodynamic states
     therm_energies : numpy.ndarray(shape=(T), dtype=numpy.float64)
         reduced free energies of the T thermodynamic states
-    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
-        bias energies in the T thermodynamic states for all X samples
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32) or PackedSequences
+        bias energies in the T thermodynamic states for all X samples; the trajectories of
+        a PackedSequences object are swept with a single C call
     scratch_T : numpy.ndarray(shape=(T), dtype=numpy.float64)
         scratch array
     new_therm_energies : numpy.ndarray(shape=(T), dtype=numpy.float64)
         target array for the reduced free energies of the T thermodynamic states
     """
     new_therm_energies[:] = _np.inf
+    if isinstance(bias_energy_sequences, _PackedSequences):
+        if bias_energy_sequences.contiguous:
+            b = bias_energy_sequences.bias_energy_sequence
+            offsets = bias_energy_sequences.offsets
+            if b.dtype == _np.float32:
+                _mbar_update_therm_energies_packed_f32(
+                    <double*> _np.PyArray_DATA(log_therm_state_counts),
+                    <double*> _np.PyArray_DATA(therm_energies),
+                    <float*> _np.PyArray_DATA(b),
+                    <long long*> _np.PyArray_DATA(offsets),
+                    offsets.shape[0] - 1,
+                    therm_energies.shape[0],
+                    <double*> _np.PyArray_DATA(scratch_T),
+                    <double*> _np.PyArray_DATA(new_therm_energies))
+            else:
+                _mbar_update_therm_energies_packed(
+                    <double*> _np.PyArray_DATA(log_therm_state_counts),
+                    <double*> _np.PyArray_DATA(therm_energies),
+                    <double*> _np.PyArray_DATA(b),
+                    <long long*> _np.PyArray_DATA(offsets),
+                    offsets.shape[0] - 1,
+                    therm_energies.shape[0],
+                    <double*> _np.PyArray_DATA(scratch_T),
+                    <double*> _np.PyArray_DATA(new_therm_energies))
+            new_therm_energies -= new_therm_energies[0]
+            return
+        bias_energy_sequences = bias_energy_sequences.bias_energy_sequences
     for i in range(len(bias_energy_sequences)):
-        _mbar_update_therm_energies(
-            <double*> _np.PyArray_DATA(log_therm_state_counts),
-            <double*> _np.PyArray_DATA(therm_energies),
-            <double*> _np.PyArray_DATA(bias_energy_sequences[i]),
-            therm_energies.shape[0],
-            bias_energy_sequences[i].shape[0],
-            <double*> _np.PyArray_DATA(scratch_T),
-            <double*> _np.PyArray_DATA(new_therm_energies))
+        b = bias_energy_sequences[i]
+        if b.dtype == _np.float32:
+            _mbar_update_therm_energies_f32(
+                <double*> _np.PyArray_DATA(log_therm_state_counts),
+                <double*> _np.PyArray_DATA(therm_energies),
+                <float*> _np.PyArray_DATA(b),
+                therm_energies.shape[0],
+                b.shape[0],
+                <double*> _np.PyArray_DATA(scratch_T),
+                <double*> _np.PyArray_DATA(new_therm_energies))
+        else:
+            _mbar_update_therm_energies(
+                <double*> _np.PyArray_DATA(log_therm_state_counts),
+                <double*> _np.PyArray_DATA(therm_energies),
+                <double*> _np.PyArray_DATA(b),
+                therm_energies.shape[0],
+                b.shape[0],
+                <double*> _np.PyArray_DATA(scratch_T),
+                <double*> _np.PyArray_DATA(new_therm_energies))
     new_therm_energies -= new_therm_energies[0]
 
 def get_conf_energies(
@@ -104,10 +203,12 @@ def get_conf_energies(
         log of the state counts in each of the T thermodynamic states
     therm_energies : numpy.ndarray(shape=(T), dtype=numpy.float64)
         reduced free energies of the T thermodynamic states
-    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
-        bias energies in the T thermodynamic states for all X samples
-    conf_state_sequences : list of numpy.ndarray(shape=(X_i), dtype=numpy.intc)
-        discrete states indices for all X samples
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32) or PackedSequences
+        bias energies in the T thermodynamic states for all X samples; the trajectories of
+        a PackedSequences object are swept with a single C call
+    conf_state_sequences : list of numpy.ndarray(shape=(X_i), dtype=numpy.intc) or None
+        discrete states indices for all X samples; ignored if bias_energy_sequences is a
+        PackedSequences object, whose state sequences are used instead
     scratch_T : numpy.ndarray(shape=(T), dtype=numpy.float64)
         scratch array
     n_conf_states : int
@@ -125,18 +226,66 @@ def get_conf_energies(
         shape=(therm_energies.shape[0], n_conf_states), dtype=_np.float64)
     conf_energies[:] = _np.inf
     biased_conf_energies[:] = _np.inf
+    if isinstance(bias_energy_sequences, _PackedSequences):
+        assert bias_energy_sequences.state_sequence is not None
+        if bias_energy_sequences.contiguous:
+            b = bias_energy_sequences.bias_energy_sequence
+            offsets = bias_energy_sequences.offsets
+            if b.dtype == _np.float32:
+                _mbar_get_conf_energies_packed_f32(
+                    <double*> _np.PyArray_DATA(log_therm_state_counts),
+                    <double*> _np.PyArray_DATA(therm_energies),
+                    <float*> _np.PyArray_DATA(b),
+                    <int*> _np.PyArray_DATA(bias_energy_sequences.state_sequence),
+                    <long long*> _np.PyArray_DATA(offsets),
+                    offsets.shape[0] - 1,
+                    therm_energies.shape[0],
+                    n_conf_states,
+                    <double*> _np.PyArray_DATA(scratch_T),
+                    <double*> _np.PyArray_DATA(conf_energies),
+                    <double*> _np.PyArray_DATA(biased_conf_energies))
+            else:
+                _mbar_get_conf_energies_packed(
+                    <double*> _np.PyArray_DATA(log_therm_state_counts),
+                    <double*> _np.PyArray_DATA(therm_energies),
+                    <double*> _np.PyArray_DATA(b),
+                    <int*> _np.PyArray_DATA(bias_energy_sequences.state_sequence),
+                    <long long*> _np.PyArray_DATA(offsets),
+                    offsets.shape[0] - 1,
+                    therm_energies.shape[0],
+                    n_conf_states,
+                    <double*> _np.PyArray_DATA(scratch_T),
+                    <double*> _np.PyArray_DATA(conf_energies),
+                    <double*> _np.PyArray_DATA(biased_conf_energies))
+            return conf_energies, biased_conf_energies
+        conf_state_sequences = bias_energy_sequences.state_sequences
+        bias_energy_sequences = bias_energy_sequences.bias_energy_sequences
     for i in range(len(bias_energy_sequences)):
-        _mbar_get_conf_energies(
-            <double*> _np.PyArray_DATA(log_therm_state_counts),
-            <double*> _np.PyArray_DATA(therm_energies),
-            <double*> _np.PyArray_DATA(bias_energy_sequences[i]),
-            <int*> _np.PyArray_DATA(conf_state_sequences[i]),
-            therm_energies.shape[0],
-            n_conf_states,
-            conf_state_sequences[i].shape[0],
-            <double*> _np.PyArray_DATA(scratch_T),
-            <double*> _np.PyArray_DATA(conf_energies),
-            <double*> _np.PyArray_DATA(biased_conf_energies))
+        b = bias_energy_sequences[i]
+        if b.dtype == _np.float32:
+            _mbar_get_conf_energies_f32(
+                <double*> _np.PyArray_DATA(log_therm_state_counts),
+                <double*> _np.PyArray_DATA(therm_energies),
+                <float*> _np.PyArray_DATA(b),
+                <int*> _np.PyArray_DATA(conf_state_sequences[i]),
+                therm_energies.shape[0],
+                n_conf_states,
+                conf_state_sequences[i].shape[0],
+                <double*> _np.PyArray_DATA(scratch_T),
+                <double*> _np.PyArray_DATA(conf_energies),
+                <double*> _np.PyArray_DATA(biased_conf_energies))
+        else:
+            _mbar_get_conf_energies(
+                <double*> _np.PyArray_DATA(log_therm_state_counts),
+                <double*> _np.PyArray_DATA(therm_energies),
+                <double*> _np.PyArray_DATA(b),
+                <int*> _np.PyArray_DATA(conf_state_sequences[i]),
+                therm_energies.shape[0],
+                n_conf_states,
+                conf_state_sequences[i].shape[0],
+                <double*> _np.PyArray_DATA(scratch_T),
+                <double*> _np.PyArray_DATA(conf_energies),
+                <double*> _np.PyArray_DATA(biased_conf_energies))
     return conf_energies, biased_conf_energies
 
 def normalize(
@@ -185,7 +334,7 @@ def get_pointwise_unbiased_free_energies(
         of the unbiased ensemble.
     log_therm_state_counts : numpy.ndarray(shape=(T), dtype=numpy.float64)
         log of the state counts in each of the T thermodynamic states
-    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32)
         bias energies in the T thermodynamic states for all X samples
     therm_energies : numpy.ndarray(shape=(T), dtype=numpy.float64)
         reduced free energies of the T thermodynamic states
@@ -202,7 +351,7 @@ def get_pointwise_unbiased_free_energies(
     assert len(bias_energy_sequences)==len(pointwise_unbiased_free_energies)
     for b, p in zip(bias_energy_sequences, pointwise_unbiased_free_energies):
         assert b.ndim == 2
-        assert b.dtype == _np.float64
+        assert b.dtype in (_np.float32, _np.float64)
         assert p.ndim == 1
         assert p.dtype == _np.float64
         assert b.shape[0] == p.shape[0]
@@ -210,20 +359,33 @@ def get_pointwise_unbiased_free_energies(
         assert b.flags.c_contiguous
         assert p.flags.c_contiguous
     for i in range(len(bias_energy_sequences)):
-        _mbar_get_pointwise_unbiased_free_energies(
-            k,
-            <double*> _np.PyArray_DATA(log_therm_state_counts),
-            <double*> _np.PyArray_DATA(therm_energies),
-            <double*> _np.PyArray_DATA(bias_energy_sequences[i]),
-            log_therm_state_counts.shape[0],
-            bias_energy_sequences[i].shape[0],
-            <double*> _np.PyArray_DATA(scratch_T),
-            <double*> _np.PyArray_DATA(pointwise_unbiased_free_energies[i]))
+        b = bias_energy_sequences[i]
+        if b.dtype == _np.float32:
+            _mbar_get_pointwise_unbiased_free_energies_f32(
+                k,
+                <double*> _np.PyArray_DATA(log_therm_state_counts),
+                <double*> _np.PyArray_DATA(therm_energies),
+                <float*> _np.PyArray_DATA(b),
+                log_therm_state_counts.shape[0],
+                b.shape[0],
+                <double*> _np.PyArray_DATA(scratch_T),
+                <double*> _np.PyArray_DATA(pointwise_unbiased_free_energies[i]))
+        else:
+            _mbar_get_pointwise_unbiased_free_energies(
+                k,
+                <double*> _np.PyArray_DATA(log_therm_state_counts),
+                <double*> _np.PyArray_DATA(therm_energies),
+                <double*> _np.PyArray_DATA(b),
+                log_therm_state_counts.shape[0],
+                b.shape[0],
+                <double*> _np.PyArray_DATA(scratch_T),
+                <double*> _np.PyArray_DATA(pointwise_unbiased_free_energies[i]))
 
 def estimate_therm_energies(
     therm_state_counts, bias_energy_sequences,
     maxiter=1000, maxerr=1.0E-8, therm_energies=None,
-    n_conf_states=None, save_convergence_info=0, callback=None):
+    n_conf_states=None, save_convergence_info=0, callback=None, logsumexp_mode='sort_kahan',
+    solver='plain'):
     r"""
     Estimate the thermodynamic free energies.
         
@@ -231,8 +393,14 @@ def estimate_therm_energies(
     ----------
     therm_state_counts : numpy.ndarray(shape=(T), dtype=numpy.intc)
         numbers of samples in the T thermodynamic states
-    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32) or PackedSequences
         reduced bias energies in the T thermodynamic states for all X samples
+        (a PackedSequences object from `thermotools.util.pack_sequences` may also
+        carry the state sequences; it avoids repacking the data on every call)
+        numpy.memmap inputs and bias providers, which compute the bias energies on the fly
+        from reaction coordinates (`thermotools.util.UmbrellaBias`) or from a few energy
+        terms such as potential energies at several temperatures (`thermotools.util.LinearBias`),
+        are streamed in chunks of bounded memory (see `thermotools.util.ChunkedSequences`)
     maxiter : int
         maximum number of iterations
     maxerr : float
@@ -244,6 +412,18 @@ def estimate_therm_energies(
         If None, this is set to max(conf_state_sequence)+1.
     save_convergence_info : int, optional
         every save_convergence_info iteration steps, store the actual increment
+    logsumexp_mode : str, optional, default='sort_kahan'
+        logspace summation scheme of the C kernels: 'sort_kahan' sorts every
+        summand buffer before the compensated sum, 'max_kahan' skips the sort
+        and runs in linear time, 'simd_kahan' also uses a vectorized exponential
+        (see `thermotools.util.logsumexp_mode_index`); the scheme is selected for
+        the calling thread only, such that estimators running in other threads are
+        not affected
+    solver : str or FixedPointSolver, optional, default='plain'
+        fixed point scheme: 'plain' self-consistent iteration or the safeguarded
+        'squarem' and 'anderson' (alias 'diis') extrapolations
+        (see `thermotools.solvers.get_solver`); 'newton' minimizes the MBAR
+        objective with second order steps (see `estimate_therm_energies_newton`)
 
     Returns
     -------
@@ -252,51 +432,304 @@ def estimate_therm_energies(
     increments : numpy.ndarray(dtype=numpy.float64, ndim=1)
         stored sequence of increments
     """
-    T = therm_state_counts.shape[0]
-    log_therm_state_counts = _np.log(therm_state_counts)
-    if therm_energies is None:
-        therm_energies = _np.zeros(shape=(T,), dtype=_np.float64)
-    old_therm_energies = therm_energies.copy()
-    increments = []
-    sci_count = 0
-    scratch = _np.zeros(shape=(T,), dtype=_np.float64)
-    for m in range(maxiter):
-        sci_count += 1
-        update_therm_energies(
-            log_therm_state_counts, old_therm_energies, bias_energy_sequences,
-            scratch, therm_energies)
-        delta_therm_energies = _np.abs(therm_energies - old_therm_energies)
-        err = _np.max(delta_therm_energies)
-        if sci_count == save_convergence_info:
-            sci_count = 0
-            increments.append(err)
-        if callback is not None:
-            try:
-                callback(therm_energies=therm_energies,
-                         old_therm_energies=old_therm_energies,
-                         delta_therm_energies=delta_therm_energies,
-                         iteration_step=m,
-                         err=err,
-                         maxerr=maxerr,
-                         maxiter=maxiter)
-            except CallbackInterrupt:
+    if solver == 'newton':
+        return estimate_therm_energies_newton(
+            therm_state_counts, bias_energy_sequences,
+            maxiter=maxiter, maxerr=maxerr, therm_energies=therm_energies,
+            save_convergence_info=save_convergence_info, callback=callback,
+            logsumexp_mode=logsumexp_mode)
+    solver = _get_solver(solver)
+    with _logsumexp_mode_context(_select_logsumexp_mode, logsumexp_mode):
+        T = therm_state_counts.shape[0]
+        bias_energy_sequences = _pack_sequences(bias_energy_sequences)
+        log_therm_state_counts = _np.log(therm_state_counts)
+        if therm_energies is None:
+            therm_energies = _np.zeros(shape=(T,), dtype=_np.float64)
+        old_therm_energies = therm_energies.copy()
+        increments = []
+        sci_count = 0
+        scratch = _np.zeros(shape=(T,), dtype=_np.float64)
+        for m in range(maxiter):
+            sci_count += 1
+            update_therm_energies(
+                log_therm_state_counts, old_therm_energies, bias_energy_sequences,
+                scratch, therm_energies)
+            delta_therm_energies = _np.abs(therm_energies - old_therm_energies)
+            err = _np.max(delta_therm_energies)
+            if sci_count == save_convergence_info:
+                sci_count = 0
+                increments.append(err)
+            if callback is not None:
+                try:
+                    callback(therm_energies=therm_energies,
+                             old_therm_energies=old_therm_energies,
+                             delta_therm_energies=delta_therm_energies,
+                             iteration_step=m,
+                             err=err,
+                             maxerr=maxerr,
+                             maxiter=maxiter)
+                except CallbackInterrupt:
+                    break
+            if err < maxerr:
                 break
-        if err < maxerr:
-            break
+            else:
+                update = (therm_energies,)
+                proposal = solver.step((old_therm_energies,), update)
+                if proposal is not update:
+                    therm_energies[:] = proposal[0]
+                old_therm_energies[:] = therm_energies[:]
+        if err >= maxerr:
+            _warn("MBAR did not converge: last increment = %.5e" % err, _NotConvergedWarning)
+        if save_convergence_info == 0:
+            increments = None
+        else:
+            increments = _np.array(increments, dtype=_np.float64)
+    return therm_energies, increments
+
+def get_gradient_and_hessian(
+    _np.ndarray[double, ndim=1, mode="c"] log_therm_state_counts not None,
+    _np.ndarray[double, ndim=1, mode="c"] therm_energies not None,
+    bias_energy_sequences, # _np.ndarray[double, ndim=2, mode="c"]
+    _np.ndarray[double, ndim=1, mode="c"] scratch_T not None,
+    _np.ndarray[double, ndim=1, mode="c"] gradient not None,
+    _np.ndarray[double, ndim=2, mode="c"] hessian not None):
+    r"""
+    Evaluate the MBAR objective function with its gradient and Hessian in a single
+    pass over the samples.
+
+    Parameters
+    ----------
+    log_therm_state_counts : numpy.ndarray(shape=(T), dtype=numpy.float64)
+        log of the state counts in each of the T thermodynamic states
+    therm_energies : numpy.ndarray(shape=(T), dtype=numpy.float64)
+        reduced free energies of the T thermodynamic states
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32) or PackedSequences
+        bias energies in the T thermodynamic states for all X samples; the trajectories of
+        a PackedSequences object are swept with a single C call
+    scratch_T : numpy.ndarray(shape=(T), dtype=numpy.float64)
+        scratch array
+    gradient : numpy.ndarray(shape=(T), dtype=numpy.float64)
+        target array for the gradient of the objective function
+    hessian : numpy.ndarray(shape=(T, T), dtype=numpy.float64)
+        target array for the Hessian of the objective function
+
+    Returns
+    -------
+    objective : float
+        the convex MBAR objective function
+        sum_x log sum_K N_K exp(f_K - b_K(x)) - sum_K N_K f_K
+        whose minimizers are the reduced thermodynamic free energies f_K
+    """
+    therm_state_counts = _np.exp(log_therm_state_counts)
+    objective = -_np.dot(therm_state_counts, therm_energies)
+    gradient[:] = -therm_state_counts
+    hessian[:] = 0.0
+    if isinstance(bias_energy_sequences, _PackedSequences) and bias_energy_sequences.contiguous:
+        b = bias_energy_sequences.bias_energy_sequence
+        offsets = bias_energy_sequences.offsets
+        if b.dtype == _np.float32:
+            objective += _mbar_get_gradient_and_hessian_packed_f32(
+                <double*> _np.PyArray_DATA(log_therm_state_counts),
+                <double*> _np.PyArray_DATA(therm_energies),
+                <float*> _np.PyArray_DATA(b),
+                <long long*> _np.PyArray_DATA(offsets),
+                offsets.shape[0] - 1,
+                therm_energies.shape[0],
+                <double*> _np.PyArray_DATA(scratch_T),
+                <double*> _np.PyArray_DATA(gradient),
+                <double*> _np.PyArray_DATA(hessian))
         else:
-            old_therm_energies[:] = therm_energies[:]
-    if err >= maxerr:
-        _warn("MBAR did not converge: last increment = %.5e" % err, _NotConvergedWarning)
-    if save_convergence_info == 0:
-        increments = None
+            objective += _mbar_get_gradient_and_hessian_packed(
+                <double*> _np.PyArray_DATA(log_therm_state_counts),
+                <double*> _np.PyArray_DATA(therm_energies),
+                <double*> _np.PyArray_DATA(b),
+                <long long*> _np.PyArray_DATA(offsets),
+                offsets.shape[0] - 1,
+                therm_energies.shape[0],
+                <double*> _np.PyArray_DATA(scratch_T),
+                <double*> _np.PyArray_DATA(gradient),
+                <double*> _np.PyArray_DATA(hessian))
     else:
-        increments = _np.array(increments, dtype=_np.float64)
+        if isinstance(bias_energy_sequences, _PackedSequences):
+            bias_energy_sequences = bias_energy_sequences.bias_energy_sequences
+        for i in range(len(bias_energy_sequences)):
+            b = bias_energy_sequences[i]
+            if b.dtype == _np.float32:
+                objective += _mbar_get_gradient_and_hessian_f32(
+                    <double*> _np.PyArray_DATA(log_therm_state_counts),
+                    <double*> _np.PyArray_DATA(therm_energies),
+                    <float*> _np.PyArray_DATA(b),
+                    therm_energies.shape[0],
+                    b.shape[0],
+                    <double*> _np.PyArray_DATA(scratch_T),
+                    <double*> _np.PyArray_DATA(gradient),
+                    <double*> _np.PyArray_DATA(hessian))
+            else:
+                objective += _mbar_get_gradient_and_hessian(
+                    <double*> _np.PyArray_DATA(log_therm_state_counts),
+                    <double*> _np.PyArray_DATA(therm_energies),
+                    <double*> _np.PyArray_DATA(b),
+                    therm_energies.shape[0],
+                    b.shape[0],
+                    <double*> _np.PyArray_DATA(scratch_T),
+                    <double*> _np.PyArray_DATA(gradient),
+                    <double*> _np.PyArray_DATA(hessian))
+    lower = _np.tril_indices(therm_energies.shape[0], -1)
+    hessian[lower] = hessian.T[lower]
+    return objective
+
+def estimate_therm_energies_newton(
+    therm_state_counts, bias_energy_sequences,
+    maxiter=100, maxerr=1.0E-8, therm_energies=None, warmup_steps=10,
+    save_convergence_info=0, callback=None, logsumexp_mode='sort_kahan'):
+    r"""
+    Estimate the thermodynamic free energies by Newton minimization of the MBAR
+    objective function.
+
+    Parameters
+    ----------
+    therm_state_counts : numpy.ndarray(shape=(T), dtype=numpy.intc)
+        numbers of samples in the T thermodynamic states
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32) or PackedSequences
+        reduced bias energies in the T thermodynamic states for all X samples
+    maxiter : int
+        maximum number of Newton iterations
+    maxerr : float
+        convergence criterion based on the largest component of the full Newton step,
+        i.e., the estimated distance of the free energies to the minimum, and on the
+        relative gradient of the objective
+    therm_energies : numpy.ndarray(shape=(T), dtype=numpy.float64), OPTIONAL
+        initial guess for the reduced free energies of the T thermodynamic states
+    warmup_steps : int, optional, default=10
+        number of self-consistent iterations before the first Newton step
+    save_convergence_info : int, optional
+        every save_convergence_info iteration steps, store the actual increment
+    logsumexp_mode : str, optional, default='sort_kahan'
+        logspace summation scheme of the C kernels
+        (see `thermotools.util.logsumexp_mode_index`); the scheme is selected for
+        the calling thread only, such that estimators running in other threads are
+        not affected
+
+    Returns
+    -------
+    therm_energies : numpy.ndarray(shape=(T), dtype=numpy.float64)
+        reduced free energies of the T thermodynamic states
+    increments : numpy.ndarray(dtype=numpy.float64, ndim=1)
+        stored sequence of increments
+
+    Notes
+    -----
+    Every iteration evaluates the gradient and the Hessian of the objective (see
+    `get_gradient_and_hessian`) in one pass over the samples and takes a Newton
+    step with backtracking; if the Newton direction does not descend or the
+    backtracking fails, a self-consistent step is taken instead. The free energy of the first sampled thermodynamic state is held
+    fixed; a final self-consistent update sets the free energies of the unsampled
+    states and normalizes the result such that therm_energies[0] = 0.
+    """
+    with _logsumexp_mode_context(_select_logsumexp_mode, logsumexp_mode):
+        T = therm_state_counts.shape[0]
+        bias_energy_sequences = _pack_sequences(bias_energy_sequences)
+        log_therm_state_counts = _np.log(therm_state_counts).astype(_np.float64)
+        if therm_energies is None:
+            therm_energies = _np.zeros(shape=(T,), dtype=_np.float64)
+        else:
+            therm_energies = _np.ascontiguousarray(therm_energies, dtype=_np.float64).copy()
+        scratch = _np.zeros(shape=(T,), dtype=_np.float64)
+        new_therm_energies = _np.zeros(shape=(T,), dtype=_np.float64)
+        for m in range(warmup_steps):
+            update_therm_energies(
+                log_therm_state_counts, therm_energies, bias_energy_sequences,
+                scratch, new_therm_energies)
+            therm_energies, new_therm_energies = new_therm_energies, therm_energies
+        sampled = _np.where(therm_state_counts > 0)[0]
+        fixed, free = sampled[0], sampled[1:]
+        gradient = _np.zeros(shape=(T,), dtype=_np.float64)
+        hessian = _np.zeros(shape=(T, T), dtype=_np.float64)
+        new_gradient = _np.zeros(shape=(T,), dtype=_np.float64)
+        new_hessian = _np.zeros(shape=(T, T), dtype=_np.float64)
+        objective = get_gradient_and_hessian(
+            log_therm_state_counts, therm_energies, bias_energy_sequences,
+            scratch, gradient, hessian)
+        increments = []
+        sci_count = 0
+        err = _np.inf
+        for m in range(maxiter):
+            sci_count += 1
+            g = gradient[free]
+            H = hessian[_np.ix_(free, free)]
+            try:
+                direction = -_np.linalg.solve(H, g)
+            except _np.linalg.LinAlgError:
+                direction = -_np.linalg.lstsq(H, g, rcond=None)[0]
+            # the full Newton step estimates the distance to the minimum and the relative
+            # gradient sum_x w_K(x) / N_K - 1 catches a degenerate Hessian; unlike the
+            # step taken below, neither becomes small when the line search stalls
+            err = max(
+                _np.max(_np.abs(direction), initial=0.0),
+                _np.max(_np.abs(g) / therm_state_counts[free], initial=0.0))
+            slope = _np.dot(g, direction)
+            # no descent direction (e.g., for a vanishing Hessian): skip the line search
+            step = 1.0 if slope < 0.0 else 0.0
+            while step >= 1.0E-8:
+                new_therm_energies[:] = therm_energies
+                new_therm_energies[free] += step * direction
+                new_objective = get_gradient_and_hessian(
+                    log_therm_state_counts, new_therm_energies, bias_energy_sequences,
+                    scratch, new_gradient, new_hessian)
+                # close to the minimum, rounding errors in the objective make the
+                # sufficient decrease test unreliable; accept a smaller gradient instead
+                if new_objective <= objective + 1.0E-4 * step * slope \
+                    or _np.linalg.norm(new_gradient[free]) < _np.linalg.norm(g):
+                    break
+                step *= 0.5
+            else:
+                # the line search failed or was skipped: fall back to a self-consistent
+                # step, which does not increase the objective
+                update_therm_energies(
+                    log_therm_state_counts, therm_energies, bias_energy_sequences,
+                    scratch, new_therm_energies)
+                new_therm_energies += therm_energies[fixed] - new_therm_energies[fixed]
+                new_objective = get_gradient_and_hessian(
+                    log_therm_state_counts, new_therm_energies, bias_energy_sequences,
+                    scratch, new_gradient, new_hessian)
+            delta_therm_energies = _np.abs(new_therm_energies - therm_energies)
+            therm_energies, new_therm_energies = new_therm_energies, therm_energies
+            gradient, new_gradient = new_gradient, gradient
+            hessian, new_hessian = new_hessian, hessian
+            objective = new_objective
+            if sci_count == save_convergence_info:
+                sci_count = 0
+                increments.append(err)
+            if callback is not None:
+                try:
+                    callback(therm_energies=therm_energies,
+                             old_therm_energies=new_therm_energies,
+                             delta_therm_energies=delta_therm_energies,
+                             iteration_step=m,
+                             err=err,
+                             maxerr=maxerr,
+                             maxiter=maxiter)
+                except CallbackInterrupt:
+                    break
+            if err < maxerr:
+                break
+        update_therm_energies(
+            log_therm_state_counts, therm_energies, bias_energy_sequences,
+            scratch, new_therm_energies)
+        therm_energies = new_therm_energies
+        if err >= maxerr:
+            _warn("MBAR did not converge: last increment = %.5e" % err, _NotConvergedWarning)
+        if save_convergence_info == 0:
+            increments = None
+        else:
+            increments = _np.array(increments, dtype=_np.float64)
     return therm_energies, increments
 
 def estimate(
     therm_state_counts, bias_energy_sequences, conf_state_sequences,
     maxiter=1000, maxerr=1.0E-8, therm_energies=None,
-    n_conf_states=None, save_convergence_info=0, callback=None):
+    n_conf_states=None, save_convergence_info=0, callback=None, logsumexp_mode='sort_kahan',
+    solver='plain'):
     r"""
     Estimate the (un)biased reduced free energies and thermodynamic free energies.
         
@@ -304,8 +737,14 @@ def estimate(
     ----------
     therm_state_counts : numpy.ndarray(shape=(T), dtype=numpy.intc)
         numbers of samples in the T thermodynamic states
-    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32) or PackedSequences
         reduced bias energies in the T thermodynamic states for all X samples
+        (a PackedSequences object from `thermotools.util.pack_sequences` may also
+        carry the state sequences; it avoids repacking the data on every call)
+        numpy.memmap inputs and bias providers, which compute the bias energies on the fly
+        from reaction coordinates (`thermotools.util.UmbrellaBias`) or from a few energy
+        terms such as potential energies at several temperatures (`thermotools.util.LinearBias`),
+        are streamed in chunks of bounded memory (see `thermotools.util.ChunkedSequences`)
     conf_state_sequences : list of numpy.ndarray(shape=(X_i), dtype=numpy.float64)
         discrete state indices (cluster indices) for all X samples
     maxiter : int
@@ -319,6 +758,18 @@ def estimate(
         If None, this is set to max(conf_state_sequence)+1.
     save_convergence_info : int, optional
         every save_convergence_info iteration steps, store the actual increment
+    logsumexp_mode : str, optional, default='sort_kahan'
+        logspace summation scheme of the C kernels: 'sort_kahan' sorts every
+        summand buffer before the compensated sum, 'max_kahan' skips the sort
+        and runs in linear time, 'simd_kahan' also uses a vectorized exponential
+        (see `thermotools.util.logsumexp_mode_index`); the scheme is selected for
+        the calling thread only, such that estimators running in other threads are
+        not affected
+    solver : str or FixedPointSolver, optional, default='plain'
+        fixed point scheme: 'plain' self-consistent iteration or the safeguarded
+        'squarem' and 'anderson' (alias 'diis') extrapolations
+        (see `thermotools.solvers.get_solver`); 'newton' minimizes the MBAR
+        objective with second order steps (see `estimate_therm_energies_newton`)
 
     Returns
     -------
@@ -332,30 +783,24 @@ def estimate(
     increments : numpy.ndarray(dtype=numpy.float64, ndim=1)
         stored sequence of increments
     """
-    T = therm_state_counts.shape[0]
-    if n_conf_states is None:
-        M = 1 + max([_np.max(s) for s in conf_state_sequences])
-    else:
-        M = n_conf_states
-    assert len(conf_state_sequences)==len(bias_energy_sequences)
-    for s, b in zip(conf_state_sequences, bias_energy_sequences):
-        assert s.ndim == 1
-        assert s.dtype == _np.intc
-        assert b.ndim == 2
-        assert b.dtype == _np.float64
-        assert s.shape[0] == b.shape[0]
-        assert b.shape[1] == T
-        assert s.flags.c_contiguous
-        assert b.flags.c_contiguous
-    increments = []
-    scratch_M = _np.zeros(shape=(M,), dtype=_np.float64)
-    scratch_T = _np.zeros(shape=(T,), dtype=_np.float64)
-    therm_energies, increments = estimate_therm_energies(
-        therm_state_counts, bias_energy_sequences,
-        maxiter=maxiter, maxerr=maxerr, therm_energies=therm_energies,
-        save_convergence_info=save_convergence_info, callback=callback)
-    conf_energies, biased_conf_energies = get_conf_energies(
-        _np.log(therm_state_counts), therm_energies, bias_energy_sequences, conf_state_sequences,
-        scratch_T, M)
-    normalize(scratch_M, therm_energies, conf_energies, biased_conf_energies)
+    with _logsumexp_mode_context(_select_logsumexp_mode, logsumexp_mode):
+        T = therm_state_counts.shape[0]
+        packed = _pack_sequences(bias_energy_sequences, conf_state_sequences)
+        assert packed.state_sequence is not None
+        assert packed.n_therm_states == T
+        if n_conf_states is None:
+            M = 1 + _np.max(packed.state_sequence)
+        else:
+            M = n_conf_states
+        increments = []
+        scratch_M = _np.zeros(shape=(M,), dtype=_np.float64)
+        scratch_T = _np.zeros(shape=(T,), dtype=_np.float64)
+        therm_energies, increments = estimate_therm_energies(
+            therm_state_counts, packed,
+            maxiter=maxiter, maxerr=maxerr, therm_energies=therm_energies,
+            save_convergence_info=save_convergence_info, callback=callback,
+            logsumexp_mode=logsumexp_mode, solver=solver)
+        conf_energies, biased_conf_energies = get_conf_energies(
+            _np.log(therm_state_counts), therm_energies, packed, None, scratch_T, M)
+        normalize(scratch_M, therm_energies, conf_energies, biased_conf_energies)
     return therm_energies, conf_energies, biased_conf_energies, increments
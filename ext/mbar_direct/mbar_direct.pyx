@@ -27,6 +27,10 @@ from msmtools.util.exceptions import NotConvergedWarning as _NotConvergedWarning
 
 from thermotools import mbar as _mbar
 from .callback import CallbackInterrupt
+from .util import logsumexp_mode_context as _logsumexp_mode_context
+from .util import pack_sequences as _pack_sequences
+from .util import bias_weight_sequences as _bias_weight_sequences
+from .solvers import get_solver as _get_solver
 
 __all__ = [
     'update_therm_weights',
@@ -71,7 +75,7 @@ def update_therm_weights(
 def estimate_therm_energies(
     therm_state_counts, bias_energy_sequences,
     maxiter=1000, maxerr=1.0E-8, therm_energies=None,
-    save_convergence_info=0, callback=None):
+    save_convergence_info=0, callback=None, solver='plain'):
     r"""
     Estimate the thermodynamic free energies
         
@@ -79,8 +83,10 @@ def estimate_therm_energies(
     ----------
     therm_state_counts : numpy.ndarray(shape=(T), dtype=numpy.intc)
         numbers of samples in the T thermodynamic states
-    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64) or PackedSequences
         reduced bias energies in the T thermodynamic states for all X samples
+        (a PackedSequences object from `thermotools.util.pack_sequences` may also
+        carry the state sequences; it avoids repacking the data on every call)
     maxiter : int
         maximum number of iterations
     maxerr : float
@@ -89,6 +95,10 @@ def estimate_therm_energies(
         initial guess for the reduced free energies of the T thermodynamic states
     save_convergence_info : int, optional
         every save_convergence_info iteration steps, store the actual increment
+    solver : str or FixedPointSolver, optional, default='plain'
+        fixed point scheme: 'plain' self-consistent iteration or the safeguarded
+        'squarem' and 'anderson' (alias 'diis') extrapolations
+        (see `thermotools.solvers.get_solver`)
 
     Returns
     -------
@@ -97,16 +107,18 @@ def estimate_therm_energies(
     increments : numpy.ndarray(dtype=numpy.float64, ndim=1)
         stored sequence of increments
     """
+    solver = _get_solver(solver)
     T = therm_state_counts.shape[0]
+    bias_energy_sequences = _pack_sequences(bias_energy_sequences).bias_energy_sequences
     therm_state_counts = therm_state_counts.astype(_np.intc)
     log_therm_state_counts = _np.log(therm_state_counts)
-    shift = _np.min([_np.min(b, axis=0) for b in bias_energy_sequences], axis=0)
+    shift = _np.min([_np.min(b, axis=0) for b in bias_energy_sequences], axis=0).astype(_np.float64)
     if therm_energies is None:
         therm_energies = _np.zeros(shape=(T,), dtype=_np.float64)
         therm_weights = _np.ones(shape=(T,), dtype=_np.float64)
     else:
         therm_weights = _np.exp(shift - therm_energies)
-    bias_weight_sequences = [_np.exp(shift - b) for b in bias_energy_sequences]
+    bias_weight_sequences = _bias_weight_sequences(bias_energy_sequences, shift)
     old_therm_energies = therm_energies.copy()
     old_therm_weights = therm_weights.copy()
     increments = []
@@ -134,6 +146,11 @@ def estimate_therm_energies(
         if err < maxerr:
             break
         else:
+            update = (therm_energies,)
+            proposal = solver.step((old_therm_energies,), update)
+            if proposal is not update:
+                therm_energies = proposal[0]
+                therm_weights[:] = _np.exp(-therm_energies)
             old_therm_weights[:] = therm_weights[:]
             old_therm_energies[:] = therm_energies[:]
     therm_energies = shift - _np.log(therm_weights)
@@ -148,7 +165,8 @@ def estimate_therm_energies(
 def estimate(
     therm_state_counts, bias_energy_sequences, conf_state_sequences,
     maxiter=1000, maxerr=1.0E-8, therm_energies=None,
-    n_conf_states=None, save_convergence_info=0, callback=None):
+    n_conf_states=None, save_convergence_info=0, callback=None, logsumexp_mode='sort_kahan',
+    solver='plain'):
     r"""
     Estimate the (un)biased reduced free energies and thermodynamic free energies
         
@@ -156,8 +174,10 @@ def estimate(
     ----------
     therm_state_counts : numpy.ndarray(shape=(T), dtype=numpy.intc)
         numbers of samples in the T thermodynamic states
-    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64) or PackedSequences
         reduced bias energies in the T thermodynamic states for all X samples
+        (a PackedSequences object from `thermotools.util.pack_sequences` may also
+        carry the state sequences; it avoids repacking the data on every call)
     conf_state_sequences : list of numpy.ndarray(shape=(X_i), dtype=numpy.intc)
         discrete state indices (cluster indices) for all X samples
     maxiter : int
@@ -171,6 +191,17 @@ def estimate(
         If None, this is set to max(conf_state_sequence)+1.
     save_convergence_info : int, optional
         every save_convergence_info iteration steps, store the actual increment
+    logsumexp_mode : str, optional, default='sort_kahan'
+        logspace summation scheme of the C kernels: 'sort_kahan' sorts every
+        summand buffer before the compensated sum, 'max_kahan' skips the sort
+        and runs in linear time, 'simd_kahan' also uses a vectorized exponential
+        (see `thermotools.util.logsumexp_mode_index`); the scheme is selected for
+        the calling thread only, such that estimators running in other threads are
+        not affected
+    solver : str or FixedPointSolver, optional, default='plain'
+        fixed point scheme: 'plain' self-consistent iteration or the safeguarded
+        'squarem' and 'anderson' (alias 'diis') extrapolations
+        (see `thermotools.solvers.get_solver`)
 
     Returns
     -------
@@ -184,39 +215,28 @@ def estimate(
     increments : numpy.ndarray(dtype=numpy.float64, ndim=1)
         stored sequence of increments
     """
-    T = therm_state_counts.shape[0]
-    therm_state_counts = therm_state_counts.astype(_np.intc)
-    if n_conf_states is None:
-        M = 1 + max([_np.max(c) for c in conf_state_sequences])
-    else:
-        M = n_conf_states
-    assert len(conf_state_sequences) == len(bias_energy_sequences)
-    for s, b in zip(conf_state_sequences, bias_energy_sequences):
-        assert s.ndim == 1
-        assert s.dtype == _np.intc
-        assert b.ndim == 2
-        assert b.dtype == _np.float64
-        assert s.shape[0] == b.shape[0]
-        assert b.shape[1] == T
-        assert s.flags.c_contiguous
-        assert b.flags.c_contiguous
-    log_therm_state_counts = _np.log(therm_state_counts)
-    shift = _np.min([_np.min(b, axis=0) for b in bias_energy_sequences], axis=0)
-    if therm_energies is None:
-        therm_energies = _np.zeros(shape=(T,), dtype=_np.float64)
-        therm_weights = _np.ones(shape=(T,), dtype=_np.float64)
-    else:
-        therm_weights = _np.exp(shift - therm_energies)
-    bias_weight_sequences = [_np.exp(shift - b) for b in bias_energy_sequences]
-    scratch_M = _np.zeros(shape=(M,), dtype=_np.float64)
-    scratch_T = _np.zeros(shape=(T,), dtype=_np.float64)
-    therm_energies, increments = estimate_therm_energies(
-        therm_state_counts, bias_energy_sequences,
-        maxiter=maxiter, maxerr=maxerr, therm_energies=therm_energies,
-        save_convergence_info=save_convergence_info, callback=callback)
-    conf_energies, biased_conf_energies = _mbar.get_conf_energies(
-        log_therm_state_counts, therm_energies,
-        bias_energy_sequences, conf_state_sequences, scratch_T, M)
-    _mbar.normalize(
-        scratch_M, therm_energies, conf_energies, biased_conf_energies)
+    with _logsumexp_mode_context(_mbar._select_logsumexp_mode, logsumexp_mode):
+        T = therm_state_counts.shape[0]
+        therm_state_counts = therm_state_counts.astype(_np.intc)
+        packed = _pack_sequences(bias_energy_sequences, conf_state_sequences)
+        assert packed.state_sequence is not None
+        assert packed.n_therm_states == T
+        bias_energy_sequences = packed.bias_energy_sequences
+        conf_state_sequences = packed.state_sequences
+        if n_conf_states is None:
+            M = 1 + _np.max(packed.state_sequence)
+        else:
+            M = n_conf_states
+        log_therm_state_counts = _np.log(therm_state_counts)
+        scratch_M = _np.zeros(shape=(M,), dtype=_np.float64)
+        scratch_T = _np.zeros(shape=(T,), dtype=_np.float64)
+        therm_energies, increments = estimate_therm_energies(
+            therm_state_counts, packed,
+            maxiter=maxiter, maxerr=maxerr, therm_energies=therm_energies,
+            save_convergence_info=save_convergence_info, callback=callback, solver=solver)
+        conf_energies, biased_conf_energies = _mbar.get_conf_energies(
+            log_therm_state_counts, therm_energies,
+            bias_energy_sequences, conf_state_sequences, scratch_T, M)
+        _mbar.normalize(
+            scratch_M, therm_energies, conf_energies, biased_conf_energies)
     return therm_energies, conf_energies, biased_conf_energies, increments
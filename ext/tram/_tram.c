@@ -19,6 +19,9 @@
 
 #include <stdio.h>
 #include <assert.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 
 #include "_tram.h"
 #include "../util/_util.h"
@@ -43,6 +46,21 @@ void _tram_init_lagrangian_mult(int *count_matrices, int n_therm_states, int n_c
 
 }
 
+void _tram_init_lagrangian_mult_sparse(
+    int *indptr, int *counts_ij, int *counts_ji,
+    int n_therm_states, int n_conf_states, double *log_lagrangian_mult)
+{
+    int Ki, e, TM = n_therm_states * n_conf_states;
+    double sum;
+    for(Ki=0; Ki<TM; ++Ki)
+    {
+        sum = 0.0;
+        for(e=indptr[Ki]; e<indptr[Ki + 1]; ++e)
+            sum += 0.5 * (counts_ij[e] + counts_ji[e]);
+        log_lagrangian_mult[Ki] = log(THERMOTOOLS_TRAM_PRIOR + sum);
+    }
+}
+
 void _tram_update_lagrangian_mult(
     double *log_lagrangian_mult, double *biased_conf_energies, int *count_matrices, int* state_counts,
     int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult)
@@ -83,10 +101,124 @@ void _tram_update_lagrangian_mult(
                     log_lagrangian_mult[Kj] - biased_conf_energies[Ki] - log_lagrangian_mult[Ki] + biased_conf_energies[Kj], 0.0);
                 scratch_M[o++] = log((double) CK) - divisor;
             }
-            new_log_lagrangian_mult[Ki] = _logsumexp_sort_kahan_inplace(scratch_M, o);
+            new_log_lagrangian_mult[Ki] = _logsumexp_inplace(scratch_M, o);
+        }
+    }
+}
+
+void _tram_update_lagrangian_mult_sparse(
+    double *log_lagrangian_mult, double *biased_conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji, int* state_counts,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult)
+{
+    int i, K, e, o;
+    int Ki, Kj, KM;
+    int CK, CKij;
+    double divisor;
+    for(K=0; K<n_therm_states; ++K)
+    {
+        KM = K * n_conf_states;
+        for(i=0; i<n_conf_states; ++i)
+        {
+            Ki = KM + i;
+            if(0 == state_counts[Ki])
+            {
+                new_log_lagrangian_mult[Ki] = -INFINITY;
+                continue;
+            }
+            o = 0;
+            for(e=indptr[Ki]; e<indptr[Ki + 1]; ++e)
+            {
+                CKij = counts_ij[e];
+                /* special case: most variables cancel out, here */
+                if(i == indices[e])
+                {
+                    scratch_M[o++] = (0 == CKij) ?
+                        THERMOTOOLS_TRAM_LOG_PRIOR : log(THERMOTOOLS_TRAM_PRIOR + (double) CKij);
+                    continue;
+                }
+                CK = CKij + counts_ji[e];
+                /* special case */
+                if(0 == CK) continue;
+                /* regular case */
+                Kj = KM + indices[e];
+                divisor = _logsumexp_pair(
+                    log_lagrangian_mult[Kj] - biased_conf_energies[Ki] - log_lagrangian_mult[Ki] + biased_conf_energies[Kj], 0.0);
+                scratch_M[o++] = log((double) CK) - divisor;
+            }
+            new_log_lagrangian_mult[Ki] = _logsumexp_inplace(scratch_M, o);
+        }
+    }
+}
+
+void _tram_update_lagrangian_mult_logc(
+    double *log_lagrangian_mult, double *biased_conf_energies,
+    int *indptr, int *indices, double *log_counts, int* state_counts,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult)
+{
+    int i, K, e, o;
+    int Ki, Kj, KM;
+    double divisor;
+    for(K=0; K<n_therm_states; ++K)
+    {
+        KM = K * n_conf_states;
+        for(i=0; i<n_conf_states; ++i)
+        {
+            Ki = KM + i;
+            if(0 == state_counts[Ki])
+            {
+                new_log_lagrangian_mult[Ki] = -INFINITY;
+                continue;
+            }
+            o = 0;
+            for(e=indptr[Ki]; e<indptr[Ki + 1]; ++e)
+            {
+                /* special case: most variables cancel out, here */
+                if(i == indices[e])
+                {
+                    scratch_M[o++] = log_counts[e];
+                    continue;
+                }
+                /* regular case */
+                Kj = KM + indices[e];
+                divisor = _logsumexp_pair(
+                    log_lagrangian_mult[Kj] - biased_conf_energies[Ki] - log_lagrangian_mult[Ki] + biased_conf_energies[Kj], 0.0);
+                scratch_M[o++] = log_counts[e] - divisor;
+            }
+            new_log_lagrangian_mult[Ki] = _logsumexp_inplace(scratch_M, o);
+        }
+    }
+}
+
+#ifdef TRAMMBAR
+static void _tram_add_equilibrium_log_R_K_i(
+    double *therm_energies, int *equilibrium_therm_state_counts, double overcounting_factor,
+    int n_therm_states, int n_conf_states, double *log_R_K_i)
+{
+    int i, K, Ki, KM;
+    if(equilibrium_therm_state_counts && therm_energies)
+    {
+        for(K=0; K<n_therm_states; ++K)
+        {
+            KM = K * n_conf_states;
+            for(i=0; i<n_conf_states; ++i)
+                log_R_K_i[KM + i] += log(overcounting_factor);
+        }
+        for(K=0; K<n_therm_states; ++K)
+        {
+            if(0 < equilibrium_therm_state_counts[K])
+            {
+                KM = K * n_conf_states;
+                for(i=0; i<n_conf_states; ++i)
+                {
+                    Ki = KM + i;
+                    log_R_K_i[Ki] = _logsumexp_pair(log_R_K_i[Ki], log(equilibrium_therm_state_counts[K]) + therm_energies[K]);
+                }
+            }
         }
     }
 }
+#endif
 
 void _tram_get_log_Ref_K_i(
     double *log_lagrangian_mult, double *biased_conf_energies,
@@ -142,109 +274,148 @@ void _tram_get_log_Ref_K_i(
             }
             NC = state_counts[Ki] - Ci;
             R_addon = (0 < NC) ? log((double) NC) + biased_conf_energies[Ki] : -INFINITY; /* IGNORE PRIOR */
-            log_R_K_i[Ki] = _logsumexp_pair(_logsumexp_sort_kahan_inplace(scratch_M, o), R_addon);
+            log_R_K_i[Ki] = _logsumexp_pair(_logsumexp_inplace(scratch_M, o), R_addon);
         }
     }
 
 #ifdef TRAMMBAR
-    if(equilibrium_therm_state_counts && therm_energies)
+    _tram_add_equilibrium_log_R_K_i(
+        therm_energies, equilibrium_therm_state_counts, overcounting_factor,
+        n_therm_states, n_conf_states, log_R_K_i);
+#endif
+}
+
+void _tram_get_log_Ref_K_i_sparse(
+    double *log_lagrangian_mult, double *biased_conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji, int *state_counts,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *log_R_K_i
+#ifdef TRAMMBAR
+    ,
+    double *therm_energies, int *equilibrium_therm_state_counts,
+    double overcounting_factor
+#endif
+)
+{
+    int i, K, e, o;
+    int Ki, Kj, KM;
+    int Ci, CK, CKij, CKji, NC;
+    double divisor, R_addon;
+
+    for(K=0; K<n_therm_states; ++K)
     {
-        for(K=0; K<n_therm_states; ++K)
-        {
-            KM = K * n_conf_states;
-            for(i=0; i<n_conf_states; ++i)
-                log_R_K_i[KM + i] += log(overcounting_factor);
-        }
-        for(K=0; K<n_therm_states; ++K)
+        KM = K * n_conf_states;
+        for(i=0; i<n_conf_states; ++i)
         {
-            if(0 < equilibrium_therm_state_counts[K])
+            Ki = KM + i;
+            if(0 == state_counts[Ki]) /* applying Hao's speed-up recomendation */
             {
-                KM = K * n_conf_states;
-                for(i=0; i<n_conf_states; ++i)
+                log_R_K_i[Ki] = -INFINITY;
+                continue;
+            }
+            Ci = 0;
+            o = 0;
+            for(e=indptr[Ki]; e<indptr[Ki + 1]; ++e)
+            {
+                CKij = counts_ij[e];
+                CKji = counts_ji[e];
+                Ci += CKji;
+                /* special case: most variables cancel out, here */
+                if(i == indices[e])
                 {
-                    Ki = KM + i;
-                    log_R_K_i[Ki] = _logsumexp_pair(log_R_K_i[Ki], log(equilibrium_therm_state_counts[K]) + therm_energies[K]);
+                    scratch_M[o] = (0 == CKij) ? THERMOTOOLS_TRAM_LOG_PRIOR : log(THERMOTOOLS_TRAM_PRIOR + (double) CKij);
+                    scratch_M[o++] += biased_conf_energies[Ki];
+                    continue;
                 }
+                CK = CKij + CKji;
+                /* special case */
+                if(0 == CK) continue;
+                /* regular case */
+                Kj = KM + indices[e];
+                divisor = _logsumexp_pair(
+                    log_lagrangian_mult[Kj] - biased_conf_energies[Ki],
+                    log_lagrangian_mult[Ki] - biased_conf_energies[Kj]);
+                scratch_M[o++] = log((double) CK) + log_lagrangian_mult[Kj] - divisor;
             }
+            NC = state_counts[Ki] - Ci;
+            R_addon = (0 < NC) ? log((double) NC) + biased_conf_energies[Ki] : -INFINITY; /* IGNORE PRIOR */
+            log_R_K_i[Ki] = _logsumexp_pair(_logsumexp_inplace(scratch_M, o), R_addon);
         }
     }
+
+#ifdef TRAMMBAR
+    _tram_add_equilibrium_log_R_K_i(
+        therm_energies, equilibrium_therm_state_counts, overcounting_factor,
+        n_therm_states, n_conf_states, log_R_K_i);
 #endif
 }
 
-double _tram_update_biased_conf_energies(
-    double *bias_energy_sequence, int *state_sequence, int seq_length, double *log_R_K_i,
-    int n_therm_states, int n_conf_states, double *scratch_T, double *new_biased_conf_energies, int return_log_L)
+void _tram_get_log_Ref_K_i_logc(
+    double *log_lagrangian_mult, double *biased_conf_energies,
+    int *indptr, int *indices, double *log_counts, double *log_excess_counts, int *state_counts,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *log_R_K_i
+#ifdef TRAMMBAR
+    ,
+    double *therm_energies, int *equilibrium_therm_state_counts,
+    double overcounting_factor
+#endif
+)
 {
-    int i, K, x, o, Ki;
-    int KM;
-    double divisor, log_L;
+    int i, K, e, o;
+    int Ki, Kj, KM;
+    double divisor;
 
-    /* assume that new_biased_conf_energies have been set to INF by the caller in the first call */
-    for(x=0; x<seq_length; ++x)
+    for(K=0; K<n_therm_states; ++K)
     {
-        i = state_sequence[x];
-        if(i < 0) continue; /* skip frames that have negative Markov state indices */
-        o = 0;
-        for(K=0; K<n_therm_states; ++K)
-        {
-            assert(K<n_therm_states);
-            assert(K>=0);
-            /* applying Hao's speed-up recomendation */
-            if(-INFINITY == log_R_K_i[K * n_conf_states + i]) continue;
-            scratch_T[o++] = log_R_K_i[K * n_conf_states + i] - bias_energy_sequence[x * n_therm_states + K];
-        }
-        divisor = _logsumexp_sort_kahan_inplace(scratch_T, o);
-        
-        for(K=0; K<n_therm_states; ++K)
+        KM = K * n_conf_states;
+        for(i=0; i<n_conf_states; ++i)
         {
-            new_biased_conf_energies[K * n_conf_states + i] = -_logsumexp_pair(
-                    -new_biased_conf_energies[K * n_conf_states + i],
-                    -(divisor + bias_energy_sequence[x * n_therm_states + K]));
-        }
-    }
-
-    if(return_log_L) {
-        /* -\sum_{x}\log\sum_{l}R_{i(x)}^{(l)}e^{-b^{(l)}(x)+f_{i(x)}^{(l)}} */
-        log_L = 0;
-        for(x=0; x<seq_length; ++x) {
+            Ki = KM + i;
+            if(0 == state_counts[Ki]) /* applying Hao's speed-up recomendation */
+            {
+                log_R_K_i[Ki] = -INFINITY;
+                continue;
+            }
             o = 0;
-            i = state_sequence[x];
-            if(i < 0) continue;
-            for(K=0; K<n_therm_states; ++K) {
-                KM = K*n_conf_states;
-                Ki = KM + i;
-                if(log_R_K_i[Ki] > 0)
-                    scratch_T[o++] =
-                        log_R_K_i[Ki] - bias_energy_sequence[x * n_therm_states + K];
+            for(e=indptr[Ki]; e<indptr[Ki + 1]; ++e)
+            {
+                /* special case: most variables cancel out, here */
+                if(i == indices[e])
+                {
+                    scratch_M[o++] = log_counts[e] + biased_conf_energies[Ki];
+                    continue;
                 }
-            log_L -= _logsumexp_sort_kahan_inplace(scratch_T,o);
-        }
-        return log_L;
-    } else
-        return 0;
-}
-
-void _tram_get_conf_energies(
-    double *bias_energy_sequence, int *state_sequence, int seq_length, double *log_R_K_i,
-    int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies)
-{
-    int i, K, x, o;
-    double divisor;
-    /* assume that conf_energies was set to INF by the caller on the first call */
-    for( x=0; x<seq_length; ++x )
-    {
-        i = state_sequence[x];
-        if(i < 0) continue;
-        o = 0;
-        for(K=0; K<n_therm_states; ++K) {
-            if(-INFINITY == log_R_K_i[K * n_conf_states + i]) continue;
-            scratch_T[o++] = log_R_K_i[K * n_conf_states + i] - bias_energy_sequence[x * n_therm_states + K];
+                /* regular case */
+                Kj = KM + indices[e];
+                divisor = _logsumexp_pair(
+                    log_lagrangian_mult[Kj] - biased_conf_energies[Ki],
+                    log_lagrangian_mult[Ki] - biased_conf_energies[Kj]);
+                scratch_M[o++] = log_counts[e] + log_lagrangian_mult[Kj] - divisor;
+            }
+            /* IGNORE PRIOR; log_excess_counts is -inf where N_i^K does not exceed the counts */
+            log_R_K_i[Ki] = _logsumexp_pair(
+                _logsumexp_inplace(scratch_M, o), log_excess_counts[Ki] + biased_conf_energies[Ki]);
         }
-        divisor = _logsumexp_sort_kahan_inplace(scratch_T, o);
-        conf_energies[i] = -_logsumexp_pair(-conf_energies[i], -divisor);
     }
+
+#ifdef TRAMMBAR
+    _tram_add_equilibrium_log_R_K_i(
+        therm_energies, equilibrium_therm_state_counts, overcounting_factor,
+        n_therm_states, n_conf_states, log_R_K_i);
+#endif
 }
 
+#define BIAS_T double
+#define FRAME_KERNEL(name) name
+#include "_tram_frame_kernels.h"
+#undef BIAS_T
+#undef FRAME_KERNEL
+
+#define BIAS_T float
+#define FRAME_KERNEL(name) name##_f32
+#include "_tram_frame_kernels.h"
+#undef BIAS_T
+#undef FRAME_KERNEL
+
 void _tram_get_therm_energies(
     double *biased_conf_energies, int n_therm_states, int n_conf_states, double *scratch_M, double *therm_energies)
 {
@@ -253,7 +424,7 @@ void _tram_get_therm_energies(
     {
         for(i=0; i<n_conf_states; ++i)
             scratch_M[i] = -biased_conf_energies[K * n_conf_states + i];
-        therm_energies[K] = -_logsumexp_sort_kahan_inplace(scratch_M, n_conf_states);
+        therm_energies[K] = -_logsumexp_inplace(scratch_M, n_conf_states);
     }
 }
 
@@ -265,7 +436,7 @@ void _tram_normalize(
     double f0;
     for(i=0; i<n_conf_states; ++i)
         scratch_M[i] = -conf_energies[i];
-    f0 = -_logsumexp_sort_kahan_inplace(scratch_M, n_conf_states);
+    f0 = -_logsumexp_inplace(scratch_M, n_conf_states);
     for(i=0; i<n_conf_states; ++i)
         conf_energies[i] -= f0;
     for(i=0; i<KM; ++i)
@@ -326,6 +497,97 @@ void _tram_estimate_transition_matrix(
 
 }
 
+void _tram_estimate_transition_matrix_sparse(
+    double *log_lagrangian_mult, double *conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji,
+    int n_conf_states, double *scratch_M, double *transition_values)
+{
+    int i, j, e;
+    int C;
+    double divisor, max_sum;
+    double *sum;
+    /* indptr points to the M+1 row offsets of one thermodynamic state */
+    sum = scratch_M;
+    for(i=0; i<n_conf_states; ++i)
+    {
+        sum[i] = 0.0;
+        for(e=indptr[i]; e<indptr[i + 1]; ++e)
+        {
+            j = indices[e];
+            transition_values[e] = 0.0;
+            C = counts_ij[e] + counts_ji[e];
+            /* special case: this element is zero */
+            if(0 == C) continue;
+            if(i == j) {
+                /* special case: diagonal element */
+                transition_values[e] = 0.5 * C * exp(-log_lagrangian_mult[i]);
+            } else {
+                /* regular case */
+                divisor = _logsumexp_pair(
+                    log_lagrangian_mult[j] - conf_energies[i],
+                    log_lagrangian_mult[i] - conf_energies[j]);
+                transition_values[e] = C * exp(-(conf_energies[j] + divisor));
+            }
+            sum[i] += transition_values[e];
+        }
+    }
+    /* normalize T matrix */
+    max_sum = 0;
+    for(i=0; i<n_conf_states; ++i) if(sum[i] > max_sum) max_sum = sum[i];
+    if(max_sum==0) max_sum = 1.0; /* completely empty T matrix -> generate Id matrix */
+    for(i=0; i<n_conf_states; ++i) {
+        for(e=indptr[i]; e<indptr[i + 1]; ++e) {
+            if(i == indices[e]) {
+                transition_values[e] = (transition_values[e]+max_sum-sum[i])/max_sum;
+                if(0 == transition_values[e] && 0 < counts_ij[e])
+                    fprintf(stderr, "# Warning: zero diagonal element T[%d,%d] with non-zero counts.\n", i, i);
+            } else {
+                transition_values[e] = transition_values[e]/max_sum;
+            }
+        }
+    }
+}
+
+/* adds the state-count terms to the transition part a of the TRAM log-likelihood lower bound */
+static double _tram_add_state_log_likelihood(
+    double a, double *biased_conf_energies, int *state_counts, int n_therm_states, int n_conf_states
+#ifdef TRAMMBAR
+    ,
+    double *therm_energies, int *equilibrium_therm_state_counts,
+    double overcounting_factor
+#endif
+)
+{
+    double b;
+    int K, i, KM, Ki;
+
+    /* \sum_{i,k}N_{i}^{(k)}f_{i}^{(k)} */
+    b = 0;
+    for(K=0; K<n_therm_states; ++K) {
+        KM = K * n_conf_states;
+        for(i=0; i<n_conf_states; ++i) {
+            Ki = KM + i;
+            if(state_counts[Ki]>0)
+                b += (state_counts[Ki] + THERMOTOOLS_TRAM_PRIOR) * biased_conf_energies[Ki];
+        }
+    }
+
+#ifdef TRAMMBAR
+    a *= overcounting_factor;
+    b *= overcounting_factor;
+
+    /* \sum_k N_{eq}^{(k)}f^{(k)}*/
+    if(equilibrium_therm_state_counts && therm_energies) {
+        for(K=0; K<n_therm_states; ++K) {
+            if(0 < equilibrium_therm_state_counts[K])
+                b += equilibrium_therm_state_counts[K] * therm_energies[K];
+        }
+    }
+#endif
+
+    return a+b;
+}
+
 /* TRAM log-likelihood that comes from the terms containing discrete quantities */
 double _tram_discrete_log_likelihood_lower_bound(
     double *log_lagrangian_mult, double *biased_conf_energies,
@@ -338,9 +600,9 @@ double _tram_discrete_log_likelihood_lower_bound(
 #endif
 )
 {
-    double a, b;
+    double a;
     int K, i, j;
-    int KM, KMM, Ki;
+    int KM, KMM;
     int CKij;
     double *T_ij;
 
@@ -369,58 +631,59 @@ double _tram_discrete_log_likelihood_lower_bound(
         }
     }
 
-    /* \sum_{i,k}N_{i}^{(k)}f_{i}^{(k)} */
-    b = 0;
-    for(K=0; K<n_therm_states; ++K) {
-        KM = K * n_conf_states;
-        for(i=0; i<n_conf_states; ++i) {
-            Ki = KM + i;
-            if(state_counts[Ki]>0)
-                b += (state_counts[Ki] + THERMOTOOLS_TRAM_PRIOR) * biased_conf_energies[Ki];
-        }
-    }
-
+    return _tram_add_state_log_likelihood(
+        a, biased_conf_energies, state_counts, n_therm_states, n_conf_states
 #ifdef TRAMMBAR
-    a *= overcounting_factor;
-    b *= overcounting_factor;
-
-    /* \sum_k N_{eq}^{(k)}f^{(k)}*/
-    if(equilibrium_therm_state_counts && therm_energies) {
-        for(K=0; K<n_therm_states; ++K) {
-            if(0 < equilibrium_therm_state_counts[K])
-                b += equilibrium_therm_state_counts[K] * therm_energies[K];
-        }
-    }
+        ,
+        therm_energies, equilibrium_therm_state_counts, overcounting_factor
 #endif
-
-    return a+b;
+    );
 }
 
-void _tram_get_pointwise_unbiased_free_energies(
-    int k, double *bias_energy_sequence, double *therm_energies, int *state_sequence,
-    int seq_length, double *log_R_K_i, int n_therm_states, int n_conf_states,
-    double *scratch_T, double *pointwise_unbiased_free_energies)
+double _tram_discrete_log_likelihood_lower_bound_sparse(
+    double *log_lagrangian_mult, double *biased_conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji, int *state_counts,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *scratch_nnz
+#ifdef TRAMMBAR
+    ,
+    double *therm_energies, int *equilibrium_therm_state_counts,
+    double overcounting_factor
+#endif
+)
 {
-    int L, o, i, x;
-    double log_divisor;
+    double a;
+    int K, i, e;
+    int KM;
+    int CKij;
 
-    for(x=0; x<seq_length; ++x)
+    /* \sum_{i,j,k}c_{ij}^{(k)}\log p_{ij}^{(k)} over the stored pattern */
+    a = 0;
+    for(K=0; K<n_therm_states; ++K)
     {
-        i = state_sequence[x];
-        if(i < 0) {
-            pointwise_unbiased_free_energies[x] = INFINITY;
-            continue;
-        }
-        o = 0;
-        for(L=0; L<n_therm_states; ++L)
+        KM = K * n_conf_states;
+        _tram_estimate_transition_matrix_sparse(
+           &log_lagrangian_mult[KM], &biased_conf_energies[KM], &indptr[KM], indices,
+           counts_ij, counts_ji, n_conf_states, scratch_M, scratch_nnz);
+        for(i=0; i<n_conf_states; ++i)
         {
-            if(-INFINITY == log_R_K_i[L * n_conf_states + i]) continue;
-            scratch_T[o++] = log_R_K_i[L * n_conf_states + i] - bias_energy_sequence[x * n_therm_states + L];
+            for(e=indptr[KM + i]; e<indptr[KM + i + 1]; ++e)
+            {
+                CKij = counts_ij[e];
+                if(0==CKij) continue;
+                if(i==indices[e]) {
+                    a += ((double)CKij + THERMOTOOLS_TRAM_PRIOR) * log(scratch_nnz[e]);
+                } else {
+                    a += CKij * log(scratch_nnz[e]);
+                }
+            }
         }
-        log_divisor = _logsumexp_sort_kahan_inplace(scratch_T, o);
-        if(k==-1)
-            pointwise_unbiased_free_energies[x] = log_divisor;
-        else
-            pointwise_unbiased_free_energies[x] = bias_energy_sequence[x * n_therm_states + k] + log_divisor - therm_energies[k];
     }
+
+    return _tram_add_state_log_likelihood(
+        a, biased_conf_energies, state_counts, n_therm_states, n_conf_states
+#ifdef TRAMMBAR
+        ,
+        therm_energies, equilibrium_therm_state_counts, overcounting_factor
+#endif
+    );
 }
@@ -28,18 +28,70 @@
 
 void _tram_init_lagrangian_mult(int *count_matrices, int n_therm_states, int n_conf_states, double *log_lagrangian_mult);
 
+void _tram_init_lagrangian_mult_sparse(
+    int *indptr, int *counts_ij, int *counts_ji,
+    int n_therm_states, int n_conf_states, double *log_lagrangian_mult);
+
 void _tram_update_lagrangian_mult(
     double *log_lagrangian_mult, double *biased_conf_energies, int *count_matrices, int* state_counts,
     int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult);
 
+void _tram_update_lagrangian_mult_sparse(
+    double *log_lagrangian_mult, double *biased_conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji, int* state_counts,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult);
+
+void _tram_update_lagrangian_mult_logc(
+    double *log_lagrangian_mult, double *biased_conf_energies,
+    int *indptr, int *indices, double *log_counts, int* state_counts,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult);
+
 double _tram_update_biased_conf_energies(
     double *bias_energy_sequence, int *state_sequence, int seq_length, double *log_R_K_i,
     int n_therm_states, int n_conf_states, double *scratch_T, double *new_biased_conf_energies, int return_log_L);
 
+double _tram_update_biased_conf_energies_parallel(
+    double **bias_energy_sequences, int **state_sequences, int *seq_lengths, int n_sequences,
+    double *log_R_K_i, int n_therm_states, int n_conf_states, int n_threads,
+    double *scratch_NT, double *scratch_NTM, double *new_biased_conf_energies, int return_log_L);
+
 void _tram_get_conf_energies(
     double *bias_energy_sequence, int *state_sequence, int seq_length, double *log_R_K_i,
     int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies);
 
+/* all trajectories in one buffer, trajectory s spans the samples offsets[s]:offsets[s+1] */
+double _tram_update_biased_conf_energies_packed(
+    double *bias_energy_sequence, int *state_sequence, long long *offsets, int n_sequences,
+    double *log_R_K_i, int n_therm_states, int n_conf_states, int n_threads,
+    double *scratch_NT, double *scratch_NTM, double *new_biased_conf_energies, int return_log_L);
+
+void _tram_get_conf_energies_packed(
+    double *bias_energy_sequence, int *state_sequence, long long *offsets, int n_sequences,
+    double *log_R_K_i, int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies);
+
+/* single precision storage of the bias energies, double precision accumulation */
+double _tram_update_biased_conf_energies_f32(
+    float *bias_energy_sequence, int *state_sequence, int seq_length, double *log_R_K_i,
+    int n_therm_states, int n_conf_states, double *scratch_T, double *new_biased_conf_energies, int return_log_L);
+
+double _tram_update_biased_conf_energies_parallel_f32(
+    float **bias_energy_sequences, int **state_sequences, int *seq_lengths, int n_sequences,
+    double *log_R_K_i, int n_therm_states, int n_conf_states, int n_threads,
+    double *scratch_NT, double *scratch_NTM, double *new_biased_conf_energies, int return_log_L);
+
+void _tram_get_conf_energies_f32(
+    float *bias_energy_sequence, int *state_sequence, int seq_length, double *log_R_K_i,
+    int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies);
+
+double _tram_update_biased_conf_energies_packed_f32(
+    float *bias_energy_sequence, int *state_sequence, long long *offsets, int n_sequences,
+    double *log_R_K_i, int n_therm_states, int n_conf_states, int n_threads,
+    double *scratch_NT, double *scratch_NTM, double *new_biased_conf_energies, int return_log_L);
+
+void _tram_get_conf_energies_packed_f32(
+    float *bias_energy_sequence, int *state_sequence, long long *offsets, int n_sequences,
+    double *log_R_K_i, int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies);
+
 void _tram_get_therm_energies(
     double *biased_conf_energies, int n_therm_states, int n_conf_states, double *scratch_M, double *therm_energies);
 
@@ -51,6 +103,11 @@ void _tram_estimate_transition_matrix(
     double *log_lagrangian_mult, double *conf_energies, int *count_matrix,
     int n_conf_states, double *scratch_M, double *transition_matrix);
 
+void _tram_estimate_transition_matrix_sparse(
+    double *log_lagrangian_mult, double *conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji,
+    int n_conf_states, double *scratch_M, double *transition_values);
+
 double _tram_discrete_log_likelihood_lower_bound(
     double *log_lagrangian_mult, double *biased_conf_energies,
     int *count_matrices, int *state_counts,
@@ -73,9 +130,47 @@ void _tram_get_log_Ref_K_i(
 #endif
 );
 
+double _tram_discrete_log_likelihood_lower_bound_sparse(
+    double *log_lagrangian_mult, double *biased_conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji, int *state_counts,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *scratch_nnz
+#ifdef TRAMMBAR
+    ,
+    double *therm_energies, int *equilibrium_therm_state_counts,
+    double overcounting_factor
+#endif
+);
+
+void _tram_get_log_Ref_K_i_sparse(
+    double *log_lagrangian_mult, double *biased_conf_energies,
+    int *indptr, int *indices, int *counts_ij, int *counts_ji, int *state_counts,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *log_R_K_i
+#ifdef TRAMMBAR
+    ,
+    double *therm_energies, int *equilibrium_therm_state_counts,
+    double overcounting_factor
+#endif
+);
+
+void _tram_get_log_Ref_K_i_logc(
+    double *log_lagrangian_mult, double *biased_conf_energies,
+    int *indptr, int *indices, double *log_counts, double *log_excess_counts, int *state_counts,
+    int n_therm_states, int n_conf_states, double *scratch_M, double *log_R_K_i
+#ifdef TRAMMBAR
+    ,
+    double *therm_energies, int *equilibrium_therm_state_counts,
+    double overcounting_factor
+#endif
+);
+
 void _tram_get_pointwise_unbiased_free_energies(
     int k, double *bias_energy_sequence, double *therm_energies, int *state_sequence,
     int seq_length, double *log_R_K_i, int n_therm_states, int n_conf_states,
     double *scratch_T, double *pointwise_unbiased_free_energies);
 
+void _tram_get_pointwise_unbiased_free_energies_f32(
+    int k, float *bias_energy_sequence, double *therm_energies, int *state_sequence,
+    int seq_length, double *log_R_K_i, int n_therm_states, int n_conf_states,
+    double *scratch_T, double *pointwise_unbiased_free_energies);
+
 #endif
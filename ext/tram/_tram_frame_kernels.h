@@ -0,0 +1,242 @@
+/*
+* This file is part of thermotools.
+*
+* Copyright 2016 Computational Molecular Biology Group, Freie Universitaet Berlin (GER)
+*
+* thermotools is free software: you can redistribute it and/or modify
+* it under the terms of the GNU Lesser General Public License as published by
+* the Free Software Foundation, either version 3 of the License, or
+* (at your option) any later version.
+*
+* This program is distributed in the hope that it will be useful,
+* but WITHOUT ANY WARRANTY; without even the implied warranty of
+* MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+* GNU General Public License for more details.
+*
+* You should have received a copy of the GNU Lesser General Public License
+* along with this program.  If not, see <http://www.gnu.org/licenses/>.
+*/
+
+/*
+* Per-frame TRAM kernels, included by _tram.c once for every storage type of the
+* bias energies: BIAS_T is the element type and FRAME_KERNEL(name) the function
+* name. The bias energies are only read; all sums are accumulated in double.
+*/
+
+double FRAME_KERNEL(_tram_update_biased_conf_energies)(
+    BIAS_T *bias_energy_sequence, int *state_sequence, int seq_length, double *log_R_K_i,
+    int n_therm_states, int n_conf_states, double *scratch_T, double *new_biased_conf_energies, int return_log_L)
+{
+    int i, K, x, o, Ki;
+    int KM;
+    double divisor, log_L;
+
+    /* assume that new_biased_conf_energies have been set to INF by the caller in the first call */
+    for(x=0; x<seq_length; ++x)
+    {
+        i = state_sequence[x];
+        if(i < 0) continue; /* skip frames that have negative Markov state indices */
+        o = 0;
+        for(K=0; K<n_therm_states; ++K)
+        {
+            assert(K<n_therm_states);
+            assert(K>=0);
+            /* applying Hao's speed-up recomendation */
+            if(-INFINITY == log_R_K_i[K * n_conf_states + i]) continue;
+            scratch_T[o++] = log_R_K_i[K * n_conf_states + i] - bias_energy_sequence[(long long) x * n_therm_states + K];
+        }
+        divisor = _logsumexp_inplace(scratch_T, o);
+        
+        for(K=0; K<n_therm_states; ++K)
+        {
+            new_biased_conf_energies[K * n_conf_states + i] = -_logsumexp_pair(
+                    -new_biased_conf_energies[K * n_conf_states + i],
+                    -(divisor + bias_energy_sequence[(long long) x * n_therm_states + K]));
+        }
+    }
+
+    if(return_log_L) {
+        /* -\sum_{x}\log\sum_{l}R_{i(x)}^{(l)}e^{-b^{(l)}(x)+f_{i(x)}^{(l)}} */
+        log_L = 0;
+        for(x=0; x<seq_length; ++x) {
+            o = 0;
+            i = state_sequence[x];
+            if(i < 0) continue;
+            for(K=0; K<n_therm_states; ++K) {
+                KM = K*n_conf_states;
+                Ki = KM + i;
+                if(log_R_K_i[Ki] > 0)
+                    scratch_T[o++] =
+                        log_R_K_i[Ki] - bias_energy_sequence[(long long) x * n_therm_states + K];
+                }
+            log_L -= _logsumexp_inplace(scratch_T,o);
+        }
+        return log_L;
+    } else
+        return 0;
+}
+
+double FRAME_KERNEL(_tram_update_biased_conf_energies_parallel)(
+    BIAS_T **bias_energy_sequences, int **state_sequences, int *seq_lengths, int n_sequences,
+    double *log_R_K_i, int n_therm_states, int n_conf_states, int n_threads,
+    double *scratch_NT, double *scratch_NTM, double *new_biased_conf_energies, int return_log_L)
+{
+    int j, n, TM = n_therm_states * n_conf_states;
+    int mode = _get_logsumexp_mode();
+    double log_L = 0.0;
+
+    /* every thread sweeps a contiguous block of each sequence into a private (T, M) accumulator */
+    for(j=0; j<n_threads*TM; ++j)
+        scratch_NTM[j] = INFINITY;
+#ifdef _OPENMP
+    #pragma omp parallel num_threads(n_threads) reduction(+:log_L)
+#endif
+    {
+        int s, first, last, thread = 0, n_active = 1;
+#ifdef _OPENMP
+        thread = omp_get_thread_num();
+        n_active = omp_get_num_threads();
+#endif
+        /* the logsumexp mode is thread-local: hand the caller's mode to the workers */
+        _set_logsumexp_mode(mode);
+        for(s=0; s<n_sequences; ++s)
+        {
+            first = (int) (((long long) seq_lengths[s] * thread) / n_active);
+            last = (int) (((long long) seq_lengths[s] * (thread + 1)) / n_active);
+            if(first == last) continue;
+            log_L += FRAME_KERNEL(_tram_update_biased_conf_energies)(
+                bias_energy_sequences[s] + (long long) first * n_therm_states,
+                state_sequences[s] + first, last - first, log_R_K_i,
+                n_therm_states, n_conf_states, scratch_NT + thread * n_therm_states,
+                scratch_NTM + thread * TM, return_log_L);
+        }
+    }
+    /* logspace reduction in a fixed order keeps the result independent of the scheduling */
+    for(n=0; n<n_threads; ++n)
+    {
+        for(j=0; j<TM; ++j)
+            new_biased_conf_energies[j] = -_logsumexp_pair(
+                -new_biased_conf_energies[j], -scratch_NTM[n * TM + j]);
+    }
+    return log_L;
+}
+
+/*
+* Multi-trajectory entry point for data that is stored back to back in one C-contiguous
+* buffer, trajectory s spans the samples offsets[s]:offsets[s+1]. One call sweeps every
+* trajectory; with n_threads > 1, the trajectories are split into blocks as above.
+*/
+double FRAME_KERNEL(_tram_update_biased_conf_energies_packed)(
+    BIAS_T *bias_energy_sequence, int *state_sequence, long long *offsets, int n_sequences,
+    double *log_R_K_i, int n_therm_states, int n_conf_states, int n_threads,
+    double *scratch_NT, double *scratch_NTM, double *new_biased_conf_energies, int return_log_L)
+{
+    int s, j, n, TM = n_therm_states * n_conf_states;
+    int mode = _get_logsumexp_mode();
+    double log_L = 0.0;
+
+    if(n_threads == 1)
+    {
+        /* accumulate directly, scratch_NT serves as scratch_T and scratch_NTM is not used */
+        for(s=0; s<n_sequences; ++s)
+            log_L += FRAME_KERNEL(_tram_update_biased_conf_energies)(
+                bias_energy_sequence + offsets[s] * n_therm_states, state_sequence + offsets[s],
+                (int) (offsets[s + 1] - offsets[s]), log_R_K_i, n_therm_states, n_conf_states,
+                scratch_NT, new_biased_conf_energies, return_log_L);
+        return log_L;
+    }
+    for(j=0; j<n_threads*TM; ++j)
+        scratch_NTM[j] = INFINITY;
+#ifdef _OPENMP
+    #pragma omp parallel num_threads(n_threads) reduction(+:log_L)
+#endif
+    {
+        int t, thread = 0, n_active = 1;
+        long long length, first, last;
+#ifdef _OPENMP
+        thread = omp_get_thread_num();
+        n_active = omp_get_num_threads();
+#endif
+        _set_logsumexp_mode(mode);
+        for(t=0; t<n_sequences; ++t)
+        {
+            length = offsets[t + 1] - offsets[t];
+            first = offsets[t] + (length * thread) / n_active;
+            last = offsets[t] + (length * (thread + 1)) / n_active;
+            if(first == last) continue;
+            log_L += FRAME_KERNEL(_tram_update_biased_conf_energies)(
+                bias_energy_sequence + first * n_therm_states, state_sequence + first,
+                (int) (last - first), log_R_K_i, n_therm_states, n_conf_states,
+                scratch_NT + thread * n_therm_states, scratch_NTM + thread * TM, return_log_L);
+        }
+    }
+    for(n=0; n<n_threads; ++n)
+    {
+        for(j=0; j<TM; ++j)
+            new_biased_conf_energies[j] = -_logsumexp_pair(
+                -new_biased_conf_energies[j], -scratch_NTM[n * TM + j]);
+    }
+    return log_L;
+}
+
+void FRAME_KERNEL(_tram_get_conf_energies)(
+    BIAS_T *bias_energy_sequence, int *state_sequence, int seq_length, double *log_R_K_i,
+    int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies)
+{
+    int i, K, x, o;
+    double divisor;
+    /* assume that conf_energies was set to INF by the caller on the first call */
+    for( x=0; x<seq_length; ++x )
+    {
+        i = state_sequence[x];
+        if(i < 0) continue;
+        o = 0;
+        for(K=0; K<n_therm_states; ++K) {
+            if(-INFINITY == log_R_K_i[K * n_conf_states + i]) continue;
+            scratch_T[o++] = log_R_K_i[K * n_conf_states + i] - bias_energy_sequence[(long long) x * n_therm_states + K];
+        }
+        divisor = _logsumexp_inplace(scratch_T, o);
+        conf_energies[i] = -_logsumexp_pair(-conf_energies[i], -divisor);
+    }
+}
+
+void FRAME_KERNEL(_tram_get_conf_energies_packed)(
+    BIAS_T *bias_energy_sequence, int *state_sequence, long long *offsets, int n_sequences,
+    double *log_R_K_i, int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies)
+{
+    int s;
+    for(s=0; s<n_sequences; ++s)
+        FRAME_KERNEL(_tram_get_conf_energies)(
+            bias_energy_sequence + offsets[s] * n_therm_states, state_sequence + offsets[s],
+            (int) (offsets[s + 1] - offsets[s]), log_R_K_i, n_therm_states, n_conf_states,
+            scratch_T, conf_energies);
+}
+
+void FRAME_KERNEL(_tram_get_pointwise_unbiased_free_energies)(
+    int k, BIAS_T *bias_energy_sequence, double *therm_energies, int *state_sequence,
+    int seq_length, double *log_R_K_i, int n_therm_states, int n_conf_states,
+    double *scratch_T, double *pointwise_unbiased_free_energies)
+{
+    int L, o, i, x;
+    double log_divisor;
+
+    for(x=0; x<seq_length; ++x)
+    {
+        i = state_sequence[x];
+        if(i < 0) {
+            pointwise_unbiased_free_energies[x] = INFINITY;
+            continue;
+        }
+        o = 0;
+        for(L=0; L<n_therm_states; ++L)
+        {
+            if(-INFINITY == log_R_K_i[L * n_conf_states + i]) continue;
+            scratch_T[o++] = log_R_K_i[L * n_conf_states + i] - bias_energy_sequence[(long long) x * n_therm_states + L];
+        }
+        log_divisor = _logsumexp_inplace(scratch_T, o);
+        if(k==-1)
+            pointwise_unbiased_free_energies[x] = log_divisor;
+        else
+            pointwise_unbiased_free_energies[x] = bias_energy_sequence[(long long) x * n_therm_states + k] + log_divisor - therm_energies[k];
+    }
+}
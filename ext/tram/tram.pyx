@@ -21,11 +21,20 @@ Python interface to the TRAM estimator's lowlevel functions.
 
 import numpy as _np
 cimport numpy as _np
+from libc.stdlib cimport malloc, free
 
 from warnings import warn as _warn
 from msmtools.util.exceptions import NotConvergedWarning as _NotConvergedWarning
 
 from .callback import CallbackInterrupt
+from .util import logsumexp_mode_context as _logsumexp_mode_context
+from .util import pack_sequences as _pack_sequences
+from .util import PackedSequences as _PackedSequences
+from .util import SparseCountMatrices as _SparseCountMatrices
+from .util import sparse_count_matrices as _sparse_count_matrices
+from .util import LogCountTables as _LogCountTables
+from .util import log_count_tables as _log_count_tables
+from .solvers import get_solver as _get_solver
 
 __all__ = [
     'init_lagrangian_mult',
@@ -39,16 +48,33 @@ __all__ = [
     'estimate']
 
 cdef extern from "_tram.h":
+    double THERMOTOOLS_TRAM_PRIOR
     void _tram_init_lagrangian_mult(
         int *count_matrices, int n_therm_states, int n_conf_states, double *log_lagrangian_mult)
+    void _tram_init_lagrangian_mult_sparse(
+        int *indptr, int *counts_ij, int *counts_ji,
+        int n_therm_states, int n_conf_states, double *log_lagrangian_mult)
     void _tram_update_lagrangian_mult(
         double *log_lagrangian_mult, double *biased_conf_energies,
         int *count_matrices,  int* state_counts,
         int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult)
+    void _tram_update_lagrangian_mult_sparse(
+        double *log_lagrangian_mult, double *biased_conf_energies,
+        int *indptr, int *indices, int *counts_ij, int *counts_ji, int* state_counts,
+        int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult)
+    void _tram_update_lagrangian_mult_logc(
+        double *log_lagrangian_mult, double *biased_conf_energies,
+        int *indptr, int *indices, double *log_counts, int* state_counts,
+        int n_therm_states, int n_conf_states, double *scratch_M, double *new_log_lagrangian_mult)
     double _tram_update_biased_conf_energies(
         double *bias_energy_sequence, int *state_sequence, int seq_length, double *log_R_K_i,
         int n_therm_states, int n_conf_states, double *scratch_T,
         double *new_biased_conf_energies, int return_log_L)
+    double _tram_update_biased_conf_energies_parallel(
+        double **bias_energy_sequences, int **state_sequences, int *seq_lengths, int n_sequences,
+        double *log_R_K_i, int n_therm_states, int n_conf_states, int n_threads,
+        double *scratch_NT, double *scratch_NTM, double *new_biased_conf_energies,
+        int return_log_L) nogil
     void _tram_get_conf_energies(
         double *bias_energy_sequence, int *state_sequence, int seq_length, double *log_R_K_i,
         int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies)
@@ -61,21 +87,82 @@ cdef extern from "_tram.h":
     void _tram_estimate_transition_matrix(
         double *log_lagrangian_mult, double *conf_energies, int *count_matrix,
         int n_conf_states, double *scratch_M, double *transition_matrix)
+    void _tram_estimate_transition_matrix_sparse(
+        double *log_lagrangian_mult, double *conf_energies,
+        int *indptr, int *indices, int *counts_ij, int *counts_ji,
+        int n_conf_states, double *scratch_M, double *transition_values)
     double _tram_discrete_log_likelihood_lower_bound(
         double *log_lagrangian_mult, double *biased_conf_energies,
         int *count_matrices,  int *state_counts, int n_therm_states, int n_conf_states,
         double *scratch_M, double *scratch_MM)
+    double _tram_discrete_log_likelihood_lower_bound_sparse(
+        double *log_lagrangian_mult, double *biased_conf_energies,
+        int *indptr, int *indices, int *counts_ij, int *counts_ji, int *state_counts,
+        int n_therm_states, int n_conf_states, double *scratch_M, double *scratch_nnz)
     void _tram_get_log_Ref_K_i(
         double *log_lagrangian_mult, double *biased_conf_energies, int *count_matrices,
         int *state_counts, int n_therm_states, int n_conf_states, double *scratch_M,
         double *log_R_K_i)
+    void _tram_get_log_Ref_K_i_sparse(
+        double *log_lagrangian_mult, double *biased_conf_energies,
+        int *indptr, int *indices, int *counts_ij, int *counts_ji, int *state_counts,
+        int n_therm_states, int n_conf_states, double *scratch_M, double *log_R_K_i)
+    void _tram_get_log_Ref_K_i_logc(
+        double *log_lagrangian_mult, double *biased_conf_energies,
+        int *indptr, int *indices, double *log_counts, double *log_excess_counts, int *state_counts,
+        int n_therm_states, int n_conf_states, double *scratch_M, double *log_R_K_i)
     void _tram_get_pointwise_unbiased_free_energies(
         int k, double *bias_energy_sequence, double *therm_energies, int *state_sequence,
         int seq_length, double *log_R_K_i, int n_therm_states, int n_conf_states,
         double *scratch_T, double *pointwise_unbiased_free_energies)
+    double _tram_update_biased_conf_energies_f32(
+        float *bias_energy_sequence, int *state_sequence, int seq_length, double *log_R_K_i,
+        int n_therm_states, int n_conf_states, double *scratch_T,
+        double *new_biased_conf_energies, int return_log_L)
+    double _tram_update_biased_conf_energies_parallel_f32(
+        float **bias_energy_sequences, int **state_sequences, int *seq_lengths, int n_sequences,
+        double *log_R_K_i, int n_therm_states, int n_conf_states, int n_threads,
+        double *scratch_NT, double *scratch_NTM, double *new_biased_conf_energies,
+        int return_log_L) nogil
+    void _tram_get_conf_energies_f32(
+        float *bias_energy_sequence, int *state_sequence, int seq_length, double *log_R_K_i,
+        int n_therm_states, int n_conf_states, double *scratch_T, double *conf_energies)
+    double _tram_update_biased_conf_energies_packed(
+        double *bias_energy_sequence, int *state_sequence, long long *offsets, int n_sequences,
+        double *log_R_K_i, int n_therm_states, int n_conf_states, int n_threads,
+        double *scratch_NT, double *scratch_NTM, double *new_biased_conf_energies,
+        int return_log_L) nogil
+    double _tram_update_biased_conf_energies_packed_f32(
+        float *bias_energy_sequence, int *state_sequence, long long *offsets, int n_sequences,
+        double *log_R_K_i, int n_therm_states, int n_conf_states, int n_threads,
+        double *scratch_NT, double *scratch_NTM, double *new_biased_conf_energies,
+        int return_log_L) nogil
+    void _tram_get_conf_energies_packed(
+        double *bias_energy_sequence, int *state_sequence, long long *offsets, int n_sequences,
+        double *log_R_K_i, int n_therm_states, int n_conf_states, double *scratch_T,
+        double *conf_energies)
+    void _tram_get_conf_energies_packed_f32(
+        float *bias_energy_sequence, int *state_sequence, long long *offsets, int n_sequences,
+        double *log_R_K_i, int n_therm_states, int n_conf_states, double *scratch_T,
+        double *conf_energies)
+    void _tram_get_pointwise_unbiased_free_energies_f32(
+        int k, float *bias_energy_sequence, double *therm_energies, int *state_sequence,
+        int seq_length, double *log_R_K_i, int n_therm_states, int n_conf_states,
+        double *scratch_T, double *pointwise_unbiased_free_energies)
+
+cdef extern from "../util/_util.h":
+    int _get_logsumexp_mode()
+    int _get_n_threads(int n_threads)
+    void _set_logsumexp_mode(int mode)
+
+def _select_logsumexp_mode(int mode):
+    r"""Select the logsumexp scheme index of the kernels in this module; return the previous one."""
+    cdef int old_mode = _get_logsumexp_mode()
+    _set_logsumexp_mode(mode)
+    return old_mode
 
 def init_lagrangian_mult(
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
+    count_matrices,
     _np.ndarray[double, ndim=2, mode="c"] log_lagrangian_mult not None):
     r"""
     Set the logarithm of the Lagrangian multipliers with an initial guess based
@@ -83,13 +170,24 @@ def init_lagrangian_mult(
 
     Parameters
     ----------
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or SparseCountMatrices
         multistate count matrix
     log_lagrangian_mult : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         log of the Lagrangian multipliers (allocated but unset)
     """
+    cdef _np.ndarray[int, ndim=3, mode="c"] dense
+    if isinstance(count_matrices, _SparseCountMatrices):
+        _tram_init_lagrangian_mult_sparse(
+            <int*> _np.PyArray_DATA(count_matrices.indptr),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ij),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ji),
+            log_lagrangian_mult.shape[0],
+            log_lagrangian_mult.shape[1],
+            <double*> _np.PyArray_DATA(log_lagrangian_mult))
+        return
+    dense = _np.asarray(count_matrices)
     _tram_init_lagrangian_mult(
-        <int*> _np.PyArray_DATA(count_matrices),
+        <int*> _np.PyArray_DATA(dense),
         log_lagrangian_mult.shape[0],
         log_lagrangian_mult.shape[1],
         <double*> _np.PyArray_DATA(log_lagrangian_mult))
@@ -97,7 +195,7 @@ def init_lagrangian_mult(
 def update_lagrangian_mult(
     _np.ndarray[double, ndim=2, mode="c"] log_lagrangian_mult not None,
     _np.ndarray[double, ndim=2, mode="c"] biased_conf_energies not None,
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
+    count_matrices,
     _np.ndarray[int, ndim=2, mode="c"] state_counts not None,
     _np.ndarray[double, ndim=1, mode="c"] scratch_M not None,
     _np.ndarray[double, ndim=2, mode="c"] new_log_lagrangian_mult not None):
@@ -110,17 +208,46 @@ def update_lagrangian_mult(
         log of the Lagrangian multipliers
     biased_conf_energies : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         reduced free energies
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
-        multistate count matrix
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc), SparseCountMatrices or LogCountTables
+        multistate count matrix (LogCountTables skip the logarithms of the counts)
     scratch_M : numpy.ndarray(shape=(M), dtype=numpy.float64)
         scratch array for logsumexp operations
     new_log_lagrangian_mult : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         target array for the log of the Lagrangian multipliers
     """
+    cdef _np.ndarray[int, ndim=3, mode="c"] dense
+    if isinstance(count_matrices, _LogCountTables):
+        _tram_update_lagrangian_mult_logc(
+            <double*> _np.PyArray_DATA(log_lagrangian_mult),
+            <double*> _np.PyArray_DATA(biased_conf_energies),
+            <int*> _np.PyArray_DATA(count_matrices.indptr),
+            <int*> _np.PyArray_DATA(count_matrices.indices),
+            <double*> _np.PyArray_DATA(count_matrices.log_counts),
+            <int*> _np.PyArray_DATA(state_counts),
+            log_lagrangian_mult.shape[0],
+            log_lagrangian_mult.shape[1],
+            <double*> _np.PyArray_DATA(scratch_M),
+            <double*> _np.PyArray_DATA(new_log_lagrangian_mult))
+        return
+    if isinstance(count_matrices, _SparseCountMatrices):
+        _tram_update_lagrangian_mult_sparse(
+            <double*> _np.PyArray_DATA(log_lagrangian_mult),
+            <double*> _np.PyArray_DATA(biased_conf_energies),
+            <int*> _np.PyArray_DATA(count_matrices.indptr),
+            <int*> _np.PyArray_DATA(count_matrices.indices),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ij),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ji),
+            <int*> _np.PyArray_DATA(state_counts),
+            log_lagrangian_mult.shape[0],
+            log_lagrangian_mult.shape[1],
+            <double*> _np.PyArray_DATA(scratch_M),
+            <double*> _np.PyArray_DATA(new_log_lagrangian_mult))
+        return
+    dense = _np.asarray(count_matrices)
     _tram_update_lagrangian_mult(
         <double*> _np.PyArray_DATA(log_lagrangian_mult),
         <double*> _np.PyArray_DATA(biased_conf_energies),
-        <int*> _np.PyArray_DATA(count_matrices),
+        <int*> _np.PyArray_DATA(dense),
         <int*> _np.PyArray_DATA(state_counts),
         log_lagrangian_mult.shape[0],
         log_lagrangian_mult.shape[1],
@@ -130,7 +257,7 @@ def update_lagrangian_mult(
 def update_biased_conf_energies(
     _np.ndarray[double, ndim=2, mode="c"] log_lagrangian_mult not None,
     _np.ndarray[double, ndim=2, mode="c"] biased_conf_energies not None,
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
+    count_matrices,
     bias_energy_sequences,
     state_sequences,
     _np.ndarray[int, ndim=2, mode="c"] state_counts not None,
@@ -139,7 +266,8 @@ def update_biased_conf_energies(
     _np.ndarray[double, ndim=1, mode="c"] scratch_T not None,
     _np.ndarray[double, ndim=2, mode="c"] new_biased_conf_energies not None,
     _np.ndarray[double, ndim=2, mode="c"] scratch_MM,
-    return_log_L=False):
+    return_log_L=False,
+    n_threads=1):
     r"""
     Update the reduced unbiased free energies
 
@@ -149,12 +277,14 @@ def update_biased_conf_energies(
         log of the Lagrangian multipliers
     biased_conf_energies : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         reduced free energies
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or SparseCountMatrices
         multistate count matrix
-    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
-        reduced bias energies in the T thermodynamic states for all X samples
-    state_sequences : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc)
-        Markov state indices for all X samples
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32) or PackedSequences
+        reduced bias energies in the T thermodynamic states for all X samples; the trajectories
+        of a PackedSequences object are swept with a single C call
+    state_sequences : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc) or None
+        Markov state indices for all X samples; ignored if bias_energy_sequences is a
+        PackedSequences object, whose state sequences are used instead
     state_counts : numpy.ndarray(shape=(T, M), dtype=numpy.intc)
         number of visits to thermodynamic state K and Markov state i
     log_R_K_i : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
@@ -167,31 +297,44 @@ def update_biased_conf_energies(
         target array for the reduced free energies
     scratch_MM : numpy.ndarray(shape=(M, M), dtype=numpy.float64), optional
         scratch array for likelihood computation (only needed when
-        return_log_L = True)
+        return_log_L = True and count_matrices are dense)
     return_log_L : bool
         If true, retrun the TRAM-log-likelihood.
+    n_threads : int, optional, default=1
+        number of OpenMP threads for the sweep over the frames; values < 1
+        select all available threads (serial if built without OpenMP)
     """
     new_biased_conf_energies[:] = _np.inf
     get_log_Ref_K_i(log_lagrangian_mult, biased_conf_energies, 
                     count_matrices, state_counts, scratch_M, log_R_K_i)
     log_L = 0.0
-    for i in range(len(bias_energy_sequences)):
-        log_L += _tram_update_biased_conf_energies(
-            <double*> _np.PyArray_DATA(bias_energy_sequences[i]),
-            <int*> _np.PyArray_DATA(state_sequences[i]),
-            state_sequences[i].shape[0],
-            <double*> _np.PyArray_DATA(log_R_K_i),
-            log_lagrangian_mult.shape[0],
-            log_lagrangian_mult.shape[1],
-            <double*> _np.PyArray_DATA(scratch_T),
+    log_L += _sweep_biased_conf_energies(
+        bias_energy_sequences, state_sequences, log_R_K_i, scratch_T,
+        new_biased_conf_energies, int(return_log_L), n_threads)
+    cdef _np.ndarray[int, ndim=3, mode="c"] dense
+    cdef _np.ndarray[double, ndim=1, mode="c"] scratch_nnz
+    if return_log_L and isinstance(count_matrices, _SparseCountMatrices):
+        scratch_nnz = _np.zeros(shape=(count_matrices.nnz,), dtype=_np.float64)
+        log_L += _tram_discrete_log_likelihood_lower_bound_sparse(
+            <double*> _np.PyArray_DATA(log_lagrangian_mult),
             <double*> _np.PyArray_DATA(new_biased_conf_energies),
-            int(return_log_L))
+            <int*> _np.PyArray_DATA(count_matrices.indptr),
+            <int*> _np.PyArray_DATA(count_matrices.indices),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ij),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ji),
+            <int*> _np.PyArray_DATA(state_counts),
+            state_counts.shape[0],
+            state_counts.shape[1],
+            <double*> _np.PyArray_DATA(scratch_M),
+            <double*> _np.PyArray_DATA(scratch_nnz))
+        return log_L
     if return_log_L:
         assert scratch_MM is not None
+        dense = _np.asarray(count_matrices)
         log_L += _tram_discrete_log_likelihood_lower_bound(
             <double*> _np.PyArray_DATA(log_lagrangian_mult),
             <double*> _np.PyArray_DATA(new_biased_conf_energies),
-            <int*> _np.PyArray_DATA(count_matrices),
+            <int*> _np.PyArray_DATA(dense),
             <int*> _np.PyArray_DATA(state_counts),
             state_counts.shape[0],
             state_counts.shape[1],
@@ -199,10 +342,159 @@ def update_biased_conf_energies(
             <double*> _np.PyArray_DATA(scratch_MM))
         return log_L
 
+def _sweep_biased_conf_energies(
+    bias_energy_sequences, state_sequences,
+    _np.ndarray[double, ndim=2, mode="c"] log_R_K_i not None,
+    _np.ndarray[double, ndim=1, mode="c"] scratch_T not None,
+    _np.ndarray[double, ndim=2, mode="c"] new_biased_conf_energies not None,
+    int return_log_L, int n_threads):
+    r"""
+    Accumulate the frame contributions of all trajectories into new_biased_conf_energies.
+
+    Parameters
+    ----------
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32) or PackedSequences
+        reduced bias energies in the T thermodynamic states for all X samples
+    state_sequences : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc) or None
+        Markov state indices for all X samples (not used with a PackedSequences object)
+    log_R_K_i : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
+        sum of TRAM log pseudo-counts and biased_conf_energies
+    scratch_T : numpy.ndarray(shape=(T), dtype=numpy.float64)
+        scratch array for logsumexp operations
+    new_biased_conf_energies : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
+        target array for the reduced free energies
+    return_log_L : int
+        if nonzero, compute the frame part of the TRAM log-likelihood
+    n_threads : int
+        number of OpenMP threads; the frames of every trajectory are split into
+        contiguous blocks with private (T, M) accumulators
+
+    Returns
+    -------
+    log_L : float
+        frame part of the TRAM log-likelihood (zero if return_log_L is zero)
+    """
+    cdef int i, n_sequences
+    cdef double log_L = 0.0
+    cdef void **bias_pointers
+    cdef int **state_pointers
+    cdef int *seq_lengths
+    cdef _np.ndarray[double, ndim=2, mode="c"] scratch_NT
+    cdef _np.ndarray[double, ndim=3, mode="c"] scratch_NTM
+    cdef double *scratch_NTM_data = NULL
+    cdef void *bias_data
+    cdef int *state_data
+    cdef long long *offsets_data
+    n_threads = _get_n_threads(n_threads)
+    if isinstance(bias_energy_sequences, _PackedSequences):
+        if bias_energy_sequences.contiguous:
+            # one C call for all trajectories, serial or threaded
+            b = bias_energy_sequences.bias_energy_sequence
+            s = bias_energy_sequences.state_sequence
+            offsets = bias_energy_sequences.offsets
+            n_sequences = offsets.shape[0] - 1
+            if n_threads == 1:
+                scratch_NT = scratch_T.reshape(1, log_R_K_i.shape[0])
+            else:
+                scratch_NT = _np.zeros(shape=(n_threads, log_R_K_i.shape[0]), dtype=_np.float64)
+                scratch_NTM = _np.zeros(
+                    shape=(n_threads, log_R_K_i.shape[0], log_R_K_i.shape[1]), dtype=_np.float64)
+                scratch_NTM_data = <double*> _np.PyArray_DATA(scratch_NTM)
+            bias_data = _np.PyArray_DATA(b)
+            state_data = <int*> _np.PyArray_DATA(s)
+            offsets_data = <long long*> _np.PyArray_DATA(offsets)
+            if b.dtype == _np.float32:
+                with nogil:
+                    log_L = _tram_update_biased_conf_energies_packed_f32(
+                        <float*> bias_data,
+                        state_data,
+                        offsets_data,
+                        n_sequences,
+                        <double*> _np.PyArray_DATA(log_R_K_i),
+                        log_R_K_i.shape[0],
+                        log_R_K_i.shape[1],
+                        n_threads,
+                        <double*> _np.PyArray_DATA(scratch_NT),
+                        scratch_NTM_data,
+                        <double*> _np.PyArray_DATA(new_biased_conf_energies),
+                        return_log_L)
+            else:
+                with nogil:
+                    log_L = _tram_update_biased_conf_energies_packed(
+                        <double*> bias_data,
+                        state_data,
+                        offsets_data,
+                        n_sequences,
+                        <double*> _np.PyArray_DATA(log_R_K_i),
+                        log_R_K_i.shape[0],
+                        log_R_K_i.shape[1],
+                        n_threads,
+                        <double*> _np.PyArray_DATA(scratch_NT),
+                        scratch_NTM_data,
+                        <double*> _np.PyArray_DATA(new_biased_conf_energies),
+                        return_log_L)
+            return log_L
+        state_sequences = bias_energy_sequences.state_sequences
+        bias_energy_sequences = bias_energy_sequences.bias_energy_sequences
+    n_sequences = len(state_sequences)
+    if not isinstance(bias_energy_sequences, (list, tuple)) or \
+        len(set(b.dtype for b in bias_energy_sequences)) > 1:
+        # streamed chunks (see thermotools.util.ChunkedSequences) are only valid
+        # until the next one is requested and mixed precisions need separate
+        # kernels, so sweep the sequences one at a time
+        for i in range(n_sequences):
+            log_L += _sweep_biased_conf_energies(
+                [bias_energy_sequences[i]], [state_sequences[i]], log_R_K_i, scratch_T,
+                new_biased_conf_energies, return_log_L, n_threads)
+        return log_L
+    scratch_NT = _np.zeros(shape=(n_threads, log_R_K_i.shape[0]), dtype=_np.float64)
+    scratch_NTM = _np.zeros(
+        shape=(n_threads, log_R_K_i.shape[0], log_R_K_i.shape[1]), dtype=_np.float64)
+    single_precision = n_sequences > 0 and bias_energy_sequences[0].dtype == _np.float32
+    bias_pointers = <void**> malloc(max(n_sequences, 1) * sizeof(void*))
+    state_pointers = <int**> malloc(max(n_sequences, 1) * sizeof(int*))
+    seq_lengths = <int*> malloc(max(n_sequences, 1) * sizeof(int))
+    try:
+        if bias_pointers == NULL or state_pointers == NULL or seq_lengths == NULL:
+            raise MemoryError()
+        for i in range(n_sequences):
+            bias_pointers[i] = _np.PyArray_DATA(bias_energy_sequences[i])
+            state_pointers[i] = <int*> _np.PyArray_DATA(state_sequences[i])
+            seq_lengths[i] = state_sequences[i].shape[0]
+        if single_precision:
+            with nogil:
+                log_L = _tram_update_biased_conf_energies_parallel_f32(
+                    <float**> bias_pointers, state_pointers, seq_lengths, n_sequences,
+                    <double*> _np.PyArray_DATA(log_R_K_i),
+                    log_R_K_i.shape[0],
+                    log_R_K_i.shape[1],
+                    n_threads,
+                    <double*> _np.PyArray_DATA(scratch_NT),
+                    <double*> _np.PyArray_DATA(scratch_NTM),
+                    <double*> _np.PyArray_DATA(new_biased_conf_energies),
+                    return_log_L)
+        else:
+            with nogil:
+                log_L = _tram_update_biased_conf_energies_parallel(
+                    <double**> bias_pointers, state_pointers, seq_lengths, n_sequences,
+                    <double*> _np.PyArray_DATA(log_R_K_i),
+                    log_R_K_i.shape[0],
+                    log_R_K_i.shape[1],
+                    n_threads,
+                    <double*> _np.PyArray_DATA(scratch_NT),
+                    <double*> _np.PyArray_DATA(scratch_NTM),
+                    <double*> _np.PyArray_DATA(new_biased_conf_energies),
+                    return_log_L)
+    finally:
+        free(bias_pointers)
+        free(state_pointers)
+        free(seq_lengths)
+    return log_L
+
 def get_log_Ref_K_i(
     _np.ndarray[double, ndim=2, mode="c"] log_lagrangian_mult not None,
     _np.ndarray[double, ndim=2, mode="c"] biased_conf_energies not None,
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
+    count_matrices,
     _np.ndarray[int, ndim=2, mode="c"] state_counts not None,
     _np.ndarray[double, ndim=1, mode="c"] scratch_M not None,
     _np.ndarray[double, ndim=2, mode="c"] log_R_K_i not None):
@@ -215,8 +507,9 @@ def get_log_Ref_K_i(
         log of the Lagrangian multipliers
     biased_conf_energies : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         reduced free energies
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
-        multistate count matrix
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc), SparseCountMatrices or LogCountTables
+        multistate count matrix (LogCountTables built with the same state_counts skip the
+        logarithms of the counts)
     state_counts : numpy.ndarray(shape=(T, M), dtype=numpy.intc)
         number of visits to thermodynamic state K and Markov state i
     scratch_M : numpy.ndarray(shape=(M), dtype=numpy.float64)
@@ -224,10 +517,40 @@ def get_log_Ref_K_i(
     log_R_K_i : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         target array for sum of TRAM log pseudo-counts and biased_conf_energies
     """
+    cdef _np.ndarray[int, ndim=3, mode="c"] dense
+    if isinstance(count_matrices, _LogCountTables) and count_matrices.log_excess_counts is not None:
+        _tram_get_log_Ref_K_i_logc(
+            <double*> _np.PyArray_DATA(log_lagrangian_mult),
+            <double*> _np.PyArray_DATA(biased_conf_energies),
+            <int*> _np.PyArray_DATA(count_matrices.indptr),
+            <int*> _np.PyArray_DATA(count_matrices.indices),
+            <double*> _np.PyArray_DATA(count_matrices.log_counts),
+            <double*> _np.PyArray_DATA(count_matrices.log_excess_counts),
+            <int*> _np.PyArray_DATA(state_counts),
+            log_lagrangian_mult.shape[0],
+            log_lagrangian_mult.shape[1],
+            <double*> _np.PyArray_DATA(scratch_M),
+            <double*> _np.PyArray_DATA(log_R_K_i))
+        return
+    if isinstance(count_matrices, _SparseCountMatrices):
+        _tram_get_log_Ref_K_i_sparse(
+            <double*> _np.PyArray_DATA(log_lagrangian_mult),
+            <double*> _np.PyArray_DATA(biased_conf_energies),
+            <int*> _np.PyArray_DATA(count_matrices.indptr),
+            <int*> _np.PyArray_DATA(count_matrices.indices),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ij),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ji),
+            <int*> _np.PyArray_DATA(state_counts),
+            log_lagrangian_mult.shape[0],
+            log_lagrangian_mult.shape[1],
+            <double*> _np.PyArray_DATA(scratch_M),
+            <double*> _np.PyArray_DATA(log_R_K_i))
+        return
+    dense = _np.asarray(count_matrices)
     _tram_get_log_Ref_K_i(
         <double*> _np.PyArray_DATA(log_lagrangian_mult),
         <double*> _np.PyArray_DATA(biased_conf_energies),
-        <int*> _np.PyArray_DATA(count_matrices),
+        <int*> _np.PyArray_DATA(dense),
         <int*> _np.PyArray_DATA(state_counts),
         log_lagrangian_mult.shape[0],
         log_lagrangian_mult.shape[1],
@@ -244,10 +567,12 @@ def get_conf_energies(
 
     Parameters
     ----------
-    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
-        reduced bias energies in the T thermodynamic states for all X samples
-    state_sequence : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc)
-        Markov state indices for all X samples
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32) or PackedSequences
+        reduced bias energies in the T thermodynamic states for all X samples; the trajectories
+        of a PackedSequences object are swept with a single C call
+    state_sequence : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc) or None
+        Markov state indices for all X samples; ignored if bias_energy_sequences is a
+        PackedSequences object, whose state sequences are used instead
     log_R_K_i : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         precomputed sum of TRAM log pseudo-counts and biased_conf_energies
     scratch_T : numpy.ndarray(shape=(T), dtype=numpy.float64)
@@ -260,18 +585,68 @@ def get_conf_energies(
     """
     conf_energies = _np.zeros(shape=(log_R_K_i.shape[1],), dtype=_np.float64)
     conf_energies[:] = _np.inf
-    for i in range(len(bias_energy_sequences)):
-        _tram_get_conf_energies(
-            <double*> _np.PyArray_DATA(bias_energy_sequences[i]),
-            <int*> _np.PyArray_DATA(state_sequences[i]),
-            state_sequences[i].shape[0],
-            <double*> _np.PyArray_DATA(log_R_K_i),
-            log_R_K_i.shape[0],
-            log_R_K_i.shape[1],
-            <double*> _np.PyArray_DATA(scratch_T),
-            <double*> _np.PyArray_DATA(conf_energies))
+    _sweep_conf_energies(bias_energy_sequences, state_sequences, log_R_K_i, scratch_T, conf_energies)
     return conf_energies
 
+def _sweep_conf_energies(
+    bias_energy_sequences, state_sequences,
+    _np.ndarray[double, ndim=2, mode="c"] log_R_K_i not None,
+    _np.ndarray[double, ndim=1, mode="c"] scratch_T not None,
+    _np.ndarray[double, ndim=1, mode="c"] conf_energies not None):
+    r"""Accumulate the frame contributions of all trajectories into conf_energies."""
+    if isinstance(bias_energy_sequences, _PackedSequences):
+        if bias_energy_sequences.contiguous:
+            b = bias_energy_sequences.bias_energy_sequence
+            s = bias_energy_sequences.state_sequence
+            offsets = bias_energy_sequences.offsets
+            if b.dtype == _np.float32:
+                _tram_get_conf_energies_packed_f32(
+                    <float*> _np.PyArray_DATA(b),
+                    <int*> _np.PyArray_DATA(s),
+                    <long long*> _np.PyArray_DATA(offsets),
+                    offsets.shape[0] - 1,
+                    <double*> _np.PyArray_DATA(log_R_K_i),
+                    log_R_K_i.shape[0],
+                    log_R_K_i.shape[1],
+                    <double*> _np.PyArray_DATA(scratch_T),
+                    <double*> _np.PyArray_DATA(conf_energies))
+            else:
+                _tram_get_conf_energies_packed(
+                    <double*> _np.PyArray_DATA(b),
+                    <int*> _np.PyArray_DATA(s),
+                    <long long*> _np.PyArray_DATA(offsets),
+                    offsets.shape[0] - 1,
+                    <double*> _np.PyArray_DATA(log_R_K_i),
+                    log_R_K_i.shape[0],
+                    log_R_K_i.shape[1],
+                    <double*> _np.PyArray_DATA(scratch_T),
+                    <double*> _np.PyArray_DATA(conf_energies))
+            return
+        state_sequences = bias_energy_sequences.state_sequences
+        bias_energy_sequences = bias_energy_sequences.bias_energy_sequences
+    for i in range(len(bias_energy_sequences)):
+        b = bias_energy_sequences[i]
+        if b.dtype == _np.float32:
+            _tram_get_conf_energies_f32(
+                <float*> _np.PyArray_DATA(b),
+                <int*> _np.PyArray_DATA(state_sequences[i]),
+                state_sequences[i].shape[0],
+                <double*> _np.PyArray_DATA(log_R_K_i),
+                log_R_K_i.shape[0],
+                log_R_K_i.shape[1],
+                <double*> _np.PyArray_DATA(scratch_T),
+                <double*> _np.PyArray_DATA(conf_energies))
+        else:
+            _tram_get_conf_energies(
+                <double*> _np.PyArray_DATA(b),
+                <int*> _np.PyArray_DATA(state_sequences[i]),
+                state_sequences[i].shape[0],
+                <double*> _np.PyArray_DATA(log_R_K_i),
+                log_R_K_i.shape[0],
+                log_R_K_i.shape[1],
+                <double*> _np.PyArray_DATA(scratch_T),
+                <double*> _np.PyArray_DATA(conf_energies))
+
 def get_therm_energies(
     _np.ndarray[double, ndim=2, mode="c"] biased_conf_energies not None,
     _np.ndarray[double, ndim=1, mode="c"] scratch_M not None):
@@ -331,7 +706,7 @@ def get_pointwise_unbiased_free_energies(
     _np.ndarray[double, ndim=2, mode="c"] log_lagrangian_mult not None,
     _np.ndarray[double, ndim=2, mode="c"] biased_conf_energies not None,
     _np.ndarray[double, ndim=1, mode="c"] therm_energies not None,
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
+    count_matrices,
     bias_energy_sequences,
     state_sequences,
     _np.ndarray[int, ndim=2, mode="c"] state_counts not None,
@@ -352,9 +727,9 @@ def get_pointwise_unbiased_free_energies(
         reduced free energies
     therm_energies : numpy.ndarray(shape=(T), dtype=numpy.float64)
         reduced thermodynamic free energies
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or SparseCountMatrices
         multistate count matrix
-    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32)
         reduced bias energies in the T thermodynamic states for all X samples
     state_sequences : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc)
         Markov state indices for all X samples
@@ -383,7 +758,7 @@ def get_pointwise_unbiased_free_energies(
         assert s.ndim == 1
         assert s.dtype == _np.intc
         assert b.ndim == 2
-        assert b.dtype == _np.float64
+        assert b.dtype in (_np.float32, _np.float64)
         assert p.ndim == 1
         assert p.dtype == _np.float64
         assert s.shape[0] == b.shape[0] == p.shape[0]
@@ -392,22 +767,36 @@ def get_pointwise_unbiased_free_energies(
         assert b.flags.c_contiguous
         assert p.flags.c_contiguous
     for i in range(len(bias_energy_sequences)):
-        _tram_get_pointwise_unbiased_free_energies(
-            k,
-            <double*> _np.PyArray_DATA(bias_energy_sequences[i]),
-            <double*> _np.PyArray_DATA(therm_energies),
-            <int*> _np.PyArray_DATA(state_sequences[i]),
-            state_sequences[i].shape[0], 
-            <double*> _np.PyArray_DATA(log_R_K_i),
-            log_R_K_i.shape[0],
-            log_R_K_i.shape[1],
-            <double*> _np.PyArray_DATA(scratch_T),
-            <double*> _np.PyArray_DATA(pointwise_unbiased_free_energies[i]))
+        b = bias_energy_sequences[i]
+        if b.dtype == _np.float32:
+            _tram_get_pointwise_unbiased_free_energies_f32(
+                k,
+                <float*> _np.PyArray_DATA(b),
+                <double*> _np.PyArray_DATA(therm_energies),
+                <int*> _np.PyArray_DATA(state_sequences[i]),
+                state_sequences[i].shape[0], 
+                <double*> _np.PyArray_DATA(log_R_K_i),
+                log_R_K_i.shape[0],
+                log_R_K_i.shape[1],
+                <double*> _np.PyArray_DATA(scratch_T),
+                <double*> _np.PyArray_DATA(pointwise_unbiased_free_energies[i]))
+        else:
+            _tram_get_pointwise_unbiased_free_energies(
+                k,
+                <double*> _np.PyArray_DATA(b),
+                <double*> _np.PyArray_DATA(therm_energies),
+                <int*> _np.PyArray_DATA(state_sequences[i]),
+                state_sequences[i].shape[0], 
+                <double*> _np.PyArray_DATA(log_R_K_i),
+                log_R_K_i.shape[0],
+                log_R_K_i.shape[1],
+                <double*> _np.PyArray_DATA(scratch_T),
+                <double*> _np.PyArray_DATA(pointwise_unbiased_free_energies[i]))
 
 def estimate_transition_matrices(
     _np.ndarray[double, ndim=2, mode="c"] log_lagrangian_mult not None,
     _np.ndarray[double, ndim=2, mode="c"] biased_conf_energies not None,
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
+    count_matrices,
     _np.ndarray[double, ndim=1, mode="c"] scratch_M):
     r"""
     Compute the transition matrices for all thermodynamic states
@@ -418,18 +807,22 @@ def estimate_transition_matrices(
         log of the Lagrangian multipliers
     biased_conf_energies : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         reduced unbiased free energies
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or SparseCountMatrices
         multistate count matrix
     scratch_M : numpy.ndarray(shape=(M), dtype=numpy.float64)
         scratch array for logsumexp operations
 
     Returns
     -------
-    p_K_ij : numpy.ndarray(shape=(T, M, M), dtype=numpy.float64)
-        transition matrices for all thermodynamic states
+    p_K_ij : numpy.ndarray(shape=(T, M, M), dtype=numpy.float64) or list of scipy.sparse.csr_matrix
+        transition matrices for all thermodynamic states (sparse if count_matrices are sparse)
     """
     if scratch_M is None:
         scratch_M = _np.zeros(shape=(count_matrices.shape[1],), dtype=_np.float64)
+    if isinstance(count_matrices, _SparseCountMatrices):
+        return [estimate_transition_matrix(
+            log_lagrangian_mult, biased_conf_energies, count_matrices, scratch_M, K)
+            for K in range(log_lagrangian_mult.shape[0])]
     p_K_ij = _np.zeros(
         shape=(count_matrices.shape[0], count_matrices.shape[1], count_matrices.shape[2]),
         dtype=_np.float64)
@@ -441,7 +834,7 @@ def estimate_transition_matrices(
 def estimate_transition_matrix(
     _np.ndarray[double, ndim=2, mode="c"] log_lagrangian_mult not None,
     _np.ndarray[double, ndim=2, mode="c"] biased_conf_energies not None,
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
+    count_matrices,
     _np.ndarray[double, ndim=1, mode="c"] scratch_M,
     therm_state):
     r"""
@@ -453,7 +846,7 @@ def estimate_transition_matrix(
         log of the Lagrangian multipliers
     biased_conf_energies : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         reduced unbiased free energies
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or SparseCountMatrices
         multistate count matrix
     scratch_M : numpy.ndarray(shape=(M), dtype=numpy.float64)
         scratch array for logsumexp operations
@@ -462,11 +855,25 @@ def estimate_transition_matrix(
 
     Returns
     -------
-    transition_matrix : numpy.ndarray(shape=(M, M), dtype=numpy.float64)
-        transition matrix for the target thermodynamic state
+    transition_matrix : numpy.ndarray(shape=(M, M), dtype=numpy.float64) or scipy.sparse.csr_matrix
+        transition matrix for the target thermodynamic state (sparse if count_matrices are sparse)
     """
+    cdef _np.ndarray[double, ndim=1, mode="c"] transition_values
     if scratch_M is None:
         scratch_M = _np.zeros(shape=(count_matrices.shape[1],), dtype=_np.float64)
+    if isinstance(count_matrices, _SparseCountMatrices):
+        transition_values = _np.zeros(shape=(count_matrices.nnz,), dtype=_np.float64)
+        _tram_estimate_transition_matrix_sparse(
+            <double*> _np.PyArray_DATA(_np.ascontiguousarray(log_lagrangian_mult[therm_state, :])),
+            <double*> _np.PyArray_DATA(_np.ascontiguousarray(biased_conf_energies[therm_state, :])),
+            <int*> _np.PyArray_DATA(count_matrices.indptr) + (<int> therm_state) * biased_conf_energies.shape[1],
+            <int*> _np.PyArray_DATA(count_matrices.indices),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ij),
+            <int*> _np.PyArray_DATA(count_matrices.counts_ji),
+            biased_conf_energies.shape[1],
+            <double*> _np.PyArray_DATA(scratch_M),
+            <double*> _np.PyArray_DATA(transition_values))
+        return count_matrices.tocsr(therm_state, values=transition_values)
     transition_matrix = _np.zeros(
         shape=(biased_conf_energies.shape[1], biased_conf_energies.shape[1]), dtype=_np.float64)
     _tram_estimate_transition_matrix(
@@ -481,7 +888,7 @@ def estimate_transition_matrix(
 def log_likelihood_lower_bound(
     _np.ndarray[double, ndim=2, mode="c"] log_lagrangian_mult not None,
     _np.ndarray[double, ndim=2, mode="c"] biased_conf_energies not None,
-    _np.ndarray[int, ndim=3, mode="c"] count_matrices not None,
+    count_matrices,
     bias_energy_sequences,
     state_sequences,
     _np.ndarray[int, ndim=2, mode="c"] state_counts not None,
@@ -499,9 +906,9 @@ def log_likelihood_lower_bound(
         log of the Lagrangian multipliers
     biased_conf_energies : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         reduced free energies
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or SparseCountMatrices
         multistate count matrix
-    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32)
         reduced bias energies in the T thermodynamic states for all X samples
     state_sequences : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc)
         Markov state indices for all X samples
@@ -516,7 +923,7 @@ def log_likelihood_lower_bound(
     scratch_TM : numpy.ndarray(shape=(T, M), dtype=numpy.float64)
         scratch array for logsumexp operations
     scratch_MM : numpy.ndarray(shape=(M, M), dtype=numpy.float64)
-        scratch array for likelihood computation
+        scratch array for likelihood computation (not used for sparse count_matrices)
 
     Note
     ----
@@ -544,7 +951,7 @@ def log_likelihood_lower_bound(
         scratch_T = _np.zeros((T,), dtype=_np.float64)
     if scratch_TM is None:
         scratch_TM = _np.zeros((T, M), dtype=_np.float64)
-    if scratch_MM is None:
+    if scratch_MM is None and not isinstance(count_matrices, _SparseCountMatrices):
         scratch_MM = _np.zeros((M, M), dtype=_np.float64)
     return update_biased_conf_energies(
         log_lagrangian_mult, biased_conf_energies, count_matrices,
@@ -553,18 +960,30 @@ def log_likelihood_lower_bound(
 
 def estimate(count_matrices, state_counts, bias_energy_sequences, state_sequences,
     maxiter=1000, maxerr=1.0E-8, save_convergence_info=0,
-    biased_conf_energies=None, log_lagrangian_mult=None, callback=None, N_dtram_accelerations=0):
+    biased_conf_energies=None, log_lagrangian_mult=None, callback=None, N_dtram_accelerations=0,
+    logsumexp_mode='sort_kahan',
+    n_threads=1, solver='plain'):
     r"""
     Estimate the reduced discrete state free energies and thermodynamic free energies
 
     Parameters
     ----------
-    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
-        transition count matrices for all T thermodynamic states
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or SparseCountMatrices
+        transition count matrices for all T thermodynamic states (a list of T
+        scipy.sparse matrices is converted with `thermotools.util.sparse_count_matrices`;
+        the sparse kernels scale with the number of nonzero counts instead of M^2); the
+        logarithms of the counts are tabulated once per call (see
+        `thermotools.util.log_count_tables`)
     state_counts : numpy.ndarray(shape=(T, M), dtype=numpy.intc)
         state counts for all M discrete and T thermodynamic states
-    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32) or PackedSequences
         reduced bias energies in the T thermodynamic states for all X samples
+        (a PackedSequences object from `thermotools.util.pack_sequences` also carries
+        the state sequences; it avoids repacking the data on every call)
+        numpy.memmap inputs and bias providers, which compute the bias energies on the fly
+        from reaction coordinates (`thermotools.util.UmbrellaBias`) or from a few energy
+        terms such as potential energies at several temperatures (`thermotools.util.LinearBias`),
+        are streamed in chunks of bounded memory (see `thermotools.util.ChunkedSequences`)
     state_sequences : list of numpy.ndarray(shape=(X_i), dtype=numpy.float64)
         discrete state indices for all X samples
     maxiter : int
@@ -580,6 +999,20 @@ def estimate(count_matrices, state_counts, bias_energy_sequences, state_sequence
         initial guess for the logarithm of the Lagrangian multipliers
     N_dtram_accelerations : int
         not used
+    logsumexp_mode : str, optional, default='sort_kahan'
+        logspace summation scheme of the C kernels: 'sort_kahan' sorts every
+        summand buffer before the compensated sum, 'max_kahan' skips the sort
+        and runs in linear time, 'simd_kahan' also uses a vectorized exponential
+        (see `thermotools.util.logsumexp_mode_index`); the scheme is selected for
+        the calling thread only, such that estimators running in other threads are
+        not affected
+    n_threads : int, optional, default=1
+        number of OpenMP threads for the sweep over the frames; values < 1
+        select all available threads (serial if built without OpenMP)
+    solver : str or FixedPointSolver, optional, default='plain'
+        fixed point scheme: 'plain' self-consistent iteration or the safeguarded
+        'squarem' and 'anderson' (alias 'diis') extrapolations
+        (see `thermotools.solvers.get_solver`)
 
     Returns
     -------
@@ -607,87 +1040,98 @@ def estimate(count_matrices, state_counts, bias_energy_sequences, state_sequence
     function. Raising `CallbackInterrupt` in the callback will cleanly
     terminate the iteration.
     """
-    if biased_conf_energies is None:
-        biased_conf_energies = _np.zeros(shape=state_counts.shape, dtype=_np.float64)
-    if log_lagrangian_mult is None:
-        log_lagrangian_mult = _np.zeros(shape=state_counts.shape, dtype=_np.float64)
-        init_lagrangian_mult(count_matrices, log_lagrangian_mult)
-    increments = []
-    loglikelihoods = []
-    sci_count = 0
-    assert len(state_sequences) == len(bias_energy_sequences)
-    for s, b in zip(state_sequences, bias_energy_sequences):
-        assert s.ndim == 1
-        assert s.dtype == _np.intc
-        assert b.ndim == 2
-        assert b.dtype == _np.float64
-        assert s.shape[0] == b.shape[0]
-        assert b.shape[1] == count_matrices.shape[0]
-        assert s.flags.c_contiguous
-        assert b.flags.c_contiguous
-    log_R_K_i = _np.zeros(shape=state_counts.shape, dtype=_np.float64)
-    scratch_T = _np.zeros(shape=(count_matrices.shape[0],), dtype=_np.float64)
-    scratch_M = _np.zeros(shape=(count_matrices.shape[1],), dtype=_np.float64)
-    scratch_MM = _np.zeros(shape=count_matrices.shape[1:3], dtype=_np.float64)
-    old_biased_conf_energies = biased_conf_energies.copy()
-    old_log_lagrangian_mult = log_lagrangian_mult.copy()
-    old_stat_vectors = _np.zeros(shape=state_counts.shape, dtype=_np.float64)
-    old_therm_energies = _np.zeros(shape=count_matrices.shape[0], dtype=_np.float64)
-    for _m in range(maxiter):
-        sci_count += 1 
-        update_lagrangian_mult(
-            old_log_lagrangian_mult, biased_conf_energies, count_matrices, state_counts,
-            scratch_M, log_lagrangian_mult)
-        l = update_biased_conf_energies(
-            log_lagrangian_mult, old_biased_conf_energies, count_matrices, bias_energy_sequences,
-            state_sequences, state_counts, log_R_K_i, scratch_M, scratch_T, biased_conf_energies,
-            scratch_MM, sci_count == save_convergence_info)
+    solver = _get_solver(solver)
+    with _logsumexp_mode_context(_select_logsumexp_mode, logsumexp_mode):
+        if not isinstance(count_matrices, _np.ndarray):
+            count_matrices = _sparse_count_matrices(count_matrices)
+        if biased_conf_energies is None:
+            biased_conf_energies = _np.zeros(shape=state_counts.shape, dtype=_np.float64)
+        if log_lagrangian_mult is None:
+            log_lagrangian_mult = _np.zeros(shape=state_counts.shape, dtype=_np.float64)
+            init_lagrangian_mult(count_matrices, log_lagrangian_mult)
+        # the logarithms of the counts are computed once for all iterations
+        count_matrices = _log_count_tables(count_matrices, state_counts, prior=THERMOTOOLS_TRAM_PRIOR)
+        increments = []
+        loglikelihoods = []
+        sci_count = 0
+        packed = _pack_sequences(bias_energy_sequences, state_sequences)
+        assert packed.state_sequence is not None
+        assert packed.n_therm_states == count_matrices.shape[0]
+        # the lowlevel functions sweep all trajectories of a PackedSequences object
+        # with a single C call and take the state sequences from it
+        bias_energy_sequences, state_sequences = packed, None
+        log_R_K_i = _np.zeros(shape=state_counts.shape, dtype=_np.float64)
+        scratch_T = _np.zeros(shape=(count_matrices.shape[0],), dtype=_np.float64)
+        scratch_M = _np.zeros(shape=(count_matrices.shape[1],), dtype=_np.float64)
+        scratch_MM = None
+        if not isinstance(count_matrices, _SparseCountMatrices):
+            scratch_MM = _np.zeros(shape=count_matrices.shape[1:3], dtype=_np.float64)
+        old_biased_conf_energies = biased_conf_energies.copy()
+        old_log_lagrangian_mult = log_lagrangian_mult.copy()
+        old_stat_vectors = _np.zeros(shape=state_counts.shape, dtype=_np.float64)
+        old_therm_energies = _np.zeros(shape=count_matrices.shape[0], dtype=_np.float64)
+        for _m in range(maxiter):
+            sci_count += 1 
+            update_lagrangian_mult(
+                old_log_lagrangian_mult, biased_conf_energies, count_matrices, state_counts,
+                scratch_M, log_lagrangian_mult)
+            l = update_biased_conf_energies(
+                log_lagrangian_mult, old_biased_conf_energies, count_matrices, bias_energy_sequences,
+                state_sequences, state_counts, log_R_K_i, scratch_M, scratch_T, biased_conf_energies,
+                scratch_MM, sci_count == save_convergence_info, n_threads=n_threads)
 
-        therm_energies = get_therm_energies(biased_conf_energies, scratch_M)
-        stat_vectors = _np.exp(therm_energies[:, _np.newaxis] - biased_conf_energies)
-        delta_therm_energies = _np.abs(therm_energies - old_therm_energies)
-        delta_stat_vectors =  _np.abs(stat_vectors - old_stat_vectors)
-        err = max(_np.max(delta_therm_energies), _np.max(delta_stat_vectors))
-        if sci_count == save_convergence_info:
-            sci_count = 0
-            increments.append(err)
-            loglikelihoods.append(l)
-        if callback is not None:
-            try:
-                callback(biased_conf_energies=biased_conf_energies,
-                         log_lagrangian_mult=log_lagrangian_mult,
-                         therm_energies=therm_energies,
-                         stat_vectors=stat_vectors,
-                         old_biased_conf_energies=old_biased_conf_energies,
-                         old_log_lagrangian_mult=old_log_lagrangian_mult,
-                         old_stat_vectors=old_stat_vectors,
-                         old_therm_energies=old_therm_energies,
-                         iteration_step=_m,
-                         err=err,
-                         maxerr=maxerr,
-                         maxiter=maxiter)
-            except CallbackInterrupt:
+            therm_energies = get_therm_energies(biased_conf_energies, scratch_M)
+            stat_vectors = _np.exp(therm_energies[:, _np.newaxis] - biased_conf_energies)
+            delta_therm_energies = _np.abs(therm_energies - old_therm_energies)
+            delta_stat_vectors =  _np.abs(stat_vectors - old_stat_vectors)
+            err = max(_np.max(delta_therm_energies), _np.max(delta_stat_vectors))
+            if sci_count == save_convergence_info:
+                sci_count = 0
+                increments.append(err)
+                loglikelihoods.append(l)
+            if callback is not None:
+                try:
+                    callback(biased_conf_energies=biased_conf_energies,
+                             log_lagrangian_mult=log_lagrangian_mult,
+                             therm_energies=therm_energies,
+                             stat_vectors=stat_vectors,
+                             old_biased_conf_energies=old_biased_conf_energies,
+                             old_log_lagrangian_mult=old_log_lagrangian_mult,
+                             old_stat_vectors=old_stat_vectors,
+                             old_therm_energies=old_therm_energies,
+                             iteration_step=_m,
+                             err=err,
+                             maxerr=maxerr,
+                             maxiter=maxiter)
+                except CallbackInterrupt:
+                    break
+            if err < maxerr:
                 break
-        if err < maxerr:
-            break
+            else:
+                shift = _np.min(biased_conf_energies)
+                biased_conf_energies -= shift
+                update = (log_lagrangian_mult, biased_conf_energies)
+                proposal = solver.step((old_log_lagrangian_mult, old_biased_conf_energies), update)
+                if proposal is not update:
+                    log_lagrangian_mult[:], biased_conf_energies[:] = proposal
+                    therm_energies = get_therm_energies(biased_conf_energies, scratch_M)
+                    stat_vectors = _np.exp(therm_energies[:, _np.newaxis] - biased_conf_energies)
+                    shift = 0.0
+                old_biased_conf_energies[:] = biased_conf_energies
+                old_log_lagrangian_mult[:] = log_lagrangian_mult[:]
+                old_therm_energies[:] = therm_energies[:] - shift
+                old_stat_vectors[:] = stat_vectors[:]
+        conf_energies = get_conf_energies(bias_energy_sequences, state_sequences, log_R_K_i, scratch_T)
+        therm_energies = get_therm_energies(biased_conf_energies, scratch_M)
+        normalize(conf_energies, biased_conf_energies, therm_energies, scratch_M)
+        if err >= maxerr:
+            _warn("TRAM did not converge: last increment = %.5e" % err, _NotConvergedWarning)
+        if save_convergence_info == 0:
+            increments = None
+            loglikelihoods = None
         else:
-            shift = _np.min(biased_conf_energies)
-            biased_conf_energies -= shift
-            old_biased_conf_energies[:] = biased_conf_energies
-            old_log_lagrangian_mult[:] = log_lagrangian_mult[:]
-            old_therm_energies[:] = therm_energies[:] - shift
-            old_stat_vectors[:] = stat_vectors[:]
-    conf_energies = get_conf_energies(bias_energy_sequences, state_sequences, log_R_K_i, scratch_T)
-    therm_energies = get_therm_energies(biased_conf_energies, scratch_M)
-    normalize(conf_energies, biased_conf_energies, therm_energies, scratch_M)
-    if err >= maxerr:
-        _warn("TRAM did not converge: last increment = %.5e" % err, _NotConvergedWarning)
-    if save_convergence_info == 0:
-        increments = None
-        loglikelihoods = None
-    else:
-        increments = _np.array(increments, dtype=_np.float64)
-        loglikelihoods = _np.array(loglikelihoods, dtype=_np.float64)
+            increments = _np.array(increments, dtype=_np.float64)
+            loglikelihoods = _np.array(loglikelihoods, dtype=_np.float64)
 
     return biased_conf_energies, conf_energies, therm_energies, log_lagrangian_mult, \
         increments, loglikelihoods
@@ -151,7 +151,7 @@ void _tram_direct_update_biased_conf_weights(
         {
             Ki = K*n_conf_states + i;
             if(0 < R_K_i[Ki]) {
-                divisor += R_K_i[Ki]*bias_sequence[x * n_therm_states + K];
+                divisor += R_K_i[Ki]*bias_sequence[(long long) x * n_therm_states + K];
             }
         }
         if(divisor==0) fprintf(stderr, "divisor is zero. should never happen!\n");
@@ -161,9 +161,9 @@ void _tram_direct_update_biased_conf_weights(
         for(K=0; K<n_therm_states; ++K)
         {
             Ki = K*n_conf_states + i;
-            new_biased_conf_weights[Ki] += bias_sequence[x * n_therm_states + K]/divisor;
-            if(isnan(new_biased_conf_weights[Ki])) fprintf(stderr, "Z:Warning Z[%d,%d]=NaN (%f,%f) %d\n",K, i, bias_sequence[x * n_therm_states + K], divisor, x);
-            if(isinf(new_biased_conf_weights[Ki])) fprintf(stderr, "Z:Warning Z[%d,%d]=Inf (%f,%f) %d\n",K, i, bias_sequence[x * n_therm_states + K], divisor, x);
+            new_biased_conf_weights[Ki] += bias_sequence[(long long) x * n_therm_states + K]/divisor;
+            if(isnan(new_biased_conf_weights[Ki])) fprintf(stderr, "Z:Warning Z[%d,%d]=NaN (%f,%f) %d\n",K, i, bias_sequence[(long long) x * n_therm_states + K], divisor, x);
+            if(isinf(new_biased_conf_weights[Ki])) fprintf(stderr, "Z:Warning Z[%d,%d]=Inf (%f,%f) %d\n",K, i, bias_sequence[(long long) x * n_therm_states + K], divisor, x);
         }
     }
 }
@@ -29,6 +29,10 @@ from msmtools.util.exceptions import NotConvergedWarning as _NotConvergedWarning
 from thermotools.tram import get_pointwise_unbiased_free_energies, estimate_transition_matrix, estimate_transition_matrices
 
 from .callback import CallbackInterrupt
+from .util import logsumexp_mode_context as _logsumexp_mode_context
+from .util import pack_sequences as _pack_sequences
+from .util import bias_weight_sequences as _bias_weight_sequences
+from .solvers import get_solver as _get_solver
 
 __all__ = [
     'estimate_transition_matrix',
@@ -144,7 +148,7 @@ def estimate(
     count_matrices, state_counts, bias_energy_sequences, state_sequences,
     maxiter=1000, maxerr=1.0E-8, save_convergence_info=0,
     biased_conf_energies=None, log_lagrangian_mult=None, callback=None,
-    N_dtram_accelerations=0):
+    N_dtram_accelerations=0, logsumexp_mode='sort_kahan', solver='plain'):
     r"""
     Estimate the reduced discrete state free energies and thermodynamic free energies
 
@@ -154,8 +158,10 @@ def estimate(
         transition count matrices for all T thermodynamic states
     state_counts : numpy.ndarray(shape=(T, M), dtype=numpy.intc)
         state counts for all M discrete and T thermodynamic states
-    bias_energy_sequences : lift of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64) or PackedSequences
         reduced bias energies in the T thermodynamic states for all X samples
+        (a PackedSequences object from `thermotools.util.pack_sequences` also carries
+        the state sequences; it avoids repacking the data on every call)
     state_sequences : list of numpy.ndarray(shape=(X_i), dtype=numpy.float64)
         discrete state indices for all X samples
     maxiter : int
@@ -169,6 +175,17 @@ def estimate(
         initial guess for the reduced discrete state free energies for all T thermodynamic states
     log_lagrangian_mult : numpy.ndarray(shape=(T, M), dtype=numpy.float64), OPTIONAL
         initial guess for the logarithm of the Lagrangian multipliers
+    logsumexp_mode : str, optional, default='sort_kahan'
+        logspace summation scheme of the C kernels: 'sort_kahan' sorts every
+        summand buffer before the compensated sum, 'max_kahan' skips the sort
+        and runs in linear time, 'simd_kahan' also uses a vectorized exponential
+        (see `thermotools.util.logsumexp_mode_index`); the scheme is selected for
+        the calling thread only, such that estimators running in other threads are
+        not affected
+    solver : str or FixedPointSolver, optional, default='plain'
+        fixed point scheme: 'plain' self-consistent iteration or the safeguarded
+        'squarem' and 'anderson' (alias 'diis') extrapolations of the logarithmic
+        weights (see `thermotools.solvers.get_solver`)
 
     Returns
     -------
@@ -185,127 +202,138 @@ def estimate(
     loglikelihoods : numpy.ndarray(dtype=numpy.float64, ndim=1)
         stored sequence of loglikelihoods     
     """
-    n_therm_states = count_matrices.shape[0]
-    n_conf_states = count_matrices.shape[1]
-    assert len(state_sequences)==len(bias_energy_sequences)
-    for s, b in zip(state_sequences, bias_energy_sequences):
-        assert s.ndim == 1
-        assert s.dtype == _np.intc
-        assert b.ndim == 2
-        assert b.dtype == _np.float64
-        assert s.shape[0] == b.shape[0]
-        assert b.shape[1] == n_therm_states
-        assert s.flags.c_contiguous
-        assert b.flags.c_contiguous
+    solver = _get_solver(solver)
+    with _logsumexp_mode_context(_tram._select_logsumexp_mode, logsumexp_mode):
+        n_therm_states = count_matrices.shape[0]
+        n_conf_states = count_matrices.shape[1]
+        packed = _pack_sequences(bias_energy_sequences, state_sequences)
+        assert packed.state_sequence is not None
+        assert packed.n_therm_states == n_therm_states
+        bias_energy_sequences = packed.bias_energy_sequences
+        state_sequences = packed.state_sequences
 
-    assert(_np.all(
-        state_counts >= _np.maximum(count_matrices.sum(axis=1), count_matrices.sum(axis=2))))
+        assert(_np.all(
+            state_counts >= _np.maximum(count_matrices.sum(axis=1), count_matrices.sum(axis=2))))
 
-    # init lagrangian multipliers
-    if log_lagrangian_mult is None:
-        lagrangian_mult = 0.5 * (count_matrices + _np.transpose(
-            count_matrices, axes=(0, 2, 1))).sum(axis=2).astype(_np.float64)
-    else:
-        lagrangian_mult = _np.exp(log_lagrangian_mult)
-    # exploit invariance w.r.t. simultaneous scaling of energies and free energies
-    # standard quantities-> scaled quantities
-    # bias_energy^k(x)   -> bias_energy^k(x) - alpha^k
-    # free_energy_i^k    -> free_energy_i^k - alpha^k
-    # log \tilde{R}_i^k  -> log \tilde{R}_i^k - alpha^k
-    shift = _np.min([_np.min(b, axis=0) for b in bias_energy_sequences], axis=0) # minimum energy for every th. state
-    # init weights
-    if biased_conf_energies is not None:
-        biased_conf_weights = _np.exp(shift[:, _np.newaxis] - biased_conf_energies)
-    else:
-        biased_conf_weights = _np.ones(shape=(n_therm_states, n_conf_states), dtype=_np.float64)
-        biased_conf_energies = _np.zeros(shape=(n_therm_states, n_conf_states), dtype=_np.float64)
-    # init Boltzmann factors # TODO: offer in-place option
-    bias_weight_sequences = [_np.exp(shift - b) for b in bias_energy_sequences]
-    increments = []
-    loglikelihoods = []
-    sci_count = 0
-    R_K_i = _np.zeros(shape=(n_therm_states, n_conf_states), dtype=_np.float64)
-    scratch_TM = _np.zeros(shape=(n_therm_states, n_conf_states), dtype=_np.float64)
-    scratch_TM2 = _np.zeros(shape=(n_therm_states, n_conf_states), dtype=_np.float64)
-    scratch_MM = _np.zeros(shape=(n_conf_states, n_conf_states), dtype=_np.float64)
-    scratch_T = _np.zeros(shape=n_therm_states, dtype=_np.float64)
-    scratch_M = _np.zeros(shape=n_conf_states, dtype=_np.float64)
-    scratch_M_int = _np.zeros(shape=n_conf_states, dtype=_np.intc)
-    occupied = _np.where(state_counts > 0)
-    if _np.any(_np.isinf(biased_conf_energies[occupied])):
-        _warn("Detected inf in biased_conf_energies.", RuntimeWarning)
-    old_biased_conf_weights = biased_conf_weights.copy()
-    old_lagrangian_mult = lagrangian_mult.copy()
-    old_biased_conf_energies = biased_conf_energies.copy()
-    old_stat_vectors = _np.zeros(shape=state_counts.shape, dtype=_np.float64)
-    old_therm_energies = _np.zeros(shape=count_matrices.shape[0], dtype=_np.float64)
-    for m in range(maxiter):
-        sci_count += 1
-        update_lagrangian_mult(
-            old_lagrangian_mult, biased_conf_weights, count_matrices, state_counts, lagrangian_mult)
-        update_biased_conf_weights(
-            lagrangian_mult, old_biased_conf_weights, count_matrices, bias_weight_sequences,
-            state_sequences, state_counts, R_K_i, biased_conf_weights)
-        for _n  in range(N_dtram_accelerations):
-            old_biased_conf_weights[:] = biased_conf_weights[:]
-            dtram_like_update(
-                lagrangian_mult, old_biased_conf_weights, count_matrices,
-                state_counts, scratch_M, scratch_M_int, biased_conf_weights)
-        partition_funcs = biased_conf_weights.sum(axis=1)
-        stat_vectors = biased_conf_weights / partition_funcs[:, _np.newaxis]
-        therm_energies = -_np.log(partition_funcs)
-        delta_therm_energies = _np.abs(therm_energies - old_therm_energies)
-        delta_stat_vectors =  _np.abs(stat_vectors - old_stat_vectors)
-        err = max(_np.max(delta_therm_energies), _np.max(delta_stat_vectors[occupied]))
-        if sci_count == save_convergence_info:
-            sci_count = 0
-            increments.append(err)
-            with _np.errstate(divide='ignore'):
-                log_lagrangian_mult = _np.log(lagrangian_mult)
-                biased_conf_energies = shift[:, _np.newaxis] - _np.log(biased_conf_weights) # can contain -inf for empty state
-            logL = _tram.log_likelihood_lower_bound(
-                log_lagrangian_mult, biased_conf_energies, count_matrices,
-                bias_energy_sequences, state_sequences, state_counts,
-                scratch_TM2, scratch_M, scratch_T, scratch_TM, scratch_MM)
-            loglikelihoods.append(logL)
-        if callback is not None:
-            try:
-                callback(iteration_step = m,
-                         biased_conf_weights = biased_conf_weights,
-                         lagrangian_mult = lagrangian_mult,
-                         old_biased_conf_weights = old_biased_conf_weights,
-                         old_lagrangian_mult = old_lagrangian_mult,
-                         occupied = occupied,
-                         shift = shift,
-                         err = err,
-                         maxerr = maxerr,
-                         maxiter = maxiter)
-            except CallbackInterrupt:
+        # init lagrangian multipliers
+        if log_lagrangian_mult is None:
+            lagrangian_mult = 0.5 * (count_matrices + _np.transpose(
+                count_matrices, axes=(0, 2, 1))).sum(axis=2).astype(_np.float64)
+        else:
+            lagrangian_mult = _np.exp(log_lagrangian_mult)
+        # exploit invariance w.r.t. simultaneous scaling of energies and free energies
+        # standard quantities-> scaled quantities
+        # bias_energy^k(x)   -> bias_energy^k(x) - alpha^k
+        # free_energy_i^k    -> free_energy_i^k - alpha^k
+        # log \tilde{R}_i^k  -> log \tilde{R}_i^k - alpha^k
+        shift = _np.min([_np.min(b, axis=0) for b in bias_energy_sequences], axis=0).astype(_np.float64) # minimum energy for every th. state
+        # init weights
+        if biased_conf_energies is not None:
+            biased_conf_weights = _np.exp(shift[:, _np.newaxis] - biased_conf_energies)
+        else:
+            biased_conf_weights = _np.ones(shape=(n_therm_states, n_conf_states), dtype=_np.float64)
+            biased_conf_energies = _np.zeros(shape=(n_therm_states, n_conf_states), dtype=_np.float64)
+        # init Boltzmann factors # TODO: offer in-place option
+        bias_weight_sequences = _bias_weight_sequences(bias_energy_sequences, shift)
+        increments = []
+        loglikelihoods = []
+        sci_count = 0
+        R_K_i = _np.zeros(shape=(n_therm_states, n_conf_states), dtype=_np.float64)
+        scratch_TM = _np.zeros(shape=(n_therm_states, n_conf_states), dtype=_np.float64)
+        scratch_TM2 = _np.zeros(shape=(n_therm_states, n_conf_states), dtype=_np.float64)
+        scratch_MM = _np.zeros(shape=(n_conf_states, n_conf_states), dtype=_np.float64)
+        scratch_T = _np.zeros(shape=n_therm_states, dtype=_np.float64)
+        scratch_M = _np.zeros(shape=n_conf_states, dtype=_np.float64)
+        scratch_M_int = _np.zeros(shape=n_conf_states, dtype=_np.intc)
+        occupied = _np.where(state_counts > 0)
+        if _np.any(_np.isinf(biased_conf_energies[occupied])):
+            _warn("Detected inf in biased_conf_energies.", RuntimeWarning)
+        old_biased_conf_weights = biased_conf_weights.copy()
+        old_lagrangian_mult = lagrangian_mult.copy()
+        old_biased_conf_energies = biased_conf_energies.copy()
+        old_stat_vectors = _np.zeros(shape=state_counts.shape, dtype=_np.float64)
+        old_therm_energies = _np.zeros(shape=count_matrices.shape[0], dtype=_np.float64)
+        for m in range(maxiter):
+            sci_count += 1
+            if solver.extrapolates:
+                with _np.errstate(divide='ignore'):
+                    point = (_np.log(old_lagrangian_mult), _np.log(old_biased_conf_weights))
+            update_lagrangian_mult(
+                old_lagrangian_mult, biased_conf_weights, count_matrices, state_counts, lagrangian_mult)
+            update_biased_conf_weights(
+                lagrangian_mult, old_biased_conf_weights, count_matrices, bias_weight_sequences,
+                state_sequences, state_counts, R_K_i, biased_conf_weights)
+            for _n  in range(N_dtram_accelerations):
+                old_biased_conf_weights[:] = biased_conf_weights[:]
+                dtram_like_update(
+                    lagrangian_mult, old_biased_conf_weights, count_matrices,
+                    state_counts, scratch_M, scratch_M_int, biased_conf_weights)
+            partition_funcs = biased_conf_weights.sum(axis=1)
+            stat_vectors = biased_conf_weights / partition_funcs[:, _np.newaxis]
+            therm_energies = -_np.log(partition_funcs)
+            delta_therm_energies = _np.abs(therm_energies - old_therm_energies)
+            delta_stat_vectors =  _np.abs(stat_vectors - old_stat_vectors)
+            err = max(_np.max(delta_therm_energies), _np.max(delta_stat_vectors[occupied]))
+            if sci_count == save_convergence_info:
+                sci_count = 0
+                increments.append(err)
+                with _np.errstate(divide='ignore'):
+                    log_lagrangian_mult = _np.log(lagrangian_mult)
+                    biased_conf_energies = shift[:, _np.newaxis] - _np.log(biased_conf_weights) # can contain -inf for empty state
+                logL = _tram.log_likelihood_lower_bound(
+                    log_lagrangian_mult, biased_conf_energies, count_matrices,
+                    bias_energy_sequences, state_sequences, state_counts,
+                    scratch_TM2, scratch_M, scratch_T, scratch_TM, scratch_MM)
+                loglikelihoods.append(logL)
+            if callback is not None:
+                try:
+                    callback(iteration_step = m,
+                             biased_conf_weights = biased_conf_weights,
+                             lagrangian_mult = lagrangian_mult,
+                             old_biased_conf_weights = old_biased_conf_weights,
+                             old_lagrangian_mult = old_lagrangian_mult,
+                             occupied = occupied,
+                             shift = shift,
+                             err = err,
+                             maxerr = maxerr,
+                             maxiter = maxiter)
+                except CallbackInterrupt:
+                    break
+            if err < maxerr:
                 break
-        if err < maxerr:
-            break
+            else:
+                normalization_factor = _np.max(biased_conf_weights)
+                biased_conf_weights /= normalization_factor
+                if solver.extrapolates:
+                    with _np.errstate(divide='ignore'):
+                        update = (_np.log(lagrangian_mult), _np.log(biased_conf_weights))
+                    proposal = solver.step(point, update)
+                    if proposal is not update:
+                        lagrangian_mult[:] = _np.exp(proposal[0])
+                        biased_conf_weights[:] = _np.exp(proposal[1])
+                        normalization_factor = 1.0
+                        partition_funcs = biased_conf_weights.sum(axis=1)
+                        stat_vectors = biased_conf_weights / partition_funcs[:, _np.newaxis]
+                        therm_energies = -_np.log(partition_funcs)
+                old_lagrangian_mult[:] = lagrangian_mult[:]
+                old_biased_conf_weights[:] = biased_conf_weights[:]
+                old_therm_energies[:] = therm_energies[:] + _np.log(normalization_factor)
+                old_stat_vectors[:] = stat_vectors[:]
+        with _np.errstate(divide='ignore'):
+            biased_conf_energies = shift[:, _np.newaxis] - _np.log(biased_conf_weights) # can contain -inf for empty states
+            log_lagrangian_mult = _np.log(lagrangian_mult)
+            log_R_K_i = _np.log(R_K_i) + shift[:, _np.newaxis]
+        conf_energies = _tram.get_conf_energies(
+            bias_energy_sequences, state_sequences, log_R_K_i, scratch_T)
+        therm_energies = _tram.get_therm_energies(biased_conf_energies, scratch_M)
+        _tram.normalize(conf_energies, biased_conf_energies, therm_energies, scratch_M)
+        if err >= maxerr:
+            _warn("TRAM did not converge: last increment = %.5e" % err, _NotConvergedWarning)
+        if save_convergence_info == 0:
+            increments = None
+            loglikelihoods = None
         else:
-            normalization_factor = _np.max(biased_conf_weights)
-            biased_conf_weights /= normalization_factor
-            old_lagrangian_mult[:] = lagrangian_mult[:]
-            old_biased_conf_weights[:] = biased_conf_weights[:]
-            old_therm_energies[:] = therm_energies[:] + _np.log(normalization_factor)
-            old_stat_vectors[:] = stat_vectors[:]
-    with _np.errstate(divide='ignore'):
-        biased_conf_energies = shift[:, _np.newaxis] - _np.log(biased_conf_weights) # can contain -inf for empty states
-        log_lagrangian_mult = _np.log(lagrangian_mult)
-        log_R_K_i = _np.log(R_K_i) + shift[:, _np.newaxis]
-    conf_energies = _tram.get_conf_energies(
-        bias_energy_sequences, state_sequences, log_R_K_i, scratch_T)
-    therm_energies = _tram.get_therm_energies(biased_conf_energies, scratch_M)
-    _tram.normalize(conf_energies, biased_conf_energies, therm_energies, scratch_M)
-    if err >= maxerr:
-        _warn("TRAM did not converge: last increment = %.5e" % err, _NotConvergedWarning)
-    if save_convergence_info == 0:
-        increments = None
-        loglikelihoods = None
-    else:
-        increments = _np.array(increments, dtype=_np.float64)
-        loglikelihoods = _np.array(loglikelihoods, dtype=_np.float64)
+            increments = _np.array(increments, dtype=_np.float64)
+            loglikelihoods = _np.array(loglikelihoods, dtype=_np.float64)
     return biased_conf_energies, conf_energies, therm_energies, \
         log_lagrangian_mult, increments, loglikelihoods
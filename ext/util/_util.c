@@ -17,6 +17,10 @@
 * along with this program.  If not, see <http://www.gnu.org/licenses/>.
 */
 
+#include <string.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 #include "_util.h"
 
 static double wrap(double x, const double width, const double half_width) {
@@ -135,6 +139,30 @@ extern double _logsumexp_sort_kahan_inplace(double *array, int size)
     return _logsumexp_kahan_inplace(array, size, array[size - 1]);
 }
 
+extern double _logsumexp_max_kahan(double *array, int size)
+{
+    /* single max pass plus a compensated sum; leaves the array untouched */
+    int i;
+    double array_max, sum = 0.0, err = 0.0, y, t;
+    if(0 == size) return -INFINITY;
+    array_max = array[0];
+    for(i=1; i<size; ++i)
+    {
+        if(array[i] > array_max)
+            array_max = array[i];
+    }
+    if(-INFINITY == array_max)
+        return -INFINITY;
+    for(i=0; i<size; ++i)
+    {
+        y = exp(array[i] - array_max) - err;
+        t = sum + y;
+        err = (t - sum) - y;
+        sum = t;
+    }
+    return array_max + log(sum);
+}
+
 extern double _logsumexp_pair(double a, double b)
 {
     if((-INFINITY == a) && (-INFINITY == b))
@@ -144,6 +172,250 @@ extern double _logsumexp_pair(double a, double b)
     return a + log(1.0 + exp(b - a));
 }
 
+/***************************************************************************************************
+*   vectorized logspace summation
+***************************************************************************************************/
+
+/* GCC on x86-64 Linux builds an AVX2 and a baseline clone and picks one at load time */
+#if defined(__GNUC__) && !defined(__clang__) && (__GNUC__ >= 6) \
+    && defined(__x86_64__) && defined(__linux__)
+    #define THERMOTOOLS_TARGET_CLONES __attribute__((target_clones("avx2", "default")))
+#else
+    #define THERMOTOOLS_TARGET_CLONES
+#endif
+
+#ifdef _MSC_VER
+    #define THERMOTOOLS_INLINE __inline
+#else
+    #define THERMOTOOLS_INLINE inline
+#endif
+
+#define THERMOTOOLS_EXP_MIN -708.0
+#define THERMOTOOLS_LOG2E 1.4426950408889634074
+#define THERMOTOOLS_LN2_HI 6.93147180369123816490e-01
+#define THERMOTOOLS_LN2_LO 1.90821492927058770002e-10
+/* 1.5 * 2^52: adding it rounds to the nearest integer, which then sits in the low mantissa bits */
+#define THERMOTOOLS_ROUND_MAGIC 6755399441055744.0
+#define THERMOTOOLS_ROUND_MAGIC_BITS 0x4338000000000000ULL
+
+/* degree-13 Taylor polynomial of exp(r) for |r| <= ln(2)/2, evaluated by Horner's scheme */
+#define THERMOTOOLS_EXP_POLY(p, r) \
+    p = r * (1.0 / 6227020800.0) + 1.0 / 479001600.0; \
+    p = p * r + 1.0 / 39916800.0; \
+    p = p * r + 1.0 / 3628800.0; \
+    p = p * r + 1.0 / 362880.0; \
+    p = p * r + 1.0 / 40320.0; \
+    p = p * r + 1.0 / 5040.0; \
+    p = p * r + 1.0 / 720.0; \
+    p = p * r + 1.0 / 120.0; \
+    p = p * r + 1.0 / 24.0; \
+    p = p * r + 1.0 / 6.0; \
+    p = p * r + 0.5; \
+    p = p * r + 1.0; \
+    p = p * r + 1.0;
+
+typedef union
+{
+    double d;
+    unsigned long long u;
+} _double_bits;
+
+static THERMOTOOLS_INLINE double _exp_nonpositive(double x)
+{
+    /* branch-free exp(x) for x <= 0 via Cody-Waite reduction; flushes x < -708 to zero */
+    _double_bits t, scale;
+    double n, r, p, y = (x < THERMOTOOLS_EXP_MIN) ? THERMOTOOLS_EXP_MIN : x;
+    t.d = y * THERMOTOOLS_LOG2E + THERMOTOOLS_ROUND_MAGIC;
+    n = t.d - THERMOTOOLS_ROUND_MAGIC;
+    r = y - n * THERMOTOOLS_LN2_HI;
+    r = r - n * THERMOTOOLS_LN2_LO;
+    THERMOTOOLS_EXP_POLY(p, r)
+    scale.u = (t.u - THERMOTOOLS_ROUND_MAGIC_BITS + 1023ULL) << 52;
+    return (x < THERMOTOOLS_EXP_MIN) ? 0.0 : p * scale.d;
+}
+
+#ifdef __GNUC__
+
+/* four doubles per vector: AVX2 registers in the AVX2 clone, pairs of SSE2 registers otherwise */
+typedef double _v4d __attribute__((vector_size(32)));
+typedef unsigned long long _v4u __attribute__((vector_size(32)));
+
+/* blend a and b by a comparison mask; vectors are not passed by value to keep the ABI stable */
+#define THERMOTOOLS_V4D_SELECT(mask, a, b) ((_v4d) (((_v4u) (a) & (mask)) | ((_v4u) (b) & ~(mask))))
+
+static THERMOTOOLS_INLINE void _exp_nonpositive_v4d(_v4d *x)
+{
+    const _v4d x_min = {
+        THERMOTOOLS_EXP_MIN, THERMOTOOLS_EXP_MIN, THERMOTOOLS_EXP_MIN, THERMOTOOLS_EXP_MIN};
+    const _v4d zero = {0.0, 0.0, 0.0, 0.0};
+    _v4u small = (_v4u) (*x < x_min);
+    _v4d y = THERMOTOOLS_V4D_SELECT(small, x_min, *x), t, n, r, p;
+    t = y * THERMOTOOLS_LOG2E + THERMOTOOLS_ROUND_MAGIC;
+    n = t - THERMOTOOLS_ROUND_MAGIC;
+    r = y - n * THERMOTOOLS_LN2_HI;
+    r = r - n * THERMOTOOLS_LN2_LO;
+    THERMOTOOLS_EXP_POLY(p, r)
+    p *= (_v4d) (((_v4u) t - THERMOTOOLS_ROUND_MAGIC_BITS + 1023ULL) << 52);
+    *x = THERMOTOOLS_V4D_SELECT(small, zero, p);
+}
+
+THERMOTOOLS_TARGET_CLONES
+static double _array_max(double *array, int size)
+{
+    int i, j, n = size - size % 4;
+    double array_max = array[0];
+    _v4d v, v_max;
+    if(n > 0)
+    {
+        memcpy(&v_max, array, sizeof(v_max));
+        for(i=4; i<n; i+=4)
+        {
+            memcpy(&v, array + i, sizeof(v));
+            v_max = THERMOTOOLS_V4D_SELECT((_v4u) (v > v_max), v, v_max);
+        }
+        for(j=0; j<4; ++j)
+        {
+            if(v_max[j] > array_max)
+                array_max = v_max[j];
+        }
+    }
+    for(i=n; i<size; ++i)
+    {
+        if(array[i] > array_max)
+            array_max = array[i];
+    }
+    return array_max;
+}
+
+THERMOTOOLS_TARGET_CLONES
+static double _exp_shifted_sum(double *array, int size, double shift)
+{
+    /* lane-wise Kahan sums of exp(array - shift), merged with a scalar Kahan sum */
+    int i, j, n = size - size % 4;
+    double sum = 0.0, err = 0.0, y, t;
+    _v4d v_sum = {0.0, 0.0, 0.0, 0.0}, v_err = {0.0, 0.0, 0.0, 0.0}, v_y, v_t;
+    for(i=0; i<n; i+=4)
+    {
+        memcpy(&v_y, array + i, sizeof(v_y));
+        v_y -= shift;
+        _exp_nonpositive_v4d(&v_y);
+        v_y -= v_err;
+        v_t = v_sum + v_y;
+        v_err = (v_t - v_sum) - v_y;
+        v_sum = v_t;
+    }
+    for(j=0; j<4; ++j)
+    {
+        y = v_sum[j] - (v_err[j] + err);
+        t = sum + y;
+        err = (t - sum) - y;
+        sum = t;
+    }
+    for(i=n; i<size; ++i)
+    {
+        y = _exp_nonpositive(array[i] - shift) - err;
+        t = sum + y;
+        err = (t - sum) - y;
+        sum = t;
+    }
+    return sum;
+}
+
+#else
+
+static double _array_max(double *array, int size)
+{
+    int i;
+    double array_max = array[0];
+    for(i=1; i<size; ++i)
+    {
+        if(array[i] > array_max)
+            array_max = array[i];
+    }
+    return array_max;
+}
+
+static double _exp_shifted_sum(double *array, int size, double shift)
+{
+    int i;
+    double sum = 0.0, err = 0.0, y, t;
+    for(i=0; i<size; ++i)
+    {
+        y = _exp_nonpositive(array[i] - shift) - err;
+        t = sum + y;
+        err = (t - sum) - y;
+        sum = t;
+    }
+    return sum;
+}
+
+#endif
+
+extern double _logsumexp_simd_kahan(double *array, int size)
+{
+    double array_max;
+    if(0 == size) return -INFINITY;
+    array_max = _array_max(array, size);
+    if(-INFINITY == array_max)
+        return -INFINITY;
+    return array_max + log(_exp_shifted_sum(array, size, array_max));
+}
+
+/***************************************************************************************************
+*   logspace summation mode used by the estimators
+***************************************************************************************************/
+
+/* thread-local, such that estimators running in different threads do not interfere */
+#if defined(_MSC_VER)
+    #define THERMOTOOLS_THREAD_LOCAL __declspec(thread)
+#elif defined(__GNUC__)
+    #define THERMOTOOLS_THREAD_LOCAL __thread
+#else
+    #define THERMOTOOLS_THREAD_LOCAL _Thread_local
+#endif
+
+static THERMOTOOLS_THREAD_LOCAL int _logsumexp_mode = THERMOTOOLS_LOGSUMEXP_SORT_KAHAN;
+
+extern void _set_logsumexp_mode(int mode)
+{
+    _logsumexp_mode = mode;
+}
+
+extern int _get_logsumexp_mode(void)
+{
+    return _logsumexp_mode;
+}
+
+extern double _logsumexp_inplace(double *array, int size)
+{
+    /* the array is used as scratch space and may be reordered or overwritten */
+    switch(_logsumexp_mode)
+    {
+        case THERMOTOOLS_LOGSUMEXP_MAX_KAHAN:
+            return _logsumexp_max_kahan(array, size);
+        case THERMOTOOLS_LOGSUMEXP_SIMD_KAHAN:
+            return _logsumexp_simd_kahan(array, size);
+        default:
+            return _logsumexp_sort_kahan_inplace(array, size);
+    }
+}
+
+/***************************************************************************************************
+*   multithreading
+***************************************************************************************************/
+
+extern int _get_n_threads(int n_threads)
+{
+    /* resolve a requested number of threads; values < 1 select all available threads */
+#ifdef _OPENMP
+    if(n_threads < 1)
+        return omp_get_max_threads();
+    return n_threads;
+#else
+    return 1;
+#endif
+}
+
 /***************************************************************************************************
 *   counting states and transitions
 ***************************************************************************************************/
@@ -164,6 +436,85 @@ extern int _get_therm_state_break_points(int *T_x, int seq_length, int *break_po
     return o;
 }
 
+extern int _get_transition_keys(
+    int *therm_state_sequence, int *conf_state_sequence, int seq_length,
+    int *lags, int n_lags, int sliding, int n_therm_states, int n_conf_states,
+    long long *transition_keys)
+{
+    int K, i, j, l, first = 0, last, x, step, n = 0;
+    long long MM = (long long) n_conf_states * n_conf_states;
+    /* count within every segment of constant thermodynamic state; a segment yields no
+       transitions at lag times which are not shorter than the segment */
+    while(first < seq_length)
+    {
+        K = therm_state_sequence[first];
+        for(last=first+1; last<seq_length && therm_state_sequence[last] == K; ++last);
+        for(l=0; 0 <= K && l<n_lags; ++l)
+        {
+            step = sliding ? 1 : lags[l];
+            for(x=first; x+lags[l]<last; x+=step)
+            {
+                i = conf_state_sequence[x];
+                j = conf_state_sequence[x + lags[l]];
+                /* negative indices mark excluded frames */
+                if(i < 0 || j < 0) continue;
+                transition_keys[n++] = ((long long) l * n_therm_states + K) * MM
+                    + (long long) i * n_conf_states + j;
+            }
+        }
+        first = last;
+    }
+    return n;
+}
+
+extern void _get_state_counts(
+    int **therm_state_sequences, int **conf_state_sequences, int *seq_lengths, int n_sequences,
+    int n_therm_states, int n_conf_states, int n_threads, int *scratch_NTM, int *state_counts)
+{
+    int j, n, TM = n_therm_states * n_conf_states;
+
+    /* with several threads, every thread counts a contiguous block of each sequence into a
+       private (T, M) table; a single thread counts directly into state_counts */
+    if(1 < n_threads)
+    {
+        for(j=0; j<n_threads*TM; ++j)
+            scratch_NTM[j] = 0;
+    }
+#ifdef _OPENMP
+    #pragma omp parallel num_threads(n_threads)
+#endif
+    {
+        int s, x, K, i, first, last, thread = 0, n_active = 1;
+        int *counts;
+#ifdef _OPENMP
+        thread = omp_get_thread_num();
+        n_active = omp_get_num_threads();
+#endif
+        counts = (1 < n_threads) ? scratch_NTM + thread * TM : state_counts;
+        for(s=0; s<n_sequences; ++s)
+        {
+            first = (int) (((long long) seq_lengths[s] * thread) / n_active);
+            last = (int) (((long long) seq_lengths[s] * (thread + 1)) / n_active);
+            for(x=first; x<last; ++x)
+            {
+                K = therm_state_sequences[s][x];
+                i = conf_state_sequences[s][x];
+                /* negative indices mark excluded frames */
+                if(K < 0 || i < 0) continue;
+                ++counts[K * n_conf_states + i];
+            }
+        }
+    }
+    if(1 < n_threads)
+    {
+        for(n=0; n<n_threads; ++n)
+        {
+            for(j=0; j<TM; ++j)
+                state_counts[j] += scratch_NTM[n * TM + j];
+        }
+    }
+}
+
 /***************************************************************************************************
 *   bias calculation tools
 ***************************************************************************************************/
@@ -171,11 +522,16 @@ extern int _get_therm_state_break_points(int *T_x, int seq_length, int *break_po
 extern void _get_umbrella_bias(
     double *traj, double *umbrella_centers, double *force_constants,
     double *width, double *half_width,
-    int nsamples, int nthermo, int ndim, double *bias)
+    int nsamples, int nthermo, int ndim, int n_threads, double *bias)
 {
     int i, j, s, k;
     int dd = ndim * ndim, kdd, kdim, sdim;
     double sum, isum, fc;
+    /* samples are independent; each thread writes its own rows of bias */
+#ifdef _OPENMP
+    #pragma omp parallel for num_threads(n_threads) schedule(static) \
+        private(i, j, k, kdd, kdim, sdim, sum, isum, fc)
+#endif
     for(s=0; s<nsamples; ++s)
     {
         sdim = s * ndim;
@@ -198,7 +554,36 @@ extern void _get_umbrella_bias(
                 }
                 sum += isum;
             }
-            bias[s * nthermo + k] = 0.5 * sum;
+            bias[(long) s * nthermo + k] = 0.5 * sum;
+        }
+    }
+}
+
+extern void _get_umbrella_bias_diagonal(
+    double *traj, double *umbrella_centers, double *force_constants,
+    double *width, double *half_width,
+    int nsamples, int nthermo, int ndim, int n_threads, double *bias)
+{
+    /* force_constants holds the (nthermo, ndim) diagonals of the force constant matrices */
+    int i, s, k, kdim, sdim;
+    double sum, delta;
+#ifdef _OPENMP
+    #pragma omp parallel for num_threads(n_threads) schedule(static) \
+        private(i, k, kdim, sdim, sum, delta)
+#endif
+    for(s=0; s<nsamples; ++s)
+    {
+        sdim = s * ndim;
+        for(k=0; k<nthermo; ++k)
+        {
+            sum = 0.0;
+            kdim = k * ndim;
+            for(i=0; i<ndim; ++i)
+            {
+                delta = wrap(traj[sdim + i] - umbrella_centers[kdim + i], width[i], half_width[i]);
+                sum += force_constants[kdim + i] * delta * delta;
+            }
+            bias[(long) s * nthermo + k] = 0.5 * sum;
         }
     }
 }
@@ -225,10 +610,68 @@ extern void _renormalize_transition_matrix(double *p, int n_conf_states, double
         for(j=0; j<n_conf_states; ++j)
         {
             p[i * n_conf_states + j] /= max_sum;
-            if(i == j) scratch_M[i] = 0.0;
-            else scratch_M[i] = p[i * n_conf_states + j];
+            if(i == j) scratch_M[j] = 0.0;
+            else scratch_M[j] = p[i * n_conf_states + j];
         }
         _mixed_sort(scratch_M, 0, n_conf_states - 1);
         p[i * n_conf_states + i] = 1.0 - _kahan_summation(scratch_M, n_conf_states);
     }
 }
+
+extern void _renormalize_transition_matrices(
+    double *p, int n_therm_states, int n_conf_states, int n_threads, double *scratch_TM)
+{
+    int K;
+    /* every thermodynamic state works on its own matrix and its own row of scratch_TM */
+#ifdef _OPENMP
+    #pragma omp parallel for num_threads(n_threads) schedule(dynamic)
+#endif
+    for(K=0; K<n_therm_states; ++K)
+        _renormalize_transition_matrix(
+            p + (long) K * n_conf_states * n_conf_states, n_conf_states,
+            scratch_TM + (long) K * n_conf_states);
+}
+
+extern int _renormalize_sparse_transition_matrix(
+    double *data, int *indptr, int *indices, int n_conf_states, double *scratch_M)
+{
+    /* same as _renormalize_transition_matrix for a CSR matrix whose pattern contains the
+       diagonal; returns -1 (and leaves data untouched) if a diagonal element is missing */
+    int i, j, n, diagonal;
+    double sum, max_sum = 0.0;
+    for(i=0; i<n_conf_states; ++i)
+    {
+        diagonal = -1;
+        for(j=indptr[i]; j<indptr[i + 1]; ++j)
+            if(indices[j] == i) diagonal = j;
+        if(diagonal < 0) return -1;
+    }
+    for(i=0; i<n_conf_states; ++i)
+    {
+        n = indptr[i + 1] - indptr[i];
+        for(j=0; j<n; ++j)
+            scratch_M[j] = data[indptr[i] + j];
+        if(n > 1) _mixed_sort(scratch_M, 0, n - 1);
+        sum = _kahan_summation(scratch_M, n);
+        max_sum = (max_sum > sum) ? max_sum : sum;
+    }
+    if(0.0 >= max_sum) return 0;
+    for(i=0; i<n_conf_states; ++i)
+    {
+        n = indptr[i + 1] - indptr[i];
+        diagonal = 0;
+        for(j=0; j<n; ++j)
+        {
+            data[indptr[i] + j] /= max_sum;
+            if(indices[indptr[i] + j] == i)
+            {
+                diagonal = indptr[i] + j;
+                scratch_M[j] = 0.0;
+            }
+            else scratch_M[j] = data[indptr[i] + j];
+        }
+        if(n > 1) _mixed_sort(scratch_M, 0, n - 1);
+        data[diagonal] = 1.0 - _kahan_summation(scratch_M, n);
+    }
+    return 0;
+}
@@ -58,17 +58,40 @@ extern double _kahan_summation(double *array, int size);
 *   logspace summation schemes
 ***************************************************************************************************/
 
+#define THERMOTOOLS_LOGSUMEXP_SORT_KAHAN 0
+#define THERMOTOOLS_LOGSUMEXP_MAX_KAHAN 1
+#define THERMOTOOLS_LOGSUMEXP_SIMD_KAHAN 2
+
 extern double _logsumexp(double *array, int size, double array_max);
 extern double _logsumexp_kahan_inplace(double *array, int size, double array_max);
 extern double _logsumexp_sort_inplace(double *array, int size);
 extern double _logsumexp_sort_kahan_inplace(double *array, int size);
+extern double _logsumexp_max_kahan(double *array, int size);
+extern double _logsumexp_simd_kahan(double *array, int size);
 extern double _logsumexp_pair(double a, double b);
 
+extern void _set_logsumexp_mode(int mode);
+extern int _get_logsumexp_mode(void);
+extern double _logsumexp_inplace(double *array, int size);
+
+/***************************************************************************************************
+*   multithreading
+***************************************************************************************************/
+
+extern int _get_n_threads(int n_threads);
+
 /***************************************************************************************************
 *   counting states and transitions
 ***************************************************************************************************/
 
 extern int _get_therm_state_break_points(int *T_x, int seq_length, int *break_points);
+extern int _get_transition_keys(
+    int *therm_state_sequence, int *conf_state_sequence, int seq_length,
+    int *lags, int n_lags, int sliding, int n_therm_states, int n_conf_states,
+    long long *transition_keys);
+extern void _get_state_counts(
+    int **therm_state_sequences, int **conf_state_sequences, int *seq_lengths, int n_sequences,
+    int n_therm_states, int n_conf_states, int n_threads, int *scratch_NTM, int *state_counts);
 
 /***************************************************************************************************
 *   bias calculation tools
@@ -77,12 +100,20 @@ extern int _get_therm_state_break_points(int *T_x, int seq_length, int *break_po
 extern void _get_umbrella_bias(
     double *traj, double *umbrella_centers, double *force_constants,
     double *width, double *half_width,
-    int nsamples, int nthermo, int ndim, double *bias);
+    int nsamples, int nthermo, int ndim, int n_threads, double *bias);
+extern void _get_umbrella_bias_diagonal(
+    double *traj, double *umbrella_centers, double *force_constants,
+    double *width, double *half_width,
+    int nsamples, int nthermo, int ndim, int n_threads, double *bias);
 
 /***************************************************************************************************
 *   transition matrix renormalization
 ***************************************************************************************************/
 
 extern void _renormalize_transition_matrix(double *p, int n_conf_states, double *scratch_M);
+extern void _renormalize_transition_matrices(
+    double *p, int n_therm_states, int n_conf_states, int n_threads, double *scratch_TM);
+extern int _renormalize_sparse_transition_matrix(
+    double *data, int *indptr, int *indices, int n_conf_states, double *scratch_M);
 
 #endif
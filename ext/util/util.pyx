@@ -20,21 +20,41 @@ Python interface to utility functions.
 """
 
 cimport cython
+import mmap as _mmap
+from contextlib import contextmanager as _contextmanager
 import numpy as _np
 cimport numpy as _np
 from libc.math cimport exp as _libc_exp
+from libc.stdlib cimport malloc, free
+from scipy.sparse import coo_matrix as _coo
 from scipy.sparse import csr_matrix as _csr
-from msmtools.estimation import count_matrix as _cm
+from scipy.sparse import identity as _identity
+from scipy.sparse import issparse as _issparse
 
 __all__ = [
     'kahan_summation',
     'logsumexp',
     'logsumexp_pair',
+    'logsumexp_mode_index',
+    'logsumexp_mode_context',
+    'PackedSequences',
+    'ChunkedSequences',
+    'pack_sequences',
+    'bias_weight_sequences',
     'get_therm_state_break_points',
     'count_matrices',
+    'multi_lag_count_matrices',
+    'SparseCountMatrices',
+    'sparse_count_matrices',
+    'LogCountTables',
+    'log_count_tables',
     'state_counts',
     'restrict_samples_to_cset',
+    'restrict_dtrajs_to_cset',
     'get_umbrella_bias',
+    'iter_umbrella_bias',
+    'UmbrellaBias',
+    'LinearBias',
     'renormalize_transition_matrix',
     'renormalize_transition_matrices']
 
@@ -48,16 +68,39 @@ cdef extern from "_util.h":
     double _logsumexp_kahan_inplace(double *array, int size, double array_max)
     double _logsumexp_sort_inplace(double *array, int size)
     double _logsumexp_sort_kahan_inplace(double *array, int size)
+    double _logsumexp_max_kahan(double *array, int size)
+    double _logsumexp_simd_kahan(double *array, int size)
     double _logsumexp_pair(double a, double b)
+    # logspace summation mode
+    int THERMOTOOLS_LOGSUMEXP_SORT_KAHAN
+    int THERMOTOOLS_LOGSUMEXP_MAX_KAHAN
+    int THERMOTOOLS_LOGSUMEXP_SIMD_KAHAN
     # counting states and transitions
     int _get_therm_state_break_points(int *T_x, int seq_length, int *break_points)
+    int _get_transition_keys(
+        int *therm_state_sequence, int *conf_state_sequence, int seq_length,
+        int *lags, int n_lags, int sliding, int n_therm_states, int n_conf_states,
+        long long *transition_keys)
+    void _get_state_counts(
+        int **therm_state_sequences, int **conf_state_sequences, int *seq_lengths, int n_sequences,
+        int n_therm_states, int n_conf_states, int n_threads, int *scratch_NTM,
+        int *state_counts) nogil
+    int _get_n_threads(int n_threads)
     # bias calculation tools
     void _get_umbrella_bias(
         double *traj, double *umbrella_centers, double *force_constants,
-        double *width, double *inverse_width,
-        int nsamples, int nthermo, int ndim, double *bias)
+        double *width, double *half_width,
+        int nsamples, int nthermo, int ndim, int n_threads, double *bias) nogil
+    void _get_umbrella_bias_diagonal(
+        double *traj, double *umbrella_centers, double *force_constants,
+        double *width, double *half_width,
+        int nsamples, int nthermo, int ndim, int n_threads, double *bias) nogil
     # transition matrix renormalization
     void _renormalize_transition_matrix(double *p, int n_conf_states, double *scratch_M)
+    void _renormalize_transition_matrices(
+        double *p, int n_therm_states, int n_conf_states, int n_threads, double *scratch_TM) nogil
+    int _renormalize_sparse_transition_matrix(
+        double *data, int *indptr, int *indices, int n_conf_states, double *scratch_M) nogil
 
 ####################################################################################################
 #   sorting
@@ -126,7 +169,8 @@ def kahan_summation(_np.ndarray[double, ndim=1, mode="c"] array not None,
 def logsumexp(_np.ndarray[double, ndim=1, mode="c"] array not None,
     sort_array=True,
     inplace=True,
-    use_kahan=True):
+    use_kahan=True,
+    use_simd=False):
     r"""
     Perform a summation of an array of exponentials via the logsumexp scheme.
         
@@ -140,6 +184,8 @@ def logsumexp(_np.ndarray[double, ndim=1, mode="c"] array not None,
         should the sorting be performed inplace
     use_kahan : boolean
         use Kahan's algorithm for the actual summation
+    use_simd : boolean
+        use the vectorized, sort-free Kahan scheme (overrides sort_array and use_kahan)
 
     Returns
     -------
@@ -159,11 +205,13 @@ def logsumexp(_np.ndarray[double, ndim=1, mode="c"] array not None,
     if not inplace:
         x = array.copy()
     # from now on, we can always use <inplace=True> safely
+    if use_simd:
+        return _logsumexp_simd_kahan(<double*> _np.PyArray_DATA(x), x.shape[0])
     if use_kahan:
         if sort_array:
             return _logsumexp_sort_kahan_inplace(<double*> _np.PyArray_DATA(x), x.shape[0])
         else:
-            return _logsumexp_kahan_inplace(<double*> _np.PyArray_DATA(x), x.shape[0], x.max())
+            return _logsumexp_max_kahan(<double*> _np.PyArray_DATA(x), x.shape[0])
     else:
         if sort_array:
             return _logsumexp_sort_inplace(<double*> _np.PyArray_DATA(x), x.shape[0])
@@ -197,6 +245,415 @@ def logsumexp_pair(a, b):
     """
     return _logsumexp_pair(a, b)
 
+####################################################################################################
+#   logspace summation mode
+####################################################################################################
+
+LOGSUMEXP_MODES = {
+    'sort_kahan': THERMOTOOLS_LOGSUMEXP_SORT_KAHAN,
+    'max_kahan': THERMOTOOLS_LOGSUMEXP_MAX_KAHAN,
+    'simd_kahan': THERMOTOOLS_LOGSUMEXP_SIMD_KAHAN}
+
+def logsumexp_mode_index(mode):
+    r"""
+    Translate a logsumexp mode into the index used by the C kernels.
+
+    Parameters
+    ----------
+    mode : str or int
+        name of the summation scheme ('sort_kahan', 'max_kahan' or 'simd_kahan') or an index
+        as returned by this function
+
+    Returns
+    -------
+    index : int
+        index of the summation scheme
+
+    Notes
+    -----
+    'sort_kahan' sorts every summand buffer before the compensated summation
+    and is the reference scheme. 'max_kahan' shifts by the maximum in a single
+    pass and sums with Kahan compensation without sorting, which turns the
+    O(n log n) cost per logsumexp call into O(n).
+    'simd_kahan' follows the same scheme but evaluates the exponentials with a
+    branch-free polynomial in fixed-width blocks with lane-wise Kahan sums, so
+    that the compiler can vectorize it; on x86-64 Linux, an AVX2 variant is
+    selected at load time if the CPU supports it.
+    """
+    if mode in LOGSUMEXP_MODES.values():
+        return mode
+    try:
+        return LOGSUMEXP_MODES[mode]
+    except (KeyError, TypeError):
+        raise ValueError(
+            'unknown logsumexp mode %r; use one of %s' % (mode, sorted(LOGSUMEXP_MODES.keys())))
+
+@_contextmanager
+def logsumexp_mode_context(select, mode):
+    r"""
+    Select a logsumexp mode for the duration of a with block.
+
+    Parameters
+    ----------
+    select : callable
+        selects the scheme (by index) of an extension module and returns the previous
+        index, e.g., thermotools.mbar._select_logsumexp_mode; every extension module
+        holds its own mode
+    mode : str or int
+        name or index of the summation scheme
+
+    Notes
+    -----
+    The previous mode is restored on leaving the block, also if it raises an exception.
+    The mode is thread-local: it only applies to the kernels called from the current
+    thread (and to the OpenMP workers that these kernels start), such that estimators
+    running concurrently in different threads may use different modes. Lowlevel
+    functions called outside of an estimator use the mode of the calling thread.
+    """
+    old_mode = select(logsumexp_mode_index(mode))
+    try:
+        yield
+    finally:
+        select(old_mode)
+
+####################################################################################################
+#   packed trajectory data
+####################################################################################################
+
+def _check_bias_energy_sequences(bias_energy_sequences):
+    if len(bias_energy_sequences) == 0:
+        raise ValueError('at least one trajectory is required')
+    n_therm_states = bias_energy_sequences[0].shape[1]
+    for b in bias_energy_sequences:
+        if len(b.shape) != 2 or b.shape[1] != n_therm_states:
+            raise ValueError('bias energy sequences must have shape (X_i, %d)' % n_therm_states)
+    return [b.shape[0] for b in bias_energy_sequences]
+
+def _pack_state_sequences(state_sequences, lengths):
+    if state_sequences is None:
+        return None
+    state_sequences = list(state_sequences)
+    if len(state_sequences) != len(lengths):
+        raise ValueError('state and bias energy sequences must have the same length')
+    for s, length in zip(state_sequences, lengths):
+        if s.ndim != 1 or s.shape[0] != length:
+            raise ValueError('state sequences must match the bias energy sequences')
+        if not _np.issubdtype(s.dtype, _np.integer):
+            raise ValueError('state sequences must be integer arrays')
+    return _np.ascontiguousarray(
+        _np.concatenate(state_sequences) if len(lengths) > 1 else state_sequences[0],
+        dtype=_np.intc)
+
+def _bias_dtype(bias_energy_sequences):
+    if all(b.dtype == _np.float32 for b in bias_energy_sequences):
+        return _np.float32
+    return _np.float64
+
+class PackedSequences(object):
+    r"""
+    Trajectory data validated once and held in C-contiguous buffers.
+
+    Parameters
+    ----------
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64 or numpy.float32)
+        reduced bias energies in the T thermodynamic states for all X_i samples of trajectory i
+    state_sequences : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc), optional
+        discrete state indices for all X_i samples of trajectory i
+
+    Attributes
+    ----------
+    bias_energy_sequence : numpy.ndarray(shape=(X, T), dtype=numpy.float64 or numpy.float32)
+        reduced bias energies of all X samples
+    state_sequence : numpy.ndarray(shape=(X,), dtype=numpy.intc) or None
+        discrete state indices of all X samples
+    offsets : numpy.ndarray(shape=(N+1,), dtype=numpy.int64)
+        samples offsets[i]:offsets[i+1] belong to trajectory i
+    contiguous : bool
+        True: all samples are held in bias_energy_sequence and state_sequence
+
+    Notes
+    -----
+    The trajectories are concatenated once, when the object is created; a single
+    C-contiguous array of the common storage type is used in place. The per-trajectory
+    bias_energy_sequences and state_sequences are views on the packed buffers. The
+    lowlevel functions of the estimators accept a PackedSequences object in place of
+    the bias energy sequences and sweep the buffers with a single C call, which loops
+    over the trajectories via the offsets. Single precision is kept if all sequences are
+    single precision, everything else is converted to double.
+    """
+    contiguous = True
+
+    def __init__(self, bias_energy_sequences, state_sequences=None):
+        bias_energy_sequences = list(bias_energy_sequences)
+        lengths = _check_bias_energy_sequences(bias_energy_sequences)
+        self.offsets = _np.zeros(shape=(len(lengths) + 1,), dtype=_np.int64)
+        self.offsets[1:] = _np.cumsum(lengths)
+        dtype = _bias_dtype(bias_energy_sequences)
+        if len(bias_energy_sequences) == 1:
+            self.bias_energy_sequence = _np.ascontiguousarray(bias_energy_sequences[0], dtype=dtype)
+        else:
+            self.bias_energy_sequence = _np.concatenate(bias_energy_sequences).astype(dtype, copy=False)
+        self.state_sequence = _pack_state_sequences(state_sequences, lengths)
+
+    def __len__(self):
+        return self.offsets.shape[0] - 1
+
+    @property
+    def n_samples(self):
+        return self.bias_energy_sequence.shape[0]
+
+    @property
+    def n_therm_states(self):
+        return self.bias_energy_sequence.shape[1]
+
+    @property
+    def bias_energy_sequences(self):
+        r"""The bias energies of every trajectory as a list of views on bias_energy_sequence."""
+        return self.split(self.bias_energy_sequence)
+
+    @property
+    def state_sequences(self):
+        r"""The state indices of every trajectory as a list of views on state_sequence."""
+        if self.state_sequence is None:
+            return [None] * len(self)
+        return self.split(self.state_sequence)
+
+    def split(self, array):
+        r"""
+        Split a per-sample array into views of the individual trajectories.
+
+        Parameters
+        ----------
+        array : numpy.ndarray(shape=(X, ...))
+            per-sample data in packed order
+
+        Returns
+        -------
+        arrays : list of numpy.ndarray(shape=(X_i, ...))
+            views on the samples of every trajectory
+        """
+        assert array.shape[0] == self.n_samples
+        return [array[self.offsets[i]:self.offsets[i + 1]] for i in range(len(self))]
+
+CHUNK_BYTES = 1 << 26
+
+def _madvise(array, advice):
+    r"""Hint the access pattern of the pages behind a slice of a numpy.memmap."""
+    mm = getattr(array, '_mmap', None)
+    if mm is None or advice is None or not hasattr(mm, 'madvise') or array.nbytes == 0:
+        return
+    start = array.__array_interface__['data'][0] \
+        - _np.frombuffer(mm, dtype=_np.uint8).__array_interface__['data'][0]
+    length = array.nbytes + start % _mmap.PAGESIZE
+    start -= start % _mmap.PAGESIZE
+    try:
+        mm.madvise(advice, start, length)
+    except (OSError, ValueError):
+        pass
+
+class _BiasEnergyChunks(object):
+    r"""Sequence view on the chunks of a ChunkedSequences object."""
+    def __init__(self, chunked):
+        self._chunked = chunked
+    def __len__(self):
+        return len(self._chunked.chunks)
+    def __getitem__(self, index):
+        if index < 0 or index >= len(self):
+            raise IndexError(index)
+        return self._chunked.get_chunk(index)
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._chunked.get_chunk(index)
+
+class ChunkedSequences(PackedSequences):
+    r"""
+    Trajectory data whose bias energies stay on disk and are streamed in chunks.
+
+    Parameters
+    ----------
+    bias_energy_sequences : list of array_like(shape=(X_i, T))
+        reduced bias energies in the T thermodynamic states for all X_i samples of trajectory i;
+        numpy.memmap objects or any other objects that support slicing along the first
+        axis (e.g., h5py datasets)
+    state_sequences : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc), optional
+        discrete state indices for all X_i samples of trajectory i
+    chunk_size : int, optional, default=None
+        number of samples per chunk; if None, a chunk holds about CHUNK_BYTES bytes
+        of bias energies
+
+    Attributes
+    ----------
+    state_sequence : numpy.ndarray(shape=(X,), dtype=numpy.intc) or None
+        discrete state indices of all X samples
+    offsets : numpy.ndarray(shape=(N+1,), dtype=numpy.int64)
+        samples offsets[i]:offsets[i+1] belong to trajectory i
+    contiguous : bool
+        False: the bias energies are only available chunk by chunk
+    chunks : list of tuple(int, int, int)
+        trajectory index, first sample and last sample + 1 of every chunk
+
+    Notes
+    -----
+    The estimators see the chunks as a list of bias energy sequences; only the most
+    recently requested chunk is held in memory. Chunks of C-contiguous float64 or float32
+    memory maps are passed to the kernels without copying; for memory maps, the pages of the
+    next chunk are requested ahead of time and those of the previous chunk are released,
+    such that the disk is read sequentially and the resident memory is bounded by a few
+    chunks. The state sequences are packed into memory; they are 2T times smaller than
+    the bias energies.
+    """
+    contiguous = False
+
+    def __init__(self, bias_energy_sequences, state_sequences=None, chunk_size=None):
+        self._sources = list(bias_energy_sequences)
+        lengths = _check_bias_energy_sequences(self._sources)
+        self._n_therm_states = self._sources[0].shape[1]
+        if chunk_size is None:
+            chunk_size = max(1, CHUNK_BYTES // (8 * self._n_therm_states))
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+        self.chunk_size = int(chunk_size)
+        self.offsets = _np.zeros(shape=(len(lengths) + 1,), dtype=_np.int64)
+        self.offsets[1:] = _np.cumsum(lengths)
+        self.chunks = [
+            (i, first, min(first + self.chunk_size, length))
+            for i, length in enumerate(lengths) for first in range(0, length, self.chunk_size)]
+        self.state_sequence = _pack_state_sequences(state_sequences, lengths)
+        self._index = None
+        self._view = None
+        self._chunk = None
+
+    @property
+    def n_samples(self):
+        return int(self.offsets[-1])
+
+    @property
+    def n_therm_states(self):
+        return self._n_therm_states
+
+    @property
+    def bias_energy_sequence(self):
+        raise AttributeError('chunked bias energies are not held in memory; use bias_energy_sequences')
+
+    @property
+    def bias_energy_sequences(self):
+        r"""The bias energy chunks as a sequence, as accepted by the lowlevel functions."""
+        return _BiasEnergyChunks(self)
+
+    @property
+    def state_sequences(self):
+        r"""The state indices of every chunk as a list, as accepted by the lowlevel functions."""
+        if self.state_sequence is None:
+            return [None] * len(self.chunks)
+        return [
+            self.state_sequence[self.offsets[i] + first:self.offsets[i] + last]
+            for i, first, last in self.chunks]
+
+    def get_chunk(self, index):
+        r"""
+        Return the bias energies of a single chunk.
+
+        Parameters
+        ----------
+        index : int
+            chunk index
+
+        Returns
+        -------
+        chunk : numpy.ndarray(shape=(X_c, T), dtype=numpy.float64 or numpy.float32)
+            C-contiguous bias energies of the samples of the chunk (single precision
+            sources stay single precision)
+        """
+        if index == self._index:
+            return self._chunk
+        i, first, last = self.chunks[index]
+        view = self._sources[i][first:last]
+        if self._view is not None and getattr(self._view, 'mode', 'c') != 'c':
+            _madvise(self._view, getattr(_mmap, 'MADV_DONTNEED', None))
+        if index + 1 < len(self.chunks):
+            j, first, last = self.chunks[index + 1]
+            if isinstance(self._sources[j], _np.memmap):
+                _madvise(self._sources[j][first:last], getattr(_mmap, 'MADV_WILLNEED', None))
+        self._index, self._view = index, view
+        self._chunk = _np.ascontiguousarray(
+            view, dtype=_np.float32 if view.dtype == _np.float32 else _np.float64)
+        return self._chunk
+
+def pack_sequences(bias_energy_sequences, state_sequences=None, chunk_size=None):
+    r"""
+    Return the given trajectory data as a PackedSequences object.
+
+    Parameters
+    ----------
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64) or PackedSequences
+        reduced bias energies in the T thermodynamic states for all X_i samples of trajectory i;
+        a PackedSequences object is returned as is, and so is the ChunkedSequences object
+        behind a chunk view (its bias_energy_sequences), such that the chunks are never
+        read in at once
+    state_sequences : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc), optional
+        discrete state indices for all X_i samples of trajectory i
+    chunk_size : int, optional, default=None
+        if given, stream the bias energies in chunks of chunk_size samples
+
+    Returns
+    -------
+    packed : PackedSequences
+        the packed trajectory data; a ChunkedSequences object if chunk_size is given
+        or any bias energy sequence is a numpy.memmap or not a numpy.ndarray
+    """
+    if isinstance(bias_energy_sequences, PackedSequences):
+        return bias_energy_sequences
+    if isinstance(bias_energy_sequences, _BiasEnergyChunks):
+        return bias_energy_sequences._chunked
+    bias_energy_sequences = list(bias_energy_sequences)
+    if chunk_size is not None or any(
+        isinstance(b, _np.memmap) or not isinstance(b, _np.ndarray) for b in bias_energy_sequences):
+        return ChunkedSequences(bias_energy_sequences, state_sequences, chunk_size=chunk_size)
+    return PackedSequences(bias_energy_sequences, state_sequences)
+
+class _BiasWeightChunks(object):
+    r"""Sequence view on the bias weights of the chunks of a ChunkedSequences object."""
+    def __init__(self, chunked, shift):
+        self._chunked = chunked
+        self._shift = shift
+        self._index = None
+        self._weights = None
+    def __len__(self):
+        return len(self._chunked.chunks)
+    def __getitem__(self, index):
+        if index < 0 or index >= len(self):
+            raise IndexError(index)
+        if index != self._index:
+            self._weights = None
+            self._weights = _np.exp(self._shift - self._chunked.get_chunk(index))
+            self._index = index
+        return self._weights
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+def bias_weight_sequences(bias_energy_sequences, shift):
+    r"""
+    Return the bias weights exp(shift - b) for the direct-space estimators.
+
+    Parameters
+    ----------
+    bias_energy_sequences : list of numpy.ndarray(shape=(X_i, T)) or the bias_energy_sequences of a PackedSequences object
+        reduced bias energies in the T thermodynamic states for all X_i samples of trajectory i
+    shift : numpy.ndarray(shape=(T,), dtype=numpy.float64)
+        reference energy of every thermodynamic state, e.g., the minimal bias energy
+
+    Returns
+    -------
+    bias_weight_sequences : list of numpy.ndarray(shape=(X_i, T), dtype=numpy.float64)
+        the bias weights; for the chunks of a ChunkedSequences object, a sequence view
+        that computes the weights of a chunk when it is requested and holds only the
+        most recent one, such that streamed inputs are not loaded into memory at once
+    """
+    if isinstance(bias_energy_sequences, _BiasEnergyChunks):
+        return _BiasWeightChunks(bias_energy_sequences._chunked, shift)
+    return [_np.exp(shift - b) for b in bias_energy_sequences]
+
 ####################################################################################################
 #   counting states and transitions
 ####################################################################################################
@@ -225,18 +682,20 @@ def get_therm_state_break_points(
 
 def count_matrices(
     ttrajs, dtrajs, lag, sliding=True, sparse_return=True, nthermo=None, nstates=None):
-    # TODO: fix docstring
     r"""
     Count transitions at given lagtime.
 
     Parameters
     ----------
-    dtraj : [numpy.ndarray(shape=(X, 2), dtype=numpy.intc)]
-        list of discretized trajectories
+    ttrajs : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc)
+        thermodynamic state indices of all X_i frames of each trajectory
+    dtrajs : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc)
+        discrete state indices of all X_i frames of each trajectory
     lag : int
         lagtime in trajectory steps
     sliding : bool, optional
-        if true the sliding window approach is used for transition counting
+        if true the sliding window approach is used for transition counting,
+        otherwise only every lag-th frame starts a transition
     sparse_return : bool (optional)
         whether to return a 3D dense matrix or a list 2D sparse matrices
     nthermo : int, optional
@@ -246,13 +705,66 @@ def count_matrices(
 
     Returns
     -------
-    C_K : [scipy.sparse.coo_matrix] or numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
+    C_K : [scipy.sparse.csr_matrix] or numpy.ndarray(shape=(T, M, M), dtype=numpy.intc)
         count matrices at given lagtime
+
+    Notes
+    -----
+    Transitions are counted within every segment of constant thermodynamic state that is
+    longer than the lagtime; transitions from or to a frame with a negative thermodynamic
+    or discrete state index are not counted. All transitions are collected in one pass
+    and the count matrices are assembled once at the end.
+    """
+    return multi_lag_count_matrices(
+        ttrajs, dtrajs, [lag], sliding=sliding, sparse_return=sparse_return,
+        nthermo=nthermo, nstates=nstates)[0]
+
+def multi_lag_count_matrices(
+    ttrajs, dtrajs, lags, sliding=True, sparse_return=True, nthermo=None, nstates=None):
+    r"""
+    Count transitions at several lagtimes in one pass over the trajectories.
+
+    Parameters
+    ----------
+    ttrajs : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc)
+        thermodynamic state indices of all X_i frames of each trajectory
+    dtrajs : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc)
+        discrete state indices of all X_i frames of each trajectory
+    lags : list of int
+        lagtimes in trajectory steps
+    sliding : bool, optional
+        if true the sliding window approach is used for transition counting,
+        otherwise only every lag-th frame starts a transition
+    sparse_return : bool (optional)
+        whether to return 3D dense matrices or lists of 2D sparse matrices
+    nthermo : int, optional
+        enforce nthermo count-matrices with shape=(nstates, nstates)
+    nstates : int, optional
+        enforce count-matrices with shape=(nstates, nstates) for all thermodynamic states
+
+    Returns
+    -------
+    C_LK : list of [scipy.sparse.csr_matrix] or numpy.ndarray(shape=(L, T, M, M), dtype=numpy.intc)
+        count matrices for each of the L lagtimes (see `count_matrices`)
+
+    Notes
+    -----
+    Every trajectory is split into its segments of constant thermodynamic state once and
+    the transitions of all lagtimes are counted within each segment.
     """
     cdef:
         int kmax = int(_np.max([t.max() for t in ttrajs]))
         int nmax = int(_np.max([d.max() for d in dtrajs]))
-        int K, i, b
+        int n
+        _np.ndarray[int, ndim=1, mode="c"] ttraj
+        _np.ndarray[int, ndim=1, mode="c"] dtraj
+        _np.ndarray[int, ndim=1, mode="c"] lag_array
+        _np.ndarray[long long, ndim=1, mode="c"] keys
+    lag_array = _np.ascontiguousarray(lags, dtype=_np.intc).reshape(-1)
+    if lag_array.shape[0] == 0:
+        raise ValueError("at least one lag is required")
+    if _np.any(lag_array < 1):
+        raise ValueError("lag must be a positive number of trajectory steps")
     if nthermo is None:
         nthermo = kmax + 1
     elif nthermo < kmax + 1:
@@ -261,46 +773,292 @@ def count_matrices(
         nstates = nmax + 1
     elif nstates < nmax + 1:
         raise ValueError("nstates is smaller than the number of observed microstates")
-    C_K = [_csr((nstates, nstates), dtype=_np.intc) for _ in range(nthermo)]
-    for ttraj, dtraj in zip(ttrajs, dtrajs):
-        bp = get_therm_state_break_points(
-            _np.require(ttraj, dtype=_np.intc ,requirements=['C', 'A']))
-        for b in range(1, bp.shape[0]):
-            if bp[b] - bp[b - 1] > lag:
-                C_K[ttraj[bp[b - 1]]] = C_K[ttraj[bp[b - 1]]] + _cm(
-                    _np.require(dtraj[bp[b - 1]:bp[b]], dtype=_np.intc ,requirements=['C', 'A']),
-                    lag, sliding=sliding, sparse_return=True, nstates=nstates)
-        if dtraj.shape[0] - bp[-1] > lag:
-            C_K[ttraj[bp[-1]]] = C_K[ttraj[bp[-1]]] + _cm(
-                _np.require(dtraj[bp[-1]:], dtype=_np.intc ,requirements=['C', 'A']),
-                lag, sliding=sliding, sparse_return=True, nstates=nstates)
-    if sparse_return:
-        return C_K
-    return _np.array([C.toarray() for C in C_K], dtype=_np.intc)
-
-def state_counts(ttrajs, dtrajs, nstates=None, nthermo=None):
-    # TODO: fix docstring
+    n_lags = lag_array.shape[0]
+    # every transition is encoded as ((l * T + K) * M + i) * M + j; the keys of each
+    # trajectory are merged right away to bound the memory by the number of distinct keys
+    all_keys = [_np.zeros(shape=(0,), dtype=_np.int64)]
+    all_counts = [_np.zeros(shape=(0,), dtype=_np.int64)]
+    for t, d in zip(ttrajs, dtrajs):
+        ttraj = _np.ascontiguousarray(t, dtype=_np.intc).reshape(-1)
+        dtraj = _np.ascontiguousarray(d, dtype=_np.intc).reshape(-1)
+        if ttraj.shape[0] != dtraj.shape[0]:
+            raise ValueError("ttrajs and dtrajs must have matching shapes")
+        keys = _np.zeros(
+            shape=(_np.sum(_np.maximum(dtraj.shape[0] - lag_array, 0)),), dtype=_np.int64)
+        n = _get_transition_keys(
+            <int*> _np.PyArray_DATA(ttraj),
+            <int*> _np.PyArray_DATA(dtraj),
+            dtraj.shape[0],
+            <int*> _np.PyArray_DATA(lag_array),
+            n_lags,
+            int(bool(sliding)),
+            nthermo,
+            nstates,
+            <long long*> _np.PyArray_DATA(keys))
+        unique_keys, counts = _np.unique(keys[:n], return_counts=True)
+        all_keys.append(unique_keys)
+        all_counts.append(counts)
+    keys, inverse = _np.unique(_np.concatenate(all_keys), return_inverse=True)
+    counts = _np.bincount(
+        inverse, weights=_np.concatenate(all_counts), minlength=keys.shape[0]).astype(_np.intc)
+    MM = nstates * nstates
+    if not sparse_return:
+        C_LK = _np.zeros(shape=(n_lags * nthermo * MM,), dtype=_np.intc)
+        C_LK[keys] = counts
+        return C_LK.reshape(n_lags, nthermo, nstates, nstates)
+    bounds = _np.searchsorted(keys, _np.arange(n_lags * nthermo + 1, dtype=_np.int64) * MM)
+    C_LK = []
+    for l in range(n_lags):
+        C_K = []
+        for K in range(nthermo):
+            first, last = bounds[l * nthermo + K], bounds[l * nthermo + K + 1]
+            conf_keys = keys[first:last] % MM
+            C_K.append(_coo(
+                (counts[first:last], (conf_keys // nstates, conf_keys % nstates)),
+                shape=(nstates, nstates)).tocsr())
+        C_LK.append(C_K)
+    return C_LK
+
+class SparseCountMatrices(object):
+    r"""
+    Transition count matrices of all thermodynamic states in a symmetrized CSR layout.
+
+    Parameters
+    ----------
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or list of T scipy.sparse matrices
+        transition count matrices for all T thermodynamic states
+
+    Attributes
+    ----------
+    indptr : numpy.ndarray(shape=(T*M+1,), dtype=numpy.intc)
+        entries indptr[K*M+i]:indptr[K*M+i+1] belong to row i of thermodynamic state K
+    indices : numpy.ndarray(shape=(nnz,), dtype=numpy.intc)
+        column indices j (sorted within each row)
+    counts_ij : numpy.ndarray(shape=(nnz,), dtype=numpy.intc)
+        transition counts c_ij^K
+    counts_ji : numpy.ndarray(shape=(nnz,), dtype=numpy.intc)
+        transition counts c_ji^K
+
+    Notes
+    -----
+    The stored pattern of every row i contains all j with c_ij^K + c_ji^K > 0 and
+    the diagonal element. This is exactly the set of summands that the dense TRAM
+    and dTRAM kernels evaluate, so the sparse kernels visit the same terms in the
+    same order while their cost scales with the number of nonzeros.
+    """
+    def __init__(self, count_matrices):
+        if _issparse(count_matrices) or not hasattr(count_matrices, 'ndim'):
+            count_matrices = list(count_matrices)
+            if len(count_matrices) == 0:
+                raise ValueError('at least one count matrix is required')
+        elif count_matrices.ndim != 3:
+            raise ValueError('count_matrices must have shape (T, M, M)')
+        n_conf_states = count_matrices[0].shape[0]
+        indptr = [_np.zeros(shape=(1,), dtype=_np.intc)]
+        indices, counts_ij, counts_ji = [], [], []
+        eye = _identity(n_conf_states, dtype=_np.intc, format='csr')
+        nnz = 0
+        for C in count_matrices:
+            if C.shape != (n_conf_states, n_conf_states):
+                raise ValueError('count matrices must have shape (%d, %d)' % (n_conf_states, n_conf_states))
+            C = _csr(C, dtype=_np.intc)
+            C_T = C.transpose().tocsr()
+            pattern = ((C != 0) + (C_T != 0)).astype(_np.intc) + eye
+            pattern = pattern.tocsr()
+            pattern.sort_indices()
+            rows = _np.repeat(_np.arange(n_conf_states), _np.diff(pattern.indptr))
+            indptr.append((pattern.indptr[1:] + nnz).astype(_np.intc))
+            indices.append(pattern.indices.astype(_np.intc))
+            counts_ij.append(_np.asarray(C[rows, pattern.indices], dtype=_np.intc).ravel())
+            counts_ji.append(_np.asarray(C_T[rows, pattern.indices], dtype=_np.intc).ravel())
+            nnz += pattern.nnz
+        self.n_therm_states = len(indices)
+        self.n_conf_states = n_conf_states
+        self.indptr = _np.ascontiguousarray(_np.concatenate(indptr), dtype=_np.intc)
+        self.indices = _np.ascontiguousarray(_np.concatenate(indices), dtype=_np.intc)
+        self.counts_ij = _np.ascontiguousarray(_np.concatenate(counts_ij), dtype=_np.intc)
+        self.counts_ji = _np.ascontiguousarray(_np.concatenate(counts_ji), dtype=_np.intc)
+
+    @property
+    def shape(self):
+        return (self.n_therm_states, self.n_conf_states, self.n_conf_states)
+
+    @property
+    def nnz(self):
+        return self.indices.shape[0]
+
+    def tocsr(self, therm_state, values=None):
+        r"""
+        Return a matrix on the stored pattern of one thermodynamic state.
+
+        Parameters
+        ----------
+        therm_state : int
+            index of the thermodynamic state
+        values : numpy.ndarray(shape=(nnz,)), optional
+            values on the full stored pattern; defaults to counts_ij
+
+        Returns
+        -------
+        matrix : scipy.sparse.csr_matrix(shape=(M, M))
+            the selected values of thermodynamic state therm_state
+        """
+        if values is None:
+            values = self.counts_ij
+        M = self.n_conf_states
+        indptr = self.indptr[therm_state * M:(therm_state + 1) * M + 1]
+        first, last = indptr[0], indptr[-1]
+        return _csr(
+            (values[first:last], self.indices[first:last], indptr - first), shape=(M, M))
+
+    def toarray(self):
+        r"""Return the dense count matrices with shape (T, M, M)."""
+        return _np.array(
+            [self.tocsr(K).toarray() for K in range(self.n_therm_states)], dtype=_np.intc)
+
+def sparse_count_matrices(count_matrices):
+    r"""
+    Return the given count matrices as a SparseCountMatrices object.
+
+    Parameters
+    ----------
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc) or list of T scipy.sparse matrices
+        transition count matrices for all T thermodynamic states (e.g., the result of
+        `count_matrices` with sparse_return=True); a SparseCountMatrices object is returned as is
+
+    Returns
+    -------
+    sparse : SparseCountMatrices
+        the count matrices in the layout of the sparse TRAM and dTRAM kernels
+    """
+    if isinstance(count_matrices, SparseCountMatrices):
+        return count_matrices
+    return SparseCountMatrices(count_matrices)
+
+class LogCountTables(SparseCountMatrices):
+    r"""
+    Sparse count matrices with the logarithmic count tables of the TRAM and dTRAM updates.
+
+    Parameters
+    ----------
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc), list of T scipy.sparse matrices or SparseCountMatrices
+        transition count matrices for all T thermodynamic states
+    state_counts : numpy.ndarray(shape=(T, M), dtype=numpy.intc), optional
+        number of visits to thermodynamic state K and Markov state i (required by TRAM)
+    prior : float, optional, default=0.0
+        prior count of the diagonal elements (the estimator's get_prior())
+
+    Attributes
+    ----------
+    log_counts : numpy.ndarray(shape=(nnz,), dtype=numpy.float64)
+        log(prior + c_ii^K) for the diagonal elements and log(c_ij^K + c_ji^K) otherwise
+    log_conf_counts : numpy.ndarray(shape=(M,), dtype=numpy.float64)
+        log(T * prior + sum_K sum_j c_ji^K), the divisor of the dTRAM update
+    log_excess_counts : numpy.ndarray(shape=(T, M), dtype=numpy.float64) or None
+        log(N_i^K - sum_j c_ji^K) where positive and -inf elsewhere; None without state_counts
+
+    Notes
+    -----
+    The count matrices do not change during an estimation, so their logarithms are
+    computed once here instead of in every iteration; the update kernels read the
+    tables along the stored pattern of SparseCountMatrices. The other functions
+    accept a LogCountTables object wherever they accept SparseCountMatrices.
+    """
+    def __init__(self, count_matrices, state_counts=None, prior=0.0):
+        if isinstance(count_matrices, SparseCountMatrices):
+            self.n_therm_states = count_matrices.n_therm_states
+            self.n_conf_states = count_matrices.n_conf_states
+            self.indptr = count_matrices.indptr
+            self.indices = count_matrices.indices
+            self.counts_ij = count_matrices.counts_ij
+            self.counts_ji = count_matrices.counts_ji
+        else:
+            super(LogCountTables, self).__init__(count_matrices)
+        self.prior = prior
+        T, M = self.n_therm_states, self.n_conf_states
+        rows = _np.repeat(_np.arange(T * M), _np.diff(self.indptr))
+        diagonal = (self.indices == rows % M)
+        column_counts = _np.bincount(
+            rows, weights=self.counts_ji, minlength=T * M).reshape(T, M)
+        with _np.errstate(divide='ignore'):
+            self.log_counts = _np.where(
+                diagonal,
+                _np.log(prior + self.counts_ij.astype(_np.float64)),
+                _np.log((self.counts_ij + self.counts_ji).astype(_np.float64)))
+            self.log_conf_counts = _np.log(T * prior + column_counts.sum(axis=0))
+            self.log_excess_counts = None
+            if state_counts is not None:
+                if _np.shape(state_counts) != (T, M):
+                    raise ValueError('state_counts must have shape (%d, %d)' % (T, M))
+                excess_counts = _np.asarray(state_counts, dtype=_np.float64) - column_counts
+                self.log_excess_counts = _np.where(
+                    excess_counts > 0, _np.log(_np.maximum(excess_counts, 1.0)), -_np.inf)
+        self.log_counts = _np.ascontiguousarray(self.log_counts, dtype=_np.float64)
+        self.log_conf_counts = _np.ascontiguousarray(self.log_conf_counts, dtype=_np.float64)
+        if self.log_excess_counts is not None:
+            self.log_excess_counts = _np.ascontiguousarray(self.log_excess_counts, dtype=_np.float64)
+
+def log_count_tables(count_matrices, state_counts=None, prior=0.0):
+    r"""
+    Return the given count matrices as a LogCountTables object.
+
+    Parameters
+    ----------
+    count_matrices : numpy.ndarray(shape=(T, M, M), dtype=numpy.intc), list of T scipy.sparse matrices or SparseCountMatrices
+        transition count matrices for all T thermodynamic states; a LogCountTables object
+        with the same prior is returned as is unless state_counts are requested but missing
+    state_counts : numpy.ndarray(shape=(T, M), dtype=numpy.intc), optional
+        number of visits to thermodynamic state K and Markov state i (required by TRAM)
+    prior : float, optional, default=0.0
+        prior count of the diagonal elements (the estimator's get_prior())
+
+    Returns
+    -------
+    tables : LogCountTables
+        the count matrices with their precomputed logarithms
+    """
+    if isinstance(count_matrices, LogCountTables) and count_matrices.prior == prior and \
+        (state_counts is None or count_matrices.log_excess_counts is not None):
+        return count_matrices
+    return LogCountTables(count_matrices, state_counts=state_counts, prior=prior)
+
+def state_counts(ttrajs, dtrajs, nstates=None, nthermo=None, n_threads=1):
     r"""
     Count discrete states visits in all thermodynamic states.
 
     Parameters
     ----------
-    dtraj : [numpy.ndarray(shape=(X, 2), dtype=numpy.intc)]
-        list of discretized trajectories
+    ttrajs : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc)
+        thermodynamic state indices of all X_i frames of each trajectory
+    dtrajs : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc)
+        discrete state indices of all X_i frames of each trajectory
     nstates : int, optional
         enforce state count matrix with shape=(nthermo, nstates)
     nthermo : int, optional
         enforce state count matrix with shape=(nthermo, nstates)
+    n_threads : int, optional, default=1
+        number of OpenMP threads which count private tables before a final reduction;
+        values < 1 select all available threads (serial if built without OpenMP)
 
     Returns
     -------
     N : numpy.ndarray(shape=(T, M), dtype=numpy.intc)
         state counts
+
+    Notes
+    -----
+    Frames with a negative thermodynamic or discrete state index are not counted.
     """
     cdef:
         int kmax = int(_np.max([t.max() for t in ttrajs]))
         int nmax = int(_np.max([d.max() for d in dtrajs]))
-        int K, i
+        int s, n_sequences = len(dtrajs)
+        int n_therm_states, n_conf_states, n_active_threads
+        int **therm_pointers
+        int **conf_pointers
+        int *seq_lengths
+        _np.ndarray[int, ndim=2, mode="c"] N
+        _np.ndarray[int, ndim=3, mode="c"] scratch_NTM
     if nthermo is None:
         nthermo = kmax + 1
     elif nthermo < kmax + 1:
@@ -309,12 +1067,39 @@ def state_counts(ttrajs, dtrajs, nstates=None, nthermo=None):
         nstates = nmax + 1
     elif nstates < nmax + 1:
         raise ValueError("nstates is smaller than the number of observed microstates")
-    N = _np.zeros(shape=(nthermo, nstates), dtype=_np.intc)
-    for d, t in zip(dtrajs, ttrajs):
-        for K in range(nthermo):
-            idx = (t == K)
-            for i in range(nstates):
-                N[K, i] += _np.sum(_np.logical_and(idx, (d == i)))
+    if len(ttrajs) != n_sequences:
+        raise ValueError("ttrajs and dtrajs must have the same number of trajectories")
+    ttrajs = [_np.ascontiguousarray(t, dtype=_np.intc).reshape(-1) for t in ttrajs]
+    dtrajs = [_np.ascontiguousarray(d, dtype=_np.intc).reshape(-1) for d in dtrajs]
+    for t, d in zip(ttrajs, dtrajs):
+        if t.shape != d.shape:
+            raise ValueError("ttrajs and dtrajs must have matching shapes")
+    n_therm_states, n_conf_states = nthermo, nstates
+    n_active_threads = _get_n_threads(n_threads)
+    N = _np.zeros(shape=(n_therm_states, n_conf_states), dtype=_np.intc)
+    scratch_NTM = _np.zeros(
+        shape=(n_active_threads if n_active_threads > 1 else 0, n_therm_states, n_conf_states),
+        dtype=_np.intc)
+    therm_pointers = <int**> malloc(max(n_sequences, 1) * sizeof(int*))
+    conf_pointers = <int**> malloc(max(n_sequences, 1) * sizeof(int*))
+    seq_lengths = <int*> malloc(max(n_sequences, 1) * sizeof(int))
+    try:
+        if therm_pointers == NULL or conf_pointers == NULL or seq_lengths == NULL:
+            raise MemoryError()
+        for s in range(n_sequences):
+            therm_pointers[s] = <int*> _np.PyArray_DATA(ttrajs[s])
+            conf_pointers[s] = <int*> _np.PyArray_DATA(dtrajs[s])
+            seq_lengths[s] = dtrajs[s].shape[0]
+        with nogil:
+            _get_state_counts(
+                therm_pointers, conf_pointers, seq_lengths, n_sequences,
+                n_therm_states, n_conf_states, n_active_threads,
+                <int*> _np.PyArray_DATA(scratch_NTM),
+                <int*> _np.PyArray_DATA(N))
+    finally:
+        free(therm_pointers)
+        free(conf_pointers)
+        free(seq_lengths)
     return N
 
 def restrict_samples_to_cset(state_sequence, bias_energy_sequence, cset):
@@ -340,15 +1125,7 @@ def restrict_samples_to_cset(state_sequence, bias_energy_sequence, cset):
         all T thermodynamic states
     """
     nmax = int(_np.max([_np.max(state_sequence), _np.max(cset)]))
-    mapping = []
-    o = 0
-    for i in range(nmax + 1):
-        if i in cset:
-            mapping.append(o)
-            o += 1
-        else:
-            mapping.append(-1)
-    mapping = _np.array(mapping, dtype=_np.intc)
+    mapping = _cset_mapping(cset, nmax)
     conf_state_sequence = mapping[state_sequence[:, 1]]
     valid_samples = (conf_state_sequence != -1)
     new_state_sequence = _np.ascontiguousarray(state_sequence[valid_samples, :])
@@ -356,11 +1133,103 @@ def restrict_samples_to_cset(state_sequence, bias_energy_sequence, cset):
     new_bias_energy_sequence = _np.ascontiguousarray(bias_energy_sequence[:, valid_samples])
     return new_state_sequence, new_bias_energy_sequence
 
+def _cset_mapping(cset, nmax):
+    r"""Lookup table (nmax + 1,) from old to new state indices; -1 marks states outside cset."""
+    cset = _np.unique(_np.asarray(cset, dtype=_np.int64).reshape(-1))
+    cset = cset[_np.logical_and(cset >= 0, cset <= nmax)]
+    mapping = -_np.ones(shape=(nmax + 1,), dtype=_np.intc)
+    mapping[cset] = _np.arange(cset.shape[0], dtype=_np.intc)
+    return mapping
+
+def restrict_dtrajs_to_cset(dtrajs, cset, inplace=False):
+    r"""
+    Relabel the configurational state indices of several trajectories to a subset.
+
+    Parameters
+    ----------
+    dtrajs : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc)
+        configurational state indices of all X_i frames of each trajectory;
+        numpy.memmap inputs are processed in chunks of about CHUNK_BYTES bytes
+    cset : list
+        list of configurational states within the desired set
+    inplace : bool, optional, default=False
+        if True, overwrite the elements of dtrajs (which must be writeable
+        numpy.ndarrays of dtype numpy.intc) instead of returning new arrays
+
+    Returns
+    -------
+    new_dtrajs : list of numpy.ndarray(shape=(X_i,), dtype=numpy.intc)
+        the position of each state in the sorted cset, or -1 for frames in states
+        outside of cset and frames with negative indices
+    """
+    nmax = max([int(_np.max(d)) for d in dtrajs if len(d) > 0] + [0])
+    mapping = _cset_mapping(cset, nmax)
+    chunk_size = max(1, CHUNK_BYTES // (2 * _np.dtype(_np.intc).itemsize))
+    new_dtrajs = []
+    for d in dtrajs:
+        if inplace:
+            if not (isinstance(d, _np.ndarray) and d.dtype == _np.intc and d.flags.writeable):
+                raise ValueError("inplace relabeling requires writeable intc dtrajs")
+            new_d = d
+        else:
+            new_d = _np.zeros(shape=(len(d),), dtype=_np.intc)
+        for first in range(0, len(d), chunk_size):
+            chunk = _np.asarray(d[first:first + chunk_size]).reshape(-1)
+            new_d[first:first + chunk_size] = _np.where(chunk >= 0, mapping[_np.maximum(chunk, 0)], -1)
+        new_dtrajs.append(new_d)
+    return new_dtrajs
+
 @cython.boundscheck(False)
 def _overlap_post_hoc_RE(
     _np.ndarray[double, ndim=2, mode="c"] a not None,
     _np.ndarray[double, ndim=2, mode="c"] b not None,
     factor=1.0):
+    r"""
+    Check the mean replica exchange acceptance between two sets of samples.
+
+    The acceptance min(exp(delta), 1) of a pair only depends on x = a[:, 0] - a[:, 1] and
+    y = b[:, 0] - b[:, 1] via delta = x[i] - y[j]. With y sorted, all pairs with y[j] <= x[i]
+    are accepted and the remaining ones sum to exp(x[i] - y[k]) * R[k] with the suffix sums
+    R[k] = sum_{j >= k} exp(y[k] - y[j]) <= m - k, which makes the check O((n + m) log m).
+    """
+    cdef:
+        int i, k, n, m
+        double n_sum
+        _np.ndarray[double, ndim=1, mode="c"] x
+        _np.ndarray[double, ndim=1, mode="c"] y
+        _np.ndarray[double, ndim=1, mode="c"] R
+        _np.ndarray[_np.int64_t, ndim=1, mode="c"] first
+        double *p_x
+        double *p_y
+        double *p_R
+        _np.int64_t *p_first
+    n = a.shape[0]
+    m = b.shape[0]
+    x = _np.ascontiguousarray(a[:, 0] - a[:, 1])
+    y = _np.ascontiguousarray(_np.sort(b[:, 0] - b[:, 1]))
+    R = _np.zeros(shape=(m + 1,), dtype=_np.float64)
+    first = _np.searchsorted(y, x, side='right').astype(_np.int64)
+    p_x = <double*> _np.PyArray_DATA(x)
+    p_y = <double*> _np.PyArray_DATA(y)
+    p_R = <double*> _np.PyArray_DATA(R)
+    p_first = <_np.int64_t*> _np.PyArray_DATA(first)
+    n_sum = 0
+    with nogil:
+        for k in range(m - 1, -1, -1):
+            p_R[k] = 1.0 + _libc_exp(p_y[k] - p_y[k + 1]) * p_R[k + 1] if k + 1 < m else 1.0
+        for i in range(n):
+            k = p_first[i]
+            n_sum += k
+            if k < m:
+                n_sum += _libc_exp(p_x[i] - p_y[k]) * p_R[k]
+    n_avg = n_sum / (<double> n * <double> m)
+    return (n + m) * n_avg * factor >= 1.0
+
+def _overlap_post_hoc_RE_reference(
+    _np.ndarray[double, ndim=2, mode="c"] a not None,
+    _np.ndarray[double, ndim=2, mode="c"] b not None,
+    factor=1.0):
+    r"""Pairwise O(n m) version of _overlap_post_hoc_RE; kept for testing."""
     cdef:
         unsigned int i, j, n, m
         double n_sum, delta
@@ -378,44 +1247,288 @@ def _overlap_post_hoc_RE(
 #   bias calculation tools
 ####################################################################################################
 
+UMBRELLA_BLAS_MIN_DIM = 8
+
+def _umbrella_bias_chunk(
+    _np.ndarray[double, ndim=2, mode="c"] traj,
+    _np.ndarray[double, ndim=2, mode="c"] umbrella_centers,
+    force_constants,
+    _np.ndarray[double, ndim=1, mode="c"] width,
+    _np.ndarray[double, ndim=1, mode="c"] half_width,
+    _np.ndarray[double, ndim=2, mode="c"] bias,
+    int n_threads):
+    r"""
+    Fill bias for one chunk of samples.
+
+    force_constants is either the (T, D, D) matrices or the (T, D) diagonals of diagonal
+    matrices, which costs D instead of D**2 multiply-adds per sample and umbrella.
+    """
+    cdef:
+        int nsamples = traj.shape[0]
+        int nthermo = umbrella_centers.shape[0]
+        int ndim = traj.shape[1]
+        int diagonal = force_constants.ndim == 2
+        double *p_traj = <double*> _np.PyArray_DATA(traj)
+        double *p_centers = <double*> _np.PyArray_DATA(umbrella_centers)
+        double *p_force_constants
+        double *p_width = <double*> _np.PyArray_DATA(width)
+        double *p_half_width = <double*> _np.PyArray_DATA(half_width)
+        double *p_bias = <double*> _np.PyArray_DATA(bias)
+    force_constants = _np.ascontiguousarray(force_constants, dtype=_np.float64)
+    p_force_constants = <double*> _np.PyArray_DATA(force_constants)
+    with nogil:
+        if diagonal:
+            _get_umbrella_bias_diagonal(
+                p_traj, p_centers, p_force_constants, p_width, p_half_width,
+                nsamples, nthermo, ndim, n_threads, p_bias)
+        else:
+            _get_umbrella_bias(
+                p_traj, p_centers, p_force_constants, p_width, p_half_width,
+                nsamples, nthermo, ndim, n_threads, p_bias)
+
+def _umbrella_bias_chunk_blas(traj, umbrella_centers, force_constants, bias):
+    r"""Fill bias for one chunk of nonperiodic samples with batched matrix products."""
+    nthermo, ndim = umbrella_centers.shape
+    block = max(1, CHUNK_BYTES // (16 * nthermo * ndim))
+    for first in range(0, traj.shape[0], block):
+        # delta[k, x, :] is the displacement of sample x from umbrella k
+        delta = traj[_np.newaxis, first:first + block, :] - umbrella_centers[:, _np.newaxis, :]
+        bias[first:first + block, :] = 0.5 * _np.einsum(
+            'kxd,kxd->xk', _np.matmul(delta, force_constants), delta)
+
+def _umbrella_bias_parameters(ndim, umbrella_centers, force_constants, width):
+    umbrella_centers = _np.ascontiguousarray(umbrella_centers, dtype=_np.float64)
+    force_constants = _np.ascontiguousarray(force_constants, dtype=_np.float64)
+    width = _np.ascontiguousarray(width, dtype=_np.float64)
+    if umbrella_centers.ndim != 2 or umbrella_centers.shape[1] != ndim \
+        or force_constants.shape != (umbrella_centers.shape[0], ndim, ndim) \
+        or width.shape != (ndim,):
+        raise ValueError("traj, umbrella_centers, force_constants and width have inconsistent shapes")
+    diagonals = _np.ascontiguousarray(_np.diagonal(force_constants, axis1=1, axis2=2))
+    if _np.count_nonzero(force_constants) == _np.count_nonzero(diagonals):
+        # diagonal (including isotropic) force constants
+        force_constants = diagonals
+    elif ndim >= UMBRELLA_BLAS_MIN_DIM and _np.all(width <= 0.0):
+        # large dense quadratic forms of nonperiodic coordinates
+        return umbrella_centers, force_constants, width, 0.5 * width, True
+    return umbrella_centers, force_constants, width, 0.5 * width, False
+
+def iter_umbrella_bias(
+    traj, umbrella_centers, force_constants, width, chunk_size=None, n_threads=1):
+    r"""
+    Compute the umbrella bias energies block by block.
+
+    Parameters
+    ----------
+    traj : numpy.ndarray(shape=(X, D), dtype=numpy.float64)
+        sequence of the D-dimensional reaction coordinate values of the X samples;
+        any sliceable array (e.g., numpy.memmap) is read one block at a time
+    umbrella_centers : numpy.ndarray(shape=(T, D), dtype=numpy.float64)
+        sequence of T unique D-dimensional umbrella centers
+    force_constants : numpy.ndarray(shape=(T, D, D), dtype=numpy.float64)
+        sequence of T unique DxD-dimensional force constants (matrices)
+    width : numpy.ndarray(shape=(D,), dtype=numpy.float64)
+        periodicity of each dimension; nonpositive values select nonperiodic dimensions
+    chunk_size : int, optional, default=None
+        number of samples per block; if None, a block holds about CHUNK_BYTES bytes
+    n_threads : int, optional, default=1
+        number of OpenMP threads; values < 1 select all available threads
+
+    Yields
+    ------
+    bias : numpy.ndarray(shape=(Y, T), dtype=numpy.float64)
+        bias energies of the next Y <= chunk_size samples; a new array for each block
+    """
+    return _iter_umbrella_bias(
+        traj, umbrella_centers, force_constants, width, chunk_size, n_threads, None)
+
+def _iter_umbrella_bias(
+    traj, umbrella_centers, force_constants, width, chunk_size, n_threads, out):
+    traj_shape = _np.shape(traj)
+    if len(traj_shape) != 2:
+        raise ValueError("traj must have shape (X, D)")
+    umbrella_centers, force_constants, width, half_width, use_blas = _umbrella_bias_parameters(
+        traj_shape[1], umbrella_centers, force_constants, width)
+    nthermo = umbrella_centers.shape[0]
+    if chunk_size is None:
+        chunk_size = max(1, CHUNK_BYTES // (8 * max(nthermo, 1)))
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    n_threads = _get_n_threads(n_threads)
+    for first in range(0, traj_shape[0], chunk_size):
+        chunk = _np.ascontiguousarray(traj[first:first + chunk_size], dtype=_np.float64)
+        bias = None if out is None else out[first:first + chunk.shape[0], :]
+        if bias is None or not bias.flags.c_contiguous:
+            bias = _np.zeros(shape=(chunk.shape[0], nthermo), dtype=_np.float64)
+        if use_blas:
+            _umbrella_bias_chunk_blas(chunk, umbrella_centers, force_constants, bias)
+        else:
+            _umbrella_bias_chunk(
+                chunk, umbrella_centers, force_constants, width, half_width, bias, n_threads)
+        yield bias
+
 def get_umbrella_bias(
-    _np.ndarray[double, ndim=2, mode="c"] traj not None,
-    _np.ndarray[double, ndim=2, mode="c"] umbrella_centers not None,
-    _np.ndarray[double, ndim=3, mode="c"] force_constants not None,
-    _np.ndarray[double, ndim=1, mode="c"] width not None):
+    traj, umbrella_centers, force_constants, width, out=None, chunk_size=None, n_threads=1):
     r"""
-    Restrict full list of samples to a subset and relabel configurational state indices.
+    Compute the harmonic umbrella bias energies of all samples in all umbrellas.
 
     Parameters
     ----------
     traj : numpy.ndarray(shape=(X, D), dtype=numpy.float64)
-        sequence of the D-dimensional reaction coordinate values of the X samples
+        sequence of the D-dimensional reaction coordinate values of the X samples;
+        any sliceable array (e.g., numpy.memmap) is read one block at a time
     umbrella_centers : numpy.ndarray(shape=(T, D), dtype=numpy.float64)
         sequence of T unique D-dimensional umbrella centers
     force_constants : numpy.ndarray(shape=(T, D, D), dtype=numpy.float64)
         sequence of T unique DxD-dimensional force constants (matrices)
+    width : numpy.ndarray(shape=(D,), dtype=numpy.float64)
+        periodicity of each dimension; nonpositive values select nonperiodic dimensions
+    out : numpy.ndarray(shape=(X, T), dtype=numpy.float64), optional
+        buffer for the result, e.g., a numpy.memmap which can be passed on to
+        ChunkedSequences; it is filled block by block
+    chunk_size : int, optional, default=None
+        number of samples per block; if None, a block holds about CHUNK_BYTES bytes
+    n_threads : int, optional, default=1
+        number of OpenMP threads; values < 1 select all available threads
 
     Returns
     -------
     bias : numpy.ndarray(shape=(X, T), dtype=numpy.float64)
-        sequence of the T bias energies for each of the X samples
+        sequence of the T bias energies for each of the X samples (out if given)
     """
-    nsamples = traj.shape[0]
-    nthermo = umbrella_centers.shape[0]
-    ndim = traj.shape[1]
-    bias = _np.zeros(shape=(nsamples, nthermo), dtype=_np.float64)
-    half_width = 0.5 * width
-    _get_umbrella_bias(
-        <double*> _np.PyArray_DATA(traj),
-        <double*> _np.PyArray_DATA(umbrella_centers),
-        <double*> _np.PyArray_DATA(force_constants),
-        <double*> _np.PyArray_DATA(width),
-        <double*> _np.PyArray_DATA(half_width),
-        nsamples,
-        nthermo,
-        ndim,
-        <double*> _np.PyArray_DATA(bias))
-    return bias
+    nsamples = _np.shape(traj)[0]
+    nthermo = _np.shape(umbrella_centers)[0]
+    if out is None:
+        out = _np.zeros(shape=(nsamples, nthermo), dtype=_np.float64)
+    elif out.shape != (nsamples, nthermo) or out.dtype != _np.float64:
+        raise ValueError("out must be a float64 array of shape (X, T)")
+    first = 0
+    for bias in _iter_umbrella_bias(
+        traj, umbrella_centers, force_constants, width, chunk_size, n_threads, out):
+        # blocks of a C-contiguous out are computed in place
+        if not _np.may_share_memory(bias, out):
+            out[first:first + bias.shape[0], :] = bias
+        first += bias.shape[0]
+    return out
+
+class _BiasProvider(object):
+    r"""Read-only (X, T) float64 array-like whose rows are computed when they are requested."""
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def dtype(self):
+        return _np.dtype(_np.float64)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        n_samples = self.shape[0]
+        single = False
+        if isinstance(key, slice):
+            start, stop, step = key.indices(n_samples)
+            rows = slice(start, stop) if step == 1 else _np.arange(start, stop, step)
+        elif _np.ndim(key) == 0:
+            index = int(key) + n_samples if key < 0 else int(key)
+            if index < 0 or index >= n_samples:
+                raise IndexError(key)
+            rows, single = slice(index, index + 1), True
+        else:
+            rows = _np.arange(n_samples)[key]
+        bias = self._compute(rows)
+        return bias[0] if single else bias
+
+class UmbrellaBias(_BiasProvider):
+    r"""
+    Harmonic umbrella bias energies of a trajectory, computed when they are requested.
+
+    Parameters
+    ----------
+    traj : numpy.ndarray(shape=(X, D), dtype=numpy.float64)
+        sequence of the D-dimensional reaction coordinate values of the X samples;
+        any sliceable array (e.g., numpy.memmap)
+    umbrella_centers : numpy.ndarray(shape=(T, D), dtype=numpy.float64)
+        sequence of T unique D-dimensional umbrella centers
+    force_constants : numpy.ndarray(shape=(T, D, D), dtype=numpy.float64)
+        sequence of T unique DxD-dimensional force constants (matrices)
+    width : numpy.ndarray(shape=(D,), dtype=numpy.float64)
+        periodicity of each dimension; nonpositive values select nonperiodic dimensions
+    n_threads : int, optional, default=1
+        number of OpenMP threads; values < 1 select all available threads
+
+    Notes
+    -----
+    Slicing along the first axis returns the (X_s, T) bias energies of the selected
+    samples as computed by `get_umbrella_bias`. The estimators stream such providers
+    like memory-mapped bias energies (see `ChunkedSequences`), e.g.,
+    ``tram.estimate(C_K, N_K, [UmbrellaBias(x, centers, kappa, width) for x in trajs], dtrajs)``;
+    only the X*D reaction coordinates and a single chunk of bias energies are held
+    in memory, at the price of recomputing the bias energies in every iteration.
+    """
+    def __init__(self, traj, umbrella_centers, force_constants, width, n_threads=1):
+        if len(_np.shape(traj)) != 2:
+            raise ValueError("traj must have shape (X, D)")
+        self.traj = traj
+        self._parameters = _umbrella_bias_parameters(
+            _np.shape(traj)[1], umbrella_centers, force_constants, width)
+        self.n_threads = _get_n_threads(n_threads)
+
+    @property
+    def shape(self):
+        return (_np.shape(self.traj)[0], self._parameters[0].shape[0])
+
+    def _compute(self, rows):
+        umbrella_centers, force_constants, width, half_width, use_blas = self._parameters
+        chunk = _np.ascontiguousarray(self.traj[rows], dtype=_np.float64)
+        bias = _np.zeros(shape=(chunk.shape[0], umbrella_centers.shape[0]), dtype=_np.float64)
+        if use_blas:
+            _umbrella_bias_chunk_blas(chunk, umbrella_centers, force_constants, bias)
+        else:
+            _umbrella_bias_chunk(
+                chunk, umbrella_centers, force_constants, width, half_width, bias, self.n_threads)
+        return bias
+
+class LinearBias(_BiasProvider):
+    r"""
+    Bias energies which are linear combinations of a few energy terms per frame.
+
+    Parameters
+    ----------
+    energies : numpy.ndarray(shape=(X,) or (X, P), dtype=numpy.float64)
+        P energy terms for each of the X samples (e.g., the potential energy);
+        any sliceable array (e.g., numpy.memmap)
+    coefficients : numpy.ndarray(shape=(T,) or (T, P), dtype=numpy.float64)
+        coefficients of the energy terms in each of the T thermodynamic states
+
+    Notes
+    -----
+    The reduced bias energy of sample x in state K is sum_p coefficients[K, p] * energies[x, p].
+    For multi-temperature data (replica exchange, simulated tempering), use the potential
+    energies and coefficients = 1.0 / kT - 1.0 / kT_0. Like `UmbrellaBias`, lists of
+    LinearBias objects can be passed to the estimators instead of bias energy sequences;
+    only the X*P energies and a single chunk of bias energies are held in memory.
+    """
+    def __init__(self, energies, coefficients):
+        coefficients = _np.asarray(coefficients, dtype=_np.float64)
+        if coefficients.ndim == 1:
+            coefficients = coefficients[:, _np.newaxis]
+        n_terms = 1 if len(_np.shape(energies)) == 1 else _np.shape(energies)[1]
+        if coefficients.ndim != 2 or coefficients.shape[1] != n_terms \
+            or len(_np.shape(energies)) not in (1, 2):
+            raise ValueError("energies and coefficients have inconsistent shapes")
+        self.energies = energies
+        self.coefficients = _np.ascontiguousarray(coefficients.T)
+
+    @property
+    def shape(self):
+        return (_np.shape(self.energies)[0], self.coefficients.shape[1])
+
+    def _compute(self, rows):
+        chunk = _np.asarray(self.energies[rows], dtype=_np.float64)
+        return _np.ascontiguousarray(
+            _np.dot(chunk.reshape(-1, self.coefficients.shape[0]), self.coefficients))
 
 ####################################################################################################
 #   transition matrix renormalization
@@ -429,13 +1542,86 @@ def renormalize_transition_matrix(
         P.shape[0],
         <double*> _np.PyArray_DATA(scratch_M))
 
-def renormalize_transition_matrices(
-    _np.ndarray[double, ndim=3, mode="c"] PK not None,
-    _np.ndarray[double, ndim=1, mode="c"] scratch_M not None):
-    for K in range(PK.shape[0]):
-        P = _np.ascontiguousarray(PK[K, :, :])
-        _renormalize_transition_matrix(
-            <double*> _np.PyArray_DATA(P),
-            P.shape[0],
-            <double*> _np.PyArray_DATA(scratch_M))
-        PK[K, :, :] = P[:, :]
+def renormalize_transition_matrices(PK, scratch_M=None, n_threads=1):
+    r"""
+    Renormalize the transition matrices of all thermodynamic states in place.
+
+    Every matrix is divided by its largest row sum and the diagonal is reset such
+    that all rows sum to one.
+
+    Parameters
+    ----------
+    PK : numpy.ndarray(shape=(T, M, M), dtype=numpy.float64) or list of scipy.sparse.csr_matrix
+        transition matrices, e.g., from tram/dtram.estimate_transition_matrices; a dense
+        PK must be C-contiguous, sparse matrices must have float64 data
+    scratch_M : numpy.ndarray(shape=(M,), dtype=numpy.float64), optional
+        unused; the scratch memory is allocated internally
+    n_threads : int, optional, default=1
+        number of OpenMP threads for the loop over the dense matrices; values < 1
+        select all available threads
+
+    Returns
+    -------
+    PK : numpy.ndarray(shape=(T, M, M), dtype=numpy.float64) or list of scipy.sparse.csr_matrix
+        the renormalized transition matrices; sparse matrices whose pattern lacks
+        diagonal elements are replaced by new matrices, all others are modified in place
+    """
+    cdef:
+        _np.ndarray[double, ndim=3, mode="c"] dense
+        _np.ndarray[double, ndim=1, mode="c"] scratch
+        _np.ndarray[double, ndim=1, mode="c"] data
+        _np.ndarray[int, ndim=1, mode="c"] indptr
+        _np.ndarray[int, ndim=1, mode="c"] indices
+        int n_therm_states, n_conf_states, n_active_threads
+        double *p_dense
+        double *p_data
+        double *p_scratch
+        int *p_indptr
+        int *p_indices
+    if isinstance(PK, _np.ndarray):
+        dense = PK
+        n_therm_states = dense.shape[0]
+        n_conf_states = dense.shape[1]
+        if dense.shape[2] != n_conf_states:
+            raise ValueError("PK must have shape (T, M, M)")
+        scratch = _np.zeros(shape=(n_therm_states * n_conf_states,), dtype=_np.float64)
+        n_active_threads = _get_n_threads(n_threads)
+        p_dense = <double*> _np.PyArray_DATA(dense)
+        p_scratch = <double*> _np.PyArray_DATA(scratch)
+        with nogil:
+            _renormalize_transition_matrices(
+                p_dense, n_therm_states, n_conf_states, n_active_threads, p_scratch)
+        return PK
+    if not isinstance(PK, list):
+        PK = list(PK)
+    for K in range(len(PK)):
+        P = PK[K]
+        if P.format != 'csr' or P.dtype != _np.float64 or P.shape[0] != P.shape[1]:
+            raise ValueError("sparse transition matrices must be square float64 csr_matrix objects")
+        n_conf_states = P.shape[0]
+        rows = _np.repeat(_np.arange(n_conf_states), _np.diff(P.indptr))
+        has_diagonal = _np.zeros(shape=(n_conf_states,), dtype=bool)
+        has_diagonal[rows[P.indices == rows]] = True
+        missing = _np.where(~has_diagonal)[0]
+        if missing.shape[0] > 0:
+            # extend the pattern by explicit zeros on the diagonal
+            P = P.tocoo()
+            P = _coo(
+                (_np.concatenate((P.data, _np.zeros(missing.shape[0]))),
+                 (_np.concatenate((P.row, missing)), _np.concatenate((P.col, missing)))),
+                shape=P.shape).tocsr()
+            PK[K] = P
+        P.indptr = _np.ascontiguousarray(P.indptr, dtype=_np.intc)
+        P.indices = _np.ascontiguousarray(P.indices, dtype=_np.intc)
+        data = P.data
+        indptr = P.indptr
+        indices = P.indices
+        scratch = _np.zeros(shape=(max(n_conf_states, 1),), dtype=_np.float64)
+        p_data = <double*> _np.PyArray_DATA(data)
+        p_indptr = <int*> _np.PyArray_DATA(indptr)
+        p_indices = <int*> _np.PyArray_DATA(indices)
+        p_scratch = <double*> _np.PyArray_DATA(scratch)
+        with nogil:
+            _renormalize_sparse_transition_matrix(
+                p_data, p_indptr, p_indices, n_conf_states, p_scratch)
+    return PK
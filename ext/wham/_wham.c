@@ -31,7 +31,7 @@ extern void _wham_update_conf_energies(
             scratch_T[K] = log_therm_state_counts[K]
                          - bias_energies[K * n_conf_states + i]
                          + therm_energies[K];
-        conf_energies[i] = _logsumexp_sort_kahan_inplace(scratch_T, n_therm_states)
+        conf_energies[i] = _logsumexp_inplace(scratch_T, n_therm_states)
                          - log_conf_state_counts[i];
     }
 }
@@ -46,7 +46,7 @@ extern void _wham_update_therm_energies(
         KM = K*n_conf_states;
         for(i=0; i<n_conf_states; ++i)
             scratch_M[i] = -(bias_energies[KM + i] + conf_energies[i]);
-        therm_energies[K] = -_logsumexp_sort_kahan_inplace(scratch_M, n_conf_states);
+        therm_energies[K] = -_logsumexp_inplace(scratch_M, n_conf_states);
     }
 }
 
@@ -58,7 +58,7 @@ extern void _wham_normalize(
     double f0;
     for(i=0; i<n_conf_states; ++i)
         scratch_M[i] = -conf_energies[i];
-    f0 = -_logsumexp_sort_kahan_inplace(scratch_M, n_conf_states);
+    f0 = -_logsumexp_inplace(scratch_M, n_conf_states);
     for(i=0; i<n_conf_states; ++i)
         conf_energies[i] -= f0;
     for(K=0; K<n_therm_states; ++K)
@@ -26,6 +26,8 @@ from warnings import warn as _warn
 from msmtools.util.exceptions import NotConvergedWarning as _NotConvergedWarning
 
 from .callback import CallbackInterrupt
+from .util import logsumexp_mode_context as _logsumexp_mode_context
+from .solvers import get_solver as _get_solver
 
 __all__ = [
     'update_conf_energies',
@@ -50,6 +52,16 @@ cdef extern from "_wham.h":
         double *therm_energies, double *conf_energies,
         int n_therm_states, int n_conf_states, double *scratch_S)
 
+cdef extern from "../util/_util.h":
+    int _get_logsumexp_mode()
+    void _set_logsumexp_mode(int mode)
+
+def _select_logsumexp_mode(int mode):
+    r"""Select the logsumexp scheme index of the kernels in this module; return the previous one."""
+    cdef int old_mode = _get_logsumexp_mode()
+    _set_logsumexp_mode(mode)
+    return old_mode
+
 def update_conf_energies(
     _np.ndarray[double, ndim=1, mode="c"] log_therm_state_counts not None,
     _np.ndarray[double, ndim=1, mode="c"] log_conf_state_counts not None,
@@ -204,7 +216,7 @@ def estimate(
     state_counts, bias_energies,
     maxiter=1000, maxerr=1.0E-8,
     therm_energies=None, conf_energies=None,
-    save_convergence_info=0, callback=None):
+    save_convergence_info=0, callback=None, logsumexp_mode='sort_kahan', solver='plain'):
     r"""
     Estimate the unbiased reduced free energies and thermodynamic free energies
         
@@ -225,6 +237,17 @@ def estimate(
     save_convergence_info : int, optional
         every save_convergence_info iteration steps, store the actual increment
         and the actual loglikelihood
+    logsumexp_mode : str, optional, default='sort_kahan'
+        logspace summation scheme of the C kernels: 'sort_kahan' sorts every
+        summand buffer before the compensated sum, 'max_kahan' skips the sort
+        and runs in linear time, 'simd_kahan' also uses a vectorized exponential
+        (see `thermotools.util.logsumexp_mode_index`); the scheme is selected for
+        the calling thread only, such that estimators running in other threads are
+        not affected
+    solver : str or FixedPointSolver, optional, default='plain'
+        fixed point scheme: 'plain' self-consistent iteration or the safeguarded
+        'squarem' and 'anderson' (alias 'diis') extrapolations
+        (see `thermotools.solvers.get_solver`)
 
     Returns
     -------
@@ -243,65 +266,73 @@ def estimate(
     configuration energies of the unbiased thermodynamic state and the reduced thermodynamic
     energies by means of a fixed point iteration.
     """
-    T = state_counts.shape[0]
-    M = state_counts.shape[1]
-    S = T + M
-    therm_state_counts = state_counts.sum(axis=1).astype(_np.intc)
-    conf_state_counts = state_counts.sum(axis=0).astype(_np.intc)
-    log_therm_state_counts = _np.log(therm_state_counts).astype(_np.float64)
-    log_conf_state_counts = _np.log(conf_state_counts).astype(_np.float64)
-    if therm_energies is None:
-        therm_energies = _np.zeros(shape=(T,), dtype=_np.float64)
-    if conf_energies is None:
-        conf_energies = _np.zeros(shape=(M,), dtype=_np.float64)
-    old_therm_energies = therm_energies.copy()
-    old_conf_energies = conf_energies.copy()
-    scratch = _np.zeros(shape=(S,), dtype=_np.float64)
-    increments = []
-    loglikelihoods = []
-    sci_count = 0
-    for m in range(maxiter):
-        sci_count += 1
-        update_therm_energies(conf_energies, bias_energies, scratch, therm_energies)
-        update_conf_energies(
-            log_therm_state_counts, log_conf_state_counts, therm_energies, bias_energies,
-            scratch, conf_energies)
-        delta_therm_energies = _np.abs(therm_energies - old_therm_energies)
-        delta_conf_energies = _np.abs(conf_energies - old_conf_energies)
-        err = _np.max([_np.max(delta_conf_energies), _np.max(delta_therm_energies)])
-        normalize(scratch, therm_energies, conf_energies)
-        if sci_count == save_convergence_info:
-            sci_count = 0
-            increments.append(err)
-            loglikelihoods.append(
-                get_loglikelihood(
-                    therm_state_counts, conf_state_counts, therm_energies, conf_energies, scratch))
-        if callback is not None:
-            try:
-                callback(
-                    conf_energies=conf_energies,
-                    old_therm_energies=old_therm_energies,
-                    old_conf_energies=old_conf_energies,
-                    therm_energies=therm_energies,
-                    delta_conf_energies=delta_conf_energies,
-                    delta_therm_energies=delta_therm_energies,
-                    err=err,
-                    iteration_step=m,
-                    maxiter=maxiter,
-                    maxerr=maxerr)
-            except CallbackInterrupt:
+    solver = _get_solver(solver)
+    with _logsumexp_mode_context(_select_logsumexp_mode, logsumexp_mode):
+        T = state_counts.shape[0]
+        M = state_counts.shape[1]
+        S = T + M
+        therm_state_counts = state_counts.sum(axis=1).astype(_np.intc)
+        conf_state_counts = state_counts.sum(axis=0).astype(_np.intc)
+        log_therm_state_counts = _np.log(therm_state_counts).astype(_np.float64)
+        log_conf_state_counts = _np.log(conf_state_counts).astype(_np.float64)
+        if therm_energies is None:
+            therm_energies = _np.zeros(shape=(T,), dtype=_np.float64)
+        if conf_energies is None:
+            conf_energies = _np.zeros(shape=(M,), dtype=_np.float64)
+        old_therm_energies = therm_energies.copy()
+        old_conf_energies = conf_energies.copy()
+        scratch = _np.zeros(shape=(S,), dtype=_np.float64)
+        increments = []
+        loglikelihoods = []
+        sci_count = 0
+        for m in range(maxiter):
+            sci_count += 1
+            update_therm_energies(conf_energies, bias_energies, scratch, therm_energies)
+            update_conf_energies(
+                log_therm_state_counts, log_conf_state_counts, therm_energies, bias_energies,
+                scratch, conf_energies)
+            delta_therm_energies = _np.abs(therm_energies - old_therm_energies)
+            delta_conf_energies = _np.abs(conf_energies - old_conf_energies)
+            err = _np.max([_np.max(delta_conf_energies), _np.max(delta_therm_energies)])
+            normalize(scratch, therm_energies, conf_energies)
+            if sci_count == save_convergence_info:
+                sci_count = 0
+                increments.append(err)
+                loglikelihoods.append(
+                    get_loglikelihood(
+                        therm_state_counts, conf_state_counts, therm_energies, conf_energies, scratch))
+            if callback is not None:
+                try:
+                    callback(
+                        conf_energies=conf_energies,
+                        old_therm_energies=old_therm_energies,
+                        old_conf_energies=old_conf_energies,
+                        therm_energies=therm_energies,
+                        delta_conf_energies=delta_conf_energies,
+                        delta_therm_energies=delta_therm_energies,
+                        err=err,
+                        iteration_step=m,
+                        maxiter=maxiter,
+                        maxerr=maxerr)
+                except CallbackInterrupt:
+                    break
+            if err < maxerr:
                 break
-        if err < maxerr:
-            break
+            else:
+                update = (conf_energies,)
+                proposal = solver.step((old_conf_energies,), update)
+                if proposal is not update:
+                    conf_energies[:] = proposal[0]
+                    update_therm_energies(conf_energies, bias_energies, scratch, therm_energies)
+                    normalize(scratch, therm_energies, conf_energies)
+                old_therm_energies[:] = therm_energies[:]
+                old_conf_energies[:] = conf_energies[:]
+        if err >= maxerr:
+            _warn("WHAM did not converge: last increment = %.5e" % err, _NotConvergedWarning)
+        if save_convergence_info == 0:
+            increments = None
+            loglikelihoods = None
         else:
-            old_therm_energies[:] = therm_energies[:]
-            old_conf_energies[:] = conf_energies[:]
-    if err >= maxerr:
-        _warn("WHAM did not converge: last increment = %.5e" % err, _NotConvergedWarning)
-    if save_convergence_info == 0:
-        increments = None
-        loglikelihoods = None
-    else:
-        increments = _np.array(increments, dtype=_np.float64)
-        loglikelihoods = _np.array(loglikelihoods, dtype=_np.float64)
+            increments = _np.array(increments, dtype=_np.float64)
+            loglikelihoods = _np.array(loglikelihoods, dtype=_np.float64)
     return therm_energies, conf_energies, increments, loglikelihoods
@@ -24,10 +24,38 @@ thermotools is a lowlevel implementation toolbox for the analyis of multi-ensemb
 from setuptools import setup, Extension
 import versioneer
 
+def openmp_flags():
+    r"""Return the OpenMP compiler flags if the C compiler supports them, else an empty list."""
+    import os
+    import shutil
+    import tempfile
+    from distutils.ccompiler import new_compiler
+    from distutils.errors import CompileError, LinkError
+    from distutils.sysconfig import customize_compiler
+    if os.environ.get('THERMOTOOLS_DISABLE_OPENMP'):
+        return []
+    compiler = new_compiler()
+    customize_compiler(compiler)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        source = os.path.join(tmpdir, 'check_openmp.c')
+        with open(source, 'w') as f:
+            f.write('#include <omp.h>\nint main(void) { return omp_get_max_threads() > 0 ? 0 : 1; }\n')
+        objects = compiler.compile([source], output_dir=tmpdir, extra_postargs=['-fopenmp'])
+        compiler.link_executable(
+            objects, os.path.join(tmpdir, 'check_openmp'), extra_postargs=['-fopenmp'])
+    except (CompileError, LinkError):
+        print('OpenMP is not available; building the TRAM kernels without multithreading')
+        return []
+    finally:
+        shutil.rmtree(tmpdir)
+    return ['-fopenmp']
+
 def extensions():
     from numpy import get_include
     from Cython.Build import cythonize
     extra_compile_args = ["-O3", "-std=c99"]
+    openmp = openmp_flags()
     ext_bar = Extension(
         "thermotools.bar",
         sources=["ext/bar/bar.pyx", "ext/bar/_bar.c", "ext/util/_util.c"],
@@ -47,7 +75,8 @@ def extensions():
         "thermotools.tram",
         sources=["ext/tram/tram.pyx", "ext/tram/_tram.c", "ext/util/_util.c"],
         include_dirs=[get_include()],
-        extra_compile_args=extra_compile_args)
+        extra_compile_args=extra_compile_args + openmp,
+        extra_link_args=openmp)
     ext_dtram = Extension(
         "thermotools.dtram",
         sources=["ext/dtram/dtram.pyx", "ext/dtram/_dtram.c", "ext/util/_util.c"],
@@ -57,7 +86,8 @@ def extensions():
         "thermotools.trammbar",
         sources=["ext/trammbar/trammbar.pyx", "ext/tram/_tram.c", "ext/util/_util.c"],
         include_dirs=[get_include()],
-        extra_compile_args=extra_compile_args + ["-DTRAMMBAR"])
+        extra_compile_args=extra_compile_args + ["-DTRAMMBAR"] + openmp,
+        extra_link_args=openmp)
     ext_mbar_direct = Extension(
         "thermotools.mbar_direct",
         sources=["ext/mbar_direct/mbar_direct.pyx", "ext/mbar_direct/_mbar_direct.c", "ext/util/_util.c"],
@@ -77,7 +107,8 @@ def extensions():
         "thermotools.util",
         sources=["ext/util/util.pyx", "ext/util/_util.c"],
         include_dirs=[get_include()],
-        extra_compile_args=extra_compile_args)
+        extra_compile_args=extra_compile_args + openmp,
+        extra_link_args=openmp)
     exts = [
         ext_bar,
         ext_wham,
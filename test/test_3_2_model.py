@@ -21,9 +21,11 @@ import thermotools.tram_direct as tram_direct
 import thermotools.mbar as mbar
 import thermotools.mbar_direct as mbar_direct
 import thermotools.dtram as dtram
+import thermotools.util as util
 import thermotools.tram as tram
 import numpy as np
-from numpy.testing import assert_allclose
+import scipy.sparse
+from numpy.testing import assert_allclose, assert_raises
 
 #   ************************************************************************************************
 #   data generation functions
@@ -173,3 +175,140 @@ class TestThreeTwoModel(object):
         assert_allclose(transition_matrices, self.transition_matrices, atol=maxerr)
         # lower bound on the log-likelihood must be maximal at convergence
         assert np.all(logL_history[-1]+1.E-5>=logL_history[0:-1])        
+    def test_logsumexp_modes(self):
+        # the sort-free summation must reproduce the sorted reference
+        bias_energies = np.ascontiguousarray(self.bias_energies[:,self.conf_state_sequence].T)
+        results = []
+        for mode in ('sort_kahan', 'max_kahan', 'simd_kahan'):
+            results.append(tram.estimate(
+                self.count_matrices, self.state_counts, [bias_energies],
+                [self.conf_state_sequence], maxiter=10000, maxerr=1.0E-12,
+                logsumexp_mode=mode)[:3])
+            results.append(mbar.estimate(
+                self.state_counts.sum(axis=1), [bias_energies], [self.conf_state_sequence],
+                maxiter=10000, maxerr=1.0E-12, logsumexp_mode=mode)[:3])
+            results.append(dtram.estimate(
+                self.count_matrices, self.bias_energies, maxiter=10000, maxerr=1.0E-12,
+                logsumexp_mode=mode)[:2])
+            results.append(wham.estimate(
+                self.state_counts_ind, self.bias_energies, maxiter=10000, maxerr=1.0E-12,
+                logsumexp_mode=mode)[:2])
+        for reference, result in zip(results[:4] * 2, results[4:]):
+            for a, b in zip(reference, result):
+                assert_allclose(a, b, atol=1.0E-8)
+    def test_logsumexp_mode_restored(self):
+        # an exception in the iteration must not leave the selected summation scheme behind
+        def callback(**kwargs):
+            raise RuntimeError
+        bias_energies = np.ascontiguousarray(self.bias_energies[:,self.conf_state_sequence].T)
+        for module, args in (
+            (tram, (self.count_matrices, self.state_counts, [bias_energies], [self.conf_state_sequence])),
+            (mbar, (self.state_counts.sum(axis=1), [bias_energies], [self.conf_state_sequence])),
+            (dtram, (self.count_matrices, self.bias_energies)),
+            (wham, (self.state_counts_ind, self.bias_energies))):
+            assert_raises(
+                RuntimeError, module.estimate, *args, callback=callback, logsumexp_mode='max_kahan')
+            assert module._select_logsumexp_mode(0) == util.logsumexp_mode_index('sort_kahan')
+    def test_logsumexp_mode_thread_local(self):
+        # a mode selected in one thread must not leak into the estimators of other threads
+        import threading
+        seen = []
+        def worker():
+            seen.append(mbar._select_logsumexp_mode(util.logsumexp_mode_index('max_kahan')))
+            bias_energies = np.ascontiguousarray(self.bias_energies[:,self.conf_state_sequence].T)
+            seen.append(mbar.estimate(
+                self.state_counts.sum(axis=1), [bias_energies], [self.conf_state_sequence],
+                maxiter=10, logsumexp_mode='sort_kahan') is not None)
+            seen.append(mbar._select_logsumexp_mode(0))
+        with util.logsumexp_mode_context(mbar._select_logsumexp_mode, 'simd_kahan'):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+            assert mbar._select_logsumexp_mode(2) == 2
+        assert seen == [0, True, 1]
+        assert mbar._select_logsumexp_mode(0) == 0
+    def test_sparse_count_matrices(self):
+        # the sparse kernels evaluate the same summands as the dense ones
+        bias_energies = np.ascontiguousarray(self.bias_energies[:,self.conf_state_sequence].T)
+        sparse = [scipy.sparse.csr_matrix(C) for C in self.count_matrices]
+        dense_result = tram.estimate(
+            self.count_matrices, self.state_counts, [bias_energies], [self.conf_state_sequence],
+            maxiter=10000, maxerr=1.0E-12, save_convergence_info=10)
+        sparse_result = tram.estimate(
+            sparse, self.state_counts, [bias_energies], [self.conf_state_sequence],
+            maxiter=10000, maxerr=1.0E-12, save_convergence_info=10)
+        for a, b in zip(dense_result, sparse_result):
+            assert_allclose(a, b, rtol=1.0E-14, atol=1.0E-14)
+        transition_matrices = tram.estimate_transition_matrices(
+            sparse_result[3], sparse_result[0], util.sparse_count_matrices(sparse), None)
+        assert_allclose(
+            [P.toarray() for P in transition_matrices],
+            tram.estimate_transition_matrices(
+                dense_result[3], dense_result[0], self.count_matrices, None),
+            rtol=1.0E-14, atol=1.0E-14)
+        dense_result = dtram.estimate(
+            self.count_matrices, self.bias_energies, maxiter=10000, maxerr=1.0E-12,
+            save_convergence_info=10)
+        sparse_result = dtram.estimate(
+            sparse, self.bias_energies, maxiter=10000, maxerr=1.0E-12, save_convergence_info=10)
+        for a, b in zip(dense_result, sparse_result):
+            assert_allclose(a, b, rtol=1.0E-14, atol=1.0E-14)
+    def test_log_count_tables(self):
+        # the tabulated kernels reproduce the updates of the dense kernels
+        T, M = self.state_counts.shape
+        log_lagrangian_mult = np.log(self.state_counts + 1.0)
+        biased_conf_energies = np.ascontiguousarray(self.bias_energies + np.linspace(0.0, 1.0, M))
+        tables = util.log_count_tables(self.count_matrices, self.state_counts)
+        scratch_M = np.zeros(shape=(M,), dtype=np.float64)
+        for update in (tram.update_lagrangian_mult, tram.get_log_Ref_K_i):
+            dense_result = np.zeros(shape=(T, M), dtype=np.float64)
+            tables_result = np.zeros(shape=(T, M), dtype=np.float64)
+            update(log_lagrangian_mult, biased_conf_energies, self.count_matrices,
+                self.state_counts, scratch_M, dense_result)
+            update(log_lagrangian_mult, biased_conf_energies, tables,
+                self.state_counts, scratch_M, tables_result)
+            assert_allclose(tables_result, dense_result, rtol=1.0E-14, atol=1.0E-14)
+        tables = util.log_count_tables(self.count_matrices, prior=dtram.get_prior())
+        conf_energies = np.linspace(0.0, 1.0, M)
+        dense_result = np.zeros(shape=(T, M), dtype=np.float64)
+        tables_result = np.zeros(shape=(T, M), dtype=np.float64)
+        dtram.update_log_lagrangian_mult(
+            log_lagrangian_mult, self.bias_energies, conf_energies, self.count_matrices,
+            scratch_M, dense_result)
+        dtram.update_log_lagrangian_mult(
+            log_lagrangian_mult, self.bias_energies, conf_energies, tables,
+            scratch_M, tables_result)
+        assert_allclose(tables_result, dense_result, rtol=1.0E-14, atol=1.0E-14)
+        dense_result = np.zeros(shape=(M,), dtype=np.float64)
+        tables_result = np.zeros(shape=(M,), dtype=np.float64)
+        scratch_TM = np.zeros(shape=(T, M), dtype=np.float64)
+        dtram.update_conf_energies(
+            log_lagrangian_mult, self.bias_energies, conf_energies, self.count_matrices,
+            scratch_TM, dense_result)
+        dtram.update_conf_energies(
+            log_lagrangian_mult, self.bias_energies, conf_energies, tables,
+            scratch_TM, tables_result)
+        assert_allclose(tables_result, dense_result, rtol=1.0E-14, atol=1.0E-14)
+    def test_solvers(self):
+        # the accelerated iterations must converge to the plain fixed point
+        bias_energies = np.ascontiguousarray(self.bias_energies[:,self.conf_state_sequence].T)
+        results = []
+        for solver in ('plain', 'squarem', 'anderson'):
+            for _tram in (tram, tram_direct):
+                results.append(_tram.estimate(
+                    self.count_matrices, self.state_counts, [bias_energies],
+                    [self.conf_state_sequence], maxiter=10000, maxerr=1.0E-12,
+                    solver=solver)[:3])
+            for _mbar in (mbar, mbar_direct):
+                results.append(_mbar.estimate(
+                    self.state_counts.sum(axis=1), [bias_energies], [self.conf_state_sequence],
+                    maxiter=10000, maxerr=1.0E-12, solver=solver)[:3])
+            results.append(dtram.estimate(
+                self.count_matrices, self.bias_energies, maxiter=10000, maxerr=1.0E-12,
+                solver=solver)[:2])
+            results.append(wham.estimate(
+                self.state_counts_ind, self.bias_energies, maxiter=10000, maxerr=1.0E-12,
+                solver=solver)[:2])
+        for reference, result in zip(results[:6] * 2, results[6:]):
+            for a, b in zip(reference, result):
+                assert_allclose(a, b, atol=1.0E-8)
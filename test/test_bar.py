@@ -42,3 +42,19 @@ def test_bar():
     dbIJ = u_x1_x1 - u_x2_x1
     dbJI = u_x2_x2 - u_x1_x2
     assert_allclose(bar.df(dbIJ, dbJI, np.zeros(dbJI.shape[0])), delta_f_gaussian(), atol=1.0E-1)
+
+def test_variance_overlap():
+    import thermotools.cset as cset
+    sizes = np.array([30, 0, 12, 50])
+    offsets = np.concatenate(([0], np.cumsum(sizes))).astype(np.intc)
+    bias = np.random.randn(offsets[-1], 4) * 2.0
+    for factor in (0.05, 0.2, 1.0):
+        overlap = bar.variance_overlap(bias, offsets, factor=factor)
+        for k in range(4):
+            for l in range(4):
+                if k == l or sizes[k] == 0 or sizes[l] == 0:
+                    assert overlap[k, l] == 0
+                    continue
+                a = np.ascontiguousarray(bias[offsets[k]:offsets[k + 1], [k, l]])
+                b = np.ascontiguousarray(bias[offsets[l]:offsets[l + 1], [k, l]])
+                assert overlap[k, l] == int(cset._overlap_BAR_variance(a, b, factor=factor))
@@ -23,6 +23,7 @@ from numpy.testing import assert_allclose
 from nose.tools import assert_true, assert_raises
 
 from thermotools.callback import CallbackInterrupt, generic_callback_stop
+from thermotools.solvers import get_solver, SQUAREM, Anderson
 
 #   ************************************************************************************************
 #   test generic_callback_stop
@@ -62,3 +63,30 @@ def test_dtram_stop():
     assert_allclose(log_lagrangian_mult, np.log(M + dtram.get_prior()), atol=1.0E-15)
     assert_true(increments.shape[0] == 1)
     assert_true(loglikelihoods.shape[0] == 1)
+
+#   ************************************************************************************************
+#   test get_solver
+#   ************************************************************************************************
+
+def test_get_solver():
+    x, gx = (np.zeros(3),), (np.ones(3),)
+    assert_true(get_solver(None).step(x, gx) is gx)
+    assert_true(get_solver('plain').step(x, gx) is gx)
+    assert_true(isinstance(get_solver('squarem'), SQUAREM))
+    assert_true(isinstance(get_solver('diis'), Anderson))
+    solver = Anderson(depth=2)
+    assert_true(get_solver(solver) is solver)
+    assert_raises(ValueError, get_solver, 'bogus')
+
+def test_wham_stop_with_solver():
+    T = 5
+    M = 10
+    for solver in ('squarem', 'anderson'):
+        therm_energies, conf_energies, increments, loglikelihoods = wham.estimate(
+            np.ones(shape=(T, M), dtype=np.intc),
+            np.zeros(shape=(T, M), dtype=np.float64),
+            maxiter=10, maxerr=-1.0, save_convergence_info=1,
+            callback=generic_callback_stop, solver=solver)
+        assert_allclose(therm_energies, 0.0, atol=1.0E-15)
+        assert_allclose(conf_energies, np.log(M), atol=1.0E-15)
+        assert_true(increments.shape[0] == 1)
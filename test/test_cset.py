@@ -126,6 +126,20 @@ class TestCsetThermodynamicOverlap(object):
         np.testing.assert_allclose(csets[0], np.array([]))
         np.testing.assert_allclose(csets[1], np.array([0, 1]))
         np.testing.assert_allclose(projected_cset, np.array([0, 1]))
+    def test_cset_n_jobs(self):
+        for connectivity in ('post_hoc_RE', 'BAR_variance'):
+            ref = cset.compute_csets_TRAM(
+                connectivity, self.state_counts, self.count_matrices, ttrajs=self.ttrajs,
+                dtrajs=self.dtrajs, bias_trajs=self.bias_trajs)
+            steps = []
+            csets, projected_cset = cset.compute_csets_TRAM(
+                connectivity, self.state_counts, self.count_matrices, ttrajs=self.ttrajs,
+                dtrajs=self.dtrajs, bias_trajs=self.bias_trajs, n_jobs=2,
+                callback=lambda maxiter, iteration_step: steps.append(iteration_step))
+            assert steps == list(range(self.state_counts.shape[1]))
+            for x, y in zip(ref[0], csets):
+                np.testing.assert_array_equal(x, y)
+            np.testing.assert_array_equal(ref[1], projected_cset)
     def test_restrict(self):
         csets, projected_cset = cset.compute_csets_TRAM(
             'summed_count_matrix', self.state_counts, self.count_matrices,
@@ -151,3 +165,58 @@ class TestCsetThermodynamicOverlap(object):
         np.testing.assert_allclose(new_count_matrices[1,:,:], self.count_matrices[1,:,:])
         assert len(new_bias_trajs[0])==0
         np.testing.assert_allclose(new_bias_trajs[1], self.bias_trajs[1])
+    def test_restrict_inplace_without_bias_copy(self):
+        csets, projected_cset = cset.compute_csets_TRAM(
+            'post_hoc_RE', self.state_counts, self.count_matrices, ttrajs=self.ttrajs,
+            dtrajs=self.dtrajs, bias_trajs=self.bias_trajs)
+        ref = cset.restrict_to_csets(
+            csets, self.state_counts, self.count_matrices, self.ttrajs, self.dtrajs)
+        dtrajs = [d.copy() for d in self.dtrajs]
+        new_state_counts, new_count_matrices, new_dtrajs, new_bias_trajs = cset.restrict_to_csets(
+            csets, self.state_counts, self.count_matrices, self.ttrajs, dtrajs,
+            self.bias_trajs, restrict_bias=False, inplace=True)
+        np.testing.assert_array_equal(new_state_counts, ref[0])
+        np.testing.assert_array_equal(new_count_matrices, ref[1])
+        for d, new_d, ref_d in zip(dtrajs, new_dtrajs, ref[2]):
+            assert new_d is d
+            np.testing.assert_array_equal(new_d, ref_d)
+        for b, new_b in zip(self.bias_trajs, new_bias_trajs):
+            assert new_b is b
+        # restricting again leaves the excluded frames untouched
+        again = cset.restrict_to_csets(
+            csets, self.state_counts, self.count_matrices, self.ttrajs, new_dtrajs)[2]
+        for d, ref_d in zip(again, ref[2]):
+            np.testing.assert_array_equal(d, ref_d)
+        np.testing.assert_raises(
+            ValueError, cset.restrict_to_csets, csets, self.state_counts, None,
+            self.ttrajs, [d.astype(np.int64) for d in self.dtrajs], inplace=True)
+    def test_incremental_csets(self):
+        for connectivity in ('post_hoc_RE', 'BAR_variance', 'neighbors', 'reversible_pathways'):
+            ref = cset.compute_csets_TRAM(
+                connectivity, self.state_counts, self.count_matrices, ttrajs=self.ttrajs,
+                dtrajs=self.dtrajs, bias_trajs=self.bias_trajs, nn=1)
+            incremental = cset.IncrementalCsetsTRAM(connectivity, 2, 2, nn=1)
+            incremental.add(self.ttrajs[:1], self.dtrajs[:1], self.bias_trajs[:1])
+            csets, projected_cset = incremental.get_csets()
+            np.testing.assert_array_equal(csets[1], np.array([]))
+            incremental.add(self.ttrajs[1:], self.dtrajs[1:], self.bias_trajs[1:])
+            csets, projected_cset = incremental.get_csets()
+            np.testing.assert_array_equal(incremental.state_counts, self.state_counts)
+            np.testing.assert_array_equal(incremental.count_matrices, self.count_matrices)
+            for x, y in zip(ref[0], csets):
+                np.testing.assert_array_equal(x, y)
+            np.testing.assert_array_equal(ref[1], projected_cset)
+
+def test_group_frames():
+    ttrajs = [np.random.randint(-1, 3, size=n).astype(np.intc) for n in (40, 7, 0)]
+    dtrajs = [np.random.randint(-1, 4, size=t.shape[0]).astype(np.intc) for t in ttrajs]
+    bias_trajs = [np.random.rand(t.shape[0], 3) for t in ttrajs]
+    offsets, grouped_bias = cset._group_frames(ttrajs, dtrajs, bias_trajs, 3, 4)
+    assert offsets.shape == (13,)
+    for i in range(4):
+        for k in range(3):
+            ref = np.concatenate([
+                b[np.logical_and(d == i, t == k), :]
+                for t, d, b in zip(ttrajs, dtrajs, bias_trajs)])
+            np.testing.assert_array_equal(
+                grouped_bias[offsets[i * 3 + k]:offsets[i * 3 + k + 1], :], ref)
@@ -46,3 +46,66 @@ def test_mbar_fk_with_ascending_bias():
     mbar.update_therm_energies(
         log_therm_state_counts, therm_energies, [ca(bias_energies.T)], scratch, new_therm_energies)
     assert_allclose(new_therm_energies, ref, atol=1.0E-15)
+
+def test_mbar_gradient_and_hessian():
+    np.random.seed(23)
+    T = 4
+    X = 50
+    log_therm_state_counts = np.log(np.arange(1, T + 1, dtype=np.float64))
+    therm_energies = np.random.rand(T)
+    bias_energies = np.random.rand(X, T)
+    scratch = np.zeros(shape=(T,), dtype=np.float64)
+    gradient = np.zeros(shape=(T,), dtype=np.float64)
+    hessian = np.zeros(shape=(T, T), dtype=np.float64)
+    objective = mbar.get_gradient_and_hessian(
+        log_therm_state_counts, therm_energies, [bias_energies[:20], bias_energies[20:]],
+        scratch, gradient, hessian)
+    a = log_therm_state_counts + therm_energies - bias_energies
+    divisor = np.log(np.exp(a).sum(axis=1))
+    weights = np.exp(a - divisor[:, np.newaxis])
+    counts = np.exp(log_therm_state_counts)
+    assert_allclose(objective, divisor.sum() - counts.dot(therm_energies), rtol=1.0E-14)
+    assert_allclose(gradient, weights.sum(axis=0) - counts, atol=1.0E-13)
+    assert_allclose(hessian, np.diag(weights.sum(axis=0)) - weights.T.dot(weights), atol=1.0E-13)
+
+def test_mbar_newton():
+    np.random.seed(42)
+    T = 5
+    X = 200
+    therm_state_counts = np.array([X] * T, dtype=np.intc)
+    bias_energies = [ca(np.random.rand(X, T) + np.arange(T)) for K in range(T)]
+    reference, _ = mbar.estimate_therm_energies(
+        therm_state_counts, bias_energies, maxiter=10000, maxerr=1.0E-14)
+    for warmup_steps in (0, 3):
+        therm_energies, increments = mbar.estimate_therm_energies_newton(
+            therm_state_counts, bias_energies, maxiter=20, maxerr=1.0E-14,
+            warmup_steps=warmup_steps, save_convergence_info=1)
+        assert_allclose(therm_energies, reference, atol=1.0E-12)
+        assert increments.shape[0] < 20
+    therm_energies, _ = mbar.estimate_therm_energies(
+        therm_state_counts, bias_energies, maxerr=1.0E-14, solver='newton')
+    assert_allclose(therm_energies, reference, atol=1.0E-12)
+
+def test_mbar_newton_poor_start():
+    # far from the minimum, all weights are one-hot and the Hessian vanishes: the solver
+    # must fall back to self-consistent steps instead of reporting convergence
+    np.random.seed(0)
+    T = 6
+    X = 300
+    therm_state_counts = np.array([X] * T, dtype=np.intc)
+    centers = np.arange(T) * 1.5
+    bias_energies = [
+        ca(2.0 * (np.random.randn(X, 1) * 0.5 + c - centers[np.newaxis, :])**2) for c in centers]
+    reference, _ = mbar.estimate_therm_energies(
+        therm_state_counts, bias_energies, maxiter=100000, maxerr=1.0E-13)
+    for start in ([0.0, 80.0, -60.0, 200.0, -150.0, 400.0],
+                  [0.0, 8.0E4, -6.0E4, 2.0E5, -1.5E5, 4.0E5]):
+        therm_energies, _ = mbar.estimate_therm_energies_newton(
+            therm_state_counts, bias_energies, maxiter=100, maxerr=1.0E-12,
+            therm_energies=np.array(start), warmup_steps=0)
+        gradient = np.zeros(shape=(T,), dtype=np.float64)
+        mbar.get_gradient_and_hessian(
+            np.log(therm_state_counts.astype(np.float64)), therm_energies, bias_energies,
+            np.zeros(shape=(T,), dtype=np.float64), gradient, np.zeros(shape=(T, T), dtype=np.float64))
+        assert np.max(np.abs(gradient) / therm_state_counts) < 1.0E-10
+        assert_allclose(therm_energies, reference, atol=1.0E-10)
@@ -21,7 +21,13 @@ import thermotools.tram as tram
 import thermotools.tram_direct as tram_direct
 import thermotools.trammbar as trammbar
 import thermotools.trammbar_direct as trammbar_direct
+import thermotools.mbar as mbar
+import thermotools.util as util
+import os
+import shutil
 import sys
+import tempfile
+import warnings
 from numpy.testing import assert_allclose
 
 def tower_sample(distribution):
@@ -110,6 +116,181 @@ class TestRandom(object):
         self.helper_tram(False, 0, True)
     def test_trammbar_direct_as_tram(self):
         self.helper_tram(True, 0, True)
+    def test_tram_multithreaded(self):
+        self.helper_multithreaded(tram)
+    def test_trammbar_multithreaded(self):
+        self.helper_multithreaded(trammbar)
+    def helper_multithreaded(self, _tram):
+        # the threaded sweep must agree with the serial one up to summation order
+        ca = np.ascontiguousarray
+        args = (
+            self.count_matrices, self.state_counts,
+            [ca(self.bias_energies_sh[:, 0:self.n_samples//3].T), ca(self.bias_energies_sh[:, self.n_samples//3:].T)],
+            [self.conf_state_sequence[0:self.n_samples//3], self.conf_state_sequence[self.n_samples//3:]])
+        serial = _tram.estimate(*args, maxiter=100000, maxerr=1.0E-10, save_convergence_info=10)
+        for n_threads in (2, 3, 0):
+            threaded = _tram.estimate(
+                *args, maxiter=100000, maxerr=1.0E-10, save_convergence_info=10, n_threads=n_threads)
+            for a, b in zip(serial[:4], threaded[:4]):
+                assert_allclose(a, b, rtol=1.0E-8, atol=1.0E-8)
+            assert_allclose(serial[5][-1], threaded[5][-1], rtol=1.0E-8)
+    def test_packed_sequences(self):
+        # many short trajectories must give the same result as their packed counterpart
+        ca = np.ascontiguousarray
+        chunks = np.arange(0, self.n_samples, 100)
+        bias = [ca(self.bias_energies_sh[:, a:a+100].T) for a in chunks]
+        dtrajs = [self.conf_state_sequence[a:a+100] for a in chunks]
+        packed = util.pack_sequences(bias, dtrajs)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for _tram in (tram, tram_direct):
+                reference = _tram.estimate(
+                    self.count_matrices, self.state_counts, bias, dtrajs, maxiter=50, maxerr=1.0E-10)
+                result = _tram.estimate(
+                    self.count_matrices, self.state_counts, packed, None, maxiter=50, maxerr=1.0E-10)
+                for a, b in zip(reference[:4], result[:4]):
+                    assert_allclose(a, b, rtol=1.0E-8, atol=1.0E-8)
+            reference = mbar.estimate(self.state_counts.sum(axis=1), bias, dtrajs, maxiter=50)
+            result = mbar.estimate(self.state_counts.sum(axis=1), packed, None, maxiter=50)
+        for a, b in zip(reference[:3], result[:3]):
+            assert_allclose(a, b, rtol=1.0E-8, atol=1.0E-8)
+    def test_packed_single_call(self):
+        # a PackedSequences object is swept with one C call per iteration: the lowlevel
+        # functions must reproduce the loop over the trajectories and the estimators
+        # must never split the packed buffers into trajectories
+        class Unsplittable(util.PackedSequences):
+            @property
+            def bias_energy_sequences(self):
+                raise AssertionError('packed data split into trajectories')
+            @property
+            def state_sequences(self):
+                raise AssertionError('packed data split into trajectories')
+        ca = np.ascontiguousarray
+        chunks = np.arange(0, self.n_samples, 1000)
+        bias = [ca(self.bias_energies_sh[:, a:a+1000].T) for a in chunks]
+        dtrajs = [self.conf_state_sequence[a:a+1000] for a in chunks]
+        packed = Unsplittable(bias, dtrajs)
+        T, M = self.n_therm_states, self.n_conf_states
+        log_lagrangian_mult = np.zeros(shape=(T, M), dtype=np.float64)
+        tram.init_lagrangian_mult(self.count_matrices, log_lagrangian_mult)
+        biased_conf_energies = np.zeros(shape=(T, M), dtype=np.float64)
+        scratch_M, scratch_T = np.zeros(shape=(M,)), np.zeros(shape=(T,))
+        scratch_MM = np.zeros(shape=(M, M))
+        for _tram in (tram, trammbar):
+            for n_threads in (1, 2):
+                results = []
+                for b, s in ((bias, dtrajs), (packed, None)):
+                    log_R_K_i = np.zeros(shape=(T, M), dtype=np.float64)
+                    new_biased_conf_energies = np.zeros(shape=(T, M), dtype=np.float64)
+                    log_L = _tram.update_biased_conf_energies(
+                        log_lagrangian_mult, biased_conf_energies, self.count_matrices, b, s,
+                        self.state_counts, log_R_K_i, scratch_M, scratch_T, new_biased_conf_energies,
+                        scratch_MM, True, n_threads=n_threads)
+                    conf_energies = _tram.get_conf_energies(b, s, log_R_K_i, scratch_T)
+                    results.append((new_biased_conf_energies, log_L, conf_energies))
+                for a, b in zip(*results):
+                    if n_threads == 1:
+                        np.testing.assert_array_equal(a, b)
+                    else:
+                        assert_allclose(a, b, rtol=1.0E-12, atol=1.0E-12)
+        log_therm_state_counts = np.log(self.state_counts.sum(axis=1).astype(np.float64))
+        therm_energies = np.random.rand(T)
+        results = []
+        for b, s in ((bias, dtrajs), (packed, None)):
+            new_therm_energies = np.zeros(shape=(T,), dtype=np.float64)
+            mbar.update_therm_energies(log_therm_state_counts, therm_energies, b, scratch_T, new_therm_energies)
+            gradient, hessian = np.zeros(shape=(T,)), np.zeros(shape=(T, T))
+            objective = mbar.get_gradient_and_hessian(
+                log_therm_state_counts, therm_energies, b, scratch_T, gradient, hessian)
+            results.append((new_therm_energies, objective, gradient, hessian) + mbar.get_conf_energies(
+                log_therm_state_counts, therm_energies, b, s, scratch_T, M))
+        for a, b in zip(*results):
+            # the objective sums the trajectories in C instead of in Python
+            assert_allclose(a, b, rtol=1.0E-14, atol=0.0)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for _tram, kwargs in ((tram, {}), (tram, {'n_threads': 2}), (trammbar, {})):
+                reference = _tram.estimate(
+                    self.count_matrices, self.state_counts, bias, dtrajs,
+                    maxiter=50, maxerr=1.0E-10, **kwargs)
+                result = _tram.estimate(
+                    self.count_matrices, self.state_counts, packed, None,
+                    maxiter=50, maxerr=1.0E-10, **kwargs)
+                for a, b in zip(reference[:4], result[:4]):
+                    np.testing.assert_array_equal(a, b)
+            for solver in ('plain', 'newton'):
+                reference = mbar.estimate(
+                    self.state_counts.sum(axis=1), bias, dtrajs, maxiter=50, solver=solver)
+                result = mbar.estimate(
+                    self.state_counts.sum(axis=1), packed, None, maxiter=50, solver=solver)
+                for a, b in zip(reference[:3], result[:3]):
+                    np.testing.assert_array_equal(a, b)
+    def test_chunked_sequences(self):
+        # streaming memory-mapped chunks must reproduce the in-memory result
+        ca = np.ascontiguousarray
+        bias = [ca(self.bias_energies_sh[:, 0:self.n_samples//2].T), ca(self.bias_energies_sh[:, self.n_samples//2:].T)]
+        dtrajs = [self.conf_state_sequence[0:self.n_samples//2], self.conf_state_sequence[self.n_samples//2:]]
+        directory = tempfile.mkdtemp()
+        try:
+            mapped = []
+            for i, b in enumerate(bias):
+                np.save(os.path.join(directory, '%d.npy' % i), b)
+                mapped.append(np.load(os.path.join(directory, '%d.npy' % i), mmap_mode='r'))
+            chunked = util.pack_sequences(mapped, dtrajs, chunk_size=777)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                for _tram, kwargs in ((tram, {}), (tram, {'n_threads': 2}), (tram_direct, {})):
+                    reference = _tram.estimate(
+                        self.count_matrices, self.state_counts, bias, dtrajs,
+                        maxiter=50, maxerr=1.0E-10, **kwargs)
+                    result = _tram.estimate(
+                        self.count_matrices, self.state_counts, chunked, None,
+                        maxiter=50, maxerr=1.0E-10, **kwargs)
+                    for a, b in zip(reference[:4], result[:4]):
+                        assert_allclose(a, b, rtol=1.0E-8, atol=1.0E-8)
+                reference = mbar.estimate(self.state_counts.sum(axis=1), bias, dtrajs, maxiter=50)
+                result = mbar.estimate(self.state_counts.sum(axis=1), mapped, dtrajs, maxiter=50)
+                for a, b in zip(reference[:3], result[:3]):
+                    assert_allclose(a, b, rtol=1.0E-8, atol=1.0E-8)
+                # several chunks: the chunk view must be streamed, never repacked
+                assert len(chunked.chunks) > 2
+                assert util.pack_sequences(chunked.bias_energy_sequences) is chunked
+                for solver in ('plain', 'newton'):
+                    result = mbar.estimate(
+                        self.state_counts.sum(axis=1), chunked, None, maxiter=50, solver=solver)
+                    for a, b in zip(reference[:3], result[:3]):
+                        assert_allclose(a, b, rtol=1.0E-8, atol=1.0E-8)
+            del mapped, chunked
+        finally:
+            shutil.rmtree(directory)
+    def test_single_precision(self):
+        # single precision storage is widened in the kernels: results must equal
+        # those of the same (rounded) values stored in double precision
+        ca = np.ascontiguousarray
+        bias = [ca(self.bias_energies_sh[:, 0:self.n_samples//2].T, dtype=np.float32),
+                ca(self.bias_energies_sh[:, self.n_samples//2:].T, dtype=np.float32)]
+        dtrajs = [self.conf_state_sequence[0:self.n_samples//2], self.conf_state_sequence[self.n_samples//2:]]
+        widened = [b.astype(np.float64) for b in bias]
+        assert util.pack_sequences(bias, dtrajs).bias_energy_sequence.dtype == np.float32
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for _tram, kwargs in (
+                (tram, {}), (tram, {'n_threads': 2}), (tram_direct, {}), (trammbar, {})):
+                reference = _tram.estimate(
+                    self.count_matrices, self.state_counts, widened, dtrajs,
+                    maxiter=50, maxerr=1.0E-10, **kwargs)
+                result = _tram.estimate(
+                    self.count_matrices, self.state_counts, bias, dtrajs,
+                    maxiter=50, maxerr=1.0E-10, **kwargs)
+                for a, b in zip(reference[:4], result[:4]):
+                    assert_allclose(a, b, rtol=1.0E-14, atol=1.0E-14)
+            for solver in ('plain', 'newton'):
+                reference = mbar.estimate(
+                    self.state_counts.sum(axis=1), widened, dtrajs, maxiter=50, solver=solver)
+                result = mbar.estimate(
+                    self.state_counts.sum(axis=1), bias, dtrajs, maxiter=50, solver=solver)
+                for a, b in zip(reference[:3], result[:3]):
+                    assert_allclose(a, b, rtol=1.0E-14, atol=1.0E-14)
     def helper_tram(self, direct_space, N_dtram_accelerations, use_trammbar):
         if direct_space:
             _tram = tram_direct
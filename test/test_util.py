@@ -17,7 +17,11 @@
 
 import thermotools.util as util
 import numpy as np
-from nose.tools import assert_true
+import os
+import shutil
+import tempfile
+import weakref
+from nose.tools import assert_true, assert_raises
 from numpy.testing import assert_array_equal, assert_almost_equal
 
 ####################################################################################################
@@ -98,6 +102,53 @@ def test_logsumexp_truncated_diverging_geometric_series():
         util.logsumexp(data, inplace=True, sort_array=True, use_kahan=True),
         9999.4586751453862, decimal=15)
 
+def test_logsumexp_max_kahan_leaves_input_untouched():
+    data = np.random.rand(1000).astype(np.float64) * 100.0
+    copy = data.copy()
+    result = util.logsumexp(data, inplace=True, sort_array=False, use_kahan=True)
+    assert_array_equal(data, copy)
+    assert_almost_equal(result, util.logsumexp(copy, sort_array=True, use_kahan=True), decimal=12)
+    assert_true(util.logsumexp(
+        np.array([], dtype=np.float64), sort_array=False, use_kahan=True) == -np.inf)
+    assert_true(util.logsumexp(
+        -np.inf * np.ones(3), sort_array=False, use_kahan=True) == -np.inf)
+
+def test_logsumexp_simd():
+    for size in (1, 7, 8, 9, 100, 1001):
+        data = (np.random.rand(size) - 0.5) * 200.0
+        assert_almost_equal(
+            util.logsumexp(data, inplace=False, use_simd=True),
+            util.logsumexp(data, inplace=False), decimal=12)
+    # accuracy of the polynomial exponential over the whole range
+    for a in np.linspace(-750.0, 0.0, 3001):
+        assert_almost_equal(
+            util.logsumexp(np.array([0.0, a]), use_simd=True), np.log1p(np.exp(a)), decimal=15)
+    data = np.array([-np.inf, 1.0, -np.inf, 2.0] * 5)
+    assert_almost_equal(
+        util.logsumexp(data, use_simd=True), np.log(5.0 * (np.e + np.e**2)), decimal=13)
+    assert_true(util.logsumexp(-np.inf * np.ones(9), use_simd=True) == -np.inf)
+    assert_true(np.isnan(util.logsumexp(np.array([0.0, np.nan] * 8), use_simd=True)))
+
+def test_logsumexp_mode_index():
+    assert_true(util.logsumexp_mode_index('sort_kahan') == 0)
+    assert_true(util.logsumexp_mode_index('max_kahan') == 1)
+    assert_true(util.logsumexp_mode_index('simd_kahan') == 2)
+    assert_true(util.logsumexp_mode_index(1) == 1)
+    assert_raises(ValueError, util.logsumexp_mode_index, 'unknown')
+
+def test_logsumexp_mode_context():
+    modes = [0]
+    def select(mode):
+        modes.append(mode)
+        return modes[-2]
+    with util.logsumexp_mode_context(select, 'max_kahan'):
+        assert_true(modes[-1] == 1)
+    assert_true(modes[-1] == 0)
+    with assert_raises(RuntimeError):
+        with util.logsumexp_mode_context(select, 'simd_kahan'):
+            raise RuntimeError
+    assert_true(modes == [0, 1, 0, 2, 0])
+
 def test_logsumexp_pair():
     assert_almost_equal(util.logsumexp_pair(0.0, 0.0), np.log(2.0), decimal=15)
     assert_almost_equal(util.logsumexp_pair(1.0, 1.0), 1.0 + np.log(2.0), decimal=15)
@@ -111,6 +162,77 @@ def test_logsumexp_pair():
     assert_almost_equal(util.logsumexp_pair(1000.0, 0.0), 1000.0, decimal=15)
     assert_almost_equal(util.logsumexp_pair(0.0, 1000.0), 1000.0, decimal=15)
 
+####################################################################################################
+#   packed trajectory data
+####################################################################################################
+
+def test_packed_sequences():
+    bias = [np.random.rand(n, 3) for n in (5, 1, 7)]
+    dtrajs = [np.random.randint(0, 4, size=n) for n in (5, 1, 7)]
+    packed = util.pack_sequences(bias, dtrajs)
+    assert_true(len(packed) == 3)
+    assert_true(packed.n_samples == 13)
+    assert_true(packed.n_therm_states == 3)
+    assert_array_equal(packed.offsets, [0, 5, 6, 13])
+    assert_true(packed.offsets.dtype == np.int64)
+    assert_true(packed.contiguous)
+    assert_true(packed.state_sequence.dtype == np.intc)
+    assert_true(packed.bias_energy_sequence.flags.c_contiguous)
+    # the buffer is built once; the trajectories are views on it
+    assert_true(packed.bias_energy_sequence is packed.bias_energy_sequence)
+    for a, b in zip(packed.bias_energy_sequences, bias):
+        assert_true(a.base is packed.bias_energy_sequence)
+        assert_array_equal(a, b)
+    for a, b in zip(packed.state_sequences, dtrajs):
+        assert_true(a.base is packed.state_sequence)
+        assert_array_equal(a, b)
+    # a single contiguous array is used in place
+    assert_true(util.pack_sequences(bias[:1]).bias_energy_sequence is bias[0])
+    converted = util.pack_sequences([bias[0], np.asfortranarray(bias[2]), bias[1].astype(np.float32)])
+    for a, b in zip(converted.bias_energy_sequences, [bias[0], bias[2], bias[1]]):
+        assert_true(a.flags.c_contiguous and a.dtype == np.float64)
+        assert_almost_equal(a, b, decimal=7)
+    assert_true(util.pack_sequences(packed) is packed)
+    assert_true(util.pack_sequences(bias).state_sequence is None)
+    assert_raises(ValueError, util.pack_sequences, bias, dtrajs[:2])
+    assert_raises(ValueError, util.pack_sequences, bias, [d[1:] for d in dtrajs])
+    assert_raises(ValueError, util.pack_sequences, bias, [d.astype(np.float64) for d in dtrajs])
+    assert_raises(ValueError, util.pack_sequences, [bias[0], np.random.rand(4, 2)])
+
+def test_chunked_sequences():
+    bias = [np.random.rand(n, 3) for n in (5, 1, 7)]
+    dtrajs = [np.random.randint(0, 4, size=n) for n in (5, 1, 7)]
+    directory = tempfile.mkdtemp()
+    try:
+        mapped = []
+        for i, b in enumerate(bias):
+            np.save(os.path.join(directory, '%d.npy' % i), b)
+            mapped.append(np.load(os.path.join(directory, '%d.npy' % i), mmap_mode='r'))
+        chunked = util.pack_sequences(mapped, dtrajs)
+        assert_true(isinstance(chunked, util.ChunkedSequences))
+        assert_true(chunked.n_samples == 13)
+        assert_true(chunked.n_therm_states == 3)
+        chunked = util.pack_sequences(mapped, dtrajs, chunk_size=3)
+        assert_true(chunked.chunks == [(0, 0, 3), (0, 3, 5), (1, 0, 1), (2, 0, 3), (2, 3, 6), (2, 6, 7)])
+        chunks = chunked.bias_energy_sequences
+        assert_true(len(chunks) == 6)
+        for chunk in chunks:
+            assert_true(chunk.flags.c_contiguous and chunk.dtype == np.float64)
+        assert_array_equal(np.concatenate(list(chunks)), np.concatenate(bias))
+        assert_array_equal(np.concatenate(chunked.state_sequences), np.concatenate(dtrajs))
+        assert_true(chunks[4] is chunks[4])
+        assert_raises(IndexError, chunks.__getitem__, 6)
+        del mapped, chunked, chunks
+    finally:
+        shutil.rmtree(directory)
+    # single precision is kept, other dtypes are converted chunk by chunk
+    chunked = util.pack_sequences([b.astype(np.float32) for b in bias], chunk_size=4)
+    assert_true(chunked.bias_energy_sequences[0].dtype == np.float32)
+    chunked = util.pack_sequences([b.astype(np.float16) for b in bias], chunk_size=4)
+    assert_true(chunked.state_sequence is None)
+    assert_true(chunked.bias_energy_sequences[0].dtype == np.float64)
+    assert_true(np.concatenate(list(chunked.bias_energy_sequences)).shape == (13, 3))
+
 ####################################################################################################
 #   counting states and transitions
 ####################################################################################################
@@ -162,6 +284,75 @@ def test_count_matrices_st_traj():
     ref[2, 2, 1] = 1
     assert_array_equal(C_K, ref)
 
+def test_count_matrices_sample_mode_and_excluded_frames():
+    ttraj = [np.array([0, 0, 0, 0, 0, 1, 1, 1, -1, -1, 1, 1, 1], dtype=np.intc)]
+    dtraj = [np.array([0, 1, 2, 0, 1, 2, -1, 0, 1, 1, 2, 2, 0], dtype=np.intc)]
+    ref = np.zeros(shape=(2, 3, 3), dtype=np.intc)
+    ref[0, 0, 2] = 1
+    ref[0, 2, 1] = 1
+    ref[1, 2, 0] = 2
+    C_K = util.count_matrices(ttraj, dtraj, 2, sliding=False, sparse_return=False)
+    assert_array_equal(C_K, ref)
+    ref[0, 1, 0] = 1
+    C_K = util.count_matrices(ttraj, dtraj, 2, sliding=True)
+    assert_true(len(C_K) == 2)
+    assert_array_equal(np.array([C.toarray() for C in C_K]), ref)
+    assert_raises(ValueError, util.count_matrices, ttraj, dtraj, 0)
+
+def test_multi_lag_count_matrices():
+    ttrajs = [np.random.randint(0, 3, size=n).astype(np.intc) for n in (200, 50, 3)]
+    ttrajs[0][20:120] = 1
+    ttrajs[0][-1] = 2
+    dtrajs = [np.random.randint(-1, 4, size=t.shape[0]).astype(np.intc) for t in ttrajs]
+    dtrajs[0][0] = 3
+    lags = [1, 3, 7]
+    for sliding in (True, False):
+        C_LK = util.multi_lag_count_matrices(
+            ttrajs, dtrajs, lags, sliding=sliding, sparse_return=False, nthermo=4, nstates=5)
+        assert_true(C_LK.shape == (3, 4, 5, 5))
+        sparse = util.multi_lag_count_matrices(ttrajs, dtrajs, lags, sliding=sliding)
+        for l, lag in enumerate(lags):
+            C_K = util.count_matrices(
+                ttrajs, dtrajs, lag, sliding=sliding, sparse_return=False, nthermo=4, nstates=5)
+            assert_array_equal(C_LK[l], C_K)
+            assert_array_equal(np.array([C.toarray() for C in sparse[l]]), C_K[:3, :4, :4])
+    assert_raises(ValueError, util.multi_lag_count_matrices, ttrajs, dtrajs, [1, 0])
+
+def test_sparse_count_matrices():
+    C = np.random.randint(0, 3, size=(3, 5, 5)).astype(np.intc)
+    C[:, 0, :] = 0
+    C[:, :, 0] = 0
+    sparse = util.sparse_count_matrices(C)
+    assert_true(util.sparse_count_matrices(sparse) is sparse)
+    assert_true(sparse.shape == C.shape)
+    assert_array_equal(sparse.toarray(), C)
+    for K in range(C.shape[0]):
+        pattern = sparse.tocsr(K, values=np.ones(sparse.nnz)).toarray()
+        assert_array_equal(pattern != 0, (C[K] + C[K].T + np.eye(5)) != 0)
+        assert_array_equal(sparse.tocsr(K, values=sparse.counts_ji).toarray(), C[K].T)
+    assert_raises(ValueError, util.sparse_count_matrices, C[0])
+
+def test_log_count_tables():
+    C = np.random.randint(0, 3, size=(3, 5, 5)).astype(np.intc)
+    C[:, 0, :] = 0
+    C[:, :, 0] = 0
+    N = C.sum(axis=2).astype(np.intc) + np.random.randint(0, 2, size=(3, 5)).astype(np.intc)
+    tables = util.log_count_tables(C, N, prior=0.5)
+    assert_true(isinstance(tables, util.SparseCountMatrices))
+    assert_true(util.log_count_tables(tables, N, prior=0.5) is tables)
+    assert_true(util.log_count_tables(tables, N) is not tables)
+    assert_true(util.log_count_tables(util.LogCountTables(C), N, prior=0.5).log_excess_counts is not None)
+    assert_array_equal(tables.toarray(), C)
+    with np.errstate(divide='ignore'):
+        for K in range(C.shape[0]):
+            log_counts = tables.tocsr(K, values=tables.log_counts).toarray()
+            ref = np.log(C[K] + C[K].T)
+            ref[np.diag_indices(5)] = np.log(0.5 + np.diag(C[K]))
+            pattern = (C[K] + C[K].T + np.eye(5)) != 0
+            assert_array_equal(log_counts[pattern], ref[pattern])
+        assert_almost_equal(tables.log_conf_counts, np.log(1.5 + C.sum(axis=(0, 1))))
+        assert_almost_equal(tables.log_excess_counts, np.log(np.maximum(N - C.sum(axis=1), 0)))
+
 def test_state_counts():
     ttrajs = [np.zeros(shape=(10,), dtype=np.intc), 2 * np.ones(shape=(20,), dtype=np.intc)]
     dtrajs = [np.zeros(shape=(10,), dtype=np.intc), 2 * np.ones(shape=(20,), dtype=np.intc)]
@@ -169,6 +360,45 @@ def test_state_counts():
     N = util.state_counts(ttrajs, dtrajs, nthermo=5, nstates=4)
     assert_array_equal(N, ref)
 
+def test_state_counts_excluded_frames_and_threads():
+    ttrajs = [np.random.randint(-1, 3, size=n).astype(np.intc) for n in (0, 1, 50, 1000)]
+    dtrajs = [np.random.randint(-1, 7, size=n).astype(np.intc) for n in (0, 1, 50, 1000)]
+    ttrajs[1][0], ttrajs[2][0], dtrajs[2][0] = -1, 2, 6
+    ref = np.zeros(shape=(3, 7), dtype=np.intc)
+    for t, d in zip(ttrajs, dtrajs):
+        for K, i in zip(t, d):
+            if K >= 0 and i >= 0:
+                ref[K, i] += 1
+    for n_threads in (1, 3, 0):
+        assert_array_equal(util.state_counts(ttrajs[2:], dtrajs[2:], n_threads=n_threads), ref)
+    assert_array_equal(util.state_counts(ttrajs[1:], dtrajs[1:], nthermo=3, nstates=7), ref)
+    assert_raises(ValueError, util.state_counts, ttrajs[2:], dtrajs[3:])
+
+def test_overlap_post_hoc_RE():
+    for n, m in [(1, 1), (7, 3), (50, 80)]:
+        a = np.random.randn(n, 2) * 3.0
+        b = np.random.randn(m, 2) * 3.0
+        a[0, :] = b[0, :] + 1.0 # creates a tie at delta = 0
+        x = a[:, 0] - a[:, 1]
+        y = b[:, 0] - b[:, 1]
+        n_sum = np.minimum(np.exp(x[:, np.newaxis] - y[np.newaxis, :]), 1.0).sum()
+        threshold = (n * m) / ((n + m) * n_sum)
+        for factor in (threshold * (1.0 - 1.0E-8), threshold * (1.0 + 1.0E-8)):
+            assert_true(
+                util._overlap_post_hoc_RE(a, b, factor=factor) ==
+                util._overlap_post_hoc_RE_reference(a, b, factor=factor))
+        assert_true(not util._overlap_post_hoc_RE(a, b, factor=threshold * (1.0 - 1.0E-8)))
+        assert_true(util._overlap_post_hoc_RE(a, b, factor=threshold * (1.0 + 1.0E-8)))
+    # n * m > 2**31 with a known sum: x = 0, half of the y are accepted (1 each) and half of
+    # the y equal ln(2) (1/2 each), i.e., n_sum = 3/4 * n * m
+    n = m = 50000
+    a = np.zeros(shape=(n, 2))
+    b = np.zeros(shape=(m, 2))
+    b[:, 0] = np.random.permutation(np.repeat([-1.0, np.log(2.0)], m // 2))
+    threshold = 1.0 / ((n + m) * 0.75)
+    assert_true(not util._overlap_post_hoc_RE(a, b, factor=threshold * (1.0 - 1.0E-8)))
+    assert_true(util._overlap_post_hoc_RE(a, b, factor=threshold * (1.0 + 1.0E-8)))
+
 def test_restriction():
     T = 10
     M = 100
@@ -185,6 +415,28 @@ def test_restriction():
     assert_array_equal(new_state_sequence, ref_state_sequence)
     assert_array_equal(new_bias_energy_sequence, ref_bias_energy_sequence)
 
+def test_restrict_dtrajs_to_cset():
+    dtrajs = [np.array([0, 3, 5, -1, 2, 7], dtype=np.intc), np.array([], dtype=np.intc)]
+    cset = np.array([7, 2, 3])
+    ref = [np.array([-1, 1, -1, -1, 0, 2], dtype=np.intc), np.array([], dtype=np.intc)]
+    new_dtrajs = util.restrict_dtrajs_to_cset(dtrajs, cset)
+    for d, ref_d in zip(new_dtrajs, ref):
+        assert_array_equal(d, ref_d)
+        assert_true(d.dtype == np.intc)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        memmap = np.memmap(
+            os.path.join(tmpdir, 'dtraj.dat'), dtype=np.intc, mode='w+', shape=(6,))
+        memmap[:] = dtrajs[0]
+        new_dtrajs = util.restrict_dtrajs_to_cset([memmap], list(cset), inplace=True)
+        assert_true(new_dtrajs[0] is memmap)
+        assert_array_equal(memmap, ref[0])
+        del memmap, new_dtrajs
+    finally:
+        shutil.rmtree(tmpdir)
+    assert_raises(
+        ValueError, util.restrict_dtrajs_to_cset, [dtrajs[0].astype(np.int64)], cset, inplace=True)
+
 ####################################################################################################
 #   bias calculation tools
 ####################################################################################################
@@ -208,6 +460,211 @@ def test_get_umbrella_bias_binary():
         0.5 * ndim * np.linspace(-1.0, 1.0, nsamples)**2)).T.astype(np.float64)
     assert_almost_equal(bias, ref, decimal=15)
 
+def test_get_umbrella_bias_chunked():
+    traj = np.random.rand(1001, 2) * 3.0
+    umbrella_centers = np.random.rand(4, 2)
+    force_constants = np.array([np.eye(2) * (k + 1.0) for k in range(4)])
+    force_constants[:, 0, 1] = force_constants[:, 1, 0] = 0.5
+    width = np.array([0.0, 2.0])
+    ref = util.get_umbrella_bias(traj, umbrella_centers, force_constants, width)
+    blocks = list(util.iter_umbrella_bias(
+        traj, umbrella_centers, force_constants, width, chunk_size=100, n_threads=0))
+    assert_true(len(blocks) == 11)
+    assert_array_equal(np.concatenate(blocks), ref)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        traj_memmap = np.memmap(
+            os.path.join(tmpdir, 'traj.dat'), dtype=np.float64, mode='w+', shape=traj.shape)
+        traj_memmap[:] = traj
+        out = np.memmap(
+            os.path.join(tmpdir, 'bias.dat'), dtype=np.float64, mode='w+', shape=ref.shape)
+        bias = util.get_umbrella_bias(
+            traj_memmap, umbrella_centers, force_constants, width, out=out, chunk_size=64,
+            n_threads=2)
+        assert_true(bias is out)
+        assert_array_equal(out, ref)
+        del traj_memmap, out, bias
+    finally:
+        shutil.rmtree(tmpdir)
+    assert_raises(
+        ValueError, util.get_umbrella_bias, traj, umbrella_centers, force_constants, width,
+        out=np.zeros((1001, 3)))
+
+def test_get_umbrella_bias_fast_paths():
+    def reference(traj, umbrella_centers, force_constants, width):
+        bias = np.zeros(shape=(traj.shape[0], umbrella_centers.shape[0]))
+        for k in range(umbrella_centers.shape[0]):
+            delta = traj - umbrella_centers[k]
+            periodic = width > 0.0
+            delta[:, periodic] = np.mod(
+                delta[:, periodic] + 0.5 * width[periodic], width[periodic]) - 0.5 * width[periodic]
+            bias[:, k] = 0.5 * np.einsum('xd,de,xe->x', delta, force_constants[k], delta)
+        return bias
+    for ndim, width in [(3, np.array([0.0, 2.0, 0.0])), (util.UMBRELLA_BLAS_MIN_DIM, None)]:
+        if width is None:
+            width = np.zeros(shape=(ndim,))
+        traj = np.random.rand(300, ndim) * 3.0
+        umbrella_centers = np.random.rand(5, ndim)
+        diagonal = np.array([np.diag(np.random.rand(ndim) + 0.5) for k in range(5)])
+        isotropic = np.array([np.eye(ndim) * (k + 1.0) for k in range(5)])
+        A = np.random.randn(5, ndim, ndim)
+        general = np.einsum('kij,klj->kil', A, A)
+        for force_constants in (diagonal, isotropic, general):
+            assert_almost_equal(
+                util.get_umbrella_bias(traj, umbrella_centers, force_constants, width),
+                reference(traj, umbrella_centers, force_constants, width), decimal=10)
+
+def _track_live_chunks(providers):
+    # record the largest number of computed chunks alive whenever a provider computes another one
+    live, peak = [], [0]
+    def tracked(compute):
+        def _compute(rows):
+            live[:] = [r for r in live if r() is not None]
+            peak[0] = max(peak[0], len(set(id(r()) for r in live)))
+            bias = compute(rows)
+            live.append(weakref.ref(bias))
+            return bias
+        return _compute
+    for p in providers:
+        p._compute = tracked(p._compute)
+    return peak
+
+def test_umbrella_bias_provider():
+    import thermotools.tram as tram
+    import thermotools.mbar as mbar
+    umbrella_centers = np.array([[0.0], [1.0], [2.0]])
+    force_constants = np.array([[[4.0]]] * 3)
+    width = np.zeros(shape=(1,))
+    trajs = [np.random.randn(400, 1) * 0.5 + c for c in umbrella_centers]
+    ttrajs = [np.array([k] * 400, dtype=np.intc) for k in range(3)]
+    dtrajs = [np.digitize(x[:, 0], [0.5, 1.5]).astype(np.intc) for x in trajs]
+    providers = [util.UmbrellaBias(x, umbrella_centers, force_constants, width) for x in trajs]
+    bias = [util.get_umbrella_bias(x, umbrella_centers, force_constants, width) for x in trajs]
+    assert_true(providers[0].shape == (400, 3))
+    assert_array_equal(providers[1][10:20], bias[1][10:20])
+    assert_array_equal(providers[2][7], bias[2][7])
+    state_counts = util.state_counts(ttrajs, dtrajs)
+    count_matrices = util.count_matrices(ttrajs, dtrajs, 1, sparse_return=False)
+    reference = tram.estimate(
+        count_matrices, state_counts, bias, dtrajs, maxiter=100, maxerr=1.0E-10)
+    result = tram.estimate(
+        count_matrices, state_counts, providers, dtrajs, maxiter=100, maxerr=1.0E-10)
+    for a, b in zip(reference[:4], result[:4]):
+        assert_almost_equal(a, b, decimal=10)
+    reference = mbar.estimate(state_counts.sum(axis=1), bias, dtrajs, maxiter=100)
+    result = mbar.estimate(state_counts.sum(axis=1), providers, dtrajs, maxiter=100)
+    for a, b in zip(reference[:3], result[:3]):
+        assert_almost_equal(a, b, decimal=10)
+    # several chunks per trajectory: no more than one chunk may be held at a time
+    peak = _track_live_chunks(providers)
+    chunked = util.pack_sequences(providers, dtrajs, chunk_size=150)
+    assert_true(len(chunked.chunks) == 9)
+    for solver in ('plain', 'newton'):
+        result = mbar.estimate(state_counts.sum(axis=1), chunked, None, maxiter=100, solver=solver)
+        for a, b in zip(reference[:3], result[:3]):
+            assert_almost_equal(a, b, decimal=6)
+    assert_true(peak[0] == 1)
+
+def test_linear_bias_provider():
+    import thermotools.mbar as mbar
+    kT = np.array([1.0, 1.5, 2.25])
+    energies = [np.random.exponential(scale=t, size=300) for t in kT]
+    ttrajs = [np.array([k] * 300, dtype=np.intc) for k in range(3)]
+    dtrajs = [np.digitize(e, [1.0, 2.0]).astype(np.intc) for e in energies]
+    coefficients = 1.0 / kT - 1.0 / kT[0]
+    providers = [util.LinearBias(e, coefficients) for e in energies]
+    bias = [np.outer(e, coefficients) for e in energies]
+    assert_true(providers[0].shape == (300, 3))
+    assert_almost_equal(providers[1][::7], bias[1][::7], decimal=14)
+    assert_almost_equal(providers[2][-1], bias[2][-1], decimal=14)
+    state_counts = util.state_counts(ttrajs, dtrajs)
+    reference = mbar.estimate(state_counts.sum(axis=1), bias, dtrajs, maxiter=100)
+    result = mbar.estimate(state_counts.sum(axis=1), providers, dtrajs, maxiter=100)
+    for a, b in zip(reference[:3], result[:3]):
+        assert_almost_equal(a, b, decimal=10)
+    # several chunks per trajectory: no more than one chunk may be held at a time
+    peak = _track_live_chunks(providers)
+    chunked = util.pack_sequences(providers, dtrajs, chunk_size=80)
+    assert_true(len(chunked.chunks) == 12)
+    for solver in ('plain', 'newton'):
+        result = mbar.estimate(state_counts.sum(axis=1), chunked, None, maxiter=100, solver=solver)
+        for a, b in zip(reference[:3], result[:3]):
+            assert_almost_equal(a, b, decimal=6)
+    assert_true(peak[0] == 1)
+    # several energy terms
+    terms = np.random.rand(50, 2)
+    weights = np.random.rand(4, 2)
+    assert_almost_equal(util.LinearBias(terms, weights)[:], terms.dot(weights.T), decimal=14)
+    assert_raises(ValueError, util.LinearBias, terms, np.random.rand(4, 3))
+
+def test_bias_weight_sequences():
+    import thermotools.mbar as mbar
+    import thermotools.mbar_direct as mbar_direct
+    import tracemalloc
+    bias = [np.random.rand(n, 3) for n in (5, 1, 7)]
+    shift = np.random.rand(3)
+    chunked = util.pack_sequences(bias, chunk_size=2)
+    weights = util.bias_weight_sequences(chunked.bias_energy_sequences, shift)
+    assert_true(not isinstance(weights, list) and len(weights) == len(chunked.chunks))
+    assert_almost_equal(np.concatenate(list(weights)), np.exp(shift - np.concatenate(bias)), decimal=15)
+    for a, b in zip(util.bias_weight_sequences(bias, shift), bias):
+        assert_almost_equal(a, np.exp(shift - b), decimal=15)
+    # the direct-space estimators must not hold the weights of all chunks at once
+    T, X = 20, 100000
+    kT = np.linspace(1.0, 2.0, T)
+    energies = np.random.exponential(scale=1.5, size=X)
+    providers = [util.LinearBias(energies, 1.0 / kT)]
+    counts = np.array([X // T] * T, dtype=np.intc)
+    chunked = util.pack_sequences(providers, chunk_size=1000)
+    reference, _ = mbar.estimate_therm_energies(counts, chunked, maxiter=1000, maxerr=1.0E-10)
+    tracemalloc.start()
+    try:
+        result, _ = mbar_direct.estimate_therm_energies(counts, chunked, maxiter=1000, maxerr=1.0E-10)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert_almost_equal(result - result[0], reference - reference[0], decimal=8)
+    assert_true(peak < X * T * 8 // 8)
+
 ####################################################################################################
 #   transition matrix renormalization
 ####################################################################################################
+
+def test_renormalize_transition_matrix():
+    # the diagonal must collect the remainder of the off-diagonal elements of its own row
+    M = 5
+    P = np.random.rand(M, M)
+    ref = P / P.sum(axis=1).max()
+    ref[np.diag_indices(M)] = 0.0
+    ref[np.diag_indices(M)] = 1.0 - ref.sum(axis=1)
+    util.renormalize_transition_matrix(P, np.zeros(shape=(M,), dtype=np.float64))
+    assert_almost_equal(P, ref, decimal=14)
+    assert_almost_equal(P.sum(axis=1), 1.0, decimal=14)
+    P = np.array([[0.2, 0.3, 0.0], [0.1, 0.0, 0.1], [0.0, 0.0, 0.0]])
+    util.renormalize_transition_matrix(P, np.zeros(shape=(3,), dtype=np.float64))
+    assert_almost_equal(P, [[0.4, 0.6, 0.0], [0.2, 0.6, 0.2], [0.0, 0.0, 1.0]], decimal=15)
+
+def test_renormalize_transition_matrices():
+    import scipy.sparse
+    T, M = 3, 6
+    PK = np.random.rand(T, M, M) * (np.random.rand(T, M, M) < 0.5)
+    PK[1, 2, 2] = 0.0
+    ref = PK.copy()
+    for K in range(T):
+        ref[K] /= ref[K].sum(axis=1).max()
+        ref[K][np.diag_indices(M)] = 0.0
+        ref[K][np.diag_indices(M)] = 1.0 - ref[K].sum(axis=1)
+    sparse = [scipy.sparse.csr_matrix(P) for P in PK]
+    result = util.renormalize_transition_matrices(PK, n_threads=2)
+    assert_true(result is PK)
+    assert_almost_equal(PK, ref, decimal=14)
+    assert_almost_equal(PK.sum(axis=2), 1.0, decimal=14)
+    P = PK[0].copy()
+    util.renormalize_transition_matrix(P, np.zeros(M))
+    assert_almost_equal(P, PK[0], decimal=14)
+    result = util.renormalize_transition_matrices(sparse)
+    assert_true(result is sparse)
+    for P, P_ref in zip(sparse, ref):
+        assert_true(scipy.sparse.isspmatrix_csr(P))
+        assert_almost_equal(P.toarray(), P_ref, decimal=14)
+    assert_raises(ValueError, util.renormalize_transition_matrices, [sparse[0].tocoo()])
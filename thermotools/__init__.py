@@ -28,6 +28,7 @@ from . import mbar_direct
 from . import tram_direct
 from . import util
 from . import cset
+from . import solvers
 
 from .callback import CallbackInterrupt
 
@@ -23,8 +23,11 @@ from __future__ import absolute_import
 __all__ = [
     'compute_csets_TRAM',
     'compute_csets_dTRAM',
+    'IncrementalCsetsTRAM',
     'restrict_to_csets']
 
+from multiprocessing import cpu_count as _cpu_count
+from multiprocessing.pool import ThreadPool as _ThreadPool
 import numpy as _np
 import scipy as _sp
 import scipy.sparse as _sps
@@ -35,7 +38,7 @@ import thermotools.util as _util
 
 def compute_csets_TRAM(
     connectivity, state_counts, count_matrices, equilibrium_state_counts=None,
-    ttrajs=None, dtrajs=None, bias_trajs=None, nn=None, factor=1.0, callback=None):
+    ttrajs=None, dtrajs=None, bias_trajs=None, nn=None, factor=1.0, callback=None, n_jobs=1):
     r"""
     Computes the largest connected sets in the produce space of Markov state and
     thermodynamic states for TRAM data.
@@ -128,6 +131,11 @@ def compute_csets_TRAM(
         hypothetically observed transitions. For 'BAR_variance' this
         scales the threshold for the minimal allowed variance of free
         energy differences.
+    n_jobs : int, optional, default=1
+        number of threads for the overlap tests of connectivity = 'post_hoc_RE'
+        or 'BAR_variance'; the Markov states are distributed over the threads
+        and values < 1 select one thread per CPU. The result does not depend
+        on n_jobs.
 
     Returns
     -------
@@ -149,7 +157,7 @@ def compute_csets_TRAM(
     return _compute_csets(
         connectivity, state_counts, count_matrices, ttrajs, dtrajs, bias_trajs,
         nn=nn, equilibrium_state_counts=equilibrium_state_counts,
-        factor=factor, callback=callback)
+        factor=factor, callback=callback, n_jobs=n_jobs)
 
 def compute_csets_dTRAM(connectivity, count_matrices, nn=None, callback=None):
     r"""
@@ -222,7 +230,189 @@ def compute_csets_dTRAM(connectivity, count_matrices, nn=None, callback=None):
         connectivity, state_counts, count_matrices, None, None, None, nn=nn, callback=callback)
 
 
+class IncrementalCsetsTRAM(object):
+    r"""
+    Connected sets of TRAM data which grows by batches of trajectories.
+
+    Parameters
+    ----------
+    connectivity : string
+        one of the connectivity types of compute_csets_TRAM
+    n_therm_states : int
+        number of thermodynamic states T
+    n_conf_states : int
+        number of Markov states M
+    lag : int, optional, default=1
+        lagtime for counting the transitions of the added trajectories
+    nn : int, optional
+        Number of neighbors that are assumed to overlap when
+        connectivity='neighbors'
+    factor : float, default=1.0
+        scaling factor used for connectivity = 'post_hoc_RE' or
+        'BAR_variance' (see compute_csets_TRAM)
+    n_jobs : int, optional, default=1
+        number of threads for the overlap tests (see compute_csets_TRAM)
+
+    Attributes
+    ----------
+    state_counts : numpy.ndarray((T, M), dtype=numpy.intc)
+        accumulated state counts of all added non-equilibrium trajectories
+    count_matrices : numpy.ndarray((T, M, M), dtype=numpy.intc)
+        accumulated count matrices of all added non-equilibrium trajectories
+    equilibrium_state_counts : numpy.ndarray((T, M), dtype=numpy.intc) or None
+        accumulated state counts of all added equilibrium trajectories
+
+    Notes
+    -----
+    The product-space graph is stored between calls of get_csets: the overlap
+    edges of every Markov state and the chains through the strongly connected
+    components of every ensemble. After a batch has been added, only the overlap
+    tests of pairs (k, l) where one of the groups (k, i) or (l, i) received new
+    samples and only the components of ensembles with new transitions are
+    recomputed. Overlap edges can vanish when samples are added, hence the
+    connected set is recomputed from the stored edges instead of being merged
+    incrementally; this is linear in the number of edges. The bias energies of
+    all added samples are kept in memory for later overlap tests.
+    """
+    def __init__(
+        self, connectivity, n_therm_states, n_conf_states, lag=1, nn=None, factor=1.0, n_jobs=1):
+        if connectivity not in [
+            None, 'reversible_pathways', 'largest', 'summed_count_matrix', 'neighbors',
+            'post_hoc_RE', 'BAR_variance']:
+            raise ValueError('Unknown value "%s" of connectivity.' % connectivity)
+        self.connectivity = connectivity
+        self.n_therm_states = n_therm_states
+        self.n_conf_states = n_conf_states
+        self.lag = lag
+        self.nn = nn
+        self.factor = factor
+        self.n_jobs = n_jobs
+        self.state_counts = _np.zeros((n_therm_states, n_conf_states), dtype=_np.intc)
+        self.count_matrices = _np.zeros(
+            (n_therm_states, n_conf_states, n_conf_states), dtype=_np.intc)
+        self.equilibrium_state_counts = None
+        self._bias_groups = {} # (i, k) -> list of bias energy blocks
+        self._dirty_groups = set()
+        self._overlap_pairs = {} # i -> list of (k, l)
+        self._chains = [([], []) for k in range(n_therm_states)]
+        self._dirty_ensembles = set()
+
+    def add(self, ttrajs, dtrajs, bias_trajs=None, equilibrium=False):
+        r"""
+        Add a batch of trajectories.
+
+        Parameters
+        ----------
+        ttrajs : list of numpy.ndarray(X_i, dtype=int)
+            generating thermodynamic state trajectories
+        dtrajs : list of numpy.ndarray(X_i, dtype=int)
+            configurational state trajectories
+        bias_trajs : list of numpy.ndarray((X_i, T), dtype=numpy.float64), optional
+            bias energy trajectories; required for connectivity = 'post_hoc_RE'
+            or 'BAR_variance'
+        equilibrium : bool, optional, default=False
+            if True, the trajectories are equilibrium data and contribute to
+            equilibrium_state_counts instead of the transition counts
+        """
+        ttrajs = [_np.asarray(t, dtype=_np.intc) for t in ttrajs]
+        dtrajs = [_np.asarray(d, dtype=_np.intc) for d in dtrajs]
+        state_counts = _util.state_counts(
+            ttrajs, dtrajs, nstates=self.n_conf_states, nthermo=self.n_therm_states)
+        if equilibrium:
+            if self.equilibrium_state_counts is None:
+                self.equilibrium_state_counts = _np.zeros_like(self.state_counts)
+            self.equilibrium_state_counts += state_counts
+        else:
+            count_matrices = _util.count_matrices(
+                ttrajs, dtrajs, self.lag, sparse_return=False,
+                nthermo=self.n_therm_states, nstates=self.n_conf_states)
+            self.state_counts += state_counts
+            self.count_matrices += count_matrices
+            self._dirty_ensembles.update(_np.where(count_matrices.sum(axis=(1, 2)) > 0)[0])
+        if self.connectivity in ['post_hoc_RE', 'BAR_variance']:
+            if bias_trajs is None:
+                raise ValueError('bias_trajs are required for connectivity="%s"' % self.connectivity)
+            offsets, grouped_bias = _group_frames(
+                ttrajs, dtrajs, bias_trajs, self.n_therm_states, self.n_conf_states)
+            for group in _np.where(offsets[1:] > offsets[:-1])[0]:
+                i, k = divmod(int(group), self.n_therm_states)
+                self._bias_groups.setdefault((i, k), []).append(
+                    grouped_bias[offsets[group]:offsets[group + 1], :])
+                self._dirty_groups.add((i, k))
+
+    def _update_overlap_pairs(self, callback=None):
+        n_therm_states = self.n_therm_states
+        dirty = {}
+        for i, k in self._dirty_groups:
+            dirty.setdefault(i, _np.zeros(n_therm_states, dtype=bool))[k] = True
+        def overlapping_pairs(i):
+            blocks = []
+            for k in range(n_therm_states):
+                group = self._bias_groups.get((i, k), [])
+                if len(group) > 1:
+                    group[:] = [_np.concatenate(group)]
+                blocks.append(group[0] if len(group) > 0 else _np.zeros((0, n_therm_states)))
+            bounds = _np.concatenate(([0], _np.cumsum([b.shape[0] for b in blocks])))
+            new_pairs = _overlapping_therm_pairs(
+                self.connectivity, _np.concatenate(blocks), bounds, self.factor, dirty=dirty[i])
+            # keep the results of pairs without new samples
+            return sorted(new_pairs + [
+                (k, l) for k, l in self._overlap_pairs.get(i, [])
+                if not (dirty[i][k] or dirty[i][l])])
+        conf_states = sorted(dirty)
+        for i, pairs in _map_conf_states(
+            overlapping_pairs, conf_states, self.n_jobs, callback, len(conf_states)):
+            self._overlap_pairs[i] = pairs
+        self._dirty_groups = set()
+
+    def get_csets(self, callback=None):
+        r"""
+        Compute the connected sets of all data added so far.
+
+        Parameters
+        ----------
+        callback : function, optional
+            progress callback (see compute_csets_TRAM)
+
+        Returns
+        -------
+        csets, projected_cset
+            see compute_csets_TRAM
+        """
+        if self.connectivity not in ['neighbors', 'post_hoc_RE', 'BAR_variance']:
+            return _compute_csets(
+                self.connectivity, self.state_counts, self.count_matrices, None, None, None,
+                nn=self.nn, equilibrium_state_counts=self.equilibrium_state_counts,
+                factor=self.factor, callback=callback)
+        n_conf_states = self.n_conf_states
+        if self.connectivity == 'neighbors':
+            all_state_counts = self.state_counts
+            if self.equilibrium_state_counts is not None:
+                all_state_counts = all_state_counts + self.equilibrium_state_counts
+            i_s, j_s = _neighbor_edges(all_state_counts, self.nn, callback=callback)
+        else:
+            self._update_overlap_pairs(callback=callback)
+            i_s = []
+            j_s = []
+            for i in sorted(self._overlap_pairs):
+                for k, l in self._overlap_pairs[i]:
+                    i_s.append(i + k * n_conf_states)
+                    j_s.append(i + l * n_conf_states)
+        for k in sorted(self._dirty_ensembles):
+            self._chains[k] = _conf_state_chain(self.count_matrices[k, :, :], k)
+        self._dirty_ensembles = set()
+        for chain in self._chains:
+            i_s += chain[0]
+            j_s += chain[1]
+        if self.equilibrium_state_counts is not None:
+            chain = _equilibrium_chain(self.equilibrium_state_counts)
+            i_s += chain[0]
+            j_s += chain[1]
+        return _largest_product_space_cset(i_s, j_s, self.n_therm_states, n_conf_states)
+
+
 def _overlap_BAR_variance(a, b, factor=1.0):
+    # pairwise version of bar.variance_overlap; kept for testing
     N_1 = a.shape[0]
     N_2 = b.shape[0]
     db_IJ = _np.zeros(N_1, dtype=_np.float64)
@@ -236,9 +426,150 @@ def _overlap_BAR_variance(a, b, factor=1.0):
     return (1 / b - (N_1 + N_2) / (N_1 * N_2)) < factor
 
 
+def _group_frames(ttrajs, dtrajs, bias_trajs, n_therm_states, n_conf_states):
+    r"""
+    Group all frames by their (Markov state, thermodynamic state) pair in one pass.
+
+    Returns
+    -------
+    offsets : numpy.ndarray((M * T + 1,), dtype=numpy.int64)
+        the frames of the pair (i, k) are stored in the rows
+        offsets[i * T + k]:offsets[i * T + k + 1] of grouped_bias
+    grouped_bias : numpy.ndarray((X, T), dtype=numpy.float64)
+        bias energies of all frames with nonnegative state indices, sorted by group
+    """
+    keys = []
+    for t, d in zip(ttrajs, dtrajs):
+        key = _np.asarray(d, dtype=_np.int64) * n_therm_states + _np.asarray(t, dtype=_np.int64)
+        key[_np.logical_or(_np.asarray(t) < 0, _np.asarray(d) < 0)] = -1
+        keys.append(key)
+    sizes = _np.bincount(
+        _np.concatenate([key[key >= 0] for key in keys] + [_np.zeros(0, dtype=_np.int64)]),
+        minlength=n_therm_states * n_conf_states)
+    offsets = _np.concatenate(([0], _np.cumsum(sizes))).astype(_np.int64)
+    grouped_bias = _np.zeros(shape=(offsets[-1], n_therm_states), dtype=_np.float64)
+    # counting sort: next free row of every group
+    fill = offsets[:-1].copy()
+    for key, bias in zip(keys, bias_trajs):
+        valid = _np.where(key >= 0)[0]
+        order = _np.argsort(key[valid], kind='mergesort')
+        sorted_keys = key[valid][order]
+        groups, first, counts = _np.unique(sorted_keys, return_index=True, return_counts=True)
+        rows = fill[sorted_keys] + _np.arange(sorted_keys.shape[0]) - _np.repeat(first, counts)
+        grouped_bias[rows, :] = _np.asarray(bias)[valid[order], :n_therm_states]
+        fill[groups] += counts
+    return offsets, grouped_bias
+
+
+def _overlapping_therm_pairs(connectivity, grouped_bias, bounds, factor, dirty=None):
+    r"""
+    Ordered pairs (k, l) of overlapping thermodynamic states within one Markov state.
+
+    The samples from thermodynamic state k are grouped_bias[bounds[k]:bounds[k + 1], :].
+    If dirty is given, only pairs where dirty[k] or dirty[l] is True are returned.
+    """
+    if connectivity == 'BAR_variance':
+        # all (k, l) pairs of this Markov state in one native call
+        k_s, l_s = _np.where(_bar.variance_overlap(
+            grouped_bias[bounds[0]:bounds[-1], :],
+            (bounds - bounds[0]).astype(_np.intc), factor=factor))
+        return [(k, l) for k, l in zip(k_s, l_s) if dirty is None or dirty[k] or dirty[l]]
+    therm_states = _np.where(bounds[1:] > bounds[:-1])[0] # therm states that have samples
+    pairs = []
+    for k in therm_states:
+        for l in therm_states:
+            if k!=l and (dirty is None or dirty[k] or dirty[l]):
+                kl = _np.array([k, l])
+                a = _np.ascontiguousarray(grouped_bias[bounds[k]:bounds[k + 1], kl])
+                b = _np.ascontiguousarray(grouped_bias[bounds[l]:bounds[l + 1], kl])
+                if _util._overlap_post_hoc_RE(a, b, factor=factor):
+                    pairs.append((k, l))
+    return pairs
+
+
+def _map_conf_states(function, conf_states, n_jobs, callback, maxiter):
+    r"""Yield (i, function(i)) in the order of conf_states, using n_jobs threads."""
+    conf_states = list(conf_states)
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = _cpu_count()
+    pool = _ThreadPool(n_jobs) if n_jobs > 1 else None
+    # imap keeps the order of the Markov states, hence the edges are deterministic
+    results = pool.imap(function, conf_states) if pool is not None \
+        else (function(i) for i in conf_states)
+    try:
+        for step, (i, result) in enumerate(zip(conf_states, results)):
+            # can take a very long time, allow to report progress via callback
+            if callback is not None:
+                callback(maxiter=maxiter, iteration_step=step)
+            yield i, result
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+def _neighbor_edges(all_state_counts, nn, callback=None):
+    assert nn is not None, 'With connectivity="neighbors", nn can\'t be None.'
+    n_therm_states, n_conf_states = all_state_counts.shape
+    assert nn >= 1 and nn <= n_therm_states - 1
+    i_s = []
+    j_s = []
+    # connectivity between thermodynamic states
+    for l in range(1, nn + 1):
+        if callback is not None:
+            callback(maxiter=nn, iteration_step=l)
+        for k in range(n_therm_states - l):
+            w = _np.where(_np.logical_and(
+                all_state_counts[k, :] > 0, all_state_counts[k + l, :] > 0))[0]
+            a = w + k * n_conf_states
+            b = w + (k + l) * n_conf_states
+            i_s += list(a)
+            j_s += list(b)
+    return i_s, j_s
+
+
+def _conf_state_chain(count_matrix, k):
+    r"""Chains that link the states of every strongly connected component of ensemble k."""
+    n_conf_states = count_matrix.shape[0]
+    i_s = []
+    j_s = []
+    for comp in _msmtools.estimation.connected_sets(count_matrix, directed=True):
+        # add chain that links all states in the component
+        i_s += list(comp[0:-1] + k * n_conf_states)
+        j_s += list(comp[1:]   + k * n_conf_states)
+    return i_s, j_s
+
+
+def _equilibrium_chain(equilibrium_state_counts):
+    n_therm_states, n_conf_states = equilibrium_state_counts.shape
+    i_s = []
+    j_s = []
+    for k in range(n_therm_states):
+        vertices = _np.where(equilibrium_state_counts[k, :]>0)[0]
+        # add bidirectional chain that links all states
+        chain = (vertices[0:-1], vertices[1:])
+        i_s += list(chain[0] + k * n_conf_states)
+        j_s += list(chain[1] + k * n_conf_states)
+    return i_s, j_s
+
+
+def _largest_product_space_cset(i_s, j_s, n_therm_states, n_conf_states):
+    dim = n_therm_states * n_conf_states
+    data = _np.ones(len(i_s), dtype=int)
+    A = _sp.sparse.coo_matrix((data, (i_s, j_s)), shape=(dim, dim))
+    cset = _msmtools.estimation.largest_connected_set(A, directed=False)
+    # group by thermodynamic state
+    cset = _np.unravel_index(cset, (n_therm_states, n_conf_states), order='C')
+    csets = [[] for k in range(n_therm_states)]
+    for k,i in zip(*cset):
+        csets[k].append(i)
+    csets = [_np.array(c,dtype=int) for c in csets]
+    projected_cset = _np.unique(_np.concatenate(csets))
+    return csets, projected_cset
+
+
 def _compute_csets(
     connectivity, state_counts, count_matrices, ttrajs, dtrajs, bias_trajs, nn,
-    equilibrium_state_counts=None, factor=1.0, callback=None):
+    equilibrium_state_counts=None, factor=1.0, callback=None, n_jobs=1):
     n_therm_states, n_conf_states = state_counts.shape
 
     if equilibrium_state_counts is not None:
@@ -278,85 +609,38 @@ def _compute_csets(
             csets.append(cset)
         return csets, cset_projected
     elif connectivity in ['neighbors', 'post_hoc_RE', 'BAR_variance']:
-        dim = n_therm_states * n_conf_states
         if connectivity == 'post_hoc_RE' or connectivity == 'BAR_variance':
-            if connectivity == 'post_hoc_RE':
-                overlap = _util._overlap_post_hoc_RE
-            else:
-                overlap = _overlap_BAR_variance
+            offsets, grouped_bias = _group_frames(
+                ttrajs, dtrajs, bias_trajs, n_therm_states, n_conf_states)
+            def overlapping_pairs(i):
+                return _overlapping_therm_pairs(
+                    connectivity, grouped_bias,
+                    offsets[i * n_therm_states:(i + 1) * n_therm_states + 1], factor)
             i_s = []
             j_s = []
-            for i in range(n_conf_states):
-                # can take a very long time, allow to report progress via callback
-                if callback is not None:
-                    callback(maxiter=n_conf_states, iteration_step=i)
-                therm_states = _np.where(all_state_counts[:, i] > 0)[0] # therm states that have samples
-                # prepare list of indices for all thermodynamic states
-                traj_indices = {}
-                frame_indices = {}
-                for k in therm_states:
-                    frame_indices[k] = [_np.where(
-                        _np.logical_and(d == i, t == k))[0] for t, d in zip(ttrajs, dtrajs)]
-                    traj_indices[k] = [j for j, fi in enumerate(frame_indices[k]) if len(fi) > 0]
-                for k in therm_states:
-                    for l in therm_states:
-                        if k!=l:
-                            kl = _np.array([k, l])
-                            a = _np.concatenate([
-                                bias_trajs[j][:, kl][frame_indices[k][j], :] for j in traj_indices[k]])
-                            b = _np.concatenate([
-                                bias_trajs[j][:, kl][frame_indices[l][j], :] for j in traj_indices[l]])
-                            if overlap(a, b, factor=factor):
-                                x = i + k * n_conf_states
-                                y = i + l * n_conf_states
-                                i_s.append(x)
-                                j_s.append(y)
+            for i, pairs in _map_conf_states(
+                overlapping_pairs, range(n_conf_states), n_jobs, callback, n_conf_states):
+                for k, l in pairs:
+                    i_s.append(i + k * n_conf_states)
+                    j_s.append(i + l * n_conf_states)
         else: # assume overlap between nn neighboring umbrellas
-            assert nn is not None, 'With connectivity="neighbors", nn can\'t be None.'
-            assert nn >= 1 and nn <= n_therm_states - 1
-            i_s = []
-            j_s = []
-            # connectivity between thermodynamic states
-            for l in range(1, nn + 1):
-                if callback is not None:
-                    callback(maxiter=nn, iteration_step=l)
-                for k in range(n_therm_states - l):
-                    w = _np.where(_np.logical_and(
-                        all_state_counts[k, :] > 0, all_state_counts[k + l, :] > 0))[0]
-                    a = w + k * n_conf_states
-                    b = w + (k + l) * n_conf_states
-                    i_s += list(a)
-                    j_s += list(b)
+            i_s, j_s = _neighbor_edges(all_state_counts, nn, callback=callback)
 
         # connectivity between conformational states:
         # just copy it from the count matrices
         for k in range(n_therm_states):
-            for comp in _msmtools.estimation.connected_sets(count_matrices[k, :, :], directed=True):
-                # add chain that links all states in the component
-                i_s += list(comp[0:-1] + k * n_conf_states)
-                j_s += list(comp[1:]   + k * n_conf_states)
+            chain = _conf_state_chain(count_matrices[k, :, :], k)
+            i_s += chain[0]
+            j_s += chain[1]
 
         # If there is global equilibrium data, assume full connectivity
         # between all visited conformational states within the same thermodynamic state.
         if equilibrium_state_counts is not None:
-            for k in range(n_therm_states):
-                vertices = _np.where(equilibrium_state_counts[k, :]>0)[0]
-                # add bidirectional chain that links all states
-                chain = (vertices[0:-1], vertices[1:])
-                i_s += list(chain[0] + k * n_conf_states)
-                j_s += list(chain[1] + k * n_conf_states)
-
-        data = _np.ones(len(i_s), dtype=int)
-        A = _sp.sparse.coo_matrix((data, (i_s, j_s)), shape=(dim, dim))
-        cset = _msmtools.estimation.largest_connected_set(A, directed=False)
-        # group by thermodynamic state
-        cset = _np.unravel_index(cset, (n_therm_states, n_conf_states), order='C')
-        csets = [[] for k in range(n_therm_states)]
-        for k,i in zip(*cset):
-            csets[k].append(i)
-        csets = [_np.array(c,dtype=int) for c in csets]
-        projected_cset = _np.unique(_np.concatenate(csets))
-        return csets, projected_cset
+            chain = _equilibrium_chain(equilibrium_state_counts)
+            i_s += chain[0]
+            j_s += chain[1]
+
+        return _largest_product_space_cset(i_s, j_s, n_therm_states, n_conf_states)
     else:
         raise Exception(
             'Unknown value "%s" of connectivity. Should be one of: \
@@ -364,7 +648,8 @@ def _compute_csets(
             post_hoc_RE or BAR_variance.' % connectivity)
 
 def restrict_to_csets(
-    csets, state_counts=None, count_matrices=None, ttrajs=None, dtrajs=None, bias_trajs=None):
+    csets, state_counts=None, count_matrices=None, ttrajs=None, dtrajs=None, bias_trajs=None,
+    restrict_bias=True, inplace=False):
     r"""
     Delete or deactivate elements that are not in the connected sets.
 
@@ -387,6 +672,15 @@ def restrict_to_csets(
     bias_trajs : list of ndarray((X_i, T)), optional
         List of bias energy trajectories for all T thermodynamic states.
         If given, ttrajs and dtrajs must be given as well.
+    restrict_bias : bool, optional, default=True
+        If False, bias_trajs are returned as they are instead of compacted
+        copies. They remain aligned with the returned dtrajs, in which the
+        frames outside of the connected sets are marked by negative indices
+        and skipped by the TRAM estimators. This avoids copying the bias
+        energies.
+    inplace : bool, optional, default=False
+        If True, the elements of dtrajs are relabeled in place and returned;
+        they must be C-contiguous numpy.ndarrays of dtype numpy.intc.
 
     Returns
     -------
@@ -401,7 +695,7 @@ def restrict_to_csets(
     bias_trajs : list of ndarray((Y_i, T))
     Same as input but with frames removed where the combination
     of thermodynamic state and Markov state as given in ttrajs and
-    dtrajs is not in the connected sets.
+    dtrajs is not in the connected sets (unless restrict_bias=False).
     """
     if state_counts is not None:
         new_state_counts = _np.zeros_like(state_counts, order='C', dtype=_np.intc)
@@ -429,14 +723,22 @@ def restrict_to_csets(
         assert len(ttrajs) == len(dtrajs)
         for t, d in zip(ttrajs, dtrajs):
             assert len(t) == len(d)
-            new_d = _np.array(d, dtype=_np.intc, copy=True, order='C', ndmin=1)
-            bad = invalid[t, d]
+            if inplace:
+                if not (isinstance(d, _np.ndarray) and d.dtype == _np.intc and d.flags.c_contiguous):
+                    raise ValueError('inplace restriction requires C-contiguous intc dtrajs')
+                new_d = d
+            else:
+                new_d = _np.array(d, dtype=_np.intc, copy=True, order='C', ndmin=1)
+            # frames that are already excluded keep their negative index
+            bad = _np.logical_and(new_d >= 0, invalid[t, new_d])
             new_d[bad] = new_d[bad] - n_conf_states # 'numpy equivalent' indices as in x[i]==x[i+len(x)]
             assert _np.all(new_d[bad] < 0)
             new_dtrajs.append(new_d)
     else:
         new_dtrajs = None
-    if bias_trajs is not None:
+    if bias_trajs is not None and not restrict_bias:
+        new_bias_trajs = bias_trajs
+    elif bias_trajs is not None:
         assert ttrajs is not None, 'ttrajs can\'t be None, when bias_trajs are given.'
         assert dtrajs is not None, 'dtrajs can\'t be None, when bias_trajs are given.'
         n_therm_states, n_conf_states = state_counts.shape
@@ -448,7 +750,8 @@ def restrict_to_csets(
         assert len(ttrajs) == len(dtrajs) == len(bias_trajs)
         for t, d, b in zip(ttrajs, dtrajs, bias_trajs):
             assert len(t) == len(d) == len(b)
-            ok_traj = valid[t, d]
+            d = _np.asarray(d)
+            ok_traj = _np.logical_and(d >= 0, valid[t, d])
             new_b = _np.zeros((_np.count_nonzero(ok_traj), b.shape[1]), dtype=_np.float64)
             new_b[:] = b[ok_traj, :]
             new_bias_trajs.append(new_b)
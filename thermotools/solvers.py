@@ -0,0 +1,243 @@
+# This file is part of thermotools.
+#
+# Copyright 2016 Computational Molecular Biology Group, Freie Universitaet Berlin (GER)
+#
+# thermotools is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+r"""
+This module provides extrapolation schemes which accelerate the self-consistent iterations
+of the estimators.
+
+Every estimator iterates a fixed point map x -> G(x) given by its update functions. In each
+iteration, the estimator evaluates G at the current point x and passes both to the `step`
+method of its solver, which returns the point to evaluate next. The plain solver returns G(x)
+and thus reproduces the unaccelerated iteration; the extrapolating solvers combine the recent
+iterates and fall back to the plain step whenever an extrapolated point increases the
+fixed point residual |G(x) - x|.
+"""
+
+import numpy as _np
+
+__all__ = [
+    'FixedPointSolver',
+    'SQUAREM',
+    'Anderson',
+    'get_solver']
+
+class FixedPointSolver(object):
+    r"""
+    Plain self-consistent iteration; base class for the extrapolating solvers.
+    """
+    extrapolates = False
+    def reset(self):
+        r"""Forget all stored iterates."""
+        pass
+    def step(self, x, gx):
+        r"""
+        Propose the next point of the fixed point iteration.
+
+        Parameters
+        ----------
+        x : tuple of numpy.ndarray
+            the current point
+        gx : tuple of numpy.ndarray
+            the image G(x) of the current point under the plain update
+
+        Returns
+        -------
+        proposal : tuple of numpy.ndarray
+            the point to evaluate in the next iteration; this is gx itself
+            (the same object) if the plain step is taken
+
+        Notes
+        -----
+        Non-finite elements (e.g., the -inf logarithms of Lagrangian multipliers of
+        unvisited states) are excluded from the extrapolation and copied from gx.
+        """
+        return gx
+
+class _ExtrapolatingSolver(FixedPointSolver):
+    r"""Flattening and masking shared by the extrapolating solvers."""
+    extrapolates = True
+    def __init__(self):
+        self._mask = None
+    def _flatten(self, x, gx):
+        x = _np.concatenate([_np.ravel(a) for a in x]).astype(_np.float64)
+        gx = _np.concatenate([_np.ravel(a) for a in gx]).astype(_np.float64)
+        mask = _np.isfinite(x) & _np.isfinite(gx)
+        if self._mask is None or self._mask.shape != mask.shape or _np.any(self._mask != mask):
+            self.reset()
+            self._mask = mask
+        return x[mask], gx[mask], gx
+    def _unflatten(self, values, gx_full, gx):
+        gx_full = gx_full.copy()
+        gx_full[self._mask] = values
+        proposal, first = [], 0
+        for a in gx:
+            proposal.append(gx_full[first:first + a.size].reshape(a.shape))
+            first += a.size
+        return tuple(proposal)
+
+class SQUAREM(_ExtrapolatingSolver):
+    r"""
+    Squared iterative extrapolation (SQUAREM, scheme S3 of Varadhan and Roland).
+
+    Parameters
+    ----------
+    max_step : float, optional, default=4.0
+        initial bound on the magnitude of the steplength
+    step_factor : float, optional, default=4.0
+        the bound is multiplied by this factor after every accepted maximal step and
+        divided by it after every rejected extrapolation
+
+    Notes
+    -----
+    Every cycle takes two plain steps x0 -> x1 -> x2 and then proposes the extrapolated
+    point x0 - 2 a r + a^2 v with r = x1 - x0, v = x2 - 2 x1 + x0 and a = -|r|/|v|
+    (bounded by -1, which recovers x2). If the residual at the extrapolated point
+    exceeds the residual of the last plain step, the cycle restarts from x2.
+    """
+    def __init__(self, max_step=4.0, step_factor=4.0):
+        super(SQUAREM, self).__init__()
+        self.initial_max_step = max_step
+        self.step_factor = step_factor
+        self.reset()
+    def reset(self):
+        self.max_step = self.initial_max_step
+        self._x0 = None
+        self._x1 = None
+        self._fallback = None
+        self._fallback_residual = None
+        self._maximal_step = False
+    def step(self, x, gx):
+        x_m, gx_m, gx_full = self._flatten(x, gx)
+        residual = _np.linalg.norm(gx_m - x_m)
+        if self._fallback is not None:
+            # x is an extrapolated point: accept it unless it increased the residual
+            fallback = self._fallback
+            self._fallback = None
+            if not _np.isfinite(residual) or residual > self._fallback_residual:
+                self.max_step = max(1.0, self.max_step / self.step_factor)
+                return fallback
+            if self._maximal_step:
+                self.max_step *= self.step_factor
+        if self._x0 is None:
+            # first plain step of a cycle
+            self._x0, self._x1 = x_m, gx_m
+            return gx
+        # second plain step of a cycle: extrapolate
+        x0, x1 = self._x0, self._x1
+        self._x0 = self._x1 = None
+        r = x1 - x0
+        v = gx_m - 2.0 * x1 + x0
+        norm_v = _np.linalg.norm(v)
+        if norm_v == 0.0:
+            return gx
+        alpha = -_np.linalg.norm(r) / norm_v
+        self._maximal_step = (alpha <= -self.max_step)
+        alpha = min(-1.0, max(alpha, -self.max_step))
+        if alpha == -1.0:
+            if self._maximal_step:
+                self.max_step *= self.step_factor
+            return gx
+        self._fallback = tuple(a.copy() for a in gx)
+        self._fallback_residual = residual
+        return self._unflatten(x0 - 2.0 * alpha * r + alpha * alpha * v, gx_full, gx)
+
+class Anderson(_ExtrapolatingSolver):
+    r"""
+    Anderson mixing (equivalently, Pulay's DIIS) on the fixed point residuals.
+
+    Parameters
+    ----------
+    depth : int, optional, default=5
+        number of stored differences of iterates
+    regularization : float, optional, default=1.0E-10
+        relative Tikhonov regularization of the least squares problem
+
+    Notes
+    -----
+    The proposal is G(x_k) - dG gamma, where dG holds the differences of the last
+    images and gamma minimizes |f_k - dF gamma| for the residuals f = G(x) - x.
+    If the residual grows after an extrapolated step, the history is discarded
+    and the plain step is taken.
+    """
+    def __init__(self, depth=5, regularization=1.0E-10):
+        super(Anderson, self).__init__()
+        self.depth = depth
+        self.regularization = regularization
+        self.reset()
+    def reset(self):
+        self._g = None
+        self._f = None
+        self._residual = None
+        self._extrapolated = False
+        self._dg = []
+        self._df = []
+    def step(self, x, gx):
+        x_m, gx_m, gx_full = self._flatten(x, gx)
+        f = gx_m - x_m
+        residual = _np.linalg.norm(f)
+        if self._extrapolated and (not _np.isfinite(residual) or residual > self._residual):
+            self.reset()
+            self._g, self._f, self._residual = gx_m, f, residual
+            return gx
+        if self._g is not None:
+            self._dg.append(gx_m - self._g)
+            self._df.append(f - self._f)
+            if len(self._df) > self.depth:
+                self._dg.pop(0)
+                self._df.pop(0)
+        self._g, self._f, self._residual = gx_m, f, residual
+        self._extrapolated = False
+        if len(self._df) == 0:
+            return gx
+        dF = _np.array(self._df).T
+        dG = _np.array(self._dg).T
+        A = dF.T.dot(dF)
+        A += self.regularization * max(_np.trace(A), 1.0E-300) * _np.eye(A.shape[0])
+        try:
+            gamma = _np.linalg.solve(A, dF.T.dot(f))
+        except _np.linalg.LinAlgError:
+            self.reset()
+            return gx
+        self._extrapolated = True
+        return self._unflatten(gx_m - dG.dot(gamma), gx_full, gx)
+
+def get_solver(solver):
+    r"""
+    Return a solver for the `solver` argument of the estimators.
+
+    Parameters
+    ----------
+    solver : str or FixedPointSolver
+        'plain' (or None) for the unaccelerated iteration, 'squarem', 'anderson'
+        or 'diis' (an alias for 'anderson'); a FixedPointSolver object is reset and
+        returned as is
+
+    Returns
+    -------
+    solver : FixedPointSolver
+        the selected solver
+    """
+    if isinstance(solver, FixedPointSolver):
+        solver.reset()
+        return solver
+    if solver is None or solver == 'plain':
+        return FixedPointSolver()
+    if solver == 'squarem':
+        return SQUAREM()
+    if solver in ('anderson', 'diis'):
+        return Anderson()
+    raise ValueError("unknown solver %r; use 'plain', 'squarem', 'anderson' or 'diis'" % (solver,))